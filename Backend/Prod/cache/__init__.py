@@ -0,0 +1,19 @@
+"""
+Cache module for AETHERFLOW.
+
+Provides persistent LLM response caches shared across plan runs:
+- PromptCache: exact match on (provider, model, normalized prompt, context hash)
+- SemanticCache: near-duplicate match on prompt embeddings
+"""
+from .store import CacheStore, CacheEntry
+from .prompt_cache import PromptCache, normalize_prompt
+from .semantic_cache import SemanticCache, EmbeddingModelSingleton
+
+__all__ = [
+    "CacheStore",
+    "CacheEntry",
+    "PromptCache",
+    "SemanticCache",
+    "EmbeddingModelSingleton",
+    "normalize_prompt",
+]
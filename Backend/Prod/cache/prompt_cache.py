@@ -0,0 +1,229 @@
+"""
+Exact-match prompt cache.
+
+Keys are a SHA-256 over (provider, model, normalized prompt, context hash), so
+an identical step prompt sent to the same provider/model with the same context
+returns the stored response without any API call. Normalization only folds
+whitespace noise (line endings, trailing spaces, blank-line runs) — code
+indentation and case are significant and kept as-is.
+"""
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from ..config.settings import settings
+from .store import CacheStore
+
+
+_TRAILING_WS = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_RUNS = re.compile(r"\n{3,}")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Fold whitespace noise that does not change the meaning of a prompt."""
+    text = prompt.replace("\r\n", "\n").replace("\r", "\n")
+    text = _TRAILING_WS.sub("", text)
+    text = _BLANK_RUNS.sub("\n\n", text)
+    return text.strip()
+
+
+def hash_text(text: Optional[str]) -> str:
+    """Stable SHA-256 hex digest ('' for None)."""
+    if not text:
+        return ""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PromptCache:
+    """
+    Persistent exact-match cache for LLM responses.
+
+    Backed by a CacheStore (SQLite, LRU + TTL, byte budget). Hit/miss counters
+    are kept both for the current process and cumulatively on disk.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        enabled: Optional[bool] = None
+    ):
+        """
+        Initialize prompt cache.
+
+        Args:
+            db_path: SQLite file (defaults to <cache_dir>/prompt_cache.db)
+            max_entries: Maximum entries (defaults to settings.cache_max_entries)
+            max_bytes: Byte budget (defaults to settings.cache_max_size_mb)
+            ttl_seconds: Entry lifetime (defaults to settings.cache_ttl_hours, 0 = no expiry)
+            enabled: Enable lookups/stores (defaults to settings.enable_prompt_cache)
+        """
+        self.enabled = settings.enable_prompt_cache if enabled is None else enabled
+        if ttl_seconds is None:
+            ttl_seconds = settings.cache_ttl_hours * 3600
+
+        self.store = CacheStore(
+            db_path=db_path or Path(settings.cache_dir) / "prompt_cache.db",
+            max_entries=max_entries or settings.cache_max_entries,
+            max_bytes=max_bytes or settings.cache_max_size_mb * 1024 * 1024,
+            ttl_seconds=ttl_seconds or None
+        )
+        self.session_hits = 0
+        self.session_misses = 0
+        self.session_tokens_saved = 0
+        self.session_cost_saved_usd = 0.0
+
+    @staticmethod
+    def make_key(
+        prompt: str,
+        context: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None
+    ) -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            prompt: User prompt (normalized before hashing)
+            context: Additional context sent with the prompt
+            provider: Provider name (e.g. "deepseek")
+            model: Model identifier
+            system_prompt: System prompt, folded into the context hash
+
+        Returns:
+            Hex SHA-256 key
+        """
+        context_hash = hash_text((context or "") + "\x00" + (system_prompt or ""))
+        payload = json.dumps(
+            [provider or "", model or "", normalize_prompt(prompt), context_hash],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(
+        self,
+        prompt: str,
+        context: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Returns:
+            Cached response text, or None on miss
+        """
+        if not self.enabled:
+            return None
+
+        key = self.make_key(prompt, context, provider, model, system_prompt)
+        try:
+            entry = self.store.get(key)
+        except Exception as e:
+            logger.debug(f"Prompt cache lookup failed: {e}")
+            return None
+
+        if entry is None:
+            self.session_misses += 1
+            self.store.incr_stat("misses")
+            return None
+
+        self.session_hits += 1
+        self.session_tokens_saved += entry.tokens_saved
+        self.session_cost_saved_usd += entry.cost_saved_usd
+        self.store.incr_stat("hits")
+        self.store.incr_stat("tokens_saved", entry.tokens_saved)
+        self.store.incr_stat("cost_saved_usd", entry.cost_saved_usd)
+        return entry.response
+
+    def put(
+        self,
+        prompt: str,
+        response: str,
+        context: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        tokens_saved: int = 0,
+        cost_saved_usd: float = 0.0
+    ) -> None:
+        """
+        Store a response.
+
+        Args:
+            tokens_saved: Tokens the original call consumed (credited on each future hit)
+            cost_saved_usd: Cost of the original call (credited on each future hit)
+        """
+        if not self.enabled or not response:
+            return
+
+        key = self.make_key(prompt, context, provider, model, system_prompt)
+        meta = {"provider": provider, "model": model}
+        meta.update(metadata or {})
+        try:
+            self.store.put(
+                key=key,
+                response=response,
+                namespace=provider,
+                metadata=meta,
+                tokens_saved=tokens_saved,
+                cost_saved_usd=cost_saved_usd
+            )
+        except Exception as e:
+            logger.debug(f"Prompt cache store failed: {e}")
+
+    def clear(self) -> None:
+        """Drop all entries and statistics."""
+        self.store.clear()
+        self.session_hits = 0
+        self.session_misses = 0
+        self.session_tokens_saved = 0
+        self.session_cost_saved_usd = 0.0
+
+    def get_cache_summary(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Top-level counters are cumulative (persisted on disk); counters for
+        the current process only are under "session".
+        """
+        stats = self.store.get_stats()
+        hits = int(stats.get("hits", 0))
+        total_requests = hits + int(stats.get("misses", 0))
+        session_requests = self.session_hits + self.session_misses
+
+        return {
+            "enabled": self.enabled,
+            "total_entries": self.store.count(),
+            "total_bytes": self.store.total_bytes(),
+            "max_bytes": self.store.max_bytes,
+            "entries_by_provider": self.store.entries_by_namespace(),
+            "total_requests": total_requests,
+            "cache_hits": hits,
+            "cache_misses": total_requests - hits,
+            "cache_hit_rate": (hits / total_requests * 100) if total_requests else 0.0,
+            "tokens_saved": int(stats.get("tokens_saved", 0)),
+            "cost_saved_usd": stats.get("cost_saved_usd", 0.0),
+            "evictions": int(stats.get("evictions", 0)),
+            "session": {
+                "total_requests": session_requests,
+                "cache_hits": self.session_hits,
+                "cache_misses": self.session_misses,
+                "cache_hit_rate": (self.session_hits / session_requests * 100) if session_requests else 0.0,
+                "tokens_saved": self.session_tokens_saved,
+                "cost_saved_usd": self.session_cost_saved_usd,
+            },
+        }
+
+    def close(self) -> None:
+        """Close the underlying store."""
+        self.store.close()
@@ -0,0 +1,358 @@
+"""
+Semantic (near-duplicate) prompt cache.
+
+Prompts are embedded and compared by cosine similarity against stored entries
+of the same namespace; a stored response is returned when the best match is
+above the similarity threshold.
+
+Embeddings come from sentence-transformers (``all-MiniLM-L6-v2``) when it is
+installed. Otherwise a hashed character-trigram encoder is used: it catches
+near-identical prompts (whitespace, small wording edits) but not paraphrases,
+so its threshold is raised accordingly.
+"""
+import hashlib
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from ..config.settings import settings
+from .prompt_cache import normalize_prompt
+from .store import CacheStore
+
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Minimum similarity when falling back to the hashing encoder (near-duplicates only)
+HASHING_MIN_THRESHOLD = 0.95
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class EmbeddingModelSingleton:
+    """
+    Process-wide holder for sentence-transformers models.
+
+    Models are loaded once per process on first request; a failed import or
+    load is remembered (as None) so callers can fall back without retrying.
+    """
+
+    _instance: Optional["EmbeddingModelSingleton"] = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls) -> "EmbeddingModelSingleton":
+        with cls._instance_lock:
+            if cls._instance is None:
+                instance = super().__new__(cls)
+                instance._models = {}
+                instance._load_lock = threading.Lock()
+                cls._instance = instance
+        return cls._instance
+
+    def get_model(self, model_name: str = DEFAULT_EMBEDDING_MODEL) -> Optional[Any]:
+        """
+        Get a loaded SentenceTransformer, or None if unavailable.
+
+        Args:
+            model_name: sentence-transformers model name
+        """
+        if model_name in self._models:
+            return self._models[model_name]
+
+        with self._load_lock:
+            if model_name in self._models:
+                return self._models[model_name]
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._models[model_name] = SentenceTransformer(model_name)
+                logger.info(f"Embedding model loaded: {model_name}")
+            except ImportError:
+                logger.debug("sentence-transformers not installed, embedding model unavailable")
+                self._models[model_name] = None
+            except Exception as e:
+                logger.warning(f"Failed to load embedding model {model_name}: {e}")
+                self._models[model_name] = None
+        return self._models[model_name]
+
+
+class HashingEncoder:
+    """Dependency-free encoder: hashed character trigrams + words, L2-normalized."""
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def encode(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        lowered = " ".join(text.lower().split())
+        for i in range(len(lowered) - 2):
+            vector[zlib.crc32(lowered[i:i + 3].encode("utf-8")) % self.dim] += 1.0
+        for word in _WORD_RE.findall(lowered):
+            vector[zlib.crc32(b"w:" + word.encode("utf-8")) % self.dim] += 2.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SentenceEncoder:
+    """Adapter around a SentenceTransformer model."""
+
+    def __init__(self, model: Any, model_name: str):
+        self.model = model
+        self.name = model_name
+        self.dim = int(model.get_sentence_embedding_dimension())
+
+    def encode(self, text: str) -> np.ndarray:
+        vector = self.model.encode([text], normalize_embeddings=True)[0]
+        return np.asarray(vector, dtype=np.float32)
+
+
+class SemanticCache:
+    """
+    Persistent semantic cache for LLM responses.
+
+    Entries live in a CacheStore (SQLite, LRU + TTL, byte budget) with their
+    embedding as a float32 blob. Each namespace keeps an in-memory normalized
+    embedding matrix so a lookup is one matrix-vector product; the matrix is
+    rebuilt only when the store evicts or deletes entries.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        similarity_threshold: Optional[float] = None,
+        model_name: str = DEFAULT_EMBEDDING_MODEL,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        use_embeddings: bool = True
+    ):
+        """
+        Initialize semantic cache.
+
+        Args:
+            db_path: SQLite file (defaults to <cache_dir>/semantic_cache.db)
+            similarity_threshold: Minimum cosine similarity for a hit (defaults to settings)
+            model_name: sentence-transformers model name
+            max_entries: Maximum entries (defaults to settings.cache_max_entries)
+            max_bytes: Byte budget (defaults to settings.cache_max_size_mb)
+            ttl_seconds: Entry lifetime (defaults to settings.cache_ttl_hours, 0 = no expiry)
+            enabled: Enable lookups/stores (defaults to settings.enable_prompt_cache)
+            use_embeddings: Try sentence-transformers before the hashing encoder
+        """
+        self.enabled = settings.enable_prompt_cache if enabled is None else enabled
+        if ttl_seconds is None:
+            ttl_seconds = settings.cache_ttl_hours * 3600
+
+        self.store = CacheStore(
+            db_path=db_path or Path(settings.cache_dir) / "semantic_cache.db",
+            max_entries=max_entries or settings.cache_max_entries,
+            max_bytes=max_bytes or settings.cache_max_size_mb * 1024 * 1024,
+            ttl_seconds=ttl_seconds or None
+        )
+
+        self.model_name = model_name
+        self.use_embeddings = use_embeddings
+        self._encoder: Optional[Any] = None
+        self._requested_threshold = (
+            similarity_threshold if similarity_threshold is not None else settings.semantic_cache_threshold
+        )
+
+        # namespace -> (keys, matrix[n, dim])
+        self._index: Dict[str, Tuple[List[str], np.ndarray]] = {}
+        self._index_generation = -1
+        self._lock = threading.Lock()
+
+        self.session_hits = 0
+        self.session_misses = 0
+        self.session_tokens_saved = 0
+        self.session_cost_saved_usd = 0.0
+
+    @property
+    def encoder(self) -> Any:
+        """Embedding encoder (loaded lazily on first use)."""
+        if self._encoder is None:
+            model = EmbeddingModelSingleton().get_model(self.model_name) if self.use_embeddings else None
+            self._encoder = SentenceEncoder(model, self.model_name) if model is not None else HashingEncoder()
+        return self._encoder
+
+    @property
+    def similarity_threshold(self) -> float:
+        """Effective threshold (raised for the hashing encoder)."""
+        if isinstance(self.encoder, HashingEncoder):
+            return max(self._requested_threshold, HASHING_MIN_THRESHOLD)
+        return self._requested_threshold
+
+    def _make_key(self, prompt: str, namespace: Optional[str]) -> str:
+        payload = f"{self.encoder.name}\x00{namespace or ''}\x00{normalize_prompt(prompt)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_index(self, namespace: Optional[str]) -> Tuple[List[str], np.ndarray]:
+        """Return the (keys, matrix) index for a namespace, rebuilding if stale."""
+        ns = namespace or ""
+        if self._index_generation != self.store.generation:
+            self._index.clear()
+            self._index_generation = self.store.generation
+
+        if ns not in self._index:
+            dim = self.encoder.dim
+            keys: List[str] = []
+            rows: List[np.ndarray] = []
+            for key, blob in self.store.iter_embeddings(ns):
+                if blob and len(blob) == dim * 4:
+                    keys.append(key)
+                    rows.append(np.frombuffer(blob, dtype=np.float32))
+            matrix = np.vstack(rows) if rows else np.zeros((0, dim), dtype=np.float32)
+            self._index[ns] = (keys, matrix)
+        return self._index[ns]
+
+    def get(self, prompt: str, namespace: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """
+        Look up a response for a similar prompt.
+
+        Args:
+            prompt: Prompt text
+            namespace: Namespace isolating unrelated entries (e.g. step id, mode)
+
+        Returns:
+            (response, similarity) on hit, None on miss
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            with self._lock:
+                key = self._make_key(prompt, namespace)
+                entry = self.store.get(key)
+                similarity = 1.0
+
+                if entry is None:
+                    keys, matrix = self._get_index(namespace)
+                    if len(keys):
+                        query = self.encoder.encode(normalize_prompt(prompt))
+                        scores = matrix @ query
+                        best = int(np.argmax(scores))
+                        similarity = float(scores[best])
+                        if similarity >= self.similarity_threshold:
+                            entry = self.store.get(keys[best])
+        except Exception as e:
+            logger.debug(f"Semantic cache lookup failed: {e}")
+            return None
+
+        if entry is None:
+            self.session_misses += 1
+            self.store.incr_stat("misses")
+            return None
+
+        self.session_hits += 1
+        self.session_tokens_saved += entry.tokens_saved
+        self.session_cost_saved_usd += entry.cost_saved_usd
+        self.store.incr_stat("hits")
+        self.store.incr_stat("similarity_sum", similarity)
+        self.store.incr_stat("tokens_saved", entry.tokens_saved)
+        self.store.incr_stat("cost_saved_usd", entry.cost_saved_usd)
+        return entry.response, similarity
+
+    def put(
+        self,
+        prompt: str,
+        response: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        tokens_saved: int = 0,
+        cost_saved_usd: float = 0.0,
+        namespace: Optional[str] = None
+    ) -> None:
+        """
+        Store a response with its prompt embedding.
+
+        Args:
+            prompt: Prompt text
+            response: Response to cache
+            metadata: Extra metadata (provider, step id, ...)
+            tokens_saved: Tokens the original call consumed (credited on each future hit)
+            cost_saved_usd: Cost of the original call (credited on each future hit)
+            namespace: Namespace isolating unrelated entries
+        """
+        if not self.enabled or not response:
+            return
+
+        try:
+            with self._lock:
+                key = self._make_key(prompt, namespace)
+                vector = self.encoder.encode(normalize_prompt(prompt)).astype(np.float32)
+                meta = {"encoder": self.encoder.name}
+                meta.update(metadata or {})
+                self.store.put(
+                    key=key,
+                    response=response,
+                    namespace=namespace,
+                    metadata=meta,
+                    embedding=vector.tobytes(),
+                    tokens_saved=tokens_saved,
+                    cost_saved_usd=cost_saved_usd
+                )
+
+                # Append to the live index unless the put triggered an eviction (rebuild instead)
+                ns = namespace or ""
+                if self._index_generation == self.store.generation and ns in self._index:
+                    keys, matrix = self._index[ns]
+                    if key not in keys:
+                        self._index[ns] = (keys + [key], np.vstack([matrix, vector[None, :]]))
+        except Exception as e:
+            logger.debug(f"Semantic cache store failed: {e}")
+
+    def clear(self) -> None:
+        """Drop all entries and statistics."""
+        with self._lock:
+            self.store.clear()
+            self._index.clear()
+        self.session_hits = 0
+        self.session_misses = 0
+        self.session_tokens_saved = 0
+        self.session_cost_saved_usd = 0.0
+
+    def get_cache_summary(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Top-level counters are cumulative (persisted on disk); counters for
+        the current process only are under "session".
+        """
+        stats = self.store.get_stats()
+        hits = int(stats.get("hits", 0))
+        total_requests = hits + int(stats.get("misses", 0))
+        session_requests = self.session_hits + self.session_misses
+
+        return {
+            "enabled": self.enabled,
+            "encoder": self._encoder.name if self._encoder is not None else None,
+            "similarity_threshold": self._requested_threshold,
+            "total_entries": self.store.count(),
+            "total_bytes": self.store.total_bytes(),
+            "max_bytes": self.store.max_bytes,
+            "entries_by_namespace": self.store.entries_by_namespace(),
+            "total_requests": total_requests,
+            "cache_hits": hits,
+            "cache_misses": total_requests - hits,
+            "cache_hit_rate": (hits / total_requests * 100) if total_requests else 0.0,
+            "avg_similarity": (stats.get("similarity_sum", 0.0) / hits) if hits else 0.0,
+            "tokens_saved": int(stats.get("tokens_saved", 0)),
+            "cost_saved_usd": stats.get("cost_saved_usd", 0.0),
+            "evictions": int(stats.get("evictions", 0)),
+            "session": {
+                "total_requests": session_requests,
+                "cache_hits": self.session_hits,
+                "cache_misses": self.session_misses,
+                "cache_hit_rate": (self.session_hits / session_requests * 100) if session_requests else 0.0,
+                "tokens_saved": self.session_tokens_saved,
+                "cost_saved_usd": self.session_cost_saved_usd,
+            },
+        }
+
+    def close(self) -> None:
+        """Close the underlying store."""
+        self.store.close()
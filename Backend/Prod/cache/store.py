@@ -0,0 +1,324 @@
+"""
+Persistent, size-bounded SQLite store shared by PromptCache and SemanticCache.
+
+Entries are bounded three ways:
+- TTL: entries older than ``ttl_seconds`` are dropped on read and on eviction
+- Count: at most ``max_entries`` rows
+- Bytes: total payload (response + metadata + embedding) under ``max_bytes``
+
+Count/byte overflow evicts the least recently used rows first (``last_access``).
+Hit/miss counters are persisted in a ``stats`` table so cumulative figures
+survive across CLI invocations.
+"""
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL DEFAULT '',
+    response TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    embedding BLOB,
+    size_bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    tokens_saved INTEGER NOT NULL DEFAULT 0,
+    cost_saved_usd REAL NOT NULL DEFAULT 0.0
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access);
+CREATE INDEX IF NOT EXISTS idx_entries_namespace ON entries(namespace);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+@dataclass
+class CacheEntry:
+    """Single cached response."""
+    key: str
+    namespace: str
+    response: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    embedding: Optional[bytes] = None
+    size_bytes: int = 0
+    created_at: float = 0.0
+    last_access: float = 0.0
+    hits: int = 0
+    tokens_saved: int = 0
+    cost_saved_usd: float = 0.0
+
+
+class CacheStore:
+    """
+    SQLite-backed key/value store with LRU + TTL eviction and a byte budget.
+
+    A single connection is shared behind a lock; SQLite runs in WAL mode so
+    concurrent readers from other processes are not blocked by writes.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        max_entries: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 24 * 3600
+    ):
+        """
+        Initialize cache store.
+
+        Args:
+            db_path: SQLite database file (created if missing)
+            max_entries: Maximum number of rows kept
+            max_bytes: Maximum total payload size in bytes
+            ttl_seconds: Entry lifetime in seconds (None = no expiry)
+        """
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # Bumped on every deletion so in-memory indexes (semantic matrix) know to rebuild
+        self.generation = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Entries
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Fetch an entry and mark it as recently used.
+
+        Returns:
+            CacheEntry, or None if missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, namespace, response, metadata, embedding, size_bytes, created_at, "
+                "last_access, hits, tokens_saved, cost_saved_usd FROM entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            entry = self._row_to_entry(row)
+            if self._is_expired(entry.created_at, now):
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self.generation += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE entries SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                (now, key)
+            )
+            self._conn.commit()
+
+        entry.last_access = now
+        entry.hits += 1
+        return entry
+
+    def put(
+        self,
+        key: str,
+        response: str,
+        namespace: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        embedding: Optional[bytes] = None,
+        tokens_saved: int = 0,
+        cost_saved_usd: float = 0.0
+    ) -> int:
+        """
+        Insert or replace an entry, then enforce the bounds.
+
+        Returns:
+            Number of entries evicted to make room
+        """
+        metadata_json = json.dumps(metadata or {}, default=str)
+        size_bytes = (
+            len(response.encode("utf-8"))
+            + len(metadata_json.encode("utf-8"))
+            + (len(embedding) if embedding else 0)
+        )
+        if size_bytes > self.max_bytes:
+            logger.debug(f"Cache entry {key[:12]} ({size_bytes} bytes) exceeds byte budget, not stored")
+            return 0
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, namespace, response, metadata, embedding, "
+                "size_bytes, created_at, last_access, hits, tokens_saved, cost_saved_usd) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)",
+                (key, namespace or "", response, metadata_json, embedding, size_bytes,
+                 now, now, int(tokens_saved), float(cost_saved_usd))
+            )
+            evicted = self._evict_locked(now)
+            self._conn.commit()
+
+        if evicted:
+            self.incr_stat("evictions", evicted)
+        return evicted
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+            self.generation += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset statistics."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM stats")
+            self._conn.commit()
+            self.generation += 1
+
+    def iter_embeddings(self, namespace: Optional[str] = None) -> List[Tuple[str, bytes]]:
+        """
+        List (key, embedding) pairs of live entries, optionally for one namespace.
+
+        Expired rows are skipped (they are purged on the next eviction pass).
+        """
+        query = "SELECT key, embedding FROM entries WHERE embedding IS NOT NULL"
+        params: Tuple[Any, ...] = ()
+        if namespace is not None:
+            query += " AND namespace = ?"
+            params = (namespace,)
+        if self.ttl_seconds is not None:
+            query += " AND created_at >= ?"
+            params = params + (time.time() - self.ttl_seconds,)
+
+        with self._lock:
+            return [(row[0], row[1]) for row in self._conn.execute(query, params)]
+
+    def evict(self) -> int:
+        """Run an eviction pass (expired rows, then LRU overflow)."""
+        with self._lock:
+            evicted = self._evict_locked(time.time())
+            self._conn.commit()
+        if evicted:
+            self.incr_stat("evictions", evicted)
+        return evicted
+
+    def _evict_locked(self, now: float) -> int:
+        """Eviction pass; caller must hold the lock."""
+        evicted = 0
+
+        if self.ttl_seconds is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            evicted += max(cursor.rowcount, 0)
+
+        count, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM entries"
+        ).fetchone()
+
+        if count > self.max_entries or total_bytes > self.max_bytes:
+            victims = []
+            for key, size_bytes in self._conn.execute(
+                "SELECT key, size_bytes FROM entries ORDER BY last_access ASC"
+            ):
+                if count <= self.max_entries and total_bytes <= self.max_bytes:
+                    break
+                victims.append((key,))
+                count -= 1
+                total_bytes -= size_bytes
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+            evicted += len(victims)
+
+        if evicted:
+            self.generation += 1
+        return evicted
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def incr_stat(self, name: str, amount: float = 1) -> None:
+        """Increment a persisted counter."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO stats (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (name, amount)
+            )
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return all persisted counters."""
+        with self._lock:
+            return {name: value for name, value in self._conn.execute("SELECT name, value FROM stats")}
+
+    def count(self) -> int:
+        """Number of stored entries."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def total_bytes(self) -> int:
+        """Total payload size of stored entries."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()[0]
+
+    def entries_by_namespace(self) -> Dict[str, int]:
+        """Entry count per namespace."""
+        with self._lock:
+            return {
+                namespace or "default": count
+                for namespace, count in self._conn.execute(
+                    "SELECT namespace, COUNT(*) FROM entries GROUP BY namespace"
+                )
+            }
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and created_at < now - self.ttl_seconds
+
+    @staticmethod
+    def _row_to_entry(row: Tuple[Any, ...]) -> CacheEntry:
+        try:
+            metadata = json.loads(row[3]) if row[3] else {}
+        except json.JSONDecodeError:
+            metadata = {}
+        return CacheEntry(
+            key=row[0],
+            namespace=row[1],
+            response=row[2],
+            metadata=metadata,
+            embedding=row[4],
+            size_bytes=row[5],
+            created_at=row[6],
+            last_access=row[7],
+            hits=row[8],
+            tokens_saved=row[9],
+            cost_saved_usd=row[10],
+        )
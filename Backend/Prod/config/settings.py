@@ -268,6 +268,59 @@ class Settings(BaseSettings):
         default=5, alias="MAX_CONCURRENT_REQUESTS_CODESTRAL", description="Maximum concurrent requests for Codestral"
     )
 
+    # Connection Pool Settings
+    http2_enabled: bool = Field(
+        default=True,
+        alias="HTTP2_ENABLED",
+        description="Multiplex LLM requests over HTTP/2 (requires the 'h2' package, otherwise HTTP/1.1 keep-alive)",
+    )
+    connection_prewarm: bool = Field(
+        default=True,
+        alias="CONNECTION_PREWARM",
+        description="Open connections to configured providers when a plan starts executing",
+    )
+
+    # RAG Settings
+    rag_engine: str = Field(
+        default="auto",
+        alias="RAG_ENGINE",
+        description="RAG engine: bm25, llamaindex, or auto (BM25 unless embeddings are requested and LlamaIndex is installed)",
+    )
+    rag_background_warmup: bool = Field(
+        default=True,
+        alias="RAG_BACKGROUND_WARMUP",
+        description="Build the RAG index in a background thread at Orchestrator startup (otherwise on first query)",
+    )
+
+    # Prompt / Semantic Cache Settings
+    enable_prompt_cache: bool = Field(
+        default=True, alias="ENABLE_PROMPT_CACHE", description="Enable exact-match and semantic LLM response caches"
+    )
+
+    cache_dir: Path = Field(
+        default=Path.home() / ".aetherflow" / "cache",
+        alias="AETHERFLOW_CACHE_DIR",
+        description="Directory for persistent cache databases (prompt_cache.db, semantic_cache.db)",
+    )
+
+    cache_max_size_mb: int = Field(
+        default=64, alias="CACHE_MAX_SIZE_MB", description="Byte budget per cache database (MB), LRU-evicted beyond"
+    )
+
+    cache_max_entries: int = Field(
+        default=2000, alias="CACHE_MAX_ENTRIES", description="Maximum entries per cache database, LRU-evicted beyond"
+    )
+
+    cache_ttl_hours: float = Field(
+        default=24.0, alias="CACHE_TTL_HOURS", description="Lifetime of cached responses in hours (0 = no expiry)"
+    )
+
+    semantic_cache_threshold: float = Field(
+        default=0.85,
+        alias="SEMANTIC_CACHE_THRESHOLD",
+        description="Minimum cosine similarity for a semantic cache hit (embedding model)",
+    )
+
     # Planner Settings
     default_planner: str = Field(
         default="auto",
@@ -0,0 +1,93 @@
+"""Per-file async locks for concurrent plan steps.
+
+Steps that target the same file can generate in parallel; only their write
+phase (ApplyEngine) needs to be serialized. Locks are keyed on resolved paths
+and always acquired in sorted order, so two steps locking overlapping file
+sets cannot deadlock.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+
+@dataclass
+class FileLockStats:
+    """Lock usage statistics."""
+    acquisitions: int = 0
+    contended: int = 0
+    wait_time_ms: float = 0.0
+
+
+class FileLockManager:
+    """
+    Async lock registry keyed on resolved file paths.
+
+    Lock objects are created on demand and dropped once no step holds or
+    waits for them, so the registry does not grow with the number of files
+    ever touched.
+    """
+
+    def __init__(self, project_root: Optional[Path] = None):
+        """
+        Initialize lock manager.
+
+        Args:
+            project_root: Base directory for relative paths (defaults to cwd)
+        """
+        self.project_root = Path(project_root) if project_root else None
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refcounts: Dict[str, int] = {}
+        self.stats = FileLockStats()
+
+    def resolve(self, path: str) -> str:
+        """Normalize a path into a lock key."""
+        file_path = Path(path)
+        if not file_path.is_absolute() and self.project_root:
+            file_path = self.project_root / file_path
+        return str(file_path.resolve())
+
+    def is_locked(self, path: str) -> bool:
+        """Whether a file is currently locked."""
+        lock = self._locks.get(self.resolve(path))
+        return bool(lock and lock.locked())
+
+    @asynccontextmanager
+    async def acquire(self, paths: Iterable[str]) -> AsyncIterator[List[str]]:
+        """
+        Hold the locks of all given files for the duration of the block.
+
+        Args:
+            paths: File paths (relative to project_root or absolute)
+
+        Yields:
+            Sorted list of lock keys held
+        """
+        keys = sorted({self.resolve(p) for p in paths})
+        for key in keys:
+            self._refcounts[key] = self._refcounts.get(key, 0) + 1
+            if key not in self._locks:
+                self._locks[key] = asyncio.Lock()
+
+        acquired: List[str] = []
+        try:
+            loop = asyncio.get_running_loop()
+            for key in keys:
+                lock = self._locks[key]
+                if lock.locked():
+                    self.stats.contended += 1
+                started = loop.time()
+                await lock.acquire()
+                self.stats.wait_time_ms += (loop.time() - started) * 1000
+                self.stats.acquisitions += 1
+                acquired.append(key)
+            yield keys
+        finally:
+            for key in reversed(acquired):
+                self._locks[key].release()
+            for key in keys:
+                self._refcounts[key] -= 1
+                if self._refcounts[key] == 0:
+                    del self._refcounts[key]
+                    del self._locks[key]
@@ -1,10 +1,26 @@
 import numpy as np
 import re
-from typing import Dict, List, Any
+import scipy.sparse as sp
+from dataclasses import dataclass
+from typing import Dict, List, Any, Sequence, Union
 from collections import Counter
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.feature_extraction.text import TfidfVectorizer
 
+# Path patterns shared by the per-endpoint and batch extractors
+ID_IN_PATH_PATTERN = r'/\d+|/[a-fA-F0-9]{8}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-[a-fA-F0-9]{12}|/{[a-zA-Z_]+Id}'
+VERSION_IN_PATH_PATTERN = r'/v\d+'
+# A path segment (runs of anything but '/'; '\n' separates paths in the batch corpus)
+_SEGMENT_RE = re.compile(r'[^/\n]+')
+# A segment longer than 2 characters ending with 's'
+_PLURAL_SEGMENT_RE = re.compile(r'(?<![^/\n])[^/\n]{2,}s(?![^/\n])')
+_ID_IN_PATH_RE = re.compile(ID_IN_PATH_PATTERN)
+_VERSION_IN_PATH_RE = re.compile(VERSION_IN_PATH_PATTERN, re.IGNORECASE)
+_BATCH_PATH_COLUMNS = (
+    'path_depth_normalized', 'num_path_segments_normalized',
+    'has_id_in_path', 'has_version_in_path', 'has_plural_resource', 'is_root_path',
+)
+
 # Mock IntentTranslator for semantic embeddings
 # In a real scenario, this would interact with an actual service or model.
 class IntentTranslator:
@@ -30,6 +46,18 @@ class IntentTranslator:
         np.random.seed(hash(text) % (2**32 - 1)) # Seed for reproducibility based on text
         return np.random.rand(self.embedding_dim)
 
+    def get_features_from_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Batch variant of get_features_from_text: one (len(texts), embedding_dim) matrix.
+        Each distinct text is embedded once and the global NumPy RNG is left untouched.
+        """
+        unique, inverse = np.unique(np.asarray(texts, dtype=object).astype(str), return_inverse=True)
+        vectors = np.zeros((len(unique), self.embedding_dim))
+        for i, text in enumerate(unique):
+            if text:
+                vectors[i] = np.random.RandomState(hash(text) % (2**32 - 1)).rand(self.embedding_dim)
+        return vectors[inverse.reshape(-1)]
+
     def extract_keywords(self, text: str, num_keywords: int = 5) -> List[str]:
         """
         Extracts keywords from the text using a simple TF-IDF approach (mock).
@@ -51,14 +79,38 @@ class IntentTranslator:
         return keywords[:num_keywords]
 
 
+@dataclass
+class FeatureMatrix:
+    """Feature table for a batch of endpoints: one row per endpoint, one named column per feature."""
+    matrix: Union[np.ndarray, sp.csr_matrix]
+    columns: List[str]
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def to_dense(self) -> np.ndarray:
+        return self.matrix.toarray() if sp.issparse(self.matrix) else np.asarray(self.matrix)
+
+    def column(self, name: str) -> np.ndarray:
+        """Dense values of a single named column."""
+        values = self.matrix[:, self.columns.index(name)]
+        return values.toarray().ravel() if sp.issparse(values) else np.asarray(values).ravel()
+
+
 class FeatureExtractor:
     """
     Extrait diverses features à partir d'un chemin d'API, d'une méthode HTTP et d'un résumé,
     en les normalisant pour l'inférence bayésienne.
     """
-    def __init__(self, intent_translator: IntentTranslator, embedding_dim: int = 128):
+    def __init__(self, intent_translator: IntentTranslator, embedding_dim: int = 128, max_tfidf_features: int = 500):
         self.intent_translator = intent_translator
         self.embedding_dim = embedding_dim
+
+        # TF-IDF over summaries, fitted once per batch (see extract_batch)
+        self.summary_vectorizer = TfidfVectorizer(stop_words='english', max_features=max_tfidf_features)
+        self._fitted_summary_vectorizer = False
+        self._summary_vocabulary: List[str] = []
         
         # Scalers for numerical features
         self.path_depth_scaler = StandardScaler()
@@ -92,8 +144,8 @@ class FeatureExtractor:
         features['num_path_segments'] = len(segments)
 
         # Regex patterns
-        features['has_id_in_path'] = 1 if re.search(r'/\d+|/[a-fA-F0-9]{8}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-[a-fA-F0-9]{12}|/{[a-zA-Z_]+Id}', path) else 0
-        features['has_version_in_path'] = 1 if re.search(r'/v\d+', path, re.IGNORECASE) else 0
+        features['has_id_in_path'] = 1 if _ID_IN_PATH_RE.search(path) else 0
+        features['has_version_in_path'] = 1 if _VERSION_IN_PATH_RE.search(path) else 0
         features['has_plural_resource'] = 1 if any(s.endswith('s') for s in segments if len(s) > 2) else 0
         features['is_root_path'] = 1 if not segments else 0
         
@@ -208,6 +260,130 @@ class FeatureExtractor:
 
         return normalized_output
 
+    def extract_batch(
+        self,
+        endpoints: Sequence[Dict[str, Any]],
+        fit: bool = True,
+        include_embeddings: bool = False,
+        sparse: bool = True,
+    ) -> FeatureMatrix:
+        """
+        Extrait les features d'un lot d'endpoints en une passe, pour le clustering à grande échelle.
+
+        Contrairement à extract(), les scalers et le TF-IDF sont ajustés sur le lot entier
+        (une seule fois) au lieu d'un point isolé.
+
+        Args:
+            endpoints: Dicts avec les clés "path", "method" et "summary" (toutes optionnelles).
+            fit: Ajuste TF-IDF et scalers sur ce lot ; sinon réutilise l'ajustement précédent.
+            include_embeddings: Ajoute les colonnes summary_embedding_i de l'IntentTranslator.
+            sparse: Retourne une matrice CSR (sinon un ndarray dense).
+
+        Returns:
+            FeatureMatrix: matrice (n_endpoints, n_features) et noms de colonnes.
+        """
+        if not fit and not self._fitted_summary_vectorizer:
+            raise ValueError("extract_batch(fit=False) requires a previous extract_batch(fit=True)")
+
+        if not endpoints:
+            # Rien à ajuster (les scalers refusent 0 échantillon) : table vide, ajustement précédent conservé
+            columns = self._batch_columns(include_embeddings, tfidf_vocabulary=[] if fit else self._summary_vocabulary)
+            matrix = sp.csr_matrix((0, len(columns)))
+            return FeatureMatrix(matrix=matrix if sparse else matrix.toarray(), columns=columns)
+
+        # '\n' is the path separator of the batch corpus, it cannot appear inside a path
+        paths = [ep.get('path').replace('\n', ' ') if isinstance(ep.get('path'), str) else "" for ep in endpoints]
+        methods = [ep.get('method') if isinstance(ep.get('method'), str) and ep.get('method') else "UNKNOWN" for ep in endpoints]
+        summaries = [ep.get('summary') if isinstance(ep.get('summary'), str) else "" for ep in endpoints]
+
+        blocks, columns = [], []
+
+        # 1. Path statistics
+        path_stats, path_columns = self._batch_path_features(paths, fit)
+        blocks.append(sp.csr_matrix(path_stats))
+        columns.extend(path_columns)
+
+        # 2. HTTP methods: a single one-hot transform for the whole batch
+        upper = np.char.upper(np.asarray(methods, dtype=str)).reshape(-1, 1)
+        blocks.append(sp.csr_matrix(self.method_encoder.transform(upper)))
+        columns.extend(f'method_{category.lower()}' for category in self.method_encoder.categories_[0])
+        unknown = ~np.isin(upper.ravel(), self.known_http_methods)
+        blocks.append(sp.csr_matrix(unknown.astype(float).reshape(-1, 1)))
+        columns.append('method_unknown')
+
+        # 3. Summaries: TF-IDF fitted once over the batch
+        tfidf = self._batch_summary_tfidf(summaries, fit)
+        has_summary = np.array([1.0 if s else 0.0 for s in summaries]).reshape(-1, 1)
+        num_terms = np.diff(tfidf.indptr).astype(float).reshape(-1, 1)
+        if fit:
+            self.num_keywords_scaler.fit(num_terms)
+        blocks.append(sp.csr_matrix(np.hstack([has_summary, self.num_keywords_scaler.transform(num_terms)])))
+        columns.extend(['has_summary', 'num_summary_terms_normalized'])
+
+        if include_embeddings:
+            blocks.append(sp.csr_matrix(self.intent_translator.get_features_from_texts(summaries)))
+            columns.extend(f'summary_embedding_{i}' for i in range(self.intent_translator.embedding_dim))
+
+        blocks.append(tfidf)
+        columns.extend(f'summary_tfidf_{term}' for term in self._summary_vocabulary)
+
+        matrix = sp.hstack(blocks, format='csr')
+        return FeatureMatrix(matrix=matrix if sparse else matrix.toarray(), columns=columns)
+
+    def _batch_columns(self, include_embeddings: bool, tfidf_vocabulary: List[str]) -> List[str]:
+        """Noms de colonnes d'extract_batch, dans l'ordre des blocs."""
+        columns = list(_BATCH_PATH_COLUMNS)
+        columns.extend(f'method_{category.lower()}' for category in self.method_encoder.categories_[0])
+        columns.extend(['method_unknown', 'has_summary', 'num_summary_terms_normalized'])
+        if include_embeddings:
+            columns.extend(f'summary_embedding_{i}' for i in range(self.intent_translator.embedding_dim))
+        columns.extend(f'summary_tfidf_{term}' for term in tfidf_vocabulary)
+        return columns
+
+    def _batch_path_features(self, paths: List[str], fit: bool):
+        """
+        Vectorized path features: every regex scans the whole newline-joined corpus once and
+        matches are bucketed per endpoint (np.searchsorted on the path offsets).
+        """
+        n = len(paths)
+        corpus = "\n".join(paths)
+        lengths = np.fromiter((len(p) + 1 for p in paths), dtype=np.int64, count=n)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if n else np.zeros(0, dtype=np.int64)
+
+        def rows_of(pattern: re.Pattern) -> np.ndarray:
+            positions = np.fromiter((m.start() for m in pattern.finditer(corpus)), dtype=np.int64)
+            return np.searchsorted(starts, positions, side='right') - 1
+
+        depth = np.bincount(rows_of(_SEGMENT_RE), minlength=n).astype(float).reshape(-1, 1)
+        has_id = np.bincount(rows_of(_ID_IN_PATH_RE), minlength=n) > 0
+        has_version = np.bincount(rows_of(_VERSION_IN_PATH_RE), minlength=n) > 0
+        has_plural = np.bincount(rows_of(_PLURAL_SEGMENT_RE), minlength=n) > 0
+
+        if fit:
+            self.path_depth_scaler.fit(depth)
+            self.num_segments_scaler.fit(depth)
+        stats = np.hstack([
+            self.path_depth_scaler.transform(depth),
+            self.num_segments_scaler.transform(depth),
+            np.column_stack([has_id, has_version, has_plural, depth.ravel() == 0]).astype(float),
+        ])
+        return stats, list(_BATCH_PATH_COLUMNS)
+
+    def _batch_summary_tfidf(self, summaries: List[str], fit: bool) -> sp.csr_matrix:
+        if fit:
+            try:
+                tfidf = self.summary_vectorizer.fit_transform(summaries)
+                self._summary_vocabulary = list(self.summary_vectorizer.get_feature_names_out())
+            except ValueError:
+                # Empty vocabulary (no summary, or stop words only)
+                tfidf = sp.csr_matrix((len(summaries), 0))
+                self._summary_vocabulary = []
+            self._fitted_summary_vectorizer = True
+            return sp.csr_matrix(tfidf)
+        if not self._summary_vocabulary:
+            return sp.csr_matrix((len(summaries), 0))
+        return sp.csr_matrix(self.summary_vectorizer.transform(summaries))
+
 # --- Exemple d'utilisation ---
 if __name__ == "__main__":
     # Initialiser l'IntentTranslator (mock)
@@ -269,122 +445,3 @@ if __name__ == "__main__":
     for k, v in features6.items():
         print(f"{k}: {v}")
     print("\n")
-
-import re
-from typing import Dict, List
-import numpy as np
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import StandardScaler
-
-class FeatureExtractor:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer()
-        self.scaler = StandardScaler()
-        self.lemmatizer = WordNetLemmatizer()
-        self.stop_words = set(stopwords.words('english'))
-
-    def extract_path_features(self, path: str) -> Dict:
-        """
-        Extract features from a path.
-
-        Args:
-            path (str): The path to extract features from.
-
-        Returns:
-            Dict: A dictionary containing the extracted features.
-        """
-        features = {
-            'path_length': len(path),
-            'path_depth': path.count('/'),
-            'path_segments': len(path.split('/'))
-        }
-        return features
-
-    def extract_method_features(self, method: str) -> Dict:
-        """
-        Extract features from an HTTP method.
-
-        Args:
-            method (str): The HTTP method to extract features from.
-
-        Returns:
-            Dict: A dictionary containing the extracted features.
-        """
-        features = {
-            'method': method
-        }
-        return features
-
-    def extract_summary_features(self, summary: str) -> Dict:
-        """
-        Extract features from a summary.
-
-        Args:
-            summary (str): The summary to extract features from.
-
-        Returns:
-            Dict: A dictionary containing the extracted features.
-        """
-        tokens = word_tokenize(summary)
-        tokens = [token.lower() for token in tokens if token.isalpha()]
-        tokens = [token for token in tokens if token not in self.stop_words]
-        tokens = [self.lemmatizer.lemmatize(token) for token in tokens]
-        summary_features = self.vectorizer.fit_transform([' '.join(tokens)])
-        summary_features = self.scaler.fit_transform(summary_features.toarray())
-        features = {
-            'summary': summary_features.tolist()
-        }
-        return features
-
-    def extract_regex_features(self, path: str, regex_patterns: List) -> Dict:
-        """
-        Extract features from a path using regex patterns.
-
-        Args:
-            path (str): The path to extract features from.
-            regex_patterns (List): A list of regex patterns to use.
-
-        Returns:
-            Dict: A dictionary containing the extracted features.
-        """
-        features = {}
-        for pattern in regex_patterns:
-            match = re.search(pattern, path)
-            if match:
-                features[pattern] = 1
-            else:
-                features[pattern] = 0
-        return features
-
-    def extract_features(self, path: str, method: str, summary: str, regex_patterns: List) -> Dict:
-        """
-        Extract all features from a path, method, and summary.
-
-        Args:
-            path (str): The path to extract features from.
-            method (str): The HTTP method to extract features from.
-            summary (str): The summary to extract features from.
-            regex_patterns (List): A list of regex patterns to use.
-
-        Returns:
-            Dict: A dictionary containing all the extracted features.
-        """
-        path_features = self.extract_path_features(path)
-        method_features = self.extract_method_features(method)
-        summary_features = self.extract_summary_features(summary)
-        regex_features = self.extract_regex_features(path, regex_patterns)
-        features = {**path_features, **method_features, **summary_features, **regex_features}
-        return features
-
-# Example usage:
-if __name__ == "__main__":
-    feature_extractor = FeatureExtractor()
-    path = '/api/v1/users/123'
-    method = 'GET'
-    summary = 'This is a summary of the API endpoint.'
-    regex_patterns = [r'\d+', r'[a-zA-Z]+']
-    features = feature_extractor.extract_features(path, method, summary, regex_patterns)
-    print(features)
\ No newline at end of file
@@ -1,10 +1,13 @@
 """Genome generator: scan API, produce homeos_genome.json (ex-Contrat)."""
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import re
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from loguru import logger
 
@@ -94,6 +97,159 @@ def _path_to_ui_hint(path: str, method: str) -> str:
     return "generic"
 
 
+# Version des heuristiques / du mapping STAR -> x_ui_hint (invalide le cache si modifiée)
+UI_HINT_CACHE_VERSION = 1
+
+_PATH_PARAM_RE = re.compile(r"\{[^}]*\}")
+
+
+def _hint_from_situations(intent_translator: Any, situations: List[Any], path: str) -> str:
+    """
+    Mappe les situations STAR retournées par IntentTranslator vers un x_ui_hint.
+    
+    Args:
+        intent_translator: Instance IntentTranslator (pour propagate_star)
+        situations: Situations similaires, meilleure en premier
+        path: API path (pour les logs)
+        
+    Returns:
+        x_ui_hint string ("generic" si aucun pattern exploitable)
+    """
+    for situation in situations:
+        realisation = intent_translator.propagate_star(situation)
+        if not realisation:
+            continue
+        # Mapper patterns STAR vers x_ui_hint
+        pattern_name = situation.pattern_name.lower() if situation.pattern_name else ""
+        
+        # Patterns UI interactifs → form ou dashboard
+        if any(p in pattern_name for p in ["toggle", "accordion", "modal"]):
+            logger.debug(f"STAR pattern '{pattern_name}' → hint 'form' for {path}")
+            return "form"
+        
+        # Pattern Navigation → dashboard ou list
+        if "navigation" in pattern_name:
+            logger.debug(f"STAR pattern '{pattern_name}' → hint 'dashboard' for {path}")
+            return "dashboard"
+    return "generic"
+
+
+def _semantic_query(path: str, method: str, summary: str) -> str:
+    """Requête sémantique normalisée (paramètres de path anonymisés, casse et espaces)."""
+    text = f"{_PATH_PARAM_RE.sub('{}', path)} {method} {summary}"
+    return " ".join(text.lower().split())
+
+
+def _load_hint_cache(cache_path: Optional[Path], fingerprint: str) -> Dict[str, str]:
+    """Charge le cache persistant des hints sémantiques (vide si absent ou périmé)."""
+    if cache_path is None:
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("fingerprint") != fingerprint:
+        return {}
+    hints = data.get("hints")
+    return hints if isinstance(hints, dict) else {}
+
+
+def _save_hint_cache(cache_path: Optional[Path], fingerprint: str, hints: Dict[str, str]) -> None:
+    """Écrit le cache des hints de façon atomique (fichier temporaire + os.replace)."""
+    if cache_path is None:
+        return
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint, "hints": hints}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.debug(f"Could not persist UI hint cache: {e}")
+
+
+def _infer_ui_hints(
+    endpoints: List[Tuple[str, str, str]],
+    cache_path: Optional[Path] = None,
+    intent_translator: Any = None,
+) -> List[str]:
+    """
+    Déduit les x_ui_hint d'un lot d'endpoints en deux passes.
+    
+    1. Heuristiques (_path_to_ui_hint) pour tous les endpoints.
+    2. Une seule recherche sémantique groupée (IntentTranslator.search_situations)
+       pour les endpoints restés "generic", dédupliqués par requête normalisée
+       (path + method + summary). Les résultats sont mis en cache sur disque par
+       signature d'endpoint : une régénération ne ré-infère que les endpoints
+       nouveaux ou modifiés.
+    
+    Args:
+        endpoints: Liste de (path, method, summary)
+        cache_path: Fichier JSON du cache persistant (None = pas de cache)
+        intent_translator: Instance IntentTranslator (optionnel, défaut : instance partagée)
+        
+    Returns:
+        x_ui_hint par endpoint, dans le même ordre
+    """
+    hints = [_path_to_ui_hint(path, method) for path, method, _ in endpoints]
+    
+    # Endpoints génériques regroupés par requête normalisée
+    pending: Dict[str, List[int]] = {}
+    for i, (path, method, summary) in enumerate(endpoints):
+        if hints[i] == "generic":
+            pending.setdefault(_semantic_query(path, method, summary), []).append(i)
+    if not pending:
+        return hints
+    
+    try:
+        if intent_translator is None:
+            # Lazy import d'IntentTranslator pour éviter dépendances circulaires
+            from ..sullivan.intent_translator import get_intent_translator
+            
+            # Instance partagée : mappings et embeddings des situations chargés une fois
+            intent_translator = get_intent_translator()
+    except ImportError as e:
+        logger.debug(f"IntentTranslator not available: {e}. Using basic heuristics.")
+        return hints
+    except Exception as e:
+        logger.warning(f"Error loading IntentTranslator: {e}. Using basic heuristics.")
+        return hints
+
+    fingerprint = f"{UI_HINT_CACHE_VERSION}:{getattr(intent_translator, 'mappings_digest', '')}"
+    cached = _load_hint_cache(cache_path, fingerprint)
+    signatures = {
+        query: hashlib.sha256(query.encode("utf-8")).hexdigest()[:32] for query in pending
+    }
+    
+    to_infer = [query for query in pending if signatures[query] not in cached]
+    if to_infer:
+        try:
+            # Une seule passe groupée (un encodage + un produit matriciel)
+            results = intent_translator.search_situations(to_infer, limit=3)
+            for query, situations in zip(to_infer, results):
+                path = endpoints[pending[query][0]][0]
+                cached[signatures[query]] = _hint_from_situations(intent_translator, situations, path)
+        except Exception as e:
+            logger.warning(f"Error using IntentTranslator: {e}. Using basic heuristics.")
+            return hints
+    
+    for query, indices in pending.items():
+        hint = cached.get(signatures[query], "generic")
+        for i in indices:
+            hints[i] = hint
+        if hint != "generic":
+            logger.info(f"Enriched hint for {endpoints[indices[0]][0]}: generic → {hint} (via STAR)")
+    
+    logger.debug(
+        f"Semantic UI hints: {len(pending)} unique generic endpoints, "
+        f"{len(to_infer)} inferred, {len(pending) - len(to_infer)} from cache"
+    )
+    # Ne conserver que les signatures des endpoints actuels
+    _save_hint_cache(cache_path, fingerprint, {signatures[q]: cached[signatures[q]] for q in pending})
+    return hints
+
+
 def _path_to_ui_hint_enriched(path: str, method: str, summary: str = "") -> str:
     """
     Déduit x_ui_hint avec heuristiques + IntentTranslator/STAR pour enrichir l'inférence.
@@ -106,59 +262,14 @@ def _path_to_ui_hint_enriched(path: str, method: str, summary: str = "") -> str:
     Returns:
         x_ui_hint string
     """
-    # Appeler d'abord _path_to_ui_hint() pour heuristiques basiques
-    hint = _path_to_ui_hint(path, method)
-    
-    # Si résultat = "generic", utiliser IntentTranslator pour analyse sémantique
-    if hint == "generic":
-        try:
-            # Lazy import d'IntentTranslator pour éviter dépendances circulaires
-            from ..sullivan.intent_translator import IntentTranslator
-            
-            # Créer instance IntentTranslator (peut être coûteux, mais seulement si generic)
-            intent_translator = IntentTranslator()
-            
-            # Construire query pour analyse sémantique
-            query = f"{path} {method} {summary}".strip()
-            
-            # Rechercher situations similaires avec embeddings
-            situations = intent_translator.search_situation(query, limit=3)
-            
-            if situations:
-                # Propager STAR pour obtenir réalisations
-                for situation in situations:
-                    realisation = intent_translator.propagate_star(situation)
-                    if realisation:
-                        # Mapper patterns STAR vers x_ui_hint
-                        pattern_name = situation.pattern_name.lower() if situation.pattern_name else ""
-                        
-                        # Patterns UI interactifs → form ou dashboard
-                        if any(p in pattern_name for p in ["toggle", "accordion", "modal"]):
-                            hint = "form"
-                            logger.debug(f"STAR pattern '{pattern_name}' → hint 'form' for {path}")
-                            break
-                        
-                        # Pattern Navigation → dashboard ou list
-                        if "navigation" in pattern_name:
-                            hint = "dashboard"
-                            logger.debug(f"STAR pattern '{pattern_name}' → hint 'dashboard' for {path}")
-                            break
-                
-                if hint != "generic":
-                    logger.info(f"Enriched hint for {path}: generic → {hint} (via STAR)")
-            
-        except ImportError as e:
-            logger.debug(f"IntentTranslator not available: {e}. Using basic heuristics.")
-        except Exception as e:
-            logger.warning(f"Error using IntentTranslator for {path}: {e}. Using basic heuristics.")
-    
-    return hint
+    return _infer_ui_hints([(path, method, summary)])[0]
 
 
 def generate_genome(
     output_path: Path | None = None,
     intent: str = "PaaS_Studio",
     topology: List[str] | None = None,
+    hint_cache_path: Path | None = None,
 ) -> Path:
     """
     Génère le Genome (homeos_genome.json) à partir de l'API FastAPI.
@@ -167,6 +278,8 @@ def generate_genome(
         output_path: Fichier de sortie. Si None, output/studio/homeos_genome.json.
         intent: metadata.intent (défaut PaaS_Studio).
         topology: metadata.topology (défaut Brainstorm, Back, Front, Deploy).
+        hint_cache_path: Cache des x_ui_hint sémantiques. Si None,
+            <cache_dir>/genome_ui_hints.json.
 
     Returns:
         Chemin du fichier écrit.
@@ -179,6 +292,8 @@ def generate_genome(
         output_path = base / "homeos_genome.json"
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    if hint_cache_path is None:
+        hint_cache_path = Path(settings.cache_dir) / "genome_ui_hints.json"
 
     openapi = _get_openapi()
     paths = openapi.get("paths") or {}
@@ -186,6 +301,7 @@ def generate_genome(
     schemas = components.get("schemas") or {}
 
     endpoints: List[Dict[str, Any]] = []
+    operations: List[Tuple[str, str, str]] = []
     for path, spec in paths.items():
         if not isinstance(spec, dict):
             continue
@@ -195,14 +311,18 @@ def generate_genome(
             if not isinstance(op, dict):
                 continue
             summary = (op.get("summary") or op.get("description") or "").strip() or path
-            # Utiliser _path_to_ui_hint_enriched() avec summary pour enrichir l'inférence
-            hint = _path_to_ui_hint_enriched(path, method, summary)
             endpoints.append({
                 "method": method.upper(),
                 "path": path,
-                "x_ui_hint": hint,
+                "x_ui_hint": "generic",
                 "summary": summary[:200],
             })
+            operations.append((path, method, summary))
+
+    # Inférence groupée : heuristiques puis une passe sémantique sur les "generic"
+    hints = _infer_ui_hints(operations, cache_path=Path(hint_cache_path))
+    for endpoint, hint in zip(endpoints, hints):
+        endpoint["x_ui_hint"] = hint
 
     schema_definitions: Dict[str, Any] = {}
     for name, s in schemas.items():
@@ -12,13 +12,17 @@ Nouveautés:
 - Z-index pour overlays/dialogues
 """
 
+import asyncio
+import hashlib
 import json
 import math
 import os
 import re
+import time
 import argparse
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from collections import OrderedDict
+from typing import Any, List, Dict, Tuple, Optional
 
 try:
     from openai import OpenAI
@@ -32,6 +36,9 @@ try:
     from archetype_renderers import render_organ
 except ImportError:
     render_organ = None
+from organ_batch import (
+    DEFAULT_CONCURRENCY, OrganSVGCache, iter_organs, pooled_async_client, render_organs,
+)
 
 # Layout constants (px)
 ARTBOARD_W = 1440
@@ -276,17 +283,12 @@ CRITIQUE XML : guillemets doubles UNIQUEMENT. Pas d'apostrophes dans les attribu
 Répondre JSON strict : {{"h": int, "svg": "<g>...</g>"}}"""
 
 
-def _kimi_organ_svg(organ, style_id='auto'):
-    """Appelle KIMI pour obtenir un SVG layout organisé en zones."""
-    if not _OPENAI_AVAILABLE:
-        return None
-    key = _load_kimi_key()
-    if not key:
-        return None
+KIMI_BASE_URL = 'https://api.moonshot.ai/v1'
+KIMI_MODEL = 'kimi-k2.5'
 
-    if style_id == 'auto':
-        style_id = 'minimal'
-    
+
+def _kimi_organ_request(organ, style_id):
+    """Prépare la requête KIMI d'un organe (kwargs chat.completions.create)."""
     n2_list = organ.get('n2_features', [])
     n3_all = [c for f in n2_list for c in f.get('n3_components', [])]
     hints = [c.get('visual_hint', '?') for c in n3_all]
@@ -297,27 +299,87 @@ def _kimi_organ_svg(organ, style_id='auto'):
     
     prompt = _get_style_prompt(style_id, organ, n3_all, hints)
     print(f'  [KIMI] {organ.get("id")} style={style_id} zones=[{zone_info}]...')
+    return dict(
+        model=KIMI_MODEL,
+        messages=[{'role': 'user', 'content': prompt}],
+        temperature=1,
+        max_tokens=8000,
+        extra_body={"thinking": {"type": "disabled"}},
+    )
+
+
+def _parse_kimi_layout(raw):
+    """Extrait (svg_interne, hauteur) de la réponse JSON KIMI."""
+    raw = re.sub(r'^```json\s*|\s*```$', '', raw.strip(), flags=re.MULTILINE).strip()
+    data = json.loads(raw)
+    svg = data.get('svg', '')
+    svg = re.sub(r"(\w[\w-]*)='([^']*)'", lambda m: f'{m.group(1)}="{m.group(2)}"', svg)
+    return svg, max(150, min(800, int(data.get('h', 200))))
+
+
+def _kimi_organ_svg(organ, style_id='auto'):
+    """Appelle KIMI pour obtenir un SVG layout organisé en zones."""
+    if not _OPENAI_AVAILABLE:
+        return None
+    key = _load_kimi_key()
+    if not key:
+        return None
+
+    if style_id == 'auto':
+        style_id = 'minimal'
 
     try:
-        client = OpenAI(api_key=key, base_url='https://api.moonshot.ai/v1')
-        resp = client.chat.completions.create(
-            model='kimi-k2.5',
-            messages=[{'role': 'user', 'content': prompt}],
-            temperature=1,
-            max_tokens=8000,
-            extra_body={"thinking": {"type": "disabled"}},
-        )
-        raw = resp.choices[0].message.content.strip()
-        raw = re.sub(r'^```json\s*|\s*```$', '', raw, flags=re.MULTILINE).strip()
-        data = json.loads(raw)
-        svg = data.get('svg', '')
-        svg = re.sub(r"(\w[\w-]*)='([^']*)'", lambda m: f'{m.group(1)}="{m.group(2)}"', svg)
-        return svg, max(150, min(800, int(data.get('h', 200))))
+        client = OpenAI(api_key=key, base_url=KIMI_BASE_URL)
+        resp = client.chat.completions.create(**_kimi_organ_request(organ, style_id))
+        return _parse_kimi_layout(resp.choices[0].message.content)
     except Exception as e:
         print(f'  [KIMI] {organ.get("id")} échec : {e}')
         return None
 
 
+async def _kimi_organ_payloads(organs, style_id='auto', concurrency=DEFAULT_CONCURRENCY,
+                               rate=None, cache_dir=None):
+    """
+    Génère les layouts KIMI de tous les organes en parallèle borné.
+
+    Un seul client async (pool keep-alive) pour tout le lot ; résultats mis en
+    cache par hash de contenu de l'organe + style_id.
+
+    Returns:
+        {organ_id: (svg_interne, hauteur)} pour les organes réussis
+    """
+    if not _OPENAI_AVAILABLE:
+        return {}
+    key = _load_kimi_key()
+    if not key:
+        return {}
+
+    if style_id == 'auto':
+        style_id = 'minimal'
+
+    client = pooled_async_client(key, KIMI_BASE_URL, concurrency)
+
+    async def render_one(organ):
+        resp = await client.chat.completions.create(**_kimi_organ_request(organ, style_id))
+        return list(_parse_kimi_layout(resp.choices[0].message.content))
+
+    try:
+        results = await render_organs(
+            organs, render_one, style_id=style_id, concurrency=concurrency, rate=rate,
+            cache=OrganSVGCache(cache_dir), salt=f'v2-layout:{KIMI_MODEL}',
+        )
+    finally:
+        await client.close()
+
+    payloads = {}
+    for r in results:
+        if r.error:
+            print(f'  [KIMI] {r.organ.get("id")} échec : {r.error}')
+        elif r.value is not None:
+            payloads[r.organ.get('id')] = tuple(r.value)
+    return payloads
+
+
 def _render_component_zone(comps: List[Dict], x: float, y: float, w: float, 
                            zone_type: str, is_vertical: bool = False) -> Tuple[str, float]:
     """Rend une zone de composants (header, sidebar, main, footer)."""
@@ -497,6 +559,23 @@ def _render_organ_fallback(organ, x, y, w):
     return '\n'.join(lines), h
 
 
+def _wrap_kimi_organ(organ, x, y, w, kimi_result):
+    """Encapsule le SVG interne KIMI dans la carte organe."""
+    svg_inner, kimi_h = kimi_result
+    gid = _esc(organ.get('id', ''))
+    name = _esc(organ.get('display_label', organ.get('name', gid)))
+    lines = [
+        f'<g id="{gid}" class="af-organ" data-genome-id="{gid}" data-name="{name}">',
+        _rect(x, y, w, kimi_h, COL_ORGAN_BG, COL_ORGAN_STR, rx=10),
+        _text(x + 12, y + 18, name, size=11, fill=COL_TEXT_MAIN, weight='600'),
+        f'<g transform="translate({x},{y + 30})">',
+        svg_inner,
+        '</g>',
+        '</g>',
+    ]
+    return '\n'.join(lines), kimi_h
+
+
 def _render_n1(organ, x, y, use_kimi=False, style_id='auto'):
     """Rend un organe N1 (avec ou sans KIMI)."""
     gid = _esc(organ.get('id', ''))
@@ -507,18 +586,8 @@ def _render_n1(organ, x, y, use_kimi=False, style_id='auto'):
     if use_kimi:
         result = _kimi_organ_svg(organ, style_id=style_id)
         if result:
-            svg_inner, kimi_h = result
-            print(f'  [KIMI] {organ.get("id")} → {kimi_h}px ✓')
-            lines = [
-                f'<g id="{gid}" class="af-organ" data-genome-id="{gid}" data-name="{name}">',
-                _rect(x, y, w, kimi_h, COL_ORGAN_BG, COL_ORGAN_STR, rx=10),
-                _text(x + 12, y + 18, name, size=11, fill=COL_TEXT_MAIN, weight='600'),
-                f'<g transform="translate({x},{y + 30})">',
-                svg_inner,
-                '</g>',
-                '</g>',
-            ]
-            return '\n'.join(lines), kimi_h
+            print(f'  [KIMI] {organ.get("id")} → {result[1]}px ✓')
+            return _wrap_kimi_organ(organ, x, y, w, result)
         print(f'  [KIMI] {organ.get("id")} → fallback statique')
     
     # Utiliser le renderer d'archétype si disponible
@@ -534,8 +603,98 @@ def _draw_app_base(offset_y, total_h):
     return f'<rect x="0" y="{offset_y}" width="{ARTBOARD_W}" height="{total_h}" fill="#f7f6f2"/>'
 
 
-def _render_n0(phase, all_phases=None, offset_y=0, use_kimi=False, style_id='auto', app_shell_organs=None):
-    """Génère le SVG d'une phase N0 (shell dynamique possible + main)."""
+class _RenderCache:
+    """Cache LRU en mémoire des fragments SVG déjà rendus (clé -> (svg, hauteur/offset))."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Any, Tuple[str, int]]" = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, value) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Fragments par organe (position comprise) et par phase complète
+_ORGAN_CACHE = _RenderCache(maxsize=512)
+_PHASE_CACHE = _RenderCache(maxsize=32)
+
+
+def _subtree_hash(node) -> str:
+    """Hash stable d'un sous-arbre du génome (indépendant de l'ordre des clés)."""
+    payload = json.dumps(node, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _layout_key():
+    """Paramètres de layout et renderer actif : toute modification invalide les fragments."""
+    renderer = 'archetype' if render_organ else 'zones'
+    return (renderer, ARTBOARD_W, ARTBOARD_H, COL_GAP, APP_MARGIN)
+
+
+def clear_render_cache():
+    """Vide les caches de fragments (organes et phases)."""
+    _ORGAN_CACHE.clear()
+    _PHASE_CACHE.clear()
+
+
+def render_cache_stats():
+    """Statistiques des caches de fragments (entrées, hits, misses)."""
+    return {
+        name: {'entries': len(cache), 'hits': cache.hits, 'misses': cache.misses}
+        for name, cache in (('organs', _ORGAN_CACHE), ('phases', _PHASE_CACHE))
+    }
+
+
+def _render_organ_cached(organ, organ_hash, x, y, w, kimi_result=None):
+    """Rend un organe à (x, y, w), ou réutilise le fragment si sous-arbre et position inchangés."""
+    key = (_layout_key(), organ_hash, x, y, w, kimi_result)
+    cached = _ORGAN_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    if kimi_result is not None:
+        result = _wrap_kimi_organ(organ, x, y, w, kimi_result)
+    elif render_organ:
+        result = render_organ(organ, x, y, w)
+    else:
+        result = _render_organ_zones(organ, x, y, w)
+    _ORGAN_CACHE.put(key, result)
+    return result
+
+
+def _render_n0(phase, all_phases=None, offset_y=0, use_kimi=False, style_id='auto', app_shell_organs=None,
+               kimi_payloads=None):
+    """Génère le SVG d'une phase N0 (shell dynamique possible + main).
+
+    kimi_payloads : layouts KIMI pré-calculés {organ_id: (svg, h)} ; les organes
+    absents utilisent le renderer statique.
+
+    Mémoïsé par phase et par organe (hash du sous-arbre + position + style +
+    layout) : après une édition locale, seul l'organe touché est re-rendu, les
+    autres fragments sont réutilisés tels quels.
+    """
+    kimi_payloads = kimi_payloads or {}
     gid    = phase.get('id', '')
     name   = phase.get('name', gid)
     organs = phase.get('n1_sections', [])
@@ -546,6 +705,13 @@ def _render_n0(phase, all_phases=None, offset_y=0, use_kimi=False, style_id='aut
         # On injecte les organes du shell au début de la liste pour qu'ils soient dans le scaffold
         organs = app_shell_organs + organs
 
+    organ_hashes = [_subtree_hash(organ) for organ in organs]
+    organ_kimi = [kimi_payloads.get(organ.get('id')) for organ in organs]
+    phase_key = (_layout_key(), gid, name, offset_y, style_id, tuple(organ_hashes), tuple(organ_kimi))
+    cached = _PHASE_CACHE.get(phase_key)
+    if cached is not None:
+        return cached
+
     # Dimensions main content area - On utilise tout le canvas moins les marges standards
     MAIN_X  = APP_MARGIN
     MAIN_W  = ARTBOARD_W - 2 * APP_MARGIN
@@ -572,20 +738,32 @@ def _render_n0(phase, all_phases=None, offset_y=0, use_kimi=False, style_id='aut
             row_max_h = 0
         cx = MAIN_X + col * (COL2_W + COL_GAP)
 
-        if render_organ:
-            svg_organ, organ_h = render_organ(organ, cx, cy, COL2_W)
-        else:
-            svg_organ, organ_h = _render_organ_zones(organ, cx, cy, COL2_W)
+        svg_organ, organ_h = _render_organ_cached(organ, organ_hashes[i], cx, cy, COL2_W, organ_kimi[i])
 
         lines.append(svg_organ)
         row_max_h = max(row_max_h, organ_h)
 
     lines.append('</g>')
-    return '\n'.join(lines), offset_y + total_h
-
+    result = ('\n'.join(lines), offset_y + total_h)
+    _PHASE_CACHE.put(phase_key, result)
+    return result
+
+
+def generate_svg(genome, use_kimi=False, style_id='auto', concurrency=DEFAULT_CONCURRENCY, rate=None,
+                 cache_dir=None, kimi_payloads=None):
+    """Génère un SVG scaffold — 1 artboard complet par phase (header+sidebar+main).
+
+    En mode KIMI, tous les organes (toutes phases) sont générés en parallèle
+    borné (concurrency requêtes simultanées, rate requêtes/s) puis le SVG est
+    assemblé une fois tous les organes résolus. Depuis une boucle asyncio déjà
+    active, utiliser generate_svg_async().
+    """
+    if use_kimi and kimi_payloads is None:
+        return asyncio.run(generate_svg_async(
+            genome, style_id=style_id, concurrency=concurrency, rate=rate, cache_dir=cache_dir,
+        ))
+    kimi_payloads = kimi_payloads or {}
 
-def generate_svg(genome, use_kimi=False, style_id='auto'):
-    """Génère un SVG scaffold — 1 artboard complet par phase (header+sidebar+main)."""
     phases  = genome.get('n0_phases', [])
     app_shell = genome.get('n0_app_shell', {})
     app_shell_organs = app_shell.get('n1_sections', [])
@@ -612,7 +790,7 @@ def generate_svg(genome, use_kimi=False, style_id='auto'):
         phase_svg, next_offset = _render_n0(
             phase, all_phases=phases, offset_y=offset,
             use_kimi=use_kimi, style_id=style_id,
-            app_shell_organs=app_shell_organs
+            app_shell_organs=app_shell_organs, kimi_payloads=kimi_payloads
         )
         parts.append(phase_svg)
         offset = next_offset
@@ -621,12 +799,26 @@ def generate_svg(genome, use_kimi=False, style_id='auto'):
     return '\n'.join(parts)
 
 
+async def generate_svg_async(genome, style_id='auto', concurrency=DEFAULT_CONCURRENCY, rate=None,
+                             cache_dir=None):
+    """Version async de generate_svg(use_kimi=True) : organes KIMI en parallèle puis assemblage."""
+    organs = iter_organs(genome, include_app_shell=True)
+    t0 = time.monotonic()
+    payloads = await _kimi_organ_payloads(
+        organs, style_id=style_id, concurrency=concurrency, rate=rate, cache_dir=cache_dir,
+    )
+    print(f'  [KIMI] {len(payloads)}/{len(organs)} organes en {time.monotonic() - t0:.1f}s')
+    return generate_svg(genome, use_kimi=True, style_id=style_id, kimi_payloads=payloads)
+
+
 def main():
     parser = argparse.ArgumentParser(description='AetherFlow Genome → SVG scaffold (v2 avec zones)')
     parser.add_argument('--genome', default=None, help='Chemin vers genome_reference.json')
     parser.add_argument('--output', default='exports/genome_scaffold_zones.svg', help='Chemin de sortie SVG')
     parser.add_argument('--kimi', action='store_true', help='Utiliser KIMI pour des layouts fancy')
     parser.add_argument('--style', default='auto', help='Style KIMI : minimal, glassmorphism, swiss, dark_mode...')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Requêtes KIMI simultanées')
+    parser.add_argument('--rate', type=float, default=None, help='Requêtes KIMI max par seconde')
     args = parser.parse_args()
     
     if args.genome:
@@ -642,7 +834,8 @@ def main():
         total_organs = sum(len(p.get('n1_sections', [])) for p in genome.get('n0_phases', []))
         print(f'Mode KIMI activé — {total_organs} organes à générer...')
     
-    svg = generate_svg(genome, use_kimi=args.kimi, style_id=args.style)
+    svg = generate_svg(genome, use_kimi=args.kimi, style_id=args.style,
+                       concurrency=args.concurrency, rate=args.rate)
     
     out = Path(args.output)
     out.parent.mkdir(parents=True, exist_ok=True)
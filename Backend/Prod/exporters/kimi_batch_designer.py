@@ -13,9 +13,13 @@ import os
 import sys
 import json
 import time
+import asyncio
+import argparse
 from pathlib import Path
 from dotenv import load_dotenv
-from openai import OpenAI
+
+sys.path.insert(0, os.path.dirname(__file__))
+from organ_batch import DEFAULT_CONCURRENCY, OrganSVGCache, iter_organs, pooled_async_client, render_organs
 
 project_root = Path(__file__).parent.parent.parent.parent
 load_dotenv(project_root / "Backend/.env")
@@ -170,7 +174,7 @@ def get_style_directive(organ):
     )
 
 
-def generate_svg_for_organ(client, organ, model):
+def build_messages(organ):
     components = collect_components(organ)
     prompt = PROMPT_TEMPLATE.format(
         organ_name=organ.get("name", organ["id"]),
@@ -178,29 +182,51 @@ def generate_svg_for_organ(client, organ, model):
         layout_strategy=organ.get("layout_strategy", "responsive_grid"),
         components_json=json.dumps(components, indent=2)
     )
-    response = client.chat.completions.create(
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def extract_svg(content):
+    content = content or ""
+    if "<svg" in content:
+        return content[content.find("<svg"):content.rfind("</svg>") + 6]
+    return None
+
+
+async def generate_svg_for_organ(client, organ, model):
+    response = await client.chat.completions.create(
         model=model,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": prompt}
-        ],
+        messages=build_messages(organ),
         max_tokens=16000,
         extra_body={"thinking": {"type": "disabled"}},
     )
-    content = response.choices[0].message.content or ""
-    if "<svg" in content:
-        return content[content.find("<svg"):content.rfind("</svg>") + 6]
-    return None
+    return extract_svg(response.choices[0].message.content)
 
 
-def main():
+async def generate_all(genome, client, model, concurrency=DEFAULT_CONCURRENCY, rate=None, cache=None):
+    """Generate every organ of every n0 phase concurrently (bounded), cached by content hash."""
+    organs = iter_organs(genome)
+
+    async def render_one(organ):
+        print(f"  → {organ['id']} ({organ.get('ui_role', '?')}) — {organ.get('name', '')}")
+        return await generate_svg_for_organ(client, organ, model)
+
+    # ui_role selects the style directive, so it is part of the organ hash already
+    return await render_organs(
+        organs, render_one, style_id="role", concurrency=concurrency, rate=rate,
+        cache=cache, salt=f"batch:{model}",
+    )
+
+
+async def main_async(concurrency=DEFAULT_CONCURRENCY, rate=None, use_cache=True):
     api_key = os.getenv("KIMI_KEY")
     if not api_key:
         print("❌ KIMI_KEY not set in environment")
         sys.exit(1)
 
     model = "kimi-k2.5"
-    client = OpenAI(base_url="https://api.moonshot.ai/v1", api_key=api_key)
 
     genome_path = project_root / "Frontend/2. GENOME/genome_enriched.json"
     if not genome_path.exists():
@@ -213,31 +239,32 @@ def main():
     exports_dir = project_root / "exports"
     exports_dir.mkdir(exist_ok=True)
 
+    client = pooled_async_client(api_key, "https://api.moonshot.ai/v1", concurrency)
+    cache = OrganSVGCache() if use_cache else None
+    started = time.monotonic()
+    print(f"🚀 {len(iter_organs(genome))} organs, concurrency={concurrency}, rate={rate or '∞'}/s")
+    try:
+        organ_results = await generate_all(genome, client, model, concurrency, rate, cache)
+    finally:
+        await client.close()
+
     results = []
-    idx = 0
-
-    for n0 in genome.get("n0_phases", []):
-        for organ in n0.get("n1_sections", []):
-            idx += 1
-            organ_id = organ["id"]
-            ui_role = organ.get("ui_role", "?")
-            print(f"\n[{idx}] {organ_id} ({ui_role}) — {organ.get('name', '')}...")
-
-            try:
-                svg = generate_svg_for_organ(client, organ, model)
-                if svg:
-                    out_path = exports_dir / f"{organ_id}_kimi.svg"
-                    out_path.write_text(svg, encoding="utf-8")
-                    organ["svg_payload"] = svg
-                    results.append({"id": organ_id, "status": "ok", "file": out_path.name})
-                    print(f"  ✅ → {out_path.name} ({len(svg)} chars)")
-                else:
-                    results.append({"id": organ_id, "status": "no_svg"})
-                    print(f"  ❌ No SVG in response")
-                time.sleep(1)  # rate limit
-            except Exception as e:
-                results.append({"id": organ_id, "status": "error", "error": str(e)})
-                print(f"  ❌ {e}")
+    for idx, r in enumerate(organ_results, 1):
+        organ = r.organ
+        organ_id = organ["id"]
+        print(f"\n[{idx}] {organ_id} ({organ.get('ui_role', '?')}) — {organ.get('name', '')}...")
+        if r.status == "ok":
+            out_path = exports_dir / f"{organ_id}_kimi.svg"
+            out_path.write_text(r.value, encoding="utf-8")
+            organ["svg_payload"] = r.value
+            results.append({"id": organ_id, "status": "ok", "file": out_path.name})
+            print(f"  ✅ → {out_path.name} ({len(r.value)} chars){' [cache]' if r.cached else ''}")
+        elif r.status == "no_svg":
+            results.append({"id": organ_id, "status": "no_svg"})
+            print(f"  ❌ No SVG in response")
+        else:
+            results.append({"id": organ_id, "status": "error", "error": r.error})
+            print(f"  ❌ {r.error}")
 
     # Save enriched genome with svg_payload
     out_genome = project_root / "Frontend/2. GENOME/genome_enriched_kimi.json"
@@ -246,12 +273,21 @@ def main():
 
     ok = sum(1 for r in results if r["status"] == "ok")
     print(f"\n{'='*50}")
-    print(f"📊 {ok}/{len(results)} organs generated")
+    print(f"📊 {ok}/{len(results)} organs generated in {time.monotonic() - started:.1f}s")
     print(f"💾 genome_enriched_kimi.json saved")
     for r in results:
         icon = "✅" if r["status"] == "ok" else "❌"
         print(f"  {icon} {r['id']}")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="KIMI batch SVG generator for all N1 organs")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Max simultaneous KIMI requests")
+    parser.add_argument("--rate", type=float, default=None, help="Max KIMI requests started per second")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the organ SVG cache")
+    args = parser.parse_args()
+    asyncio.run(main_async(args.concurrency, args.rate, use_cache=not args.no_cache))
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+organ_batch.py — Génération SVG par organe en parallèle borné
+Rend tous les organes N1 d'un génome en concurrence (sémaphore + débit max),
+avec un client async unique et un cache disque par hash de contenu + style.
+
+Utilisé par genome_to_svg_v2.generate_svg(use_kimi=True) et kimi_batch_designer.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent.parent.parent / 'exports' / '.kimi_cache'
+DEFAULT_CONCURRENCY = 4
+
+
+def iter_organs(genome: Dict, include_app_shell: bool = False) -> List[Dict]:
+    """Liste les organes N1 de toutes les phases N0 (shell applicatif en tête si demandé)."""
+    organs = []
+    if include_app_shell:
+        organs.extend(genome.get('n0_app_shell', {}).get('n1_sections', []))
+    for phase in genome.get('n0_phases', []):
+        organs.extend(phase.get('n1_sections', []))
+    return organs
+
+
+def organ_content_hash(organ: Dict, style_id: str, salt: str = '') -> str:
+    """Hash du contenu de l'organe (hors svg_payload déjà généré) + style_id."""
+    content = {k: v for k, v in organ.items() if k != 'svg_payload'}
+    payload = json.dumps([salt, style_id, content], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class OrganSVGCache:
+    """Cache disque des rendus d'organes : un fichier JSON par clé de contenu."""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f'{key}.json'
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            return json.loads(self._path(key).read_text(encoding='utf-8'))['value']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp = path.with_name(path.name + '.tmp')
+            tmp.write_text(json.dumps({'value': value}, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f'  [cache] écriture impossible : {e}')
+
+
+class RateLimiter:
+    """Espace les départs de requêtes (au plus `rate` par seconde, None = illimité)."""
+
+    def __init__(self, rate: Optional[float] = None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+@dataclass
+class OrganResult:
+    """Résultat du rendu d'un organe (value=None si pas de SVG ou erreur)."""
+    organ: Dict
+    value: Any = None
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def status(self) -> str:
+        if self.error:
+            return 'error'
+        return 'ok' if self.value is not None else 'no_svg'
+
+
+async def render_organs(
+    organs: List[Dict],
+    render_one: Callable[[Dict], Awaitable[Any]],
+    style_id: str = 'auto',
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    cache: Optional[OrganSVGCache] = None,
+    salt: str = '',
+) -> List[OrganResult]:
+    """
+    Rend tous les organes en parallèle borné.
+
+    Les organes de contenu identique ne sont rendus qu'une fois (même tâche),
+    les hits de cache ne consomment ni slot ni débit. Seuls les résultats non
+    vides sont mis en cache.
+
+    Args:
+        organs: Organes N1 à rendre
+        render_one: Coroutine organe -> valeur JSON-sérialisable (ou None)
+        style_id: Style appliqué (fait partie de la clé de cache)
+        concurrency: Nombre max de requêtes simultanées
+        rate: Nombre max de requêtes démarrées par seconde (None = illimité)
+        cache: Cache disque (None = pas de cache)
+        salt: Discriminant supplémentaire de la clé (modèle, version du prompt...)
+
+    Returns:
+        Un OrganResult par organe, dans l'ordre d'entrée
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limiter = RateLimiter(rate)
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(organ: Dict, key: str) -> OrganResult:
+        if cache is not None:
+            value = cache.get(key)
+            if value is not None:
+                return OrganResult(organ, value, cached=True)
+        async with semaphore:
+            await limiter.wait()
+            try:
+                value = await render_one(organ)
+            except Exception as e:
+                return OrganResult(organ, error=str(e))
+        if value is not None and cache is not None:
+            cache.put(key, value)
+        return OrganResult(organ, value)
+
+    keys = []
+    for organ in organs:
+        key = organ_content_hash(organ, style_id, salt)
+        keys.append(key)
+        if key not in tasks:
+            tasks[key] = asyncio.ensure_future(run(organ, key))
+    await asyncio.gather(*tasks.values())
+
+    results = []
+    for organ, key in zip(organs, keys):
+        shared = tasks[key].result()
+        results.append(OrganResult(organ, shared.value, shared.error, shared.cached))
+    return results
+
+
+def pooled_async_client(api_key: str, base_url: str, concurrency: int = DEFAULT_CONCURRENCY):
+    """Client AsyncOpenAI unique pour tout le lot (pool de connexions keep-alive)."""
+    import httpx
+    from openai import AsyncOpenAI
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(300.0, connect=10.0)),
+    )
@@ -13,6 +13,8 @@ Features:
 - Section-based generation for large files (SectionGenerator)
 """
 import asyncio
+import hashlib
+import json
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from loguru import logger
@@ -338,19 +340,41 @@ class AgentRouter:
         system_context: Optional[str] = None
     ) -> StepResult:
         """Execute step with fallback cascade."""
-        
-        # Check semantic cache first
-        cache_namespace = f"step_{step.id}" if step else None
+        prompt = self._build_prompt(step, context, surgical_mode)
+        primary_provider = routing_decision.primary_provider
+        primary_model = getattr(self._clients.get(primary_provider), "model", None)
+
+        # Check exact-match prompt cache first, then semantic cache
+        cache_namespace = self._semantic_namespace(step, primary_provider, context, system_context)
+        cache_key = {
+            "prompt": prompt,
+            "context": context,
+            "provider": primary_provider,
+            "model": primary_model,
+            "system_prompt": system_context,
+            "namespace": cache_namespace
+        }
         cached_response = None
-        if self.semantic_cache:
-            prompt = self._build_prompt(step, context, surgical_mode)
+        cache_kind = "Prompt"
+        if self.prompt_cache:
+            cached_text = self.prompt_cache.get(
+                prompt,
+                context=context,
+                provider=primary_provider,
+                model=primary_model,
+                system_prompt=system_context
+            )
+            if cached_text is not None:
+                cached_response = (cached_text, 1.0)
+        if cached_response is None and self.semantic_cache:
+            cache_kind = "Semantic"
             cached_response = self.semantic_cache.get(prompt, namespace=cache_namespace)
         
         if cached_response:
             response_text, similarity = cached_response
             execution_time = (datetime.now() - start_time).total_seconds() * 1000
             
-            logger.info(f"Semantic cache HIT for step {step.id} (similarity: {similarity:.3f})")
+            logger.info(f"{cache_kind} cache HIT for step {step.id} (similarity: {similarity:.3f})")
             
             # Record cache hit (zero cost)
             try:
@@ -380,9 +404,6 @@ class AgentRouter:
                 cost_usd=0.0
             )
         
-        # Build prompt
-        prompt = self._build_prompt(step, context, surgical_mode)
-        
         # Execute with fallback cascade
         if self.fallback_cascade:
             # Build fallback chain
@@ -404,20 +425,15 @@ class AgentRouter:
             execution_time = (datetime.now() - start_time).total_seconds() * 1000
             
             if cascade_result.success:
-                # Cache the result
-                if self.semantic_cache:
-                    self.semantic_cache.put(
-                        prompt=prompt,
-                        response=cascade_result.output,
-                        metadata={
-                            "step_id": step.id,
-                            "provider": cascade_result.provider_used,
-                            "fallback_used": cascade_result.fallback_used
-                        },
-                        tokens_saved=0,
-                        cost_saved_usd=0.0,
-                        namespace=cache_namespace
-                    )
+                self._cache_response(
+                    cache_key,
+                    cascade_result.output,
+                    step=step,
+                    provider_used=cascade_result.provider_used,
+                    fallback_used=cascade_result.fallback_used,
+                    tokens_saved=cascade_result.total_tokens,
+                    cost_saved_usd=cascade_result.total_cost
+                )
                 
                 # Record cost
                 try:
@@ -467,7 +483,70 @@ class AgentRouter:
                 )
         else:
             # Fallback to simple execution without cascade
-            return await self._execute_simple(step, context, surgical_mode, start_time, system_context)
+            return await self._execute_simple(
+                step, context, surgical_mode, start_time, system_context, cache_key=cache_key
+            )
+
+    @staticmethod
+    def _semantic_namespace(
+        step: Step,
+        provider: str,
+        context: Optional[str],
+        system_context: Optional[str]
+    ) -> str:
+        """
+        Semantic cache namespace of a step.
+
+        The step id alone would let step_1 of unrelated plans match each other's
+        near-duplicate prompts, so the provider and a digest of the plan context
+        (context, system prompt, step context) are part of the namespace.
+        """
+        payload = json.dumps(
+            [context or "", system_context or "", step.context or {}],
+            sort_keys=True,
+            default=str
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+        return f"step_{step.id}:{provider}:{digest}"
+
+    def _cache_response(
+        self,
+        cache_key: Dict[str, Any],
+        output: str,
+        step: Step,
+        provider_used: str,
+        fallback_used: bool,
+        tokens_saved: int,
+        cost_saved_usd: float
+    ) -> None:
+        """Store a successful response in the prompt and semantic caches."""
+        # Keyed on the routed provider so the next identical request hits
+        metadata = {
+            "step_id": step.id,
+            "provider": provider_used,
+            "fallback_used": fallback_used
+        }
+        if self.prompt_cache:
+            self.prompt_cache.put(
+                cache_key["prompt"],
+                output,
+                context=cache_key["context"],
+                provider=cache_key["provider"],
+                model=cache_key["model"],
+                system_prompt=cache_key["system_prompt"],
+                metadata=metadata,
+                tokens_saved=tokens_saved,
+                cost_saved_usd=cost_saved_usd
+            )
+        if self.semantic_cache:
+            self.semantic_cache.put(
+                prompt=cache_key["prompt"],
+                response=output,
+                metadata=metadata,
+                tokens_saved=tokens_saved,
+                cost_saved_usd=cost_saved_usd,
+                namespace=cache_key["namespace"]
+            )
     
     async def _execute_chunked_step(
         self,
@@ -613,7 +692,8 @@ class AgentRouter:
         context: Optional[str],
         surgical_mode: bool,
         start_time: datetime,
-        system_context: Optional[str] = None
+        system_context: Optional[str] = None,
+        cache_key: Optional[Dict[str, Any]] = None
     ) -> StepResult:
         """Simple execution without fallback cascade (legacy)."""
         
@@ -644,6 +724,16 @@ class AgentRouter:
                     f"${result.cost_usd:.4f}, {execution_time:.0f}ms "
                     f"(provider: {provider_name})"
                 )
+                if cache_key:
+                    self._cache_response(
+                        cache_key,
+                        result.code,
+                        step=step,
+                        provider_used=provider_name,
+                        fallback_used=False,
+                        tokens_saved=result.tokens_used,
+                        cost_saved_usd=result.cost_usd
+                    )
             
             return StepResult(
                 step_id=step.id,
@@ -744,3 +834,18 @@ class AgentRouter:
             stats["fallback_stats"] = self.fallback_cascade.get_stats()
         
         return stats
+
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Get prompt cache statistics, with semantic cache stats nested.
+
+        Returns:
+            PromptCache summary (plus "semantic_cache" key), or None if no cache is configured
+        """
+        stats: Optional[Dict[str, Any]] = None
+        if self.prompt_cache:
+            stats = self.prompt_cache.get_cache_summary()
+        if self.semantic_cache:
+            stats = stats or {}
+            stats["semantic_cache"] = self.semantic_cache.get_cache_summary()
+        return stats
@@ -9,6 +9,7 @@ from loguru import logger
 
 from ..config.settings import settings
 from .base_client import BaseLLMClient, GenerationResult
+from ..network.rate_limiter import rate_limited_transport
 
 
 @dataclass
@@ -57,6 +58,7 @@ class ClaudeClient(BaseLLMClient):
         self.api_url = "https://api.anthropic.com/v1/messages"
         self.client = httpx.AsyncClient(
             timeout=self.timeout,
+            transport=rate_limited_transport("claude"),
             headers={
                 "x-api-key": self.api_key,
                 "anthropic-version": "2023-06-01",
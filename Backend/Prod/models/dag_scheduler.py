@@ -0,0 +1,229 @@
+"""Critical-path DAG scheduler for plan execution.
+
+Replaces level-by-level batches (barrier after each level) with a ready queue:
+each step is launched as soon as its own dependencies have finished, so one
+slow step only delays its own successors.
+
+Scheduling policy:
+- Ready steps are ordered by their remaining critical path (estimated tokens of
+  the step plus the heaviest chain of successors), so the longest chains start
+  first (HEFT-style upward rank)
+- Each provider has its own concurrency limit; a ready step whose provider is
+  saturated is skipped in favour of the next ready step on another provider
+- Steps sharing an exclusive resource (e.g. a target file) never run together
+"""
+import asyncio
+import heapq
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+from loguru import logger
+
+from .plan_reader import Step, PlanValidationError
+
+
+DEFAULT_PROVIDER_LIMIT = 5
+
+
+@dataclass
+class SchedulerStats:
+    """Statistics collected during a scheduler run."""
+    steps_started: int = 0
+    steps_completed: int = 0
+    max_parallelism: int = 0
+    deferred_for_provider: int = 0
+    deferred_for_resource: int = 0
+    start_order: List[str] = field(default_factory=list)
+
+
+class DagScheduler:
+    """
+    Ready-queue scheduler over a step dependency graph.
+
+    The scheduler only decides *when* a step runs; the actual execution is
+    delegated to ``run_step``. A step counts as finished whether it succeeded
+    or failed (same semantics as the batch executor: successors still run and
+    simply do not receive a failed dependency's output).
+    """
+
+    def __init__(
+        self,
+        steps: List[Step],
+        run_step: Callable[[Step], Awaitable[Any]],
+        cost_fn: Optional[Callable[[Step], float]] = None,
+        provider_fn: Optional[Callable[[Step], str]] = None,
+        provider_limits: Optional[Mapping[str, int]] = None,
+        resource_fn: Optional[Callable[[Step], Iterable[str]]] = None,
+        max_concurrency: Optional[int] = None,
+        on_step_done: Optional[Callable[[Step, Any], None]] = None
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            steps: Steps to execute (dependencies must reference steps in this list)
+            run_step: Coroutine function executing one step
+            cost_fn: Estimated cost of a step (defaults to step.estimated_tokens)
+            provider_fn: Provider a step will be routed to (for per-provider limits)
+            provider_limits: Max concurrent steps per provider (read at every launch,
+                so a live view of adaptive limits can be passed)
+            resource_fn: Exclusive resources held by a step while it runs
+            max_concurrency: Global cap on running steps (None = unbounded)
+            on_step_done: Callback invoked with (step, result) after each step
+        """
+        self.steps = {step.id: step for step in steps}
+        self.run_step = run_step
+        self.cost_fn = cost_fn or (lambda s: float(s.estimated_tokens or 1))
+        self.provider_fn = provider_fn
+        self.provider_limits = provider_limits if provider_limits is not None else {}
+        self.resource_fn = resource_fn
+        self.max_concurrency = max_concurrency
+        self.on_step_done = on_step_done
+        self.stats = SchedulerStats()
+        self.running_step_ids: Set[str] = set()
+
+        self._successors: Dict[str, List[str]] = {sid: [] for sid in self.steps}
+        for step in steps:
+            for dep in step.dependencies:
+                if dep not in self.steps:
+                    raise PlanValidationError(
+                        f"Step {step.id} has dependency on non-existent step: {dep}"
+                    )
+                self._successors[dep].append(step.id)
+
+        self.priorities = self.compute_critical_path()
+        self._order = {sid: i for i, sid in enumerate(self.steps)}
+
+    def compute_critical_path(self) -> Dict[str, float]:
+        """
+        Compute the remaining critical-path length of every step.
+
+        rank(step) = cost(step) + max(rank(successor)), computed in reverse
+        topological order.
+
+        Raises:
+            PlanValidationError: If the graph contains a cycle
+        """
+        in_degree = {sid: len(step.dependencies) for sid, step in self.steps.items()}
+        queue = [sid for sid, degree in in_degree.items() if degree == 0]
+        topo: List[str] = []
+        while queue:
+            sid = queue.pop()
+            topo.append(sid)
+            for succ in self._successors[sid]:
+                in_degree[succ] -= 1
+                if in_degree[succ] == 0:
+                    queue.append(succ)
+
+        if len(topo) != len(self.steps):
+            remaining = set(self.steps) - set(topo)
+            raise PlanValidationError(f"Circular dependency detected. Remaining steps: {remaining}")
+
+        ranks: Dict[str, float] = {}
+        for sid in reversed(topo):
+            tail = max((ranks[succ] for succ in self._successors[sid]), default=0.0)
+            ranks[sid] = max(float(self.cost_fn(self.steps[sid])), 0.0) + tail
+        return ranks
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Execute all steps.
+
+        Returns:
+            Mapping step_id -> value returned (or exception raised) by run_step
+        """
+        remaining_deps = {sid: len(step.dependencies) for sid, step in self.steps.items()}
+        ready: List[Any] = []
+        for sid, degree in remaining_deps.items():
+            if degree == 0:
+                self._push(ready, sid)
+
+        outcomes: Dict[str, Any] = {}
+        running: Dict[asyncio.Task, str] = {}
+        provider_of: Dict[str, str] = {}
+        provider_running: Dict[str, int] = {}
+        held_resources: Set[str] = set()
+        resources_of: Dict[str, Set[str]] = {}
+
+        try:
+            while ready or running:
+                # Launch every ready step that fits the limits, highest priority first
+                deferred = []
+                while ready:
+                    if self.max_concurrency and len(running) >= self.max_concurrency:
+                        break
+                    entry = heapq.heappop(ready)
+                    sid = entry[2]
+                    step = self.steps[sid]
+
+                    resources = set(self.resource_fn(step)) if self.resource_fn else set()
+                    if resources & held_resources:
+                        self.stats.deferred_for_resource += 1
+                        deferred.append(entry)
+                        continue
+
+                    if sid not in provider_of:
+                        provider_of[sid] = self.provider_fn(step) if self.provider_fn else ""
+                    provider = provider_of[sid]
+                    limit = self.provider_limits.get(provider, DEFAULT_PROVIDER_LIMIT) if provider else None
+                    if limit is not None and provider_running.get(provider, 0) >= limit:
+                        self.stats.deferred_for_provider += 1
+                        deferred.append(entry)
+                        continue
+
+                    provider_running[provider] = provider_running.get(provider, 0) + 1
+                    held_resources |= resources
+                    resources_of[sid] = resources
+                    task = asyncio.ensure_future(self.run_step(step))
+                    running[task] = sid
+                    self.running_step_ids.add(sid)
+                    self.stats.steps_started += 1
+                    self.stats.start_order.append(sid)
+                    self.stats.max_parallelism = max(self.stats.max_parallelism, len(running))
+                    logger.debug(
+                        f"DAG scheduler: started {sid} (critical path {self.priorities[sid]:.0f}, "
+                        f"provider={provider or '-'}, running={len(running)})"
+                    )
+                for entry in deferred:
+                    heapq.heappush(ready, entry)
+
+                if not running:
+                    # Nothing can run although steps are ready: limits misconfigured (e.g. 0)
+                    stuck = [entry[2] for entry in ready]
+                    raise PlanValidationError(f"Scheduler cannot start ready steps: {stuck}")
+
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    sid = running.pop(task)
+                    self.running_step_ids.discard(sid)
+                    provider_running[provider_of[sid]] -= 1
+                    held_resources -= resources_of.pop(sid, set())
+
+                    try:
+                        outcome = task.result()
+                    except Exception as e:
+                        logger.error(f"Unexpected error executing step {sid}: {e}")
+                        outcome = e
+                    outcomes[sid] = outcome
+                    self.stats.steps_completed += 1
+                    if self.on_step_done:
+                        self.on_step_done(self.steps[sid], outcome)
+
+                    for succ in self._successors[sid]:
+                        remaining_deps[succ] -= 1
+                        if remaining_deps[succ] == 0:
+                            self._push(ready, succ)
+        except BaseException:
+            # run() cancelled (plan timeout, Ctrl-C, client gone) or failed: stop the
+            # steps still in flight instead of leaving them writing files unobserved
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            self.running_step_ids.difference_update(running.values())
+            raise
+
+        return outcomes
+
+    def _push(self, heap: List[Any], sid: str) -> None:
+        # Longest remaining critical path first, plan order as tie-breaker
+        heapq.heappush(heap, (-self.priorities[sid], self._order[sid], sid))
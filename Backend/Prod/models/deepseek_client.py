@@ -10,7 +10,8 @@ from loguru import logger
 from ..config.settings import settings
 from .plan_reader import Step
 from .base_client import BaseLLMClient, GenerationResult
-from ..rag.pageindex_store import PageIndexRetriever
+from ..network.rate_limiter import rate_limited_transport
+from ..rag.lazy_retriever import LazyRetriever
 
 
 @dataclass
@@ -59,6 +60,7 @@ class DeepSeekClient(BaseLLMClient):
         
         self.client = httpx.AsyncClient(
             timeout=self.timeout,
+            transport=rate_limited_transport("deepseek"),
             headers={
                 "Authorization": f"Bearer {self.api_key}",
                 "Content-Type": "application/json"
@@ -81,12 +83,12 @@ class DeepSeekClient(BaseLLMClient):
             # Hierarchical root detection
             # models/Prod/Backend (3 levels)
             project_root = Path(__file__).resolve().parents[3]
-            self._retriever = PageIndexRetriever(docs_path=str(project_root))
-        
-        if not self._retriever.enabled:
-            return "RAG context retrieval not available."
+            self._retriever = LazyRetriever(docs_path=str(project_root))
 
+        # Index is built in a background thread on first use (event loop stays free)
         results = await self._retriever.retrieve(query, top_k=top_k)
+        if not self._retriever.enabled:
+            return "RAG context retrieval not available."
         if not results:
             return "No relevant context found in codebase."
 
@@ -7,6 +7,7 @@ from loguru import logger
 
 from ..config.settings import settings
 from .base_client import BaseLLMClient, GenerationResult
+from ..network.rate_limiter import rate_limited_transport
 
 
 class GeminiClient(BaseLLMClient):
@@ -91,6 +92,7 @@ class GeminiClient(BaseLLMClient):
 
         self.client = httpx.AsyncClient(
             timeout=self.timeout,
+            transport=rate_limited_transport("gemini"),
             headers={"Content-Type": "application/json"}
         )
 
@@ -7,6 +7,7 @@ from loguru import logger
 
 from ..config.settings import settings
 from .base_client import BaseLLMClient, GenerationResult
+from ..network.rate_limiter import rate_limited_transport
 
 
 class GroqClient(BaseLLMClient):
@@ -41,6 +42,7 @@ class GroqClient(BaseLLMClient):
 
         self.client = httpx.AsyncClient(
             timeout=self.timeout,
+            transport=rate_limited_transport("groq"),
             headers={
                 "Authorization": f"Bearer {self.api_key}",
                 "Content-Type": "application/json"
@@ -8,6 +8,7 @@ from loguru import logger
 
 from ..config.settings import settings
 from .base_client import BaseLLMClient, GenerationResult
+from ..network.rate_limiter import rate_limited_transport
 
 class MimoClient(BaseLLMClient):
     """
@@ -38,6 +39,7 @@ class MimoClient(BaseLLMClient):
 
         self.client = httpx.AsyncClient(
             timeout=self.timeout,
+            transport=rate_limited_transport("mimo"),
             headers={
                 "Authorization": f"Bearer {self.api_key}",
                 "Content-Type": "application/json"
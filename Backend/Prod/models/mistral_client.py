@@ -8,6 +8,7 @@ from loguru import logger
 
 from ..config.settings import settings
 from .base_client import BaseLLMClient, GenerationResult
+from ..network.rate_limiter import rate_limited_transport
 
 class MistralClient(BaseLLMClient):
     """Async client for Mistral AI via OpenRouter (OpenAI-compatible)."""
@@ -39,6 +40,7 @@ class MistralClient(BaseLLMClient):
 
         self.client = httpx.AsyncClient(
             timeout=self.timeout,
+            transport=rate_limited_transport("mistral"),
             headers={
                 "Authorization": f"Bearer {self.api_key}",
                 "Content-Type": "application/json"
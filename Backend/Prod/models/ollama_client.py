@@ -6,6 +6,7 @@ import httpx
 from loguru import logger
 
 from .base_client import BaseLLMClient, GenerationResult
+from ..network.rate_limiter import rate_limited_transport
 
 class OllamaClient(BaseLLMClient):
     """Client for local Ollama inference."""
@@ -19,7 +20,7 @@ class OllamaClient(BaseLLMClient):
         self.api_url = api_url
         self.model = model
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=self.timeout)
+        self.client = httpx.AsyncClient(timeout=self.timeout, transport=rate_limited_transport("ollama"))
 
     @property
     def name(self) -> str:
@@ -1,12 +1,13 @@
 """Plan reader and validator for AetherFlow."""
+import codecs
 import json
-import asyncio
 from pathlib import Path
-from typing import Dict, List, Any, Optional, AsyncIterator
+from typing import Dict, List, Any, Optional, AsyncIterable, AsyncIterator, Union
 import jsonschema
 from loguru import logger
 
 from ..config.settings import settings
+from .plan_stream import IncrementalPlanParser, PlanStreamError, follow_file
 
 
 class PlanValidationError(Exception):
@@ -144,6 +145,8 @@ class PlanReader:
         
         self.schema_path = schema_path
         self._load_schema()
+        # Top-level plan fields seen so far by read_streaming
+        self.stream_header: Dict[str, Any] = {}
     
     def _load_schema(self) -> None:
         """Load JSON schema from file."""
@@ -228,111 +231,106 @@ class PlanReader:
     
     async def read_streaming(
         self,
-        plan_path: Path,
+        plan_path: Optional[Path] = None,
         max_wait_seconds: float = 30.0,
-        check_interval: float = 0.5
+        check_interval: float = 0.05,
+        stream: Optional[AsyncIterable[Union[bytes, str]]] = None
     ) -> AsyncIterator[Step]:
         """
         Read plan steps as they become available (streaming mode).
-        
-        This method watches the plan file and yields steps as soon as they are
-        complete in the JSON. Useful when Claude Code is writing the plan progressively.
-        
+
+        The plan is parsed incrementally: each element of the ``steps`` array
+        is yielded as soon as its closing brace has been written, so execution
+        can start while the planner is still generating the rest of the plan.
+        Top-level fields (task_id, description, ...) are exposed in
+        ``self.stream_header`` as soon as they are parsed.
+
         Args:
-            plan_path: Path to plan JSON file
-            max_wait_seconds: Maximum time to wait for file to be complete
-            check_interval: How often to check for file updates (seconds)
-            
+            plan_path: Path to plan JSON file being written (followed via change
+                notifications, or polling when watchfiles is not installed)
+            max_wait_seconds: Maximum time without new data before giving up
+            check_interval: Polling period for the file (seconds)
+            stream: In-memory async stream of plan chunks (bytes or str) from the
+                planner, used instead of the file when given
+
         Yields:
             Step objects as they become available
-            
+
         Raises:
             PlanValidationError: If plan is invalid
             FileNotFoundError: If plan file doesn't exist
         """
-        if not plan_path.exists():
-            raise FileNotFoundError(f"Plan file not found: {plan_path}")
-        
-        logger.info(f"Reading plan in streaming mode from {plan_path}")
-        
-        seen_step_ids = set()
-        start_time = asyncio.get_event_loop().time()
-        last_size = 0
-        
-        while True:
-            # Check if file exists and has grown
+        if stream is None:
+            if plan_path is None:
+                raise ValueError("plan_path or stream is required")
             if not plan_path.exists():
-                await asyncio.sleep(check_interval)
-                continue
-            
-            current_size = plan_path.stat().st_size
-            
-            # Try to parse the file
-            try:
-                with open(plan_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    
-                # Try to parse as JSON
-                try:
-                    plan_data = json.loads(content)
-                except json.JSONDecodeError:
-                    # File is incomplete, wait and retry
-                    if (asyncio.get_event_loop().time() - start_time) > max_wait_seconds:
-                        # Fallback to normal read
-                        logger.warning("Streaming timeout, falling back to normal read")
-                        plan = self.read(plan_path)
-                        for step in plan.steps:
-                            if step.id not in seen_step_ids:
-                                yield step
-                        return
-                    await asyncio.sleep(check_interval)
+                raise FileNotFoundError(f"Plan file not found: {plan_path}")
+            source = follow_file(plan_path, idle_timeout=max_wait_seconds, poll_interval=check_interval)
+            logger.info(f"Reading plan in streaming mode from {plan_path}")
+        else:
+            source = stream
+            logger.info("Reading plan in streaming mode from planner stream")
+
+        parser = IncrementalPlanParser()
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        self.stream_header = parser.header
+        seen_step_ids = set()
+
+        try:
+            async for chunk in source:
+                if not chunk:
+                    # File was rewritten from scratch: parse it again (steps already
+                    # yielded are skipped by id)
+                    parser = IncrementalPlanParser()
+                    decoder.reset()
+                    self.stream_header = parser.header
                     continue
-                
-                # File is valid JSON, extract steps
-                steps_data = plan_data.get("steps", [])
-                
+                text = decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+                try:
+                    steps_data = parser.feed(text)
+                except PlanStreamError as e:
+                    logger.warning(f"Error parsing plan stream: {e}")
+                    break
+
                 for step_data in steps_data:
-                    step_id = step_data.get("id")
-                    if step_id and step_id not in seen_step_ids:
-                        try:
-                            # Validate step against schema if available
-                            if self.schema and "items" in self.schema.get("properties", {}).get("steps", {}):
-                                step_schema = self.schema["properties"]["steps"]["items"]
-                                jsonschema.validate(instance=step_data, schema=step_schema)
-                            
-                            step = Step(step_data)
-                            seen_step_ids.add(step_id)
-                            logger.debug(f"Streaming step: {step_id}")
-                            yield step
-                        except Exception as e:
-                            logger.warning(f"Failed to parse step {step_id}: {e}")
-                            continue
-                
-                # Check if we have all steps (file is complete)
-                if "steps" in plan_data and len(plan_data["steps"]) > 0:
-                    # Check if file size hasn't changed (likely complete)
-                    if current_size == last_size:
-                        # Wait a bit more to be sure
-                        await asyncio.sleep(check_interval)
-                        if plan_path.stat().st_size == current_size:
-                            logger.info("Plan file appears complete, finishing streaming")
-                            break
-                
-                last_size = current_size
-                
-            except Exception as e:
-                logger.warning(f"Error reading plan file: {e}")
-                if (asyncio.get_event_loop().time() - start_time) > max_wait_seconds:
-                    # Fallback to normal read
-                    logger.warning("Streaming error, falling back to normal read")
-                    plan = self.read(plan_path)
-                    for step in plan.steps:
-                        if step.id not in seen_step_ids:
-                            yield step
-                    return
-                await asyncio.sleep(check_interval)
-                continue
-            
-            await asyncio.sleep(check_interval)
-        
-        logger.info(f"Streaming complete: {len(seen_step_ids)} steps extracted")
\ No newline at end of file
+                    step = self._parse_streamed_step(step_data, seen_step_ids)
+                    if step is not None:
+                        yield step
+
+                if parser.done:
+                    break
+        finally:
+            if stream is None:
+                await source.aclose()
+
+        if not parser.done:
+            if plan_path is None:
+                raise PlanValidationError("Plan stream ended before the plan was complete")
+            # Fallback to normal read (reports a proper validation error if still invalid)
+            logger.warning("Streaming incomplete, falling back to normal read")
+            plan = self.read(plan_path)
+            for step in plan.steps:
+                if step.id not in seen_step_ids:
+                    seen_step_ids.add(step.id)
+                    yield step
+
+        logger.info(f"Streaming complete: {len(seen_step_ids)} steps extracted")
+
+    def _parse_streamed_step(self, step_data: Any, seen_step_ids: set) -> Optional[Step]:
+        """Validate a streamed step; None if invalid or already yielded."""
+        step_id = step_data.get("id") if isinstance(step_data, dict) else None
+        if not step_id or step_id in seen_step_ids:
+            return None
+        try:
+            # Validate step against schema if available
+            if self.schema and "items" in self.schema.get("properties", {}).get("steps", {}):
+                step_schema = self.schema["properties"]["steps"]["items"]
+                jsonschema.validate(instance=step_data, schema=step_schema)
+
+            step = Step(step_data)
+        except Exception as e:
+            logger.warning(f"Failed to parse step {step_id}: {e}")
+            return None
+        seen_step_ids.add(step_id)
+        logger.debug(f"Streaming step: {step_id}")
+        return step
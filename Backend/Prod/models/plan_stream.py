@@ -0,0 +1,236 @@
+"""
+Incremental plan parsing for streaming execution.
+
+IncrementalPlanParser is an event-driven JSON tokenizer specialised for the
+plan format: it is fed arbitrary text chunks and emits every element of the
+top-level ``steps`` array as soon as its closing brace arrives, plus the
+other top-level fields (task_id, description, metadata) as soon as each one
+is complete. Only structural characters are visited (regex scan), and the
+consumed prefix of the buffer is dropped, so feeding a plan costs O(size)
+overall instead of re-parsing the whole document on every change.
+
+follow_file / iter_text turn a growing plan file (file-change notifications
+via ``watchfiles`` when installed, stat polling otherwise) or an in-memory
+async byte stream into such chunks.
+"""
+import asyncio
+import codecs
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Union
+
+from loguru import logger
+
+try:
+    from watchfiles import awatch
+except ImportError:  # optional: polling fallback
+    awatch = None
+
+_STRUCTURAL = re.compile(r'[\[\]{}",:]')
+_STRING_TAIL = re.compile(r'(?:[^"\\]|\\.)*"', re.S)
+
+
+class PlanStreamError(ValueError):
+    """Raised when the streamed document is not a valid plan object."""
+
+
+class IncrementalPlanParser:
+    """
+    Incremental parser emitting plan steps as soon as they are complete.
+
+    Usage:
+        parser = IncrementalPlanParser()
+        for step_data in parser.feed(chunk):
+            ...
+        parser.header   # top-level fields parsed so far (without "steps")
+        parser.done     # True once the top-level object is closed
+    """
+
+    def __init__(self):
+        self.header: Dict[str, Any] = {}
+        self.done = False
+        self.steps_seen = 0
+        self._buf = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._key: Optional[str] = None
+        self._expect_key = False
+        self._value_start: Optional[int] = None
+        self._step_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume a chunk of the document.
+
+        Returns:
+            Step dicts completed by this chunk, in document order
+        """
+        if self.done or not chunk:
+            return []
+        self._buf += chunk
+        steps: List[Dict[str, Any]] = []
+        buf = self._buf
+
+        while not self.done:
+            match = _STRUCTURAL.search(buf, self._pos)
+            if match is None:
+                self._pos = len(buf)
+                break
+            char, i = match.group(), match.start()
+
+            if char == '"':
+                tail = _STRING_TAIL.match(buf, i + 1)
+                if tail is None:
+                    # String split across chunks: resume from its opening quote
+                    self._pos = i
+                    break
+                self._pos = tail.end()
+                if self._expect_key and len(self._stack) == 1:
+                    self._key = json.loads(buf[i:self._pos])
+                    self._expect_key = False
+                continue
+
+            self._pos = i + 1
+            depth = len(self._stack)
+            if char in "{[":
+                if depth == 0 and char != "{":
+                    raise PlanStreamError("Plan must be a JSON object")
+                if depth == 2 and char == "{" and self._in_steps():
+                    self._step_start = i
+                self._stack.append(char)
+                if depth == 0:
+                    self._expect_key = True
+            elif char in "}]":
+                if not self._stack:
+                    raise PlanStreamError(f"Unexpected '{char}'")
+                self._stack.pop()
+                if depth == 3 and char == "}" and self._step_start is not None:
+                    steps.append(self._load(buf[self._step_start:i + 1]))
+                    self._step_start = None
+                    self.steps_seen += 1
+                elif depth == 1:
+                    self._end_value(buf, i)
+                    self.done = True
+            elif char == ":" and depth == 1:
+                # The steps array itself is never captured, only its elements
+                self._value_start = i + 1 if self._key != "steps" else None
+            elif char == "," and depth == 1:
+                self._end_value(buf, i)
+                self._expect_key = True
+
+        self._compact()
+        return steps
+
+    def _in_steps(self) -> bool:
+        return self._key == "steps" and self._stack == ["{", "["]
+
+    def _end_value(self, buf: str, end: int) -> None:
+        if self._value_start is not None and self._key is not None:
+            self.header[self._key] = self._load(buf[self._value_start:end])
+        self._value_start = None
+        self._key = None
+
+    @staticmethod
+    def _load(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            raise PlanStreamError(f"Invalid JSON in plan stream: {e}") from e
+
+    def _compact(self) -> None:
+        """Drop the consumed prefix of the buffer (keeping any open capture)."""
+        keep = self._pos
+        for start in (self._value_start, self._step_start):
+            if start is not None:
+                keep = min(keep, start)
+        if keep:
+            self._buf = self._buf[keep:]
+            self._pos -= keep
+            if self._value_start is not None:
+                self._value_start -= keep
+            if self._step_start is not None:
+                self._step_start -= keep
+
+
+async def iter_text(stream: AsyncIterable[Union[bytes, str]]) -> AsyncIterator[str]:
+    """Decode an async stream of bytes/str chunks (UTF-8 safe across chunk boundaries)."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    async for chunk in stream:
+        text = decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def follow_file(
+    path: Path,
+    idle_timeout: float = 30.0,
+    poll_interval: float = 0.05
+) -> AsyncIterator[Union[bytes, str]]:
+    """
+    Yield the bytes appended to a file as it is being written.
+
+    Waits for change notifications (``watchfiles``) when available, otherwise
+    polls the file size. If the file is replaced or truncated, an empty
+    ``str`` is yielded as a reset marker and the file is re-read from the
+    start. Stops after ``idle_timeout`` seconds without growth.
+
+    Args:
+        path: File to follow
+        idle_timeout: Seconds without new data before giving up
+        poll_interval: Polling period when watchfiles is not installed
+    """
+    changes = None
+    if awatch is not None:
+        changes = awatch(path.parent, debounce=10, step=10, rust_timeout=int(idle_timeout * 1000),
+                         yield_on_timeout=True)
+
+    try:
+        async for data in _follow(path, changes, idle_timeout, poll_interval):
+            yield data
+    finally:
+        if changes is not None:
+            await changes.aclose()
+
+
+async def _follow(path, changes, idle_timeout, poll_interval) -> AsyncIterator[Union[bytes, str]]:
+    loop = asyncio.get_running_loop()
+    offset = 0
+    identity = None
+    last_growth = loop.time()
+
+    while True:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stat = None
+
+        if stat is not None:
+            current = (stat.st_dev, stat.st_ino)
+            if identity is not None and (current != identity or stat.st_size < offset):
+                logger.debug(f"Plan file {path} was rewritten, restarting parse")
+                offset = 0
+                yield ""
+            identity = current
+            if stat.st_size > offset:
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read(stat.st_size - offset)
+                offset += len(data)
+                last_growth = loop.time()
+                yield data
+                continue
+
+        if loop.time() - last_growth > idle_timeout:
+            return
+        if changes is not None:
+            try:
+                await asyncio.wait_for(changes.__anext__(), timeout=idle_timeout + 1)
+            except (asyncio.TimeoutError, StopAsyncIteration):
+                changes = None
+        else:
+            await asyncio.sleep(poll_interval)
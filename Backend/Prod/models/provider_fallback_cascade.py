@@ -14,6 +14,8 @@ from enum import Enum
 from datetime import datetime
 from loguru import logger
 
+from ..network.rate_limiter import get_rate_limiter
+
 
 class FailureType(Enum):
     """Types of provider failures."""
@@ -256,8 +258,14 @@ class ProviderFallbackCascade:
             self.config.max_retry_delay
         )
         
-        # Retry rate limits with backoff
+        # Retry rate limits once the provider's quota resets; if that is further
+        # away than max_retry_delay, fall through to the next provider instead
         if failure_type == FailureType.RATE_LIMIT:
+            cooldown = get_rate_limiter(provider).cooldown_remaining()
+            if cooldown > self.config.max_retry_delay:
+                return False, 0.0
+            if cooldown > 0:
+                return True, cooldown
             return True, delay * 2  # Double delay for rate limits
         
         # Retry server errors if configured
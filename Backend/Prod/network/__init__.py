@@ -2,8 +2,38 @@
 Network optimization module for AETHERFLOW.
 
 Provides connection pooling, persistent connections, and network metrics
-to reduce overhead (DNS + TCP + TLS handshake).
+to reduce overhead (DNS + TCP + TLS handshake), plus per-provider rate limiting.
 """
-from .connection_pool import ConnectionPool, ConnectionPoolStats
+from .connection_pool import (
+    ConnectionPool,
+    ConnectionPoolStats,
+    HostLimits,
+    PooledTransport,
+    get_global_pool,
+    prewarm_providers,
+)
+from .rate_limiter import (
+    ProviderQuota,
+    ProviderRateLimiter,
+    RateLimitedTransport,
+    RateLimiterRegistry,
+    get_rate_limiter,
+    get_rate_limiter_registry,
+    rate_limited_transport,
+)
 
-__all__ = ["ConnectionPool", "ConnectionPoolStats"]
+__all__ = [
+    "ConnectionPool",
+    "ConnectionPoolStats",
+    "HostLimits",
+    "PooledTransport",
+    "ProviderQuota",
+    "ProviderRateLimiter",
+    "RateLimitedTransport",
+    "RateLimiterRegistry",
+    "get_global_pool",
+    "get_rate_limiter",
+    "get_rate_limiter_registry",
+    "prewarm_providers",
+    "rate_limited_transport",
+]
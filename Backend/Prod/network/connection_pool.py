@@ -2,15 +2,80 @@
 Connection pool for persistent HTTP connections.
 
 Reduces network overhead (DNS + TCP + TLS handshake) by reusing connections
-across multiple requests.
+across multiple requests. A single process-wide pool owns one httpx
+transport per origin; every LLM client sends its requests through the pool
+(behind its provider's RateLimitedTransport), so clients talking to the same
+host share connections, multiplexed over HTTP/2 when the optional ``h2``
+package is installed.
+
+Handshake costs are measured from httpcore trace events rather than
+estimated: savings are credited per reused request with the average
+handshake time actually observed for that host.
 """
+import asyncio
+import importlib.util
+import threading
 import time
-from dataclasses import dataclass, field
-from typing import Dict, Optional
-from datetime import datetime
+import urllib.request
+import weakref
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
 import httpx
 from loguru import logger
 
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_CONNECT_EVENTS = ("connection.connect_tcp", "connection.start_tls")
+
+
+@dataclass(frozen=True)
+class HostLimits:
+    """Connection limits and keepalive tuning for one host."""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = True
+
+    def to_httpx(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+# LLM calls are long and bursty (plan steps can be minutes apart), so remote
+# providers keep idle connections longer than the httpx default. The local
+# Ollama server needs neither TLS nor HTTP/2 and handles few parallel requests.
+DEFAULT_HOST_LIMITS: Dict[str, HostLimits] = {
+    "api.deepseek.com": HostLimits(max_keepalive_connections=10, keepalive_expiry=120.0),
+    "api.groq.com": HostLimits(max_keepalive_connections=10, keepalive_expiry=60.0),
+    "api.mistral.ai": HostLimits(max_keepalive_connections=10, keepalive_expiry=120.0),
+    "codestral.mistral.ai": HostLimits(max_keepalive_connections=10, keepalive_expiry=120.0),
+    "generativelanguage.googleapis.com": HostLimits(keepalive_expiry=120.0),
+    "api.anthropic.com": HostLimits(max_keepalive_connections=10, keepalive_expiry=120.0),
+    "localhost": HostLimits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=300.0, http2=False),
+    "127.0.0.1": HostLimits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=300.0, http2=False),
+}
+
+
+@dataclass
+class HostStats:
+    """Measured connection statistics for one host."""
+    requests: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    http2_requests: int = 0
+    handshake_time_ms: float = 0.0
+
+    @property
+    def avg_handshake_ms(self) -> float:
+        if not self.connections_created:
+            return 0.0
+        return self.handshake_time_ms / self.connections_created
+
 
 @dataclass
 class ConnectionPoolStats:
@@ -18,26 +83,225 @@ class ConnectionPoolStats:
     total_requests: int = 0
     connections_reused: int = 0
     connections_created: int = 0
+    connections_prewarmed: int = 0
     dns_lookups_saved: int = 0
     tls_handshakes_saved: int = 0
+    http2_requests: int = 0
+    handshake_time_ms: float = 0.0
     network_overhead_reduction_ms: float = 0.0
     connection_reuse_rate: float = 0.0
 
 
+class _RequestTrace:
+    """httpcore ``trace`` extension recording connection setup for one request."""
+
+    __slots__ = ("connected", "handshake_ms", "_started", "_inner")
+
+    def __init__(self, inner: Optional[Callable[[str, Dict], Awaitable[None]]] = None):
+        self.connected = False
+        self.handshake_ms = 0.0
+        self._started = 0.0
+        self._inner = inner
+
+    async def __call__(self, name: str, info: Dict[str, Any]) -> None:
+        event, _, phase = name.rpartition(".")
+        if event in _CONNECT_EVENTS:
+            if phase == "started":
+                self._started = time.perf_counter()
+            elif phase == "complete":
+                self.connected = True
+                self.handshake_ms += (time.perf_counter() - self._started) * 1000
+        if self._inner is not None:
+            await self._inner(name, info)
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """
+    Non-owning handle on the pool, usable as an httpx.AsyncClient transport.
+
+    Closing a client does not close the shared connections; they belong to
+    the pool (see ConnectionPool.close_all).
+    """
+
+    def __init__(self, pool: "ConnectionPool"):
+        self.pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.pool.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
 class ConnectionPool:
     """
     Connection pool for HTTP clients.
-    
-    Manages persistent httpx.AsyncClient instances to reduce network overhead.
-    Each provider gets its own persistent client with connection pooling enabled.
+
+    Owns one httpx.AsyncHTTPTransport per origin (and per event loop, since
+    connections cannot cross loops) with per-host limits and keepalive.
+    Clients plug into it through ``pool.transport``.
     """
-    
-    def __init__(self):
-        """Initialize connection pool."""
-        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def __init__(
+        self,
+        host_limits: Optional[Dict[str, HostLimits]] = None,
+        http2: Optional[bool] = None,
+        trust_env: bool = True
+    ):
+        """
+        Initialize connection pool.
+
+        Args:
+            host_limits: Per-host overrides of DEFAULT_HOST_LIMITS
+            http2: Enable HTTP/2 (defaults to settings.http2_enabled; requires ``h2``)
+            trust_env: Honour HTTP(S)_PROXY / ALL_PROXY / NO_PROXY, like httpx.AsyncClient
+                (clients given an explicit transport no longer apply them themselves)
+        """
+        if http2 is None:
+            try:
+                from ..config.settings import settings
+                http2 = settings.http2_enabled
+            except Exception:
+                http2 = True
+        if http2 and not HTTP2_AVAILABLE:
+            logger.debug("HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+        self.http2 = bool(http2 and HTTP2_AVAILABLE)
+        self.host_limits: Dict[str, HostLimits] = dict(DEFAULT_HOST_LIMITS)
+        self.host_limits.update(host_limits or {})
+
         self.stats = ConnectionPoolStats()
+        self.host_stats: Dict[str, HostStats] = {}
+        self.transport = PooledTransport(self)
+        # Snapshot of <scheme>_proxy / all_proxy / no_proxy (stdlib parsing, as urllib does)
+        self._proxies: Dict[str, str] = urllib.request.getproxies_environment() if trust_env else {}
+
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, httpx.AsyncHTTPTransport]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._clients: Dict[str, httpx.AsyncClient] = {}
         self._client_configs: Dict[str, Dict] = {}
-    
+        self._lock = threading.Lock()
+
+    def configure_host(self, host: str, limits: HostLimits) -> None:
+        """Set limits for a host (applies to connections opened afterwards)."""
+        self.host_limits[host] = limits
+
+    def limits_for(self, host: str) -> HostLimits:
+        return self.host_limits.get(host) or HostLimits()
+
+    def proxy_for(self, url: httpx.URL) -> Optional[str]:
+        """Environment proxy for a URL (None: direct connection)."""
+        proxy = self._proxies.get(url.scheme) or self._proxies.get("all")
+        if not proxy or urllib.request.proxy_bypass_environment(url.host, self._proxies):
+            return None
+        return proxy if "://" in proxy else f"http://{proxy}"
+
+    def _transport_for(self, url: httpx.URL) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        origin = (url.scheme, url.host, url.port)
+        with self._lock:
+            transports = self._transports.setdefault(loop, {})
+            transport = transports.get(origin)
+            if transport is None:
+                limits = self.limits_for(url.host)
+                transport = httpx.AsyncHTTPTransport(
+                    limits=limits.to_httpx(),
+                    http2=self.http2 and limits.http2,
+                    proxy=self.proxy_for(url)
+                )
+                transports[origin] = transport
+            return transport
+
+    async def handle_async_request(
+        self,
+        request: httpx.Request,
+        prewarm: bool = False
+    ) -> httpx.Response:
+        """Send a request on a pooled connection and record connection metrics."""
+        transport = self._transport_for(request.url)
+        trace = _RequestTrace(request.extensions.get("trace"))
+        request.extensions["trace"] = trace
+        response = None
+        try:
+            response = await transport.handle_async_request(request)
+            return response
+        finally:
+            self._record(request.url, trace, response, prewarm)
+
+    def _record(
+        self,
+        url: httpx.URL,
+        trace: _RequestTrace,
+        response: Optional[httpx.Response],
+        prewarm: bool
+    ) -> None:
+        with self._lock:
+            stats = self.stats
+            host = self.host_stats.setdefault(url.host, HostStats())
+            if trace.connected:
+                stats.connections_created += 1
+                stats.handshake_time_ms += trace.handshake_ms
+                host.connections_created += 1
+                host.handshake_time_ms += trace.handshake_ms
+            if prewarm:
+                stats.connections_prewarmed += int(trace.connected)
+                return
+            if response is None:
+                return
+
+            stats.total_requests += 1
+            host.requests += 1
+            if response.extensions.get("http_version") == b"HTTP/2":
+                stats.http2_requests += 1
+                host.http2_requests += 1
+            if not trace.connected:
+                stats.connections_reused += 1
+                host.connections_reused += 1
+                stats.dns_lookups_saved += 1
+                if url.scheme == "https":
+                    stats.tls_handshakes_saved += 1
+                stats.network_overhead_reduction_ms += host.avg_handshake_ms
+
+    async def prewarm(self, urls: Iterable[str], timeout: float = 5.0) -> int:
+        """
+        Open a connection to each origin ahead of the first real request.
+
+        Args:
+            urls: Provider URLs (only scheme/host/port are used)
+            timeout: Per-origin connect timeout in seconds
+
+        Returns:
+            Number of origins with a ready connection
+        """
+        origins = []
+        for url in urls:
+            parts = urlsplit(url)
+            if parts.scheme and parts.netloc:
+                origin = f"{parts.scheme}://{parts.netloc}/"
+                if origin not in origins:
+                    origins.append(origin)
+
+        results = await asyncio.gather(
+            *(self._prewarm_origin(origin, timeout) for origin in origins),
+            return_exceptions=True
+        )
+        warmed = sum(1 for result in results if result is True)
+        if origins:
+            logger.debug(f"Pre-warmed {warmed}/{len(origins)} provider connections")
+        return warmed
+
+    async def _prewarm_origin(self, origin: str, timeout: float) -> bool:
+        request = httpx.Request("HEAD", origin, extensions={"timeout": httpx.Timeout(timeout).as_dict()})
+        try:
+            response = await self.handle_async_request(request, prewarm=True)
+            # Drain to completion, otherwise the connection is not returned to the pool
+            await response.aread()
+            await response.aclose()
+            return True
+        except httpx.HTTPError as e:
+            logger.debug(f"Pre-warming {origin} failed: {e}")
+            return False
+
     def get_client(
         self,
         provider: str,
@@ -48,43 +312,37 @@ class ConnectionPool:
     ) -> httpx.AsyncClient:
         """
         Get or create a persistent HTTP client for a provider.
-        
+
         Args:
             provider: Provider name (e.g., "deepseek", "gemini")
             base_url: Base URL for the API
             headers: Default headers
             timeout: Request timeout
-            limits: Connection limits (max_connections, max_keepalive_connections)
-            
+            limits: Connection limits for the base_url host (overrides the host defaults)
+
         Returns:
-            httpx.AsyncClient instance (reused if exists)
+            httpx.AsyncClient instance (reused if exists), sending through the pool
         """
-        # Check if client already exists
         if provider in self._clients:
-            self.stats.connections_reused += 1
-            self.stats.total_requests += 1
-            self._update_stats()
-            logger.debug(f"Reusing connection for {provider}")
+            logger.debug(f"Reusing client for {provider}")
             return self._clients[provider]
-        
-        # Create new client with connection pooling
-        if limits is None:
-            # Default: allow up to 100 connections, keep 20 alive
-            limits = httpx.Limits(
-                max_connections=100,
-                max_keepalive_connections=20,
-                keepalive_expiry=30.0  # Keep connections alive for 30s
-            )
-        
+
+        if limits is not None:
+            host = urlsplit(base_url).hostname or ""
+            self.configure_host(host, HostLimits(
+                max_connections=limits.max_connections or HostLimits.max_connections,
+                max_keepalive_connections=limits.max_keepalive_connections or HostLimits.max_keepalive_connections,
+                keepalive_expiry=limits.keepalive_expiry or HostLimits.keepalive_expiry,
+                http2=self.limits_for(host).http2
+            ))
+
         client = httpx.AsyncClient(
             base_url=base_url,
             timeout=timeout,
             headers=headers,
-            limits=limits,
-            # Enable HTTP/2 if supported (reduces overhead)
-            http2=True
+            transport=self.transport
         )
-        
+
         self._clients[provider] = client
         self._client_configs[provider] = {
             "base_url": base_url,
@@ -92,83 +350,124 @@ class ConnectionPool:
             "timeout": timeout,
             "limits": limits
         }
-        
-        self.stats.connections_created += 1
-        self.stats.total_requests += 1
-        
-        # Estimate overhead saved (DNS + TCP + TLS)
-        # Typical values: DNS ~50ms, TCP ~100ms, TLS ~200ms = ~350ms saved per reuse
-        self.stats.dns_lookups_saved += 1
-        self.stats.tls_handshakes_saved += 1
-        self.stats.network_overhead_reduction_ms += 350.0  # Estimated per reuse
-        
-        self._update_stats()
-        logger.info(f"Created new persistent connection for {provider}")
-        
+        logger.info(f"Created pooled client for {provider}")
         return client
-    
+
     def close_client(self, provider: str) -> None:
-        """Close a specific client."""
+        """Forget a provider client (its connections stay in the shared pool)."""
         if provider in self._clients:
-            # Note: httpx clients should be closed with aclose() in async context
-            # This is a sync method, so we just remove from dict
-            # Actual closing should be done with close_all()
             del self._clients[provider]
+            self._client_configs.pop(provider, None)
             logger.info(f"Removed client for {provider}")
-    
+
     async def close_all(self) -> None:
-        """Close all clients."""
+        """Close all clients and pooled connections of the running event loop."""
         for provider, client in self._clients.items():
             try:
                 await client.aclose()
-                logger.debug(f"Closed connection for {provider}")
             except Exception as e:
-                logger.error(f"Error closing connection for {provider}: {e}")
-        
+                logger.error(f"Error closing client for {provider}: {e}")
         self._clients.clear()
         self._client_configs.clear()
+
+        with self._lock:
+            transports = self._transports.pop(asyncio.get_running_loop(), {})
+            # Connections bound to other (finished) loops cannot be awaited here
+            self._transports.clear()
+        for origin, transport in transports.items():
+            try:
+                await transport.aclose()
+                logger.debug(f"Closed connections for {origin[1]}")
+            except Exception as e:
+                logger.error(f"Error closing connections for {origin[1]}: {e}")
         logger.info("All connections closed")
-    
+
     def _update_stats(self) -> None:
         """Update connection reuse rate."""
         if self.stats.total_requests > 0:
             self.stats.connection_reuse_rate = (
                 self.stats.connections_reused / self.stats.total_requests
             ) * 100
-    
+
     def get_stats(self) -> ConnectionPoolStats:
         """Get connection pool statistics."""
         self._update_stats()
         return self.stats
-    
-    def get_summary(self) -> Dict[str, any]:
+
+    def _open_connections(self) -> int:
+        with self._lock:
+            transports = [t for per_loop in self._transports.values() for t in per_loop.values()]
+        # httpcore pool internals: count nothing rather than fail if their layout changes
+        return sum(len(getattr(getattr(t, "_pool", None), "connections", ())) for t in transports)
+
+    def get_summary(self) -> Dict[str, Any]:
         """Get summary of connection pool state."""
         self._update_stats()
-        
+        avg_handshake = (
+            self.stats.handshake_time_ms / self.stats.connections_created
+            if self.stats.connections_created else 0.0
+        )
+
         return {
-            "active_connections": len(self._clients),
+            "active_connections": self._open_connections(),
             "providers": list(self._clients.keys()),
+            "http2_enabled": self.http2,
             "total_requests": self.stats.total_requests,
             "connections_reused": self.stats.connections_reused,
             "connections_created": self.stats.connections_created,
+            "connections_prewarmed": self.stats.connections_prewarmed,
             "connection_reuse_rate": self.stats.connection_reuse_rate,
+            "http2_requests": self.stats.http2_requests,
             "dns_lookups_saved": self.stats.dns_lookups_saved,
             "tls_handshakes_saved": self.stats.tls_handshakes_saved,
-            "network_overhead_reduction_ms": self.stats.network_overhead_reduction_ms,
-            "estimated_time_saved_seconds": self.stats.network_overhead_reduction_ms / 1000
+            "avg_handshake_ms": round(avg_handshake, 2),
+            "network_overhead_reduction_ms": round(self.stats.network_overhead_reduction_ms, 2),
+            "estimated_time_saved_seconds": self.stats.network_overhead_reduction_ms / 1000,
+            "hosts": {
+                host: {
+                    "requests": stats.requests,
+                    "connections_created": stats.connections_created,
+                    "connections_reused": stats.connections_reused,
+                    "http2_requests": stats.http2_requests,
+                    "avg_handshake_ms": round(stats.avg_handshake_ms, 2),
+                }
+                for host, stats in list(self.host_stats.items())
+            },
         }
 
 
+def configured_provider_urls() -> List[str]:
+    """API URLs of the providers that have credentials configured."""
+    from ..config.settings import settings
+
+    candidates = [
+        (settings.deepseek_api_key, settings.deepseek_api_url),
+        (settings.groq_api_key, settings.groq_api_url),
+        (settings.mistral_api_key, settings.mistral_api_url),
+        (settings.google_api_key, settings.gemini_api_url),
+        (settings.anthropic_api_key, "https://api.anthropic.com/v1/messages"),
+        (settings.mimo_api_key, settings.mimo_api_url),
+    ]
+    return [url for key, url in candidates if key and url]
+
+
 # Global connection pool instance
 _global_pool: Optional[ConnectionPool] = None
+_global_pool_lock = threading.Lock()
 
 
 def get_global_pool() -> ConnectionPool:
     """Get or create global connection pool."""
     global _global_pool
-    if _global_pool is None:
-        _global_pool = ConnectionPool()
-    return _global_pool
+    with _global_pool_lock:
+        if _global_pool is None:
+            _global_pool = ConnectionPool()
+        return _global_pool
+
+
+async def prewarm_providers(timeout: float = 5.0) -> int:
+    """Pre-warm global pool connections to every configured provider."""
+    return await get_global_pool().prewarm(configured_provider_urls(), timeout=timeout)
 
 
 async def close_global_pool() -> None:
@@ -0,0 +1,464 @@
+"""
+Adaptive per-provider rate limiting.
+
+Every LLM client sends its HTTP traffic through a RateLimitedTransport, so all
+callers in the process (AgentRouter, ProviderFallbackCascade, Sullivan and the
+Stenciler routes) share one limiter per provider:
+
+- Requests/min and tokens/min are modelled as token buckets
+- Concurrency follows AIMD: halved on 429, grown by ~1 per window of successes
+- Retry-After and x-ratelimit-* headers pause the provider until its quota resets
+  and resynchronize the buckets with what the server reports
+"""
+import asyncio
+import json
+import re
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+from .connection_pool import get_global_pool
+
+
+@dataclass
+class ProviderQuota:
+    """Initial quota of a provider (refined at runtime from response headers)."""
+    requests_per_minute: float = 60.0
+    tokens_per_minute: float = 1_000_000.0
+    max_concurrency: int = 5
+
+
+# Published free/entry tier limits; x-ratelimit-* headers take over once seen
+DEFAULT_QUOTAS: Dict[str, ProviderQuota] = {
+    "deepseek": ProviderQuota(requests_per_minute=600, tokens_per_minute=2_000_000, max_concurrency=5),
+    "groq": ProviderQuota(requests_per_minute=30, tokens_per_minute=12_000, max_concurrency=10),
+    "gemini": ProviderQuota(requests_per_minute=60, tokens_per_minute=1_000_000, max_concurrency=10),
+    "codestral": ProviderQuota(requests_per_minute=60, tokens_per_minute=500_000, max_concurrency=5),
+    "mistral": ProviderQuota(requests_per_minute=60, tokens_per_minute=500_000, max_concurrency=5),
+    "claude": ProviderQuota(requests_per_minute=50, tokens_per_minute=40_000, max_concurrency=5),
+    "ollama": ProviderQuota(requests_per_minute=6000, tokens_per_minute=100_000_000, max_concurrency=2),
+}
+
+# Seconds to pause after a 429 without Retry-After (doubled on each consecutive 429)
+DEFAULT_COOLDOWN = 1.0
+MAX_COOLDOWN = 60.0
+# Minimum interval between two multiplicative decreases (one burst of 429 = one decrease)
+DECREASE_INTERVAL = 1.0
+# Polling interval while waiting for a concurrency slot
+SLOT_POLL_INTERVAL = 0.05
+
+# Header names: OpenAI-compatible providers (Groq, DeepSeek, Mistral) and Anthropic
+_REMAINING_REQUESTS = ("x-ratelimit-remaining-requests", "anthropic-ratelimit-requests-remaining")
+_RESET_REQUESTS = ("x-ratelimit-reset-requests", "anthropic-ratelimit-requests-reset")
+_LIMIT_TOKENS = ("x-ratelimit-limit-tokens", "anthropic-ratelimit-tokens-limit")
+_REMAINING_TOKENS = ("x-ratelimit-remaining-tokens", "anthropic-ratelimit-tokens-remaining")
+_RESET_TOKENS = ("x-ratelimit-reset-tokens", "anthropic-ratelimit-tokens-reset")
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_reset(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Parse a reset/retry header into a number of seconds from now.
+
+    Accepts plain seconds ("12"), Go-style durations ("1m30.5s", "250ms"),
+    HTTP dates (Retry-After) and RFC 3339 timestamps (Anthropic).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(n + u for n, u in parts) == value:
+        scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+        return sum(float(n) * scale[u] for n, u in parts)
+
+    when: Optional[datetime] = None
+    try:
+        when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    wall = time.time() if now is None else now
+    return max(when.timestamp() - wall, 0.0)
+
+
+def _first_header(headers: httpx.Headers, names) -> Optional[str]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def _as_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``per_minute`` units per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self._updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        elapsed = max(now - self._updated, 0.0)
+        self.available = min(self.capacity, self.available + elapsed * self.capacity / 60.0)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they already are)."""
+        self.refill(now)
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) * 60.0 / self.capacity
+
+    def consume(self, amount: float) -> None:
+        self.available -= min(amount, self.capacity)
+
+    def refund(self, amount: float, now: float) -> None:
+        """Give back units that were reserved but not used."""
+        self.refill(now)
+        self.available = min(self.available + amount, self.capacity)
+
+    def set_rate(self, per_minute: float, now: float) -> None:
+        self.refill(now)
+        self.capacity = float(per_minute)
+        self.available = min(self.available, self.capacity)
+
+    def sync(self, remaining: float, now: float) -> None:
+        """Never assume more units than the server reports as remaining."""
+        self.refill(now)
+        self.available = min(self.available, remaining)
+
+
+@dataclass
+class RateLimiterStats:
+    """Per-provider limiter statistics."""
+    requests: int = 0
+    throttled: int = 0
+    wait_time_ms: float = 0.0
+    rate_limited: int = 0
+    concurrency_decreases: int = 0
+
+
+class ProviderRateLimiter:
+    """
+    Rate limiter of one provider.
+
+    State is guarded by a threading lock and waiting is done by polling with
+    asyncio.sleep, so the limiter can be shared by clients living on different
+    event loops (FastAPI worker threads, asyncio.run in scripts).
+    """
+
+    def __init__(self, provider: str, quota: Optional[ProviderQuota] = None):
+        """
+        Initialize limiter.
+
+        Args:
+            provider: Provider name
+            quota: Initial quota (defaults to DEFAULT_QUOTAS / ProviderQuota())
+        """
+        quota = quota or DEFAULT_QUOTAS.get(provider, ProviderQuota())
+        self.provider = provider
+        self.max_concurrency = max(int(quota.max_concurrency), 1)
+        self.requests = TokenBucket(quota.requests_per_minute)
+        self.tokens = TokenBucket(quota.tokens_per_minute)
+        self.stats = RateLimiterStats()
+
+        self._lock = threading.Lock()
+        self._limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._cooldown_until = 0.0
+        self._consecutive_429 = 0
+        self._last_decrease = 0.0
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Current adaptive concurrency limit."""
+        return max(int(self._limit), 1)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def cooldown_remaining(self) -> float:
+        """Seconds before the provider accepts requests again (0 if not paused)."""
+        return max(self._cooldown_until - time.monotonic(), 0.0)
+
+    def _try_acquire(self, tokens: float, now: float) -> float:
+        if now < self._cooldown_until:
+            return self._cooldown_until - now
+        if self._in_flight >= self.concurrency_limit:
+            return SLOT_POLL_INTERVAL
+        wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+        if wait > 0:
+            return wait
+        self.requests.consume(1)
+        self.tokens.consume(tokens)
+        self._in_flight += 1
+        return 0.0
+
+    async def acquire(self, tokens: float = 0) -> None:
+        """
+        Wait for a request slot.
+
+        Args:
+            tokens: Estimated tokens (prompt + completion) of the request
+        """
+        started = time.monotonic()
+        waited = False
+        while True:
+            with self._lock:
+                wait = self._try_acquire(tokens, time.monotonic())
+            if wait <= 0:
+                break
+            if not waited:
+                waited = True
+                logger.debug(f"Rate limiter [{self.provider}]: waiting {wait:.2f}s for quota")
+            await asyncio.sleep(wait)
+
+        with self._lock:
+            self.stats.requests += 1
+            if waited:
+                self.stats.throttled += 1
+                self.stats.wait_time_ms += (time.monotonic() - started) * 1000
+
+    def release(self, unused_tokens: float = 0) -> None:
+        """
+        Free the slot taken by acquire().
+
+        Args:
+            unused_tokens: Part of the acquired tokens to give back (completion reservation)
+        """
+        with self._lock:
+            self._in_flight = max(self._in_flight - 1, 0)
+            if unused_tokens > 0:
+                self.tokens.refund(unused_tokens, time.monotonic())
+
+    def observe(self, status_code: int, headers: httpx.Headers) -> None:
+        """
+        Adapt limits from a provider response.
+
+        Args:
+            status_code: HTTP status code
+            headers: Response headers
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._sync_from_headers(headers, now)
+            if status_code == 429:
+                self._on_rate_limited(headers, now)
+            elif status_code < 400:
+                self._consecutive_429 = 0
+                # Additive increase: +1 after a full window of successful requests
+                self._limit = min(self._limit + 1.0 / self._limit, float(self.max_concurrency))
+
+    def _on_rate_limited(self, headers: httpx.Headers, now: float) -> None:
+        self.stats.rate_limited += 1
+        self._consecutive_429 += 1
+        if now - self._last_decrease >= DECREASE_INTERVAL:
+            self._limit = max(self._limit / 2.0, 1.0)
+            self._last_decrease = now
+            self.stats.concurrency_decreases += 1
+
+        retry_after = parse_reset(headers.get("retry-after"))
+        if retry_after is None:
+            retry_after = min(DEFAULT_COOLDOWN * 2 ** (self._consecutive_429 - 1), MAX_COOLDOWN)
+        self._cooldown_until = max(self._cooldown_until, now + retry_after)
+        logger.warning(
+            f"Rate limiter [{self.provider}]: 429, pausing {retry_after:.1f}s, "
+            f"concurrency limit {self.concurrency_limit}"
+        )
+
+    def _sync_from_headers(self, headers: httpx.Headers, now: float) -> None:
+        limit_tokens = _as_float(_first_header(headers, _LIMIT_TOKENS))
+        if limit_tokens and limit_tokens != self.tokens.capacity:
+            self.tokens.set_rate(limit_tokens, now)
+
+        for bucket, remaining_names, reset_names in (
+            (self.requests, _REMAINING_REQUESTS, _RESET_REQUESTS),
+            (self.tokens, _REMAINING_TOKENS, _RESET_TOKENS),
+        ):
+            remaining = _as_float(_first_header(headers, remaining_names))
+            if remaining is None:
+                continue
+            bucket.sync(remaining, now)
+            if remaining <= 0:
+                reset = parse_reset(_first_header(headers, reset_names))
+                if reset:
+                    self._cooldown_until = max(self._cooldown_until, now + min(reset, MAX_COOLDOWN))
+
+    def get_stats(self) -> Dict[str, float]:
+        """Limiter state and counters."""
+        return {
+            "concurrency_limit": self.concurrency_limit,
+            "in_flight": self._in_flight,
+            "requests_available": round(self.requests.available, 1),
+            "tokens_available": round(self.tokens.available),
+            "cooldown_remaining_s": round(self.cooldown_remaining(), 2),
+            "requests": self.stats.requests,
+            "throttled": self.stats.throttled,
+            "wait_time_ms": round(self.stats.wait_time_ms, 1),
+            "rate_limited": self.stats.rate_limited,
+        }
+
+
+def request_token_budget(request: httpx.Request) -> Tuple[int, int]:
+    """Rough token cost of a request: (prompt = body length / 4, requested completion budget)."""
+    try:
+        body = request.content
+    except httpx.RequestNotRead:
+        return 0, 0
+    if not body:
+        return 0, 0
+    prompt = len(body) // 4
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return prompt, 0
+    completion = 0
+    if isinstance(payload, dict):
+        generation = payload.get("generationConfig") or {}
+        max_tokens = (
+            payload.get("max_tokens")
+            or payload.get("max_completion_tokens")
+            or (generation.get("maxOutputTokens") if isinstance(generation, dict) else None)
+        )
+        if isinstance(max_tokens, int):
+            completion = max_tokens
+    return prompt, completion
+
+
+def estimate_request_tokens(request: httpx.Request) -> int:
+    """Rough token cost of a request: body length / 4 plus the requested completion budget."""
+    return sum(request_token_budget(request))
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that routes every request through a provider limiter."""
+
+    def __init__(
+        self,
+        limiter: ProviderRateLimiter,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.limiter = limiter
+        # Default: the process-wide pool, shared by every client
+        self._transport = transport or get_global_pool().transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        # max_tokens is only reserved while the request is in flight: most completions
+        # are far shorter, and x-ratelimit-remaining-tokens then reports the real usage
+        prompt, completion = request_token_budget(request)
+        await self.limiter.acquire(prompt + completion)
+        try:
+            response = await self._transport.handle_async_request(request)
+        finally:
+            self.limiter.release(unused_tokens=completion)
+        self.limiter.observe(response.status_code, response.headers)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class ConcurrencyLimits(Mapping):
+    """Live read-only view of the adaptive concurrency limit of each provider."""
+
+    def __init__(self, registry: "RateLimiterRegistry"):
+        self._registry = registry
+
+    def __getitem__(self, provider: str) -> int:
+        return self._registry.get(provider).concurrency_limit
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._registry.limiters))
+
+    def __len__(self) -> int:
+        return len(self._registry.limiters)
+
+
+class RateLimiterRegistry:
+    """Process-wide registry of provider limiters."""
+
+    def __init__(self, quotas: Optional[Dict[str, ProviderQuota]] = None):
+        self.quotas = dict(quotas) if quotas is not None else None
+        self.limiters: Dict[str, ProviderRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def _quota(self, provider: str) -> ProviderQuota:
+        if self.quotas is not None:
+            return self.quotas.get(provider, ProviderQuota())
+        quota = DEFAULT_QUOTAS.get(provider, ProviderQuota())
+        try:
+            from ..config.settings import settings
+            max_concurrency = getattr(settings, f"max_concurrent_requests_{provider}", None)
+        except Exception:
+            max_concurrency = None
+        if max_concurrency:
+            quota = ProviderQuota(quota.requests_per_minute, quota.tokens_per_minute, max_concurrency)
+        return quota
+
+    def get(self, provider: str) -> ProviderRateLimiter:
+        """Limiter of a provider (created on first use)."""
+        provider = provider.lower()
+        with self._lock:
+            limiter = self.limiters.get(provider)
+            if limiter is None:
+                limiter = ProviderRateLimiter(provider, self._quota(provider))
+                self.limiters[provider] = limiter
+            return limiter
+
+    def transport(
+        self,
+        provider: str,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> RateLimitedTransport:
+        """Transport for an httpx.AsyncClient talking to ``provider``."""
+        return RateLimitedTransport(self.get(provider), transport)
+
+    def concurrency_limits(self) -> ConcurrencyLimits:
+        return ConcurrencyLimits(self)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: limiter.get_stats() for name, limiter in list(self.limiters.items())}
+
+
+_registry = RateLimiterRegistry()
+
+
+def get_rate_limiter_registry() -> RateLimiterRegistry:
+    """Shared registry used by all clients of the process."""
+    return _registry
+
+
+def get_rate_limiter(provider: str) -> ProviderRateLimiter:
+    """Shared limiter of a provider."""
+    return _registry.get(provider)
+
+
+def rate_limited_transport(provider: str) -> RateLimitedTransport:
+    """Shared-limiter transport for a provider's httpx.AsyncClient (on the global connection pool)."""
+    return _registry.transport(provider)
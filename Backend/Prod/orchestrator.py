@@ -4,7 +4,7 @@ import json
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterable, Union
 from loguru import logger
 
 # #region agent log
@@ -17,15 +17,19 @@ def _dbg(hy: str, loc: str, msg: str, data: Optional[Dict] = None):
 from .models.plan_reader import PlanReader, Plan, Step, PlanValidationError
 from .models.deepseek_client import StepResult
 from .models.agent_router import AgentRouter
+from .models.dag_scheduler import DagScheduler
 from .models.metrics import MetricsCollector
 from .models.claude_validator import ClaudeCodeValidator
 from .models.execution_monitor import ExecutionMonitor
 from .config.settings import settings
-from .rag import PageIndexRetriever
+from .rag import LazyRetriever
 from .core.surgical_editor import SurgicalEditor
 from .core.plan_status import update_plan_status
 from .claude_helper import split_structure_and_code
 from .core.apply_engine import ApplyEngine
+from .core.file_locks import FileLockManager
+from .network.connection_pool import get_global_pool, prewarm_providers
+from .network.rate_limiter import get_rate_limiter_registry
 from .ui.hybrid_loader import HybridLoader, Phase, StepStatus
 
 
@@ -121,32 +125,23 @@ class Orchestrator:
         self.enable_hybrid_loader = enable_hybrid_loader
         self.hybrid_loader: Optional[HybridLoader] = None
 
-        # Rate limiting: semaphores per provider to limit concurrent requests
-        # Limits: DeepSeek=5, Groq=10, Gemini=10, Codestral=5
-        self._provider_semaphores = {
-            "deepseek": asyncio.Semaphore(5),
-            "groq": asyncio.Semaphore(10),
-            "gemini": asyncio.Semaphore(10),
-            "codestral": asyncio.Semaphore(5)
-        }
-        
-        # Initialize RAG system
+        # Rate limiting is done per provider by the shared limiters wired into
+        # each client's HTTP transport (network/rate_limiter.py)
+        self._prewarm_task: Optional[asyncio.Task] = None
+
+        # RAG system: built lazily (LlamaIndex import + index load take seconds),
+        # warmed in a background thread so the first plan rarely waits for it
         self.rag_enabled = rag_enabled
         if self.rag_enabled:
-            try:
-                self.rag = PageIndexRetriever(use_embeddings=False)
-                if self.rag.enabled:
-                    logger.info("RAG system initialized for context enrichment")
-                else:
-                    logger.warning("RAG system disabled (LlamaIndex not available)")
-                    self.rag_enabled = False
-            except Exception as e:
-                logger.warning(f"Failed to initialize RAG system: {e}")
-                self.rag_enabled = False
+            self.rag = LazyRetriever(use_embeddings=False)
+            if settings.rag_background_warmup:
+                self.rag.warm_up()
         else:
             self.rag = None
         
         self.apply_engine = ApplyEngine(project_root=Path(__file__).parent.parent.parent)
+        # Per-file locks: steps sharing a file generate in parallel, only their writes serialize
+        self.file_locks = FileLockManager(project_root=self.apply_engine.project_root)
     
     async def execute_plan(
         self,
@@ -154,7 +149,8 @@ class Orchestrator:
         output_dir: Optional[Path] = None,
         context: Optional[str] = None,
         use_streaming: bool = False,
-        execution_mode: Optional[str] = None
+        execution_mode: Optional[str] = None,
+        plan_stream: Optional[AsyncIterable[Union[bytes, str]]] = None
     ) -> Dict[str, Any]:
         """
         Execute a plan from a JSON file.
@@ -165,6 +161,8 @@ class Orchestrator:
             context: Additional context for all steps
             use_streaming: If True, use streaming mode to start execution as soon as steps are available
             execution_mode: Execution mode (FAST, BUILD, DOUBLE-CHECK). Overrides instance default.
+            plan_stream: Async stream of plan JSON chunks from the planner (implies streaming
+                mode; plan_path is then only used as fallback for the final plan)
             
         Returns:
             Dictionary with execution results and metrics
@@ -176,9 +174,13 @@ class Orchestrator:
         if execution_mode:
             self.execution_mode = execution_mode.upper()
             self.agent_router.execution_mode = self.execution_mode
+
+        # Open provider connections while the plan is read and RAG runs
+        if settings.connection_prewarm and self._prewarm_task is None:
+            self._prewarm_task = asyncio.create_task(prewarm_providers())
         
-        if use_streaming:
-            return await self._execute_plan_streaming(plan_path, output_dir, context)
+        if use_streaming or plan_stream is not None:
+            return await self._execute_plan_streaming(plan_path, output_dir, context, plan_stream)
         
         # Read and validate plan
         try:
@@ -197,7 +199,7 @@ class Orchestrator:
         
         # Enrich context with RAG if enabled
         enriched_context = context
-        if self.rag_enabled and self.rag and self.rag.enabled:
+        if self.rag_enabled and self.rag:
             try:
                 rag_query = f"{plan.description}. {context or ''}"
                 rag_results = await self.rag.retrieve(rag_query, history=[], top_k=3)
@@ -221,38 +223,15 @@ class Orchestrator:
             self.monitor.add_step(step.id, step.description, step.type, step.complexity)
         self.monitor.start_monitoring()
         
-        # Get execution order (respecting dependencies)
-        execution_order = plan.get_execution_order()
-        
-        logger.info(f"Execution order: {len(execution_order)} batches")
-        
         # Execute steps in order
         results: Dict[str, StepResult] = {}
         
         try:
-            for batch_idx, batch in enumerate(execution_order, 1):
-                logger.info(f"Executing batch {batch_idx}/{len(execution_order)} ({len(batch)} steps)")
-                update_plan_status(
-                    batch_index=batch_idx,
-                    current_step_ids=[s.id for s in batch],
-                    completed_steps=list(results.keys()),
-                    total_steps=len(plan.steps),
-                    total_batches=len(execution_order),
-                )
-                # #region agent log
-                t_batch = time.time(); _dbg("D", "orchestrator:batch", "batch start", {"batch_idx": batch_idx, "n_batches": len(execution_order), "n_steps": len(batch), "step_ids": [s.id for s in batch]})
-                # #endregion
-                # Execute steps in batch (parallelized if multiple steps)
-                if len(batch) > 1:
-                    # Parallel execution for multiple independent steps
-                    await self._execute_batch_parallel(batch, enriched_context, results)
-                else:
-                    # Sequential execution for single step
-                    step = batch[0]
-                    await self._execute_step_with_monitoring(step, enriched_context, results)
-                # #region agent log
-                _dbg("D", "orchestrator:batch", "batch end", {"batch_idx": batch_idx, "duration_s": round(time.time() - t_batch, 2)})
-                # #endregion
+            if self.sequential_mode:
+                await self._execute_levels(plan, enriched_context, results)
+            else:
+                # Ready-queue scheduling: each step starts as soon as its own dependencies finish
+                await self._execute_dag(plan, enriched_context, results)
         
         finally:
             # Stop monitoring
@@ -292,20 +271,157 @@ class Orchestrator:
         plan_metrics = self.metrics.get_plan_metrics()
         
         # Get prompt cache stats
-        cache_stats = None
-        if self.agent_router.prompt_cache:
-            cache_stats = self.agent_router.prompt_cache.get_cache_summary()
+        cache_stats = self.agent_router.get_cache_stats()
         
         return {
             "plan": plan,
             "results": results,
             "metrics": plan_metrics,
             "success": plan_metrics.success_rate == 1.0,
-            "rag_enabled": self.rag_enabled,
+            "rag_enabled": bool(self.rag_enabled and self.rag and self.rag.enabled),
             "rag_references": rag_references if self.rag_enabled else [],
-            "prompt_cache_stats": cache_stats
+            "rag_timings": dict(self.rag.timings) if self.rag else {},
+            "prompt_cache_stats": cache_stats,
+            "connection_pool": get_global_pool().get_summary()
         }
     
+    async def _execute_levels(
+        self,
+        plan: Plan,
+        context: Optional[str],
+        results: Dict[str, StepResult]
+    ) -> None:
+        """
+        Execute a plan level by level (barrier between dependency levels).
+
+        Used in sequential mode, where steps run one at a time anyway.
+
+        Args:
+            plan: Plan to execute
+            context: Additional context for all steps
+            results: Dictionary to store step results
+        """
+        # Get execution order (respecting dependencies)
+        execution_order = plan.get_execution_order()
+        
+        logger.info(f"Execution order: {len(execution_order)} batches")
+        
+        for batch_idx, batch in enumerate(execution_order, 1):
+            logger.info(f"Executing batch {batch_idx}/{len(execution_order)} ({len(batch)} steps)")
+            update_plan_status(
+                batch_index=batch_idx,
+                current_step_ids=[s.id for s in batch],
+                completed_steps=list(results.keys()),
+                total_steps=len(plan.steps),
+                total_batches=len(execution_order),
+            )
+            # #region agent log
+            t_batch = time.time(); _dbg("D", "orchestrator:batch", "batch start", {"batch_idx": batch_idx, "n_batches": len(execution_order), "n_steps": len(batch), "step_ids": [s.id for s in batch]})
+            # #endregion
+            # Execute steps in batch (parallelized if multiple steps)
+            if len(batch) > 1:
+                # Parallel execution for multiple independent steps
+                await self._execute_batch_parallel(batch, context, results)
+            else:
+                # Sequential execution for single step
+                step = batch[0]
+                await self._execute_step_with_monitoring(step, context, results)
+            # #region agent log
+            _dbg("D", "orchestrator:batch", "batch end", {"batch_idx": batch_idx, "duration_s": round(time.time() - t_batch, 2)})
+            # #endregion
+
+    async def _execute_dag(
+        self,
+        plan: Plan,
+        context: Optional[str],
+        results: Dict[str, StepResult]
+    ) -> None:
+        """
+        Execute a plan with the critical-path DAG scheduler.
+
+        Steps start the instant their own dependencies finish, longest remaining
+        critical path first (estimated tokens), within per-provider concurrency
+        limits. Steps targeting the same file still generate concurrently; their
+        ApplyEngine writes are serialized by self.file_locks.
+
+        Args:
+            plan: Plan to execute
+            context: Additional context for all steps
+            results: Dictionary to store step results
+        """
+        context_router = self.agent_router.context_router
+
+        def estimate_cost(step: Step) -> float:
+            if context_router:
+                return float(context_router.estimate_tokens(step))
+            return float(step.estimated_tokens or 1)
+
+        def on_step_done(step: Step, outcome: Any) -> None:
+            if isinstance(outcome, Exception):
+                self._record_step_exception(step, outcome, results)
+            elif outcome.success:
+                logger.info(f"✓ Step {step.id} completed successfully")
+            else:
+                logger.error(f"✗ Step {step.id} failed: {outcome.error}")
+            update_plan_status(
+                current_step_ids=sorted(scheduler.running_step_ids),
+                completed_steps=list(results.keys()),
+                total_steps=len(plan.steps),
+            )
+
+        scheduler = DagScheduler(
+            steps=plan.steps,
+            run_step=lambda step: self._execute_step_with_monitoring(step, context, results),
+            cost_fn=estimate_cost,
+            provider_fn=self.agent_router.select_provider_for_step,
+            provider_limits=get_rate_limiter_registry().concurrency_limits(),
+            on_step_done=on_step_done
+        )
+        logger.info(
+            f"DAG scheduling {len(plan.steps)} steps "
+            f"(critical path ≈ {max(scheduler.priorities.values(), default=0):.0f} tokens)"
+        )
+        await scheduler.run()
+        logger.info(
+            f"DAG scheduler done: max parallelism {scheduler.stats.max_parallelism}, "
+            f"{scheduler.stats.deferred_for_provider} provider deferrals, "
+            f"{self.file_locks.stats.contended} contended file writes"
+        )
+
+    def _step_target_files(self, step: Step) -> List[str]:
+        """Resolved paths of the files a step writes (step.context['files'])."""
+        if not step.context or not isinstance(step.context, dict):
+            return []
+        project_root = Path(__file__).parent.parent.parent
+        resolved = []
+        for file_path_str in step.context.get("files", []) or []:
+            file_path = Path(file_path_str)
+            if not file_path.is_absolute():
+                file_path = project_root / file_path
+            resolved.append(str(file_path.resolve()))
+        return resolved
+
+    def _record_step_exception(
+        self,
+        step: Step,
+        error: Exception,
+        results: Dict[str, StepResult]
+    ) -> None:
+        """Store a failed result for a step that raised outside the monitored path."""
+        failed_result = StepResult(
+            step_id=step.id,
+            success=False,
+            output="",
+            tokens_used=0,
+            input_tokens=0,
+            output_tokens=0,
+            execution_time_ms=0,
+            error=str(error)
+        )
+        results[step.id] = failed_result
+        self.metrics.record_step_result(step, failed_result)
+        self.monitor.complete_step(step.id, False, 0.0, 0, 0.0, str(error))
+
     async def _execute_batch_parallel(
             self,
             batch: List[Step],
@@ -315,123 +431,38 @@ class Orchestrator:
             """
             Execute multiple independent steps in parallel using asyncio.gather().
 
-            If sequential_mode is enabled, execute steps one by one with a pause between them.
-            If file conflicts are detected (same file targeted by multiple steps), force sequential execution.
+            If sequential_mode is enabled, execute steps one by one (provider quotas are
+            enforced by the shared rate limiters, no fixed pause is needed).
+            Steps targeting the same file still run in parallel: only their ApplyEngine
+            write phase is serialized, through the per-file locks in _execute_step.
 
             Args:
                 batch: List of steps to execute in parallel
                 context: Additional context for all steps
                 results: Dictionary to store step results
             """
-            # Check for file conflicts before execution
-            file_conflict_detected = False
-            conflict_details = []
-            original_sequential_mode = None
-            
             if len(batch) > 1 and not self.sequential_mode:
-                # Collect all target files from each step
-                all_target_files = {}
+                seen_files: Dict[str, str] = {}
                 for step in batch:
-                    if step.context and isinstance(step.context, dict):
-                        files = step.context.get('files', [])
-                        for file_path in files:
-                            # Normalize path for comparison
-                            normalized_path = str(Path(file_path).resolve())
-                            if normalized_path in all_target_files:
-                                # Conflict detected: same file targeted by multiple steps
-                                file_conflict_detected = True
-                                conflict_details.append({
-                                    'file': normalized_path,
-                                    'step1': all_target_files[normalized_path],
-                                    'step2': step.id
-                                })
-                            else:
-                                all_target_files[normalized_path] = step.id
-                
-                if file_conflict_detected:
-                    logger.warning(f"⚠️ File conflict detected in batch of {len(batch)} steps")
-                    for conflict in conflict_details:
-                        logger.warning(f"  File '{conflict['file']}' targeted by steps: {conflict['step1']}, {conflict['step2']}")
-                    logger.warning("🔄 Forcing sequential execution to avoid file corruption")
-                    
-                    # Temporarily enable sequential mode for this batch
-                    original_sequential_mode = self.sequential_mode
-                    self.sequential_mode = True
-                    
-                    try:
-                        # Execute steps sequentially
-                        step_results = []
-                        for i, step in enumerate(batch, 1):
-                            logger.info(f"📍 Step {i}/{len(batch)}: {step.id}")
-                            try:
-                                await self._execute_step_with_monitoring(step, context, results)
-                                step_results.append(None)  # Success (result already in dict)
-                            except Exception as e:
-                                logger.error(f"Step {step.id} failed: {e}")
-                                step_results.append(e)
-
-                            # Pause between steps to avoid rate limiting
-                            if i < len(batch):
-                                logger.info("⏸️  Pausing 2s before next step...")
-                                await asyncio.sleep(2)
-                        
-                        # Process results and handle errors
-                        for step, result in zip(batch, step_results):
-                            if isinstance(result, Exception):
-                                logger.error(f"Unexpected error executing step {step.id}: {result}")
-                                # Create failed result
-                                failed_result = StepResult(
-                                    step_id=step.id,
-                                    success=False,
-                                    output="",
-                                    tokens_used=0,
-                                    input_tokens=0,
-                                    output_tokens=0,
-                                    execution_time_ms=0,
-                                    error=str(result)
-                                )
-                                results[step.id] = failed_result
-                                self.metrics.record_step_result(step, failed_result)
-                                
-                                # Update monitor
-                                self.monitor.complete_step(
-                                    step.id,
-                                    False,
-                                    0.0,
-                                    0,
-                                    0.0,
-                                    str(result)
-                                )
-                            else:
-                                # Result is already stored in results dict by _execute_step_with_monitoring
-                                if result.success:
-                                    logger.info(f"✓ Step {step.id} completed successfully")
-                                else:
-                                    logger.error(f"✗ Step {step.id} failed: {result.error}")
-                        
-                        return  # Exit early, batch already handled
-                    finally:
-                        # Restore original sequential mode
-                        if original_sequential_mode is not None:
-                            self.sequential_mode = original_sequential_mode
+                    for file_path in self._step_target_files(step):
+                        if file_path in seen_files:
+                            logger.info(
+                                f"File '{file_path}' targeted by steps {seen_files[file_path]}, {step.id}: "
+                                f"writes will be serialized"
+                            )
+                        else:
+                            seen_files[file_path] = step.id
             
-            # Continue with normal execution (no conflicts or sequential mode already enabled)
             if self.sequential_mode:
                 logger.info(f"🔄 SEQUENTIAL MODE: Executing {len(batch)} steps ONE AT A TIME")
                 step_results = []
                 for i, step in enumerate(batch, 1):
                     logger.info(f"📍 Step {i}/{len(batch)}: {step.id}")
                     try:
-                        await self._execute_step_with_monitoring(step, context, results)
-                        step_results.append(None)  # Success (result already in dict)
+                        step_results.append(await self._execute_step_with_monitoring(step, context, results))
                     except Exception as e:
                         logger.error(f"Step {step.id} failed: {e}")
                         step_results.append(e)
-
-                    # Pause between steps to avoid rate limiting
-                    if i < len(batch):
-                        logger.info("⏸️  Pausing 2s before next step...")
-                        await asyncio.sleep(2)
             else:
                 logger.info(f"Executing {len(batch)} steps in parallel")
 
@@ -445,37 +476,11 @@ class Orchestrator:
                 # return_exceptions=True allows other steps to continue if one fails
                 step_results = await asyncio.gather(*tasks, return_exceptions=True)
 
-            # Restore original sequential mode if it was temporarily changed
-            if original_sequential_mode is not None:
-                self.sequential_mode = original_sequential_mode
-
             # Process results and handle errors
             for step, result in zip(batch, step_results):
                 if isinstance(result, Exception):
                     logger.error(f"Unexpected error executing step {step.id}: {result}")
-                    # Create failed result
-                    failed_result = StepResult(
-                        step_id=step.id,
-                        success=False,
-                        output="",
-                        tokens_used=0,
-                        input_tokens=0,
-                        output_tokens=0,
-                        execution_time_ms=0,
-                        error=str(result)
-                    )
-                    results[step.id] = failed_result
-                    self.metrics.record_step_result(step, failed_result)
-                    
-                    # Update monitor
-                    self.monitor.complete_step(
-                        step.id,
-                        False,
-                        0.0,
-                        0,
-                        0.0,
-                        str(result)
-                    )
+                    self._record_step_exception(step, result, results)
                 else:
                     # Result is already stored in results dict by _execute_step_with_monitoring
                     if result.success:
@@ -483,28 +488,6 @@ class Orchestrator:
                     else:
                         logger.error(f"✗ Step {step.id} failed: {result.error}")
 
-    async def _execute_step_with_rate_limit(
-        self,
-        step: Step,
-        context: Optional[str],
-        results: Dict[str, StepResult],
-        semaphore: asyncio.Semaphore
-    ) -> StepResult:
-        """
-        Execute a step with rate limiting via semaphore.
-        
-        Args:
-            step: Step to execute
-            context: Additional context
-            results: Dictionary to store results
-            semaphore: Semaphore for rate limiting
-            
-        Returns:
-            StepResult
-        """
-        async with semaphore:
-            return await self._execute_step_with_monitoring(step, context, results)
-    
     async def _execute_step_with_monitoring(
         self,
         step: Step,
@@ -1032,15 +1015,17 @@ Your reasoning will be used to guide the actual code generation step.
         if result.success and result.output and (step.type in ["refactoring", "code_generation"]):
             logger.info(f"Applying changes for step {step.id} via ApplyEngine")
             
-            apply_results = await asyncio.to_thread(
-                self.apply_engine.apply,
-                step_id=step.id,
-                output=result.output,
-                target_files=list(existing_files.keys()),
-                step_type=step.type,
-                surgical_mode=surgical_mode,
-                context=step.context
-            )
+            # Serialize writes per file: only steps touching the same files wait here
+            async with self.file_locks.acquire(existing_files.keys()):
+                apply_results = await asyncio.to_thread(
+                    self.apply_engine.apply,
+                    step_id=step.id,
+                    output=result.output,
+                    target_files=list(existing_files.keys()),
+                    step_type=step.type,
+                    surgical_mode=surgical_mode,
+                    context=step.context
+                )
             
             # Update result output with application summary
             summary = []
@@ -1162,7 +1147,8 @@ Please provide the corrected version.
         self,
         plan_path: Path,
         output_dir: Optional[Path],
-        context: Optional[str]
+        context: Optional[str],
+        plan_stream: Optional[AsyncIterable[Union[bytes, str]]] = None
     ) -> Dict[str, Any]:
         """
         Execute a plan using streaming mode - starts execution as soon as steps are available.
@@ -1175,6 +1161,7 @@ Please provide the corrected version.
             plan_path: Path to plan JSON file
             output_dir: Directory for output files
             context: Additional context for all steps
+            plan_stream: Async stream of plan chunks (instead of following plan_path)
             
         Returns:
             Dictionary with execution results and metrics
@@ -1193,6 +1180,7 @@ Please provide the corrected version.
         
         # Initialize metrics and monitor (will be updated as steps arrive)
         plan_stub = None
+        final_plan = None
         self.metrics = None
         self.monitor = None
         
@@ -1202,62 +1190,48 @@ Please provide the corrected version.
         
         try:
             # Stream steps as they become available
-            async for step in self.plan_reader.read_streaming(plan_path):
+            async for step in self.plan_reader.read_streaming(plan_path, stream=plan_stream):
                 logger.info(f"Received step via streaming: {step.id}")
                 
                 # Store step
                 all_steps[step.id] = step
                 step_dependencies[step.id] = step.dependencies.copy()
                 
-                # Update plan metadata if available
-                # Note: We'd need to read metadata separately, for now we'll infer from first step
+                # Plan metadata comes from the top-level fields parsed so far
+                # (the plan file may still be incomplete at this point)
                 if task_id is None:
-                    # Try to read full plan to get metadata (one-time read)
-                    try:
-                        temp_plan = self.plan_reader.read(plan_path)
-                        task_id = temp_plan.task_id
-                        plan_description = temp_plan.description
-                        
-                        # Initialize metrics and monitor now that we have plan info
-                        self.metrics = MetricsCollector(temp_plan)
-                        self.monitor = ExecutionMonitor(plan_description, len(temp_plan.steps))
-                        for existing_step in temp_plan.steps:
-                            self.monitor.add_step(
-                                existing_step.id,
-                                existing_step.description,
-                                existing_step.type,
-                                existing_step.complexity
-                            )
-                        self.monitor.start_monitoring()
-                        
-                        # Enrich context with RAG if enabled
-                        if self.rag_enabled and self.rag and self.rag.enabled:
-                            try:
-                                rag_query = f"{plan_description}. {context or ''}"
-                                rag_results = await self.rag.retrieve(rag_query, history=[], top_k=3)
-                                if rag_results:
-                                    rag_context_parts = []
-                                    for result in rag_results:
-                                        rag_context_parts.append(f"[{result['reference']}]\n{result['content'][:500]}")
-                                        rag_references.append(result['reference'])
-                                    rag_context = "\n\n".join(rag_context_parts)
-                                    enriched_context = f"Contexte projet (RAG):\n{rag_context}\n\n{context or ''}"
-                                    logger.info(f"Context enriched with RAG: {len(rag_results)} references")
-                            except Exception as e:
-                                logger.warning(f"RAG enrichment failed: {e}, using original context")
-                    except Exception as e:
-                        logger.warning(f"Could not read full plan for metadata: {e}")
-                        # Create stub plan for metrics
-                        from .models.plan_reader import Plan
-                        plan_stub = Plan({
-                            "task_id": "streaming_task",
-                            "description": "Streaming execution",
-                            "steps": [],
-                            "metadata": {}
-                        })
-                        self.metrics = MetricsCollector(plan_stub)
-                        self.monitor = ExecutionMonitor("Streaming execution", 0)
-                        self.monitor.start_monitoring()
+                    header = self.plan_reader.stream_header
+                    task_id = header.get("task_id", "streaming_task")
+                    plan_description = header.get("description", "Streaming execution")
+                    plan_stub = Plan({
+                        "task_id": task_id,
+                        "description": plan_description,
+                        "steps": [],
+                        "metadata": header.get("metadata", {})
+                    })
+                    self.metrics = MetricsCollector(plan_stub)
+                    self.monitor = ExecutionMonitor(plan_description, 0)
+                    self.monitor.start_monitoring()
+                    
+                    # Enrich context with RAG if enabled
+                    if self.rag_enabled and self.rag:
+                        try:
+                            rag_query = f"{plan_description}. {context or ''}"
+                            rag_results = await self.rag.retrieve(rag_query, history=[], top_k=3)
+                            if rag_results:
+                                rag_context_parts = []
+                                for result in rag_results:
+                                    rag_context_parts.append(f"[{result['reference']}]\n{result['content'][:500]}")
+                                    rag_references.append(result['reference'])
+                                rag_context = "\n\n".join(rag_context_parts)
+                                enriched_context = f"Contexte projet (RAG):\n{rag_context}\n\n{context or ''}"
+                                logger.info(f"Context enriched with RAG: {len(rag_results)} references")
+                        except Exception as e:
+                            logger.warning(f"RAG enrichment failed: {e}, using original context")
+                
+                # Steps are discovered one by one
+                self.monitor.add_step(step.id, step.description, step.type, step.complexity)
+                self.monitor.total_steps = len(all_steps)
                 
                 # Check if this step is ready to execute (no dependencies or all dependencies completed)
                 ready_to_execute = True
@@ -1304,7 +1278,6 @@ Please provide the corrected version.
             except Exception as e:
                 logger.warning(f"Could not read final plan: {e}")
                 # Create plan from collected steps
-                from .models.plan_reader import Plan
                 final_plan = Plan({
                     "task_id": task_id or "streaming_task",
                     "description": plan_description or "Streaming execution",
@@ -1363,18 +1336,18 @@ Please provide the corrected version.
         plan_metrics = self.metrics.get_plan_metrics() if self.metrics else None
         
         # Get prompt cache stats
-        cache_stats = None
-        if self.agent_router.prompt_cache:
-            cache_stats = self.agent_router.prompt_cache.get_cache_summary()
+        cache_stats = self.agent_router.get_cache_stats()
         
         return {
             "plan": final_plan,
             "results": results,
             "metrics": plan_metrics,
             "success": plan_metrics.success_rate == 1.0 if plan_metrics else False,
-            "rag_enabled": self.rag_enabled,
+            "rag_enabled": bool(self.rag_enabled and self.rag and self.rag.enabled),
             "rag_references": rag_references if self.rag_enabled else [],
-            "prompt_cache_stats": cache_stats
+            "rag_timings": dict(self.rag.timings) if self.rag else {},
+            "prompt_cache_stats": cache_stats,
+            "connection_pool": get_global_pool().get_summary()
         }
     
     async def _check_and_execute_ready_steps(
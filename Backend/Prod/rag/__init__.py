@@ -1,4 +1,16 @@
-"""RAG module for AETHERFLOW."""
-from .pageindex_store import PageIndexRetriever, PageIndexRAG
+"""RAG module for AETHERFLOW.
 
-__all__ = ["PageIndexRetriever", "PageIndexRAG"]
+PageIndexRetriever imports LlamaIndex, so it is only loaded on first access;
+BM25Retriever and LazyRetriever can be imported without paying that cost.
+"""
+from .bm25_retriever import BM25Retriever
+from .lazy_retriever import LazyRetriever
+
+__all__ = ["BM25Retriever", "LazyRetriever", "PageIndexRetriever", "PageIndexRAG"]
+
+
+def __getattr__(name):
+    if name in ("PageIndexRetriever", "PageIndexRAG"):
+        from . import pageindex_store
+        return getattr(pageindex_store, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,463 @@
+"""
+Zero-dependency lexical RAG engine.
+
+BM25 scoring over an inverted index built with the standard library only:
+- Markdown is chunked by headers (section path kept as "A > B > C")
+- Python is chunked with ast (module header, one chunk per top-level
+  function/class, large classes split per method)
+- The index is persisted in one binary file (JSON header + uint32 postings +
+  UTF-8 chunk texts) and memory-mapped at load, so opening it only parses the
+  header and queries read postings/texts straight from the page cache
+
+Offers the same retrieve()/get_index_stats() API as PageIndexRetriever.
+"""
+import ast
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from .documents import resolve_document_paths
+
+
+MAGIC = b"AFBM25\x00\x01"
+K1 = 1.5
+B = 0.75
+MAX_CHUNK_CHARS = 4000
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or that the this to was were will with "
+    "au aux ce ces dans de des du en est et il la le les leur ou par pas pour que qui sur un une".split()
+)
+
+_WORD = re.compile(r"\w+")
+_CAMEL_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+_MD_HEADER = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word tokens; identifiers also yield their snake/camel parts.
+
+    "PageIndexRetriever" -> ["pageindexretriever", "page", "index", "retriever"]
+    """
+    tokens = []
+    for word in _WORD.findall(text):
+        lower = word.lower()
+        if len(lower) > 1 and lower not in STOPWORDS:
+            tokens.append(lower)
+        if word.isascii():
+            parts = [p.lower() for piece in word.split("_") for p in _CAMEL_PART.findall(piece)]
+            if len(parts) > 1:
+                tokens.extend(p for p in parts if len(p) > 1 and p not in STOPWORDS)
+    return tokens
+
+
+@dataclass
+class Chunk:
+    """A retrievable piece of a document."""
+    section: str
+    text: str
+    start_line: int
+
+
+def _split_lines(section: str, lines: List[str], start_line: int) -> List[Chunk]:
+    """Group lines into chunks of at most MAX_CHUNK_CHARS."""
+    chunks = []
+    buffer: List[str] = []
+    size = 0
+    buffer_start = start_line
+    for offset, line in enumerate(lines):
+        if buffer and size + len(line) > MAX_CHUNK_CHARS:
+            chunks.append(Chunk(section, "\n".join(buffer), buffer_start))
+            buffer, size, buffer_start = [], 0, start_line + offset
+        buffer.append(line)
+        size += len(line) + 1
+    if "\n".join(buffer).strip():
+        chunks.append(Chunk(section, "\n".join(buffer), buffer_start))
+    return chunks
+
+
+def chunk_markdown(text: str) -> List[Chunk]:
+    """Split markdown on headers (outside code fences)."""
+    chunks: List[Chunk] = []
+    headers: List[Tuple[int, str]] = []
+    section = ""
+    lines: List[str] = []
+    start_line = 1
+    in_fence = False
+
+    for lineno, line in enumerate(text.splitlines(), 1):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else _MD_HEADER.match(line)
+        if match:
+            chunks.extend(_split_lines(section, lines, start_line))
+            level = len(match.group(1))
+            while headers and headers[-1][0] >= level:
+                headers.pop()
+            headers.append((level, match.group(2)))
+            section = " > ".join(title for _, title in headers)
+            lines, start_line = [], lineno
+        lines.append(line)
+    chunks.extend(_split_lines(section, lines, start_line))
+    return chunks
+
+
+def chunk_python(text: str) -> List[Chunk]:
+    """Split Python source on top-level definitions (falls back to line windows)."""
+    lines = text.splitlines()
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return _split_lines("", lines, 1)
+
+    def span(node) -> Tuple[int, int]:
+        start = min([d.lineno for d in getattr(node, "decorator_list", [])] + [node.lineno])
+        return start, node.end_lineno or node.lineno
+
+    definitions = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+    module_lines: List[str] = []
+    chunks: List[Chunk] = []
+    for node in tree.body:
+        start, end = span(node)
+        if not isinstance(node, definitions):
+            module_lines.extend(lines[start - 1:end])
+            continue
+        segment = lines[start - 1:end]
+        methods = [n for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+        if isinstance(node, ast.ClassDef) and methods and len("\n".join(segment)) > MAX_CHUNK_CHARS:
+            first_method_start = span(methods[0])[0]
+            chunks.extend(_split_lines(node.name, lines[start - 1:first_method_start - 1], start))
+            for method in methods:
+                m_start, m_end = span(method)
+                chunks.extend(_split_lines(f"{node.name}.{method.name}", lines[m_start - 1:m_end], m_start))
+        else:
+            chunks.extend(_split_lines(node.name, segment, start))
+
+    return _split_lines("<module>", module_lines, 1) + chunks
+
+
+def chunk_document(path: Path, text: str) -> List[Chunk]:
+    if path.suffix in (".md", ".markdown"):
+        return chunk_markdown(text)
+    if path.suffix == ".py":
+        return chunk_python(text)
+    return _split_lines("", text.splitlines(), 1)
+
+
+class BM25Index:
+    """
+    Inverted index with BM25 scoring.
+
+    Postings are a flat uint32 array of (chunk_id, term_frequency) pairs;
+    ``terms`` maps a term to (first pair offset, document frequency).
+    """
+
+    def __init__(
+        self,
+        meta: Dict[str, Any],
+        postings,
+        texts,
+        mapped: Optional[mmap.mmap] = None
+    ):
+        self.meta = meta
+        self.files: List[List[Any]] = meta["files"]
+        self.chunks: List[List[Any]] = meta["chunks"]
+        self.terms: Dict[str, List[int]] = meta["terms"]
+        self.k1 = meta.get("k1", K1)
+        self.b = meta.get("b", B)
+        self._postings = postings
+        self._texts = texts
+        self._mapped = mapped
+
+        lengths = [chunk[3] for chunk in self.chunks]
+        avgdl = (sum(lengths) / len(lengths)) if lengths else 1.0
+        # Length normalization term of the BM25 denominator, per chunk
+        self._norms = [self.k1 * (1 - self.b + self.b * length / avgdl) for length in lengths]
+
+    @classmethod
+    def build(cls, paths: Iterable[Path]) -> "BM25Index":
+        """Chunk, tokenize and index documents in memory."""
+        files: List[List[Any]] = []
+        chunks: List[List[Any]] = []
+        postings_by_term: Dict[str, List[Tuple[int, int]]] = {}
+        texts = bytearray()
+
+        for path in paths:
+            try:
+                stat = path.stat()
+                text = path.read_text(encoding="utf-8", errors="replace")
+            except OSError as e:
+                logger.warning(f"BM25 index: skipping {path}: {e}")
+                continue
+            file_idx = len(files)
+            files.append([str(path), stat.st_mtime, stat.st_size])
+
+            for chunk in chunk_document(path, text):
+                tokens = tokenize(f"{chunk.section}\n{chunk.text}")
+                if not tokens:
+                    continue
+                chunk_id = len(chunks)
+                encoded = chunk.text.encode("utf-8")
+                chunks.append([file_idx, chunk.section, chunk.start_line, len(tokens), len(texts), len(encoded)])
+                texts += encoded
+                for term, tf in Counter(tokens).items():
+                    postings_by_term.setdefault(term, []).append((chunk_id, tf))
+
+        postings = array("I")
+        terms: Dict[str, List[int]] = {}
+        for term in sorted(postings_by_term):
+            entries = postings_by_term[term]
+            terms[term] = [len(postings) // 2, len(entries)]
+            for chunk_id, tf in entries:
+                postings.append(chunk_id)
+                postings.append(tf)
+
+        meta = {"files": files, "chunks": chunks, "terms": terms, "k1": K1, "b": B, "postings": len(postings)}
+        return cls(meta, postings, bytes(texts))
+
+    def save(self, path: Path) -> None:
+        """Write the index atomically in the binary format."""
+        meta_bytes = json.dumps(self.meta, separators=(",", ":")).encode("utf-8")
+        header = MAGIC + struct.pack("<Q", len(meta_bytes))
+        padding = b"\0" * (-(len(header) + len(meta_bytes)) % 4)
+        postings = array("I", self._postings)
+        if sys.byteorder != "little":
+            postings.byteswap()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(meta_bytes)
+            f.write(padding)
+            f.write(postings.tobytes())
+            f.write(bytes(self._texts))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        """
+        Memory-map an index file.
+
+        Raises:
+            ValueError: If the file is not a BM25 index
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(MAGIC)] != MAGIC:
+            mapped.close()
+            raise ValueError(f"Not a BM25 index: {path}")
+        (meta_len,) = struct.unpack_from("<Q", mapped, len(MAGIC))
+        meta_start = len(MAGIC) + 8
+        meta = json.loads(mapped[meta_start:meta_start + meta_len])
+
+        postings_start = meta_start + meta_len
+        postings_start += -postings_start % 4
+        postings_end = postings_start + 4 * meta["postings"]
+        view = memoryview(mapped)
+        postings = view[postings_start:postings_end].cast("I")
+        if sys.byteorder != "little":
+            postings = array("I", postings)
+            postings.byteswap()
+        return cls(meta, postings, view[postings_end:], mapped)
+
+    def close(self) -> None:
+        """Release the memory map."""
+        if self._mapped is not None:
+            if isinstance(self._postings, memoryview):
+                self._postings.release()
+            self._texts.release()
+            self._mapped.close()
+            self._mapped = None
+
+    def is_fresh(self, paths: Iterable[Path]) -> bool:
+        """Whether the index covers exactly these files with unchanged mtime/size."""
+        indexed = {entry[0]: (entry[1], entry[2]) for entry in self.files}
+        current = {}
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            current[str(path)] = (stat.st_mtime, stat.st_size)
+        return indexed == current
+
+    def chunk_text(self, chunk_id: int) -> str:
+        offset, length = self.chunks[chunk_id][4], self.chunks[chunk_id][5]
+        return bytes(self._texts[offset:offset + length]).decode("utf-8")
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Score chunks against a query.
+
+        Returns:
+            (chunk_id, score) pairs, best first
+        """
+        n_chunks = len(self.chunks)
+        postings = self._postings
+        norms = self._norms
+        k1_plus_1 = self.k1 + 1
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            entry = self.terms.get(term)
+            if not entry:
+                continue
+            offset, df = entry
+            idf = math.log(1 + (n_chunks - df + 0.5) / (df + 0.5))
+            for i in range(2 * offset, 2 * (offset + df), 2):
+                chunk_id = postings[i]
+                tf = postings[i + 1]
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * k1_plus_1 / (tf + norms[chunk_id])
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+
+class BM25Retriever:
+    """
+    Lexical retriever with the PageIndexRetriever API, no third-party dependency.
+    """
+
+    def __init__(
+        self,
+        docs_path: Optional[str] = None,
+        document_paths: Optional[List[str]] = None,
+        index_dir: str = "rag_index",
+        use_embeddings: bool = False
+    ):
+        """
+        Initialize BM25 retriever (loads the persisted index or builds it).
+
+        Args:
+            docs_path: Directory path containing documents (alternative to document_paths)
+            document_paths: List of specific file paths to index
+            index_dir: Directory to store/load index
+            use_embeddings: Accepted for API compatibility (lexical engine, ignored)
+        """
+        self.index_dir = Path(index_dir)
+        self.use_embeddings = use_embeddings
+        self.document_paths = resolve_document_paths(docs_path, document_paths)
+        self.index: Optional[BM25Index] = None
+        self.enabled = bool(self.document_paths)
+
+        if not self.enabled:
+            logger.warning("No documents found to index")
+            return
+
+        try:
+            self.index = self._load_or_build()
+            logger.info(
+                f"BM25Retriever initialized with {len(self.document_paths)} documents "
+                f"({len(self.index.chunks)} chunks)"
+            )
+        except Exception as e:
+            logger.error(f"Failed to initialize BM25Retriever: {e}")
+            self.enabled = False
+            self.index = None
+
+    @property
+    def index_file(self) -> Path:
+        """Index file of this document set (different sets never overwrite each other)."""
+        key = "\n".join(sorted(str(p.resolve()) for p in self.document_paths))
+        return self.index_dir / f"bm25-{hashlib.md5(key.encode()).hexdigest()[:12]}.idx"
+
+    def _load_or_build(self) -> BM25Index:
+        index_file = self.index_file
+        if index_file.exists():
+            try:
+                index = BM25Index.load(index_file)
+                if index.is_fresh(self.document_paths):
+                    logger.info(f"Loaded BM25 index from {index_file}")
+                    return index
+                index.close()
+                logger.info("Documents changed, rebuilding BM25 index...")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not load BM25 index: {e}. Rebuilding...")
+
+        index = BM25Index.build(self.document_paths)
+        index.save(index_file)
+        return index
+
+    def search(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        """Synchronous search returning PageIndexRetriever-style results."""
+        if not self.enabled or not self.index:
+            return []
+
+        results = []
+        for chunk_id, score in self.index.search(query, top_k):
+            file_idx, section, start_line = self.index.chunks[chunk_id][:3]
+            file_path = self.index.files[file_idx][0]
+            file_name = Path(file_path).name
+            metadata = {
+                'file_type': 'markdown' if file_path.endswith('.md') else 'python',
+                'original_path': file_path,
+                'file_name': file_name,
+                'section': section,
+                'start_line': start_line,
+            }
+            results.append({
+                'content': self.index.chunk_text(chunk_id).strip(),
+                'metadata': metadata,
+                'reference': f"{file_name}:{section}" if section else file_name,
+                'score': float(score),
+                'file_path': file_path,
+                'file_name': file_name
+            })
+        return results
+
+    async def retrieve(
+        self,
+        query: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        top_k: int = 3
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve relevant chunks with traceable references.
+
+        Args:
+            query: Search query string
+            history: Optional conversation history for context
+            top_k: Number of results to return
+
+        Returns:
+            List of dictionaries with content, metadata, reference, score
+        """
+        enhanced_query = query
+        if history:
+            context = "\n".join(msg.get('content', '') for msg in history[-3:])
+            enhanced_query = f"{context}\n{query}"
+
+        results = self.search(enhanced_query, top_k=top_k)
+        logger.info(f"Retrieved {len(results)} results for query: {query[:50]}...")
+        return results
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        """Get statistics about the index."""
+        doc_types: Dict[str, int] = {}
+        for path in self.document_paths:
+            doc_types[path.suffix] = doc_types.get(path.suffix, 0) + 1
+
+        return {
+            'enabled': self.enabled,
+            'engine': 'bm25',
+            'total_documents': len(self.document_paths),
+            'total_chunks': len(self.index.chunks) if self.index else 0,
+            'total_terms': len(self.index.terms) if self.index else 0,
+            'document_types': doc_types,
+            'index_directory': str(self.index_dir),
+            'index_file': str(self.index_file),
+            'use_embeddings': self.use_embeddings,
+            'document_paths': [str(p) for p in self.document_paths]
+        }
@@ -0,0 +1,36 @@
+"""Document selection shared by the RAG engines."""
+from pathlib import Path
+from typing import List, Optional
+
+
+def resolve_document_paths(
+    docs_path: Optional[str] = None,
+    document_paths: Optional[List[str]] = None
+) -> List[Path]:
+    """
+    Resolve the documents to index.
+
+    Args:
+        docs_path: Directory to scan for .md and .py files
+        document_paths: Explicit file list (takes precedence over docs_path)
+
+    Returns:
+        Existing document paths (defaults to PRD, roadmap and orchestrator)
+    """
+    if document_paths:
+        return [Path(p) for p in document_paths if Path(p).exists()]
+    if docs_path:
+        docs_dir = Path(docs_path)
+        if docs_dir.exists():
+            # Find all .md and .py files
+            return list(docs_dir.rglob("*.md")) + list(docs_dir.rglob("*.py"))
+        return []
+
+    # Default: use PRD and roadmap
+    base_dir = Path(__file__).parent.parent.parent.parent
+    default_paths = [
+        base_dir / "docs" / "guides" / "PRD AETHERFLOW.md",
+        base_dir / "docs" / "guides" / "PLAN_GENERAL_ROADMAP.md",
+        base_dir / "Backend" / "Prod" / "orchestrator.py"
+    ]
+    return [p for p in default_paths if p.exists()]
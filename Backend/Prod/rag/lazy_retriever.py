@@ -0,0 +1,149 @@
+"""
+Lazy / background initialization of the RAG retriever.
+
+Importing LlamaIndex and loading (or updating) the index takes seconds, which
+used to be paid by every Orchestrator construction. LazyRetriever defers that
+work to a daemon thread, started either explicitly (warm_up) or by the first
+query, and exposes a ready-future so callers only wait when they actually
+need RAG results.
+"""
+import asyncio
+import importlib.util
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from ..config.settings import settings
+
+
+class LazyRetriever:
+    """
+    Deferred RAG retriever (BM25Retriever or PageIndexRetriever) with the
+    same retrieve() API.
+    """
+
+    def __init__(self, engine: Optional[str] = None, **retriever_kwargs: Any):
+        """
+        Args:
+            engine: "bm25", "llamaindex" or "auto" (defaults to settings.rag_engine)
+            **retriever_kwargs: Forwarded to the retriever constructor
+        """
+        self.engine = engine
+        self.resolved_engine: Optional[str] = None
+        self.retriever_kwargs = retriever_kwargs
+        self.timings: Dict[str, float] = {}
+        self._created = time.perf_counter()
+        self._future: Optional[Future] = None
+        self._lock = threading.Lock()
+
+    def warm_up(self) -> Future:
+        """Start initialization in a background thread (idempotent). Returns the ready-future."""
+        with self._lock:
+            if self._future is None:
+                self._future = Future()
+                thread = threading.Thread(target=self._initialize, name="rag-warmup", daemon=True)
+                thread.start()
+            return self._future
+
+    @property
+    def ready(self) -> bool:
+        """Whether initialization has finished (successfully or not)."""
+        return self._future is not None and self._future.done()
+
+    @property
+    def enabled(self) -> bool:
+        """False once initialization finished without a usable index."""
+        if not self.ready:
+            return True
+        retriever = self._future.result()
+        return bool(retriever is not None and retriever.enabled)
+
+    def _initialize(self) -> None:
+        future = self._future
+        started = time.perf_counter()
+        self.timings["queued_ms"] = round((started - self._created) * 1000, 1)
+        retriever = None
+        try:
+            retriever_class = self._retriever_class()
+            imported = time.perf_counter()
+            retriever = retriever_class(**self.retriever_kwargs)
+            built = time.perf_counter()
+            self.timings["import_ms"] = round((imported - started) * 1000, 1)
+            self.timings["index_ms"] = round((built - imported) * 1000, 1)
+        except Exception as e:
+            logger.warning(f"Failed to initialize RAG system: {e}")
+        finally:
+            self.timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            future.set_result(retriever)
+
+        if retriever is not None and retriever.enabled:
+            logger.info(
+                f"RAG ({self.resolved_engine}) ready in {self.timings['total_ms']:.0f}ms "
+                f"(import {self.timings['import_ms']:.0f}ms, index {self.timings['index_ms']:.0f}ms)"
+            )
+        else:
+            logger.warning("RAG system disabled (engine or documents not available)")
+
+    def _retriever_class(self):
+        """
+        Pick the RAG engine.
+
+        "auto" uses the BM25 engine unless embeddings are requested and
+        LlamaIndex is installed (without embeddings a VectorStoreIndex brings
+        no ranking benefit over lexical scoring).
+        """
+        engine = (self.engine or settings.rag_engine).lower()
+        if engine == "auto":
+            wants_embeddings = self.retriever_kwargs.get("use_embeddings", False)
+            engine = "llamaindex" if wants_embeddings and importlib.util.find_spec("llama_index") else "bm25"
+        self.resolved_engine = engine
+        if engine == "llamaindex":
+            from .pageindex_store import PageIndexRetriever
+            return PageIndexRetriever
+        from .bm25_retriever import BM25Retriever
+        return BM25Retriever
+
+    def _record_wait(self, started: float) -> None:
+        waited = (time.perf_counter() - started) * 1000
+        self.timings["waited_ms"] = round(self.timings.get("waited_ms", 0.0) + waited, 1)
+
+    def get(self, timeout: Optional[float] = None):
+        """Block until the retriever is built (None if initialization failed)."""
+        future = self.warm_up()
+        started = time.perf_counter()
+        retriever = future.result(timeout)
+        self._record_wait(started)
+        return retriever
+
+    async def aget(self):
+        """Await the retriever without blocking the event loop."""
+        future = self.warm_up()
+        if future.done():
+            return future.result()
+        started = time.perf_counter()
+        retriever = await asyncio.wrap_future(future)
+        self._record_wait(started)
+        return retriever
+
+    async def retrieve(
+        self,
+        query: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        top_k: int = 3
+    ) -> List[Dict[str, Any]]:
+        """Same contract as PageIndexRetriever.retrieve (empty list when RAG is unavailable)."""
+        retriever = await self.aget()
+        if retriever is None or not retriever.enabled:
+            return []
+        return await retriever.retrieve(query, history=history, top_k=top_k)
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        """Index statistics plus cold-start timing breakdown."""
+        stats: Dict[str, Any] = {"ready": self.ready, "enabled": self.enabled, "engine": self.resolved_engine}
+        if self.ready and self._future.result() is not None:
+            stats.update(self._future.result().get_index_stats())
+        stats["timings"] = dict(self.timings)
+        return stats
@@ -7,7 +7,8 @@ Uses MarkdownNodeParser + HierarchicalNodeParser + RouterQueryEngine for
 structure-preserving retrieval with traceable references.
 
 NO vector DB needed - CPU-only, zero embeddings cost.
-Includes hash-based cache invalidation for fast index reloading.
+Includes a per-document content-hash manifest: only added, changed or removed
+documents are re-parsed and patched into the persisted index.
 """
 import os
 import json
@@ -16,6 +17,8 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 from loguru import logger
 
+from .documents import resolve_document_paths
+
 # Try to import LlamaIndex components
 try:
     from llama_index.core import SimpleDirectoryReader, VectorStoreIndex, Settings
@@ -34,6 +37,24 @@ except ImportError as e:
     logger.warning(f"LlamaIndex not available: {e}. Install with: pip install llama-index llama-index-core")
 
 
+MANIFEST_FILE = "docs_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def _doc_key(path) -> str:
+    """Manifest key of a document (resolved path)."""
+    return str(Path(path).resolve())
+
+
+def _file_hash(path: Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 class PageIndexRetriever(BaseRetriever if LLAMAINDEX_AVAILABLE else object):
     """
     PageIndex-style RAG retriever using LlamaIndex native components.
@@ -75,24 +96,7 @@ class PageIndexRetriever(BaseRetriever if LLAMAINDEX_AVAILABLE else object):
         self.index = None  # Initialize index attribute
 
         # Determine document paths
-        if document_paths:
-            self.document_paths = [Path(p) for p in document_paths if Path(p).exists()]
-        elif docs_path:
-            docs_dir = Path(docs_path)
-            if docs_dir.exists():
-                # Find all .md and .py files
-                self.document_paths = list(docs_dir.rglob("*.md")) + list(docs_dir.rglob("*.py"))
-            else:
-                self.document_paths = []
-        else:
-            # Default: use PRD and roadmap
-            base_dir = Path(__file__).parent.parent.parent.parent
-            default_paths = [
-                base_dir / "docs" / "guides" / "PRD AETHERFLOW.md",
-                base_dir / "docs" / "guides" / "PLAN_GENERAL_ROADMAP.md",
-                base_dir / "Backend" / "Prod" / "orchestrator.py"
-            ]
-            self.document_paths = [p for p in default_paths if p.exists()]
+        self.document_paths = resolve_document_paths(docs_path, document_paths)
 
         if not self.document_paths:
             logger.warning("No documents found to index")
@@ -116,85 +120,160 @@ class PageIndexRetriever(BaseRetriever if LLAMAINDEX_AVAILABLE else object):
             self.enabled = False
             self.index = None
 
-    def _calculate_docs_hash(self) -> str:
-        """Calculate hash of documents for cache invalidation."""
-        if not self.document_paths:
-            return ""
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Load the per-document manifest (empty if missing, corrupt or outdated)."""
+        manifest_file = self.index_dir / MANIFEST_FILE
+        try:
+            with open(manifest_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != MANIFEST_VERSION:
+            return {}
+        return data.get('documents', {})
+
+    def _save_manifest(self, documents: Dict[str, Dict[str, Any]]) -> None:
+        """Write the manifest atomically next to the persisted index."""
+        manifest_file = self.index_dir / MANIFEST_FILE
+        tmp_file = manifest_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'documents': documents}, f)
+        os.replace(tmp_file, manifest_file)
+
+    def _scan_documents(self, manifest: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fingerprint every document by content hash.
 
-        # Hash based on file paths and modification times
-        hash_data = []
-        for path in sorted(self.document_paths):
-            if path.exists():
+        Files whose mtime and size match the manifest keep their recorded hash,
+        so an unchanged docs set is checked with one stat() per file.
+        """
+        current = {}
+        for path in self.document_paths:
+            key = _doc_key(path)
+            try:
                 stat = path.stat()
-                hash_data.append(f"{path}:{stat.st_mtime}:{stat.st_size}")
-
-        content = "\n".join(hash_data)
-        return hashlib.md5(content.encode()).hexdigest()
-
-    def _should_rebuild_index(self) -> bool:
-        """Check if index needs rebuild based on document hash."""
-        # Ensure self.index is always defined as an attribute
-        if not hasattr(self, 'index'):
-            self.index = None
-            
-        hash_file = self.index_dir / "docs_hash.json"
-
-        # Calculate current hash
-        current_hash = self._calculate_docs_hash()
-
-        # Try to load existing index
+            except OSError:
+                continue
+            previous = manifest.get(key)
+            if previous and previous.get('mtime') == stat.st_mtime and previous.get('size') == stat.st_size:
+                digest = previous['hash']
+            else:
+                digest = _file_hash(path)
+            current[key] = {'hash': digest, 'mtime': stat.st_mtime, 'size': stat.st_size}
+        return current
+
+    def _load_persisted_index(self) -> bool:
+        """Load the index persisted in index_dir. Returns True on success."""
+        if not self.index_dir.exists() or not any(self.index_dir.iterdir()):
+            return False
+        from llama_index.core import StorageContext, load_index_from_storage
         try:
-            if self.index_dir.exists() and any(self.index_dir.iterdir()):
-                # Check hash
-                if hash_file.exists():
-                    with open(hash_file, 'r') as f:
-                        cached = json.load(f)
-                        if cached.get('hash') == current_hash:
-                            logger.info("Index cache valid, loading from disk...")
-                            # Try to load index even if hash matches
-                            from llama_index.core import StorageContext, load_index_from_storage
-                            try:
-                                storage_context = StorageContext.from_defaults(
-                                    persist_dir=str(self.index_dir)
-                                )
-                                self.index = load_index_from_storage(storage_context)
-                                logger.info(f"Loaded existing index from {self.index_dir}")
-                                return False  # No rebuild needed
-                            except Exception as e:
-                                logger.warning(f"Could not load cached index: {e}. Rebuilding...")
-                                self.index = None
-                                return True  # Rebuild needed
-
-                # Try to load index even if hash doesn't match
-                from llama_index.core import StorageContext, load_index_from_storage
-                try:
-                    storage_context = StorageContext.from_defaults(
-                        persist_dir=str(self.index_dir)
-                    )
-                    self.index = load_index_from_storage(storage_context)
-                    logger.info(f"Loaded existing index from {self.index_dir}")
-
-                    # Save current hash
-                    with open(hash_file, 'w') as f:
-                        json.dump({'hash': current_hash}, f)
-                    return False  # Successfully loaded
-                except Exception as e:
-                    logger.warning(f"Could not load existing index: {e}. Rebuilding...")
-                    self.index = None
+            storage_context = StorageContext.from_defaults(persist_dir=str(self.index_dir))
+            self.index = load_index_from_storage(storage_context)
+            logger.info(f"Loaded existing index from {self.index_dir}")
+            return True
         except Exception as e:
-            logger.warning(f"Cache check failed: {e}. Rebuilding index...")
+            logger.warning(f"Could not load existing index: {e}. Rebuilding...")
             self.index = None
-
-        return True  # Rebuild needed
+            return False
 
     def _initialize_index(self):
-        """Initialize the hierarchical index (with cache support)."""
-        # Check if we can load from cache
-        if not self._should_rebuild_index():
-            return  # Index already loaded
+        """Load the persisted index and bring it up to date with the documents."""
+        manifest = self._load_manifest()
+        current = self._scan_documents(manifest)
+
+        if manifest and self._load_persisted_index():
+            added = [key for key in current if key not in manifest]
+            changed = [
+                key for key in current
+                if key in manifest and manifest[key].get('hash') != current[key]['hash']
+            ]
+            removed = [key for key in manifest if key not in current]
+
+            if not (added or changed or removed):
+                logger.info("Index cache valid, loaded from disk")
+                if any(manifest[key].get('mtime') != current[key]['mtime'] for key in current):
+                    # Touched but identical files: refresh mtimes to keep the stat() fast path
+                    self._save_manifest({
+                        key: {**current[key], 'node_ids': manifest[key].get('node_ids', [])}
+                        for key in current
+                    })
+                return
+
+            try:
+                self._update_index(manifest, current, added, changed, removed)
+                return
+            except Exception as e:
+                logger.warning(f"Incremental index update failed: {e}. Rebuilding...")
+                self.index = None
+
+        self._build_index(current)
+
+    def _update_index(
+        self,
+        manifest: Dict[str, Dict[str, Any]],
+        current: Dict[str, Dict[str, Any]],
+        added: List[str],
+        changed: List[str],
+        removed: List[str]
+    ) -> None:
+        """Re-parse only added/changed documents and patch the persisted index."""
+        stale_ids = []
+        for key in changed + removed:
+            stale_ids.extend(manifest[key].get('node_ids', []))
+        if stale_ids:
+            self.index.delete_nodes(stale_ids, delete_from_docstore=True)
+
+        parsed = self._parse_documents([Path(key) for key in added + changed])
+        new_nodes = [node for nodes in parsed.values() for node in nodes]
+        if new_nodes:
+            self.index.insert_nodes(new_nodes)
+
+        documents = {}
+        for key, fingerprint in current.items():
+            if key in parsed:
+                node_ids = [node.node_id for node in parsed[key]]
+            else:
+                node_ids = manifest.get(key, {}).get('node_ids', [])
+            documents[key] = {**fingerprint, 'node_ids': node_ids}
 
-        # Build new index
+        self.index.storage_context.persist(persist_dir=str(self.index_dir))
+        self._save_manifest(documents)
+        logger.info(
+            f"Index updated incrementally: {len(added)} added, {len(changed)} changed, "
+            f"{len(removed)} removed ({len(stale_ids)} nodes deleted, {len(new_nodes)} inserted)"
+        )
+
+    def _build_index(self, current: Dict[str, Dict[str, Any]]) -> None:
+        """Build the index from scratch and persist it with its manifest."""
         logger.info("Building new index from documents...")
+        parsed = self._parse_documents(self.document_paths)
+        final_nodes = [node for nodes in parsed.values() for node in nodes]
+
+        # Create index
+        self.index = VectorStoreIndex(final_nodes)
+
+        # Persist index
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.index.storage_context.persist(persist_dir=str(self.index_dir))
+
+        # Save manifest for incremental updates
+        self._save_manifest({
+            key: {**fingerprint, 'node_ids': [node.node_id for node in parsed.get(key, [])]}
+            for key, fingerprint in current.items()
+        })
+
+        logger.info(f"Index created with {len(final_nodes)} nodes and cached")
+
+    def _parse_documents(self, paths: List[Path]) -> Dict[str, List["BaseNode"]]:
+        """
+        Parse documents into nodes, grouped by document key.
+
+        Each document yields structured nodes (MarkdownNodeParser for .md,
+        CodeSplitter for code) plus hierarchical nodes for structure navigation.
+        """
+        if not paths:
+            return {}
 
         # 1. Parsing hiérarchique préservant structure
         md_parser = MarkdownNodeParser()  # Headers → métadonnées
@@ -206,64 +285,38 @@ class PageIndexRetriever(BaseRetriever if LLAMAINDEX_AVAILABLE else object):
             # Fallback: use HierarchicalNodeParser for code files
             logger.warning(f"CodeSplitter not available ({e}), using HierarchicalNodeParser for code")
             code_parser = HierarchicalNodeParser.from_defaults()
+        hierarchical_parser = HierarchicalNodeParser.from_defaults()
 
         # Load documents
-        reader = SimpleDirectoryReader(
-            input_files=[str(p) for p in self.document_paths]
-        )
+        reader = SimpleDirectoryReader(input_files=[str(p) for p in paths])
         docs = reader.load_data()
 
-        # Apply appropriate parsing
-        all_nodes = []
+        parsed: Dict[str, List["BaseNode"]] = {_doc_key(p): [] for p in paths}
         for doc in docs:
             file_path = Path(doc.metadata.get('file_path', ''))
             if file_path.suffix == '.md':
                 # Markdown: preserve header structure
                 nodes = md_parser.get_nodes_from_documents([doc])
-                for node in nodes:
-                    node.metadata['file_type'] = 'markdown'
-                    node.metadata['original_path'] = str(file_path)
-                    node.metadata['file_name'] = file_path.name
-                all_nodes.extend(nodes)
+                file_type = 'markdown'
             else:
                 # Code: use code splitter
                 nodes = code_parser.get_nodes_from_documents([doc])
-                for node in nodes:
-                    node.metadata['file_type'] = 'python'
+                file_type = 'python'
+            for node in nodes:
+                node.metadata['file_type'] = file_type
+                node.metadata['original_path'] = str(file_path)
+                node.metadata['file_name'] = file_path.name
+
+            # 2. Also create hierarchical nodes for structure navigation
+            hierarchical_nodes = hierarchical_parser.get_nodes_from_documents([doc])
+            for node in hierarchical_nodes:
+                if 'original_path' not in node.metadata and file_path.exists():
                     node.metadata['original_path'] = str(file_path)
                     node.metadata['file_name'] = file_path.name
-                all_nodes.extend(nodes)
-
-        # 2. Also create hierarchical nodes for structure navigation
-        hierarchical_parser = HierarchicalNodeParser.from_defaults()
-        hierarchical_nodes = hierarchical_parser.get_nodes_from_documents(docs)
-
-        # Add metadata to hierarchical nodes
-        for node in hierarchical_nodes:
-            if 'original_path' not in node.metadata:
-                # Try to infer from document
-                file_path = Path(node.metadata.get('file_path', ''))
-                if file_path.exists():
-                    node.metadata['original_path'] = str(file_path)
-                    node.metadata['file_name'] = file_path.name
-
-        # Combine both: structured nodes + hierarchical nodes
-        final_nodes = all_nodes + hierarchical_nodes
-
-        # Create index
-        self.index = VectorStoreIndex(final_nodes)
 
-        # Persist index
-        self.index_dir.mkdir(parents=True, exist_ok=True)
-        self.index.storage_context.persist(persist_dir=str(self.index_dir))
-
-        # Save hash for cache invalidation
-        hash_file = self.index_dir / "docs_hash.json"
-        current_hash = self._calculate_docs_hash()
-        with open(hash_file, 'w') as f:
-            json.dump({'hash': current_hash}, f)
+            parsed.setdefault(_doc_key(file_path), []).extend(nodes + hierarchical_nodes)
 
-        logger.info(f"Index created with {len(final_nodes)} nodes and cached")
+        return parsed
 
     def _retrieve(self, query: str, **kwargs):
         """
@@ -6,10 +6,15 @@ Gère 1 ou plusieurs images.
 import asyncio
 import io
 import base64
+import hashlib
 import json
+import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Tuple, Dict, List
+from typing import Any, Tuple, Dict, List, Optional
 from loguru import logger
 from dotenv import load_dotenv
 
@@ -106,49 +111,122 @@ JSON SCHEMA :
 }"""
 
 
+MAX_CONCURRENT_ANALYSES = 3
+
+
+def _preprocess_image(image_path: str, max_dimension: int) -> bytes:
+    """Redimensionne + ré-encode en PNG optimisé (fonction top-level : exécutable en sous-processus)."""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError("Pillow not installed: pip install pillow")
+
+    with Image.open(image_path) as img:
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGB")
+
+        w, h = img.size
+        if max(w, h) > max_dimension:
+            ratio = max_dimension / max(w, h)
+            img = img.resize((int(w * ratio), int(h * ratio)), Image.Resampling.LANCZOS)
+
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue()
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Pool de processus partagé pour le prétraitement PIL (hors boucle événementielle)."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+        return _process_pool
+
+
+def _reset_process_pool() -> None:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
 class ImagePreprocessor:
     def __init__(self, max_dimension=MAX_DIMENSION):
         self.max_dimension = max_dimension
 
     def process(self, image_path: Path) -> Tuple[str, str]:
+        data = _preprocess_image(str(image_path), self.max_dimension)
+        return base64.b64encode(data).decode("utf-8"), "image/png"
+
+    async def process_bytes_async(self, image_path: Path) -> bytes:
+        """PNG prétraité, calculé dans le pool de processus (repli sur un thread si indisponible)."""
+        loop = asyncio.get_running_loop()
         try:
-            from PIL import Image
-        except ImportError:
-            raise RuntimeError("Pillow not installed: pip install pillow")
+            pool = _get_process_pool()
+            return await loop.run_in_executor(pool, _preprocess_image, str(image_path), self.max_dimension)
+        except (BrokenProcessPool, NotImplementedError, PermissionError) as e:
+            logger.debug(f"ImagePreprocessor: process pool unavailable ({e}), using a thread")
+            _reset_process_pool()
+        return await asyncio.to_thread(_preprocess_image, str(image_path), self.max_dimension)
 
-        with Image.open(image_path) as img:
-            if img.mode not in ("RGB", "RGBA"):
-                img = img.convert("RGB")
 
-            w, h = img.size
-            if max(w, h) > self.max_dimension:
-                ratio = self.max_dimension / max(w, h)
-                img = img.resize((int(w * ratio), int(h * ratio)), Image.Resampling.LANCZOS)
+from Backend.Prod.models.gemini_client import GeminiClient
 
-            buffer = io.BytesIO()
-            img.save(buffer, format="PNG", optimize=True)
-            data = buffer.getvalue()
 
-        return base64.b64encode(data).decode("utf-8"), "image/png"
+# Discriminant de cache : un changement de prompt invalide les analyses en cache
+_PROMPT_DIGEST = hashlib.sha256(VISUAL_DECOMPOSER_PROMPT.encode("utf-8")).digest()
 
 
-from Backend.Prod.models.gemini_client import GeminiClient
+def _default_vision_cache() -> Optional[Any]:
+    """VisionCache partagé (None si le package sullivan n'est pas importable)."""
+    try:
+        from Backend.Prod.sullivan.analyzer.vision_cache import get_vision_cache
+        return get_vision_cache()
+    except Exception as e:
+        logger.debug(f"[VisualDecomposer] VisionCache unavailable: {e}")
+        return None
 
 
 class RetroGenomeAnalyzer:
     """VisualDecomposer — Analyse visuelle libre d'une ou plusieurs maquettes PNG."""
 
-    def __init__(self):
-        self.client = GeminiClient(execution_mode="FAST")
+    def __init__(self, client: Optional[Any] = None, cache: Optional[Any] = None,
+                 max_concurrency: int = MAX_CONCURRENT_ANALYSES):
+        """
+        Args:
+            client: Client vision partagé (défaut : GeminiClient FAST)
+            cache: Cache des analyses avec get/set(bytes) (défaut : VisionCache global)
+            max_concurrency: Nombre max d'analyses simultanées dans analyze_multiple
+        """
+        self.client = client or GeminiClient(execution_mode="FAST")
         self.preprocessor = ImagePreprocessor()
+        self.cache = cache if cache is not None else _default_vision_cache()
+        self.max_concurrency = max_concurrency
+
+    async def close(self) -> None:
+        await self.client.close()
 
     async def analyze_png(self, image_path: Path) -> Dict:
         """Analyse un seul PNG et retourne un JSON de décomposition visuelle libre.
         Retry x2 sur réponse vide ou JSON invalide, temperature=0 pour la cohérence.
+        Résultat mis en cache par hash du PNG prétraité (+ prompt).
         """
         logger.info(f"🔍 VisualDecomposer: Analyzing {image_path.name}...")
 
-        b64_image, mime_type = self.preprocessor.process(image_path)
+        png = await self.preprocessor.process_bytes_async(image_path)
+        cache_key = hashlib.sha256(png).digest() + _PROMPT_DIGEST
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        b64_image, mime_type = base64.b64encode(png).decode("utf-8"), "image/png"
 
         max_attempts = 3
         last_error = None
@@ -174,7 +252,10 @@ class RetroGenomeAnalyzer:
                     raise ValueError("Réponse vide de Gemini")
 
                 logger.debug(f"[VisualDecomposer] Raw response (first 300): {raw[:300]}")
-                return extract_json_robust(raw)
+                analysis = extract_json_robust(raw)
+                if self.cache is not None:
+                    self.cache.set(cache_key, analysis)
+                return analysis
 
             except Exception as e:
                 last_error = e
@@ -183,19 +264,20 @@ class RetroGenomeAnalyzer:
                     await asyncio.sleep(1)
 
         logger.error(f"[VisualDecomposer] All {max_attempts} attempts failed for {image_path.name}: {last_error}")
-        await self.client.close()
         return {"error": str(last_error), "elements": [], "regions": [], "design_tokens": {}, "annotations_visible": []}
 
     async def analyze_multiple(self, image_paths: List[Path]) -> Dict:
         """
-        Analyse plusieurs PNGs séquentiellement et synthétise les résultats.
-        Chaque appel recrée le client pour éviter les conflits de session.
+        Analyse plusieurs PNGs en parallèle (au plus max_concurrency à la fois,
+        client partagé) et synthétise les résultats dans l'ordre des images.
         """
         logger.info(f"🔍 VisualDecomposer: Analyzing {len(image_paths)} images...")
-        results = []
-        for path in image_paths:
-            self.client = GeminiClient(execution_mode="FAST")
-            res = await self.analyze_png(path)
-            results.append({"source": path.name, "analysis": res})
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def analyze(path: Path) -> Dict:
+            async with semaphore:
+                res = await self.analyze_png(path)
+            return {"source": path.name, "analysis": res}
 
-        return {"multi_template_analysis": results}
+        results = await asyncio.gather(*(analyze(path) for path in image_paths))
+        return {"multi_template_analysis": list(results)}
@@ -62,7 +62,7 @@ async def dispatch_brainstorm(session_id: str, prompt: str, buffer_answers: Opti
 
 async def sse_generator(session_id: str, provider: str):
     """Générateur SSE pour le streaming tokens."""
-    session = storage.get_session(session_id)
+    session = await storage.aget_session(session_id)
     if not session:
         yield "event: error\ndata: Session not found\n\n"
         return
@@ -119,7 +119,7 @@ def capture_nugget(session_id: str, text: str, provider: str):
 
 async def generate_prd_from_basket(session_id: str, project_name: str):
     """Génère le PRD final et le persiste."""
-    basket = storage.get_basket(session_id)
+    basket = await storage.aget_basket(session_id)
     if not basket:
         raise ValueError("Basket is empty")
         
@@ -172,8 +172,8 @@ async def arbitrate_session(session_id: str):
     logger.info(f"[BRS] Arbitrating session: {session_id}")
     
     # 1. Récupérer l'historique
-    messages = storage.get_messages(session_id)
-    basket = storage.get_basket(session_id)
+    messages = await storage.aget_messages(session_id)
+    basket = await storage.aget_basket(session_id)
     
     if not messages:
         yield f"data: {json.dumps({'status': 'error', 'message': 'No messages found for this session'})}\n\n"
@@ -215,7 +215,7 @@ async def arbitrate_session(session_id: str):
 
 async def rank_council(session_id: str):
     """Mission 58 — Classement des 3 réponses COUNCIL par Gemini."""
-    messages = storage.get_messages(session_id)
+    messages = await storage.aget_messages(session_id)
     responses = {
         m['provider']: m['content']
         for m in messages
@@ -252,7 +252,7 @@ async def sse_chat_generator(session_id: str, provider: str, message: str, class
     storage.save_message(session_id, provider, "user", message)
 
     # 2. Charger l'historique pour construire un prompt conversationnel
-    history = storage.get_messages(session_id, provider=provider)
+    history = await storage.aget_messages(session_id, provider=provider)
 
     # Construire un prompt conversationnel plat
     history_lines = []
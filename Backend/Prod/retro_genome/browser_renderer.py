@@ -1,59 +1,255 @@
 import asyncio
+import atexit
+import hashlib
 import tempfile
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
-from playwright.async_api import async_playwright
+from typing import Any, Dict, List, Optional
 from loguru import logger
 
+
+class BrowserQueueFull(RuntimeError):
+    """Raised when too many captures are already pending on the browser pool."""
+    pass
+
+
+class BrowserPool:
+    """
+    Long-lived headless Chromium shared by every capture.
+
+    The browser, its pages and the screenshot cache live on a dedicated event loop
+    thread, so the pool survives the short-lived loops callers run under
+    (e.g. ``asyncio.run`` in a worker thread) and Chromium is launched only once.
+    Pages are reused across captures (HTML is injected with ``page.set_content``),
+    at most ``max_pages`` captures render at once and at most ``max_queue`` more
+    may wait for a page. Screenshots are cached by HTML hash + viewport.
+    """
+
+    def __init__(
+        self,
+        max_pages: int = 2,
+        max_queue: int = 16,
+        cache_size: int = 32,
+        network_idle_timeout_ms: int = 2500,
+    ):
+        self.max_pages = max_pages
+        self.max_queue = max_queue
+        self.cache_size = cache_size
+        self.network_idle_timeout_ms = network_idle_timeout_ms
+
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Owned by the pool loop
+        self._playwright: Any = None
+        self._browser: Any = None
+        self._idle_pages: List[Any] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"captures": 0, "cache_hits": 0, "browser_launches": 0, "rejected": 0}
+
+    @staticmethod
+    def cache_key(html_content: str, width: int, height: int) -> str:
+        digest = hashlib.sha256(html_content.encode("utf-8")).hexdigest()
+        return f"{digest}:{width}x{height}"
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._slots = None
+                self._pending = 0
+                self._inflight.clear()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="browser-pool", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    async def capture(self, html_content: str, width: int = 1440, height: int = 900) -> bytes:
+        """Render the HTML and return the full-page PNG bytes (callable from any event loop)."""
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._capture(html_content, width, height), loop)
+        return await asyncio.wrap_future(future)
+
+    async def _capture(self, html_content: str, width: int, height: int) -> bytes:
+        key = self.cache_key(html_content, width, height)
+        while True:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return cached
+
+            # Identical capture already rendering: share its result
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # this caller was cancelled, not the leader
+                # Leader cancelled: look again (cache, another leader, or render ourselves)
+
+        if self._pending >= self.max_pages + self.max_queue:
+            self.stats["rejected"] += 1
+            raise BrowserQueueFull(f"BrowserPool: {self._pending} captures already pending")
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pages)
+        result = asyncio.get_running_loop().create_future()
+        self._inflight[key] = result
+        self._pending += 1
+        try:
+            async with self._slots:
+                png = await self._render(html_content, width, height)
+            self.stats["captures"] += 1
+            self._cache[key] = png
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            result.set_result(png)
+            return png
+        except Exception as e:
+            result.set_exception(e)
+            result.exception()  # retrieved here; followers re-raise it
+            raise
+        finally:
+            self._pending -= 1
+            self._inflight.pop(key, None)
+            if not result.done():
+                # Cancelled (caller timeout): never leave followers waiting on it
+                result.cancel()
+
+    async def _render(self, html_content: str, width: int, height: int) -> bytes:
+        page = await self._acquire_page(width, height)
+        reusable = False
+        try:
+            await page.set_content(html_content, wait_until="load")
+
+            # Wait for any network idle (fonts, CDNs) up to 2.5s to not hang the loop
+            try:
+                await page.wait_for_load_state("networkidle", timeout=self.network_idle_timeout_ms)
+            except Exception:
+                logger.debug("BrowserRenderer: Networkidle timeout reached, capturing anyway.")
+
+            png = await page.screenshot(full_page=True)
+            reusable = True
+            return png
+        finally:
+            if reusable:
+                self._idle_pages.append(page)
+            else:
+                await self._discard_page(page)
+
+    async def _acquire_page(self, width: int, height: int) -> Any:
+        while self._idle_pages:
+            page = self._idle_pages.pop()
+            if page.is_closed():
+                continue
+            if page.viewport_size != {"width": width, "height": height}:
+                await page.set_viewport_size({"width": width, "height": height})
+            return page
+
+        browser = await self._ensure_browser()
+        return await browser.new_page(viewport={"width": width, "height": height})
+
+    async def _ensure_browser(self) -> Any:
+        if self._browser is None or not self._browser.is_connected():
+            self._idle_pages.clear()
+            start_time = time.time()
+            self._browser = await self._launch()
+            self.stats["browser_launches"] += 1
+            logger.info(f"BrowserPool: Chromium launched in {time.time() - start_time:.2f}s")
+        return self._browser
+
+    async def _launch(self) -> Any:
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(headless=True)
+
+    async def _discard_page(self, page: Any) -> None:
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+    async def _shutdown(self) -> None:
+        for page in self._idle_pages:
+            await self._discard_page(page)
+        self._idle_pages.clear()
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Close the browser and stop the pool thread (a later capture restarts it)."""
+        with self._start_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None or not thread.is_alive():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout)
+        except Exception as e:
+            logger.debug(f"BrowserPool: shutdown error: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
+
+
+_browser_pool: Optional[BrowserPool] = None
+_browser_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Process-wide BrowserPool, closed at interpreter exit."""
+    global _browser_pool
+    with _browser_pool_lock:
+        if _browser_pool is None:
+            _browser_pool = BrowserPool()
+            atexit.register(_browser_pool.close)
+        return _browser_pool
+
+
 class BrowserRenderer:
     """Headless Playwright rendering engine for Visual QA Loop."""
-    
+
     @staticmethod
     async def capture_screenshot(html_content: str, width: int = 1440, height: int = 900) -> Path:
         """
         Rends the HTML content in a headless browser and returns the path to the screenshot PNG.
+
+        Uses the shared BrowserPool (warm Chromium, cached screenshots). The PNG is a
+        fresh temp file owned by the caller, even when served from the cache.
         """
         start_time = time.time()
-        
-        # We need a physical temp file for Playwright to load relative assets (if any) or properly structure DOM.
-        # But since we use absolute CDN links or inline CSS, writing to a temp file is bulletproof.
-        temp_html = tempfile.NamedTemporaryFile(delete=False, suffix=".html")
-        temp_html_path = Path(temp_html.name)
-        temp_html_path.write_text(html_content, encoding="utf-8")
-        
-        output_png = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-        output_png_path = Path(output_png.name)
-        
+
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page(viewport={'width': width, 'height': height})
-                
-                # Navigate to the temp file
-                await page.goto(f"file://{temp_html_path.absolute()}")
-                
-                # Wait for any network idle (fonts, CDNs) up to 2.5s to not hang the loop
-                try:
-                    await page.wait_for_load_state("networkidle", timeout=2500)
-                except Exception:
-                    logger.debug("BrowserRenderer: Networkidle timeout reached, capturing anyway.")
-                    pass
-                
-                # Screenshot
-                await page.screenshot(path=str(output_png_path), full_page=True)
-                
-                await browser.close()
-                
+            png = await get_browser_pool().capture(html_content, width, height)
         except Exception as e:
             logger.error(f"BrowserRenderer capture failed: {e}")
             raise
-        finally:
-            # Cleanup HTML, keep PNG for the DA (calling code will clean it up)
-            try:
-                temp_html_path.unlink()
-            except Exception:
-                pass
-                
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as output_png:
+            output_png.write(png)
+        output_png_path = Path(output_png.name)
+
         elapsed = time.time() - start_time
         logger.debug(f"📸 Playwright render took {elapsed:.2f}s -> {output_png_path}")
         return output_png_path
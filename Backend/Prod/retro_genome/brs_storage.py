@@ -4,27 +4,216 @@ brs_storage.py — Mission 46
 Couche de persistance SQLite pour le Brainstorming (BRS).
 """
 
+import asyncio
+import atexit
+import base64
+import queue
 import sqlite3
 import json
+import threading
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 from loguru import logger
 
+# Requêtes constantes : réutilisées depuis le cache de statements préparés de sqlite3
+_SQL_UPSERT_SESSION = """
+    INSERT INTO sessions (id, user_id, prompt, buffer_answers, created_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        prompt=excluded.prompt,
+        buffer_answers=excluded.buffer_answers
+"""
+_SQL_INSERT_MESSAGE = """
+    INSERT INTO messages (id, session_id, provider, role, content, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_MESSAGE_FTS = """
+    INSERT INTO messages_fts(session_id, provider, content, user_id)
+    VALUES (?, ?, ?, COALESCE((SELECT user_id FROM sessions WHERE id = ?), 'default'))
+"""
+_SQL_REINDEX_MESSAGES_FTS = """
+    INSERT INTO messages_fts(session_id, provider, content, user_id)
+    SELECT m.session_id, m.provider, m.content, COALESCE(s.user_id, 'default')
+    FROM messages m LEFT JOIN sessions s ON s.id = m.session_id
+    WHERE m.role = 'assistant'
+    ORDER BY m.rowid
+"""
+
+# Tokenizers FTS5 : mots (+ index de préfixes pour la saisie incrémentale)
+# ou trigrammes (recherche de sous-chaînes, SQLite >= 3.34)
+FTS_TOKENIZERS = {
+    "unicode61": "tokenize='unicode61 remove_diacritics 2', prefix='2 3'",
+    "trigram": "tokenize='trigram'",
+}
+_SQL_INSERT_NUGGET = """
+    INSERT INTO nuggets (id, session_id, provider, text, created_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_DOCUMENT = """
+    INSERT INTO documents (id, session_id, type, path, content, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+Statement = Tuple[str, Sequence[Any]]
+_STOP = object()
+
+
+def _fts_quote(term: str) -> str:
+    """Chaîne FTS5 littérale : neutralise opérateurs et syntaxe (AND, NEAR, *, :, ...)."""
+    return '"' + term.replace('"', '""') + '"'
+
+
 class BRSStorage:
-    def __init__(self, db_path: str):
+    """
+    Persistance SQLite du Brainstorming.
+
+    - Mode WAL : les lectures ne bloquent pas l'écriture (et inversement).
+    - Un thread écrivain unique possède la connexion d'écriture et vide une file
+      write-behind : toutes les écritures en attente (messages + index FTS5,
+      pépites, documents) sont appliquées en une seule transaction.
+    - Connexions de lecture réutilisées, une par thread. Chaque lecture attend
+      d'abord que les écritures déjà soumises soient commitées (read-your-writes).
+    - Variantes async (a*) : les lectures passent par asyncio.to_thread pour ne
+      jamais bloquer la boucle événementielle des générateurs SSE.
+    """
+
+    MAX_BATCH = 256
+    # Poids bm25 des colonnes FTS (session_id, provider, content, user_id)
+    SEARCH_WEIGHTS = (0.0, 0.0, 1.0, 0.0)
+    MAX_PAGE_SIZE = 100
+
+    def __init__(self, db_path: str, tokenizer: str = "unicode61"):
+        if tokenizer not in FTS_TOKENIZERS:
+            raise ValueError(f"Unknown FTS tokenizer: {tokenizer} (expected one of {sorted(FTS_TOKENIZERS)})")
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.tokenizer = tokenizer
+
+        self._readers = threading.local()
+        self._reader_conns: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._committed = threading.Condition(self._lock)
+        self._enqueued_seq = 0
+        self._committed_seq = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._write_conn: Optional[sqlite3.Connection] = None
+
         self.init_db()
 
-    def _get_connection(self):
-        return sqlite3.connect(self.db_path)
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Connexion de lecture du thread courant (créée une fois puis réutilisée)."""
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            conn.row_factory = sqlite3.Row
+            self._readers.conn = conn
+            with self._lock:
+                self._reader_conns.append(conn)
+        return conn
+
+    def _read(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        self.flush()
+        return self._get_connection().execute(sql, params).fetchall()
+
+    # ------------------------------------------------------------------
+    # Écritures (thread écrivain + file write-behind)
+    # ------------------------------------------------------------------
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None or not self._writer.is_alive():
+            if self._write_conn is None:
+                self._write_conn = self._connect()
+            self._writer = threading.Thread(target=self._writer_loop, name="brs-writer", daemon=True)
+            self._writer.start()
+
+    def _enqueue(self, statements: List[Statement]) -> None:
+        with self._lock:
+            self._ensure_writer()
+            self._enqueued_seq += 1
+            self._queue.put((self._enqueued_seq, statements))
+
+    def _writer_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._apply_batch(batch)
+            with self._committed:
+                self._committed_seq = batch[-1][0]
+                self._committed.notify_all()
+            if stop:
+                return
+
+    def _apply_batch(self, batch: List[Tuple[int, List[Statement]]]) -> None:
+        conn = self._write_conn
+        try:
+            with conn:
+                for _, statements in batch:
+                    for sql, params in statements:
+                        conn.execute(sql, params)
+            return
+        except sqlite3.Error as e:
+            logger.warning(f"[BRS] Batch write failed ({e}), retrying {len(batch)} writes one by one")
+
+        # Isoler l'écriture fautive sans perdre les autres
+        for seq, statements in batch:
+            try:
+                with conn:
+                    for sql, params in statements:
+                        conn.execute(sql, params)
+            except sqlite3.Error as e:
+                logger.error(f"[BRS] Write #{seq} dropped: {e}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Attend que toutes les écritures soumises jusqu'ici soient commitées."""
+        with self._committed:
+            target = self._enqueued_seq
+            if self._committed_seq >= target:
+                return True
+            return self._committed.wait_for(lambda: self._committed_seq >= target, timeout)
+
+    def close(self) -> None:
+        """Vide la file d'écriture puis ferme toutes les connexions."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+            if writer is not None and writer.is_alive():
+                self._queue.put(_STOP)
+        if writer is not None:
+            writer.join()
+        with self._lock:
+            conns = self._reader_conns + ([self._write_conn] if self._write_conn else [])
+            self._reader_conns = []
+            self._write_conn = None
+            self._readers = threading.local()
+        for conn in conns:
+            conn.close()
 
     def init_db(self):
         """Initialise les tables si elles n'existent pas."""
         logger.info(f"[BRS] Initializing SQLite storage at {self.db_path}")
-        with self._get_connection() as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # Table Sessions
@@ -51,19 +240,12 @@ class BRSStorage:
                 )
             """)
             
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id, provider, created_at)"
+            )
+
             # FTS5 — migration auto si schema obsolète
-            try:
-                cursor.execute("SELECT session_id FROM messages_fts LIMIT 1")
-            except sqlite3.OperationalError:
-                # Ancien schema sans session_id → drop + recreate
-                cursor.execute("DROP TABLE IF EXISTS messages_fts")
-                try:
-                    cursor.execute("""
-                        CREATE VIRTUAL TABLE messages_fts
-                        USING fts5(session_id UNINDEXED, provider UNINDEXED, content)
-                    """)
-                except sqlite3.OperationalError as e:
-                    logger.warning(f"[BRS] FTS5 not supported: {e}")
+            self._init_fts(cursor)
 
             # Table Nuggets (Pépites)
             cursor.execute("""
@@ -91,52 +273,58 @@ class BRSStorage:
             """)
             
             conn.commit()
+        conn.close()
+
+    def _init_fts(self, cursor: sqlite3.Cursor) -> None:
+        """Crée messages_fts, ou la reconstruit et la réindexe si le schéma ou le tokenizer a changé."""
+        # Repli sur unicode61 si le tokenizer demandé n'est pas compilé dans SQLite
+        for tokenizer in dict.fromkeys([self.tokenizer, "unicode61"]):
+            create_sql = (
+                "CREATE VIRTUAL TABLE messages_fts USING fts5("
+                f"session_id UNINDEXED, provider UNINDEXED, content, user_id, {FTS_TOKENIZERS[tokenizer]})"
+            )
+            row = cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'"
+            ).fetchone()
+            if row and row[0] == create_sql:
+                self.tokenizer = tokenizer
+                return
+            try:
+                cursor.execute("DROP TABLE IF EXISTS messages_fts")
+                cursor.execute(create_sql)
+            except sqlite3.OperationalError as e:
+                logger.warning(f"[BRS] FTS5 tokenizer '{tokenizer}' not supported: {e}")
+                continue
+            cursor.execute(_SQL_REINDEX_MESSAGES_FTS)
+            self.tokenizer = tokenizer
+            if row:
+                logger.info(f"[BRS] messages_fts rebuilt (tokenizer={tokenizer}, {cursor.rowcount} messages reindexed)")
+            return
 
     def save_session(self, session_id: str, prompt: str, buffer_answers: Dict[str, str], user_id: str = "default"):
         """Sauvegarde ou met à jour une session."""
         created_at = datetime.now().isoformat()
         buffer_json = json.dumps(buffer_answers)
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO sessions (id, user_id, prompt, buffer_answers, created_at)
-                VALUES (?, ?, ?, ?, ?)
-                ON CONFLICT(id) DO UPDATE SET 
-                    prompt=excluded.prompt,
-                    buffer_answers=excluded.buffer_answers
-            """, (session_id, user_id, prompt, buffer_json, created_at))
-            conn.commit()
+        self._enqueue([(_SQL_UPSERT_SESSION, (session_id, user_id, prompt, buffer_json, created_at))])
 
     def save_message(self, session_id: str, provider: str, role: str, content: str):
-        """Sauvegarde un message (accumulé ou unitaire)."""
+        """Sauvegarde un message (accumulé ou unitaire) — non bloquant, écrit par lot."""
         msg_id = str(uuid.uuid4())
         created_at = datetime.now().isoformat()
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO messages (id, session_id, provider, role, content, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (msg_id, session_id, provider, role, content, created_at))
-            # Alimentation FTS5 (role=assistant uniquement — pas besoin d'indexer les prompts user)
-            if role == "assistant":
-                cursor.execute(
-                    "INSERT INTO messages_fts(session_id, provider, content) VALUES (?, ?, ?)",
-                    (session_id, provider, content)
-                )
-            conn.commit()
+        statements: List[Statement] = [
+            (_SQL_INSERT_MESSAGE, (msg_id, session_id, provider, role, content, created_at))
+        ]
+        # Alimentation FTS5 (role=assistant uniquement — pas besoin d'indexer les prompts user)
+        if role == "assistant":
+            statements.append((_SQL_INSERT_MESSAGE_FTS, (session_id, provider, content, session_id)))
+        self._enqueue(statements)
 
     def save_nugget(self, session_id: str, provider: str, text: str) -> Dict[str, Any]:
         """Sauvegarde une pépite."""
         nugget_id = str(uuid.uuid4())[:8]
         created_at = datetime.now().isoformat()
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO nuggets (id, session_id, provider, text, created_at)
-                VALUES (?, ?, ?, ?, ?)
-            """, (nugget_id, session_id, provider, text, created_at))
-            conn.commit()
-            
+        self._enqueue([(_SQL_INSERT_NUGGET, (nugget_id, session_id, provider, text, created_at))])
+
         return {
             "id": nugget_id,
             "text": text,
@@ -146,78 +334,165 @@ class BRSStorage:
 
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Récupère les données d'une session."""
-        with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM sessions WHERE id = ?", (session_id,))
-            row = cursor.fetchone()
-            if row:
-                data = dict(row)
-                data["buffer_answers"] = json.loads(data["buffer_answers"])
-                return data
+        rows = self._read("SELECT * FROM sessions WHERE id = ?", (session_id,))
+        if rows:
+            data = dict(rows[0])
+            data["buffer_answers"] = json.loads(data["buffer_answers"])
+            return data
         return None
 
     def get_messages(self, session_id: str, provider: Optional[str] = None) -> List[Dict[str, Any]]:
         """Récupère l'historique d'une session (filtrable par provider)."""
-        with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            sql = "SELECT provider, role, content, created_at FROM messages WHERE session_id = ?"
-            params = [session_id]
-            
-            if provider:
-                sql += " AND provider = ?"
-                params.append(provider)
-                
-            sql += " ORDER BY created_at ASC"
-            
-            cursor.execute(sql, params)
-            return [dict(row) for row in cursor.fetchall()]
+        sql = "SELECT provider, role, content, created_at FROM messages WHERE session_id = ?"
+        params = [session_id]
 
-    def search(self, query: str, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Recherche plein texte dans les messages (FTS5)."""
-        with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            # snippet() : colonne 2 = content, balises highlight, extrait 20 tokens
-            sql = """
+        if provider:
+            sql += " AND provider = ?"
+            params.append(provider)
+
+        # rowid départage les messages écrits dans la même microseconde
+        sql += " ORDER BY created_at ASC, rowid ASC"
+
+        return [dict(row) for row in self._read(sql, params)]
+
+    def _match_expression(self, query: str, user_id: Optional[str], prefix: bool) -> Optional[str]:
+        """Traduit la saisie utilisateur en expression MATCH sûre (termes entre guillemets, ET implicite)."""
+        terms = query.split()
+        if self.tokenizer == "trigram":
+            # Un trigramme ne peut pas retrouver un terme de moins de 3 caractères
+            terms = [t for t in terms if len(t) >= 3]
+        if not terms:
+            return None
+        quoted = [_fts_quote(t) for t in terms]
+        if prefix and self.tokenizer != "trigram":
+            quoted[-1] += "*"
+        expression = f"content : ({' '.join(quoted)})"
+        if user_id and self.tokenizer != "trigram":
+            # Filtre pris en charge par l'index FTS ; l'égalité exacte est revérifiée en SQL
+            expression = f"user_id : {_fts_quote(user_id)} AND {expression}"
+        return expression
+
+    @staticmethod
+    def _encode_cursor(score: float, rowid: int) -> str:
+        return base64.urlsafe_b64encode(json.dumps([score, rowid]).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[float, int]:
+        try:
+            score, rowid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return float(score), int(rowid)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid search cursor: {cursor!r}") from e
+
+    def search_page(
+        self,
+        query: str,
+        user_id: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        prefix: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Recherche plein texte classée (bm25 pondéré par colonne), paginée par curseur.
+
+        Args:
+            query: Termes recherchés, tous requis (la syntaxe FTS5 est neutralisée)
+            user_id: Restreint aux sessions de cet utilisateur
+            limit: Taille de page (plafonnée à MAX_PAGE_SIZE)
+            cursor: next_cursor renvoyé par la page précédente
+            prefix: Le dernier terme est un préfixe (saisie incrémentale)
+
+        Returns:
+            {"results": [{session_id, provider, excerpt, score}], "next_cursor": str | None}
+        """
+        limit = max(1, min(limit, self.MAX_PAGE_SIZE))
+        expression = self._match_expression(query, user_id, prefix)
+        if expression is None:
+            return {"results": [], "next_cursor": None}
+
+        # snippet() : colonne 2 = content, balises highlight, extrait 20 tokens
+        sql = """
+            SELECT * FROM (
                 SELECT
+                    rowid,
                     session_id,
                     provider,
-                    snippet(messages_fts, 2, '<b>', '</b>', '...', 20) as excerpt
+                    snippet(messages_fts, 2, '<b>', '</b>', '...', 20) as excerpt,
+                    bm25(messages_fts, ?, ?, ?, ?) as score
                 FROM messages_fts
-                WHERE content MATCH ?
-            """
-            params = [query]
-            if user_id:
-                sql += " AND session_id IN (SELECT id FROM sessions WHERE user_id = ?)"
-                params.append(user_id)
-            sql += " ORDER BY rank LIMIT 20"
-            cursor.execute(sql, params)
-            return [dict(row) for row in cursor.fetchall()]
+                WHERE messages_fts MATCH ?
+        """
+        params: List[Any] = [*self.SEARCH_WEIGHTS, expression]
+        if user_id:
+            sql += " AND user_id = ?"
+            params.append(user_id)
+        sql += ")"
+        if cursor:
+            # Pagination par clé (score, rowid) : stable, sans OFFSET
+            last_score, last_rowid = self._decode_cursor(cursor)
+            sql += " WHERE score > ? OR (score = ? AND rowid > ?)"
+            params.extend([last_score, last_score, last_rowid])
+        sql += " ORDER BY score, rowid LIMIT ?"
+        params.append(limit + 1)
+
+        rows = [dict(row) for row in self._read(sql, params)]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1]["score"], rows[-1]["rowid"])
+        for row in rows:
+            del row["rowid"]
+        return {"results": rows, "next_cursor": next_cursor}
+
+    def search(self, query: str, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Recherche plein texte dans les messages (FTS5) : première page de search_page()."""
+        return self.search_page(query, user_id=user_id)["results"]
 
     def get_basket(self, session_id: str) -> List[Dict[str, Any]]:
         """Récupère toutes les pépites d'une session."""
-        with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, text, provider, created_at as timestamp FROM nuggets WHERE session_id = ? ORDER BY created_at DESC", (session_id,))
-            return [dict(row) for row in cursor.fetchall()]
+        rows = self._read(
+            "SELECT id, text, provider, created_at as timestamp FROM nuggets WHERE session_id = ? ORDER BY created_at DESC",
+            (session_id,)
+        )
+        return [dict(row) for row in rows]
 
     def save_document(self, session_id: str, doc_type: str, path: str, content: str):
         """Sauvegarde un document généré."""
         doc_id = str(uuid.uuid4())
         created_at = datetime.now().isoformat()
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO documents (id, session_id, type, path, content, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (doc_id, session_id, doc_type, path, content, created_at))
-            conn.commit()
+        self._enqueue([(_SQL_INSERT_DOCUMENT, (doc_id, session_id, doc_type, path, content, created_at))])
+
+    # ------------------------------------------------------------------
+    # Variantes async (lectures et flush hors boucle événementielle)
+    # ------------------------------------------------------------------
+
+    async def aget_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.get_session, session_id)
+
+    async def aget_messages(self, session_id: str, provider: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.get_messages, session_id, provider)
+
+    async def aget_basket(self, session_id: str) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.get_basket, session_id)
+
+    async def asearch(self, query: str, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.search, query, user_id)
+
+    async def asearch_page(
+        self,
+        query: str,
+        user_id: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        prefix: bool = False,
+    ) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.search_page, query, user_id, limit, cursor, prefix)
+
+    async def aflush(self, timeout: Optional[float] = None) -> bool:
+        return await asyncio.to_thread(self.flush, timeout)
 
 # Singleton logic
 BASE_DIR = Path(__file__).parent.parent.parent.parent
 db_file = BASE_DIR / "exports" / "brs" / "brs_sessions.db"
 storage = BRSStorage(str(db_file))
+atexit.register(storage.close)
@@ -61,7 +61,7 @@ async def capture_nugget(data: CaptureRequest):
 
 @router.get("/basket/{session_id}")
 async def get_basket(session_id: str):
-    return {"session_id": session_id, "basket": storage.get_basket(session_id)}
+    return {"session_id": session_id, "basket": await storage.aget_basket(session_id)}
 
 @router.post("/generate-prd")
 async def generate_prd(data: PRDRequest):
@@ -74,10 +74,19 @@ async def generate_prd(data: PRDRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/search")
-async def search_brainstorm(q: str):
-    """Recherche plein texte dans les messages BRS."""
-    results = storage.search(q)
-    return {"status": "ok", "query": q, "results": results}
+async def search_brainstorm(
+    q: str,
+    user_id: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    prefix: bool = False,
+):
+    """Recherche plein texte dans les messages BRS (classée, paginée par curseur)."""
+    try:
+        page = await storage.asearch_page(q, user_id=user_id, limit=limit, cursor=cursor, prefix=prefix)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "ok", "query": q, "results": page["results"], "next_cursor": page["next_cursor"]}
 
 @router.get("/arbitrate/{session_id}")
 async def arbitrate_session(session_id: str):
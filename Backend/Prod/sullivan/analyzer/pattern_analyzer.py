@@ -68,8 +68,8 @@ class PatternAnalyzer:
         star_patterns_by_category: Dict[str, List[str]] = defaultdict(list)
         
         try:
-            from ..intent_translator import IntentTranslator
-            intent_translator = IntentTranslator()
+            from ..intent_translator import get_intent_translator
+            intent_translator = get_intent_translator()
             
             for comp in components:
                 # Essayer d'extraire l'intent depuis le nom ou metadata
@@ -132,10 +132,10 @@ class ComponentGenerator:
         """
         try:
             # Lazy import d'IntentTranslator pour éviter dépendances circulaires
-            from ..intent_translator import IntentTranslator
+            from ..intent_translator import get_intent_translator
             
-            # Créer instance IntentTranslator
-            intent_translator = IntentTranslator()
+            # Instance partagée (mappings et embeddings chargés une fois)
+            intent_translator = get_intent_translator()
             
             # Rechercher situations similaires avec embeddings
             situations = intent_translator.search_situation(intent, limit=3)
@@ -577,8 +577,8 @@ class ComponentGenerator:
                 
                 # Ajouter patterns STAR si disponibles
                 try:
-                    from ..intent_translator import IntentTranslator
-                    intent_translator = IntentTranslator()
+                    from ..intent_translator import get_intent_translator
+                    intent_translator = get_intent_translator()
                     situations = intent_translator.search_situation(intent, limit=1)
                     if situations:
                         realisation = intent_translator.propagate_star(situations[0])
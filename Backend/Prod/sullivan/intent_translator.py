@@ -1,11 +1,14 @@
 """IntentTranslator - Traduction d'intentions avec système STAR (Situation, Transformation, Abstraction, Réalisation)."""
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import re
+import threading
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 from loguru import logger
@@ -22,6 +25,8 @@ except ImportError:
         EMBEDDINGS_AVAILABLE = False
         logger.debug("EmbeddingModelSingleton not available. Semantic scoring will use fallback.")
 
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
 
 class Situation:
     """Représente une situation dans la chaîne STAR."""
@@ -106,27 +111,37 @@ class IntentTranslator:
     Charge les mappings depuis star_mappings.json et permet de rechercher
     des situations, propager la chaîne STAR, et calculer des scores de similarité
     avec embeddings sémantiques.
+    
+    Les embeddings des situations sont calculés une seule fois au chargement
+    (matrice float32 normalisée, persistée à côté de star_mappings.json et
+    invalidée par hash) : une recherche coûte un encodage de la requête et un
+    produit matrice-vecteur.
     """
     
-    def __init__(self, mappings_path: Optional[Path] = None):
+    def __init__(self, mappings_path: Optional[Path] = None, embedding_model: Optional[Any] = None):
         """
         Initialise IntentTranslator.
         
         Args:
             mappings_path: Chemin vers star_mappings.json (optionnel, utilise chemin par défaut)
+            embedding_model: Modèle avec encode() (optionnel, défaut : all-MiniLM-L6-v2 partagé)
         """
         self.index_situations: List[Situation] = []
         self.index_transformations: List[Transformation] = []
         self.index_abstractions: List[Abstraction] = []
         self.index_realisations: List[Realisation] = []
         self._mappings_by_pattern: Dict[str, Dict] = {}  # Mapping pattern_name -> full mapping dict
+        # Embeddings normalisés des situations (une ligne par index_situations)
+        self._situation_matrix: Optional[np.ndarray] = None
+        # Empreinte des mappings + modèle (invalide les caches de résultats en aval)
+        self.mappings_digest: str = ""
         
         # Charger modèle d'embeddings si disponible
-        self._embedding_model = None
-        if EMBEDDINGS_AVAILABLE:
+        self._embedding_model = embedding_model
+        if self._embedding_model is None and EMBEDDINGS_AVAILABLE:
             try:
                 embedding_singleton = EmbeddingModelSingleton()
-                self._embedding_model = embedding_singleton.get_model("all-MiniLM-L6-v2")
+                self._embedding_model = embedding_singleton.get_model(EMBEDDING_MODEL_NAME)
                 if self._embedding_model:
                     logger.info("Embedding model loaded for semantic scoring")
             except Exception as e:
@@ -235,6 +250,16 @@ class IntentTranslator:
             
             logger.info(f"Loaded {len(self.index_situations)} STAR mappings successfully")
             
+            model_name = (
+                getattr(self._embedding_model, "model_name", EMBEDDING_MODEL_NAME)
+                if self._embedding_model is not None else "word-count"
+            )
+            self.mappings_digest = hashlib.sha256(
+                json.dumps([model_name, mappings], ensure_ascii=False, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+            
+            self._build_situation_index(mappings_path)
+            
         except FileNotFoundError:
             logger.warning(f"star_mappings.json not found at {mappings_path}. Indexes will be empty.")
         except json.JSONDecodeError as e:
@@ -242,6 +267,63 @@ class IntentTranslator:
         except Exception as e:
             logger.error(f"Unexpected error loading mappings: {e}", exc_info=True)
     
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode des textes en un seul appel au modèle.
+        
+        Returns:
+            Matrice float32 (len(texts), dim) aux lignes normalisées
+        """
+        vectors = np.asarray(self._embedding_model.encode(texts, convert_to_numpy=True), dtype=np.float32)
+        vectors = vectors.reshape(len(texts), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+    
+    def _build_situation_index(self, mappings_path: Path) -> None:
+        """
+        Calcule (ou recharge) la matrice d'embeddings des situations.
+        
+        Le cache star_mappings.embeddings.npz est invalidé par un hash des
+        descriptions et du nom du modèle.
+        
+        Args:
+            mappings_path: Chemin vers star_mappings.json
+        """
+        if self._embedding_model is None or not self.index_situations:
+            return
+        
+        descriptions = [situation.description for situation in self.index_situations]
+        model_name = getattr(self._embedding_model, "model_name", EMBEDDING_MODEL_NAME)
+        digest = hashlib.sha256(
+            json.dumps([model_name, descriptions], ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        cache_path = mappings_path.with_name(f"{mappings_path.stem}.embeddings.npz")
+        
+        try:
+            with np.load(cache_path) as cached:
+                if str(cached["digest"]) == digest:
+                    self._situation_matrix = cached["matrix"].astype(np.float32, copy=False)
+                    logger.debug(f"Situation embeddings loaded from {cache_path}")
+                    return
+        except (OSError, KeyError, ValueError):
+            pass
+        
+        try:
+            self._situation_matrix = self._encode(descriptions)
+        except Exception as e:
+            logger.warning(f"Error encoding situations: {e}. Falling back to word count.")
+            return
+        
+        try:
+            tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, digest=np.array(digest), matrix=self._situation_matrix)
+            os.replace(tmp_path, cache_path)
+            logger.info(f"Situation embeddings ({len(descriptions)}) saved to {cache_path}")
+        except OSError as e:
+            logger.debug(f"Could not persist situation embeddings: {e}")
+    
     def parse_query(self, query: str) -> Dict[str, List[str]]:
         """
         Extrait les entités (éléments, actions, conditions) de la requête.
@@ -277,6 +359,15 @@ class IntentTranslator:
         Returns:
             Score de similarité entre 0 et 1
         """
+        if self._situation_matrix is not None:
+            try:
+                position = self.index_situations.index(situation)
+                similarity = float(self._situation_matrix[position] @ self._encode([query])[0])
+                # Normaliser entre 0 et 1 (cos_sim retourne -1 à 1)
+                return max(0.0, min(1.0, (similarity + 1) / 2))
+            except ValueError:
+                pass  # situation hors index : encodage direct ci-dessous
+        
         if self._embedding_model is not None:
             try:
                 from sentence_transformers import util
@@ -309,8 +400,9 @@ class IntentTranslator:
         """
         Recherche des situations similaires à la requête.
         
-        Utilise score_mapping() avec embeddings pour scorer chaque situation,
-        puis retourne les top N triés par pertinence.
+        Avec embeddings : un encodage de la requête puis un produit
+        matrice-vecteur sur l'index précalculé (top-k). Sinon, score_mapping()
+        (comptage de mots) sur chaque situation.
         
         Args:
             query: Requête utilisateur
@@ -319,26 +411,50 @@ class IntentTranslator:
         Returns:
             Liste de Situation triée par score décroissant
         """
+        return self.search_situations([query], limit=limit)[0]
+    
+    def search_situations(self, queries: List[str], limit: int = 5) -> List[List[Situation]]:
+        """
+        Recherche par lot : un seul encodage pour toutes les requêtes.
+        
+        Args:
+            queries: Requêtes utilisateur
+            limit: Nombre maximum de résultats par requête
+            
+        Returns:
+            Pour chaque requête, liste de Situation triée par score décroissant
+        """
         if not self.index_situations:
             logger.warning("No situations in index. Returning empty list.")
+            return [[] for _ in queries]
+        if not queries:
             return []
         
-        scored_situations: List[Tuple[float, Situation]] = []
-        
-        for situation in self.index_situations:
+        if self._situation_matrix is not None:
             try:
-                score = self.score_mapping(query, situation)
-                scored_situations.append((score, situation))
+                # (requêtes × dim) @ (dim × situations) : similarités cosinus
+                scores = self._encode(list(queries)) @ self._situation_matrix.T
+                return [self._top_k(row, limit) for row in scores]
             except Exception as e:
-                logger.warning(f"Error scoring situation {situation.id}: {e}")
-                continue
-        
-        # Trier par score décroissant
-        scored_situations.sort(key=lambda x: x[0], reverse=True)
+                logger.warning(f"Error calculating embeddings: {e}. Falling back to word count.")
         
-        # Retourner top N
-        results = [situation for _, situation in scored_situations[:limit]]
-        logger.info(f"Found {len(results)} situations for query '{query}'")
+        results = []
+        for query in queries:
+            scores = np.zeros(len(self.index_situations), dtype=np.float32)
+            for position, situation in enumerate(self.index_situations):
+                try:
+                    scores[position] = self.score_mapping(query, situation)
+                except Exception as e:
+                    logger.warning(f"Error scoring situation {situation.id}: {e}")
+                    scores[position] = -np.inf
+            results.append(self._top_k(scores, limit))
+        return results
+    
+    def _top_k(self, scores: np.ndarray, limit: int) -> List[Situation]:
+        """Top-k par score décroissant (ordre stable à égalité, comme un tri)."""
+        order = np.argsort(-scores, kind="stable")[:limit]
+        results = [self.index_situations[i] for i in order if np.isfinite(scores[i])]
+        logger.debug(f"Found {len(results)} situations")
         return results
 
     def propagate_star(self, situation: Situation) -> Optional[Realisation]:
@@ -363,4 +479,30 @@ class IntentTranslator:
         
         realisation = mapping_data['realisation']
         logger.info(f"Propagated STAR for '{situation.pattern_name}': {realisation.description}")
-        return realisation
\ No newline at end of file
+        return realisation
+
+
+_translators: Dict[Path, IntentTranslator] = {}
+_translators_lock = threading.Lock()
+
+
+def get_intent_translator(mappings_path: Optional[Path] = None) -> IntentTranslator:
+    """
+    Instance partagée par processus (mappings et embeddings chargés une fois).
+    
+    Args:
+        mappings_path: Chemin vers star_mappings.json (optionnel, utilise chemin par défaut)
+    """
+    key = Path(mappings_path) if mappings_path else Path(__file__).parent / "knowledge" / "star_mappings.json"
+    with _translators_lock:
+        translator = _translators.get(key)
+        if translator is None:
+            translator = IntentTranslator(key)
+            _translators[key] = translator
+        return translator
+
+
+def reset_intent_translator() -> None:
+    """Vide les instances partagées (rechargement des mappings, isolation des tests)."""
+    with _translators_lock:
+        _translators.clear()
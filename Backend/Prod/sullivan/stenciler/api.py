@@ -211,21 +211,21 @@ async def undo_modification():
         success: bool, error si échec
     """
     try:
-        success, error = genome_manager.undo(modification_log)
+        success, error = genome_manager.undo()
 
         if not success:
             return {
                 "success": False,
                 "error": error,
-                "can_undo": modification_log.can_undo(),
-                "can_redo": modification_log.can_redo()
+                "can_undo": genome_manager.can_undo(),
+                "can_redo": genome_manager.can_redo()
             }
 
         return {
             "success": True,
             "message": "Modification annulée",
-            "can_undo": modification_log.can_undo(),
-            "can_redo": modification_log.can_redo()
+            "can_undo": genome_manager.can_undo(),
+            "can_redo": genome_manager.can_redo()
         }
     except Exception as e:
         raise HTTPException(
@@ -243,21 +243,21 @@ async def redo_modification():
         success: bool, error si échec
     """
     try:
-        success, error = genome_manager.redo(modification_log)
+        success, error = genome_manager.redo()
 
         if not success:
             return {
                 "success": False,
                 "error": error,
-                "can_undo": modification_log.can_undo(),
-                "can_redo": modification_log.can_redo()
+                "can_undo": genome_manager.can_undo(),
+                "can_redo": genome_manager.can_redo()
             }
 
         return {
             "success": True,
             "message": "Modification refaite",
-            "can_undo": modification_log.can_undo(),
-            "can_redo": modification_log.can_redo()
+            "can_undo": genome_manager.can_undo(),
+            "can_redo": genome_manager.can_redo()
         }
     except Exception as e:
         raise HTTPException(
@@ -0,0 +1,193 @@
+"""
+GenomeJournal — Journal append-only des modifications du Genome
+
+Responsabilités :
+- Ajoute chaque modification en une ligne JSONL (write + flush : coût constant)
+- Regroupe les fsync (au plus un toutes les fsync_interval secondes)
+- Déclenche la compaction en arrière-plan (après compaction_delay secondes
+  d'inactivité ou compact_every entrées) : le snapshot complet est réécrit
+  et le journal tronqué
+- Relit le journal au démarrage (une dernière ligne tronquée par un crash
+  est ignorée)
+
+Format :
+    {"type": "header", "snapshot_seq": N, "undo": [...], "redo": [...]}
+    {"seq": N+1, "op": "set", "path": "n0[0]", "property": "...", "old_value": ..., "new_value": ...}
+    ...
+
+Les entrées de seq <= snapshot_seq sont déjà incluses dans le fichier snapshot ;
+rejouer une entrée déjà appliquée est sans effet (affectations absolues).
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class GenomeJournal:
+    """Journal JSONL avec fsync groupés et compaction différée"""
+
+    def __init__(
+        self,
+        journal_path: str,
+        compact_fn: Optional[Callable[[], Any]] = None,
+        fsync_interval: float = 0.2,
+        compaction_delay: float = 2.0,
+        compact_every: int = 500
+    ):
+        """
+        Args:
+            journal_path: Chemin du fichier .jsonl
+            compact_fn: Callback de compaction (écrit le snapshot puis appelle rewrite)
+            fsync_interval: Délai max entre une écriture et son fsync
+            compaction_delay: Inactivité avant compaction
+            compact_every: Nombre d'entrées déclenchant une compaction immédiate
+        """
+        self.journal_path = journal_path
+        self.compact_fn = compact_fn
+        self.fsync_interval = fsync_interval
+        self.compaction_delay = compaction_delay
+        self.compact_every = compact_every
+
+        self.snapshot_seq = 0
+        self.last_seq = 0
+        # Entrées postérieures au dernier snapshot (réécrites à la compaction)
+        self.tail: List[Dict[str, Any]] = []
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._dirty = False
+        self._last_append = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Relit le journal
+
+        Returns:
+            (header, entrées) — header vide par défaut si pas de journal
+        """
+        header: Dict[str, Any] = {"type": "header", "snapshot_seq": 0, "undo": [], "redo": []}
+        entries: List[Dict[str, Any]] = []
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Dernière ligne partiellement écrite lors d'un crash
+                        print(f"⚠️ Entrée de journal illisible ignorée : {line[:80]}")
+                        continue
+                    if record.get("type") == "header":
+                        header = record
+                    else:
+                        entries.append(record)
+        except FileNotFoundError:
+            pass
+
+        self.snapshot_seq = header.get("snapshot_seq", 0)
+        self.last_seq = max([self.snapshot_seq] + [e.get("seq", 0) for e in entries])
+        self.tail = [e for e in entries if e.get("seq", 0) > self.snapshot_seq]
+        return header, entries
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """
+        Ajoute une entrée (écrite immédiatement, fsync groupé)
+
+        Returns:
+            Numéro de séquence attribué
+        """
+        with self._lock:
+            self.last_seq += 1
+            record = {"seq": self.last_seq, **entry}
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.journal_path)), exist_ok=True)
+                self._file = open(self.journal_path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self.tail.append(record)
+            self._last_append = time.monotonic()
+            was_dirty, self._dirty = self._dirty, True
+
+        self._ensure_worker()
+        if not was_dirty or len(self.tail) >= self.compact_every:
+            self._wake.set()
+        return record["seq"]
+
+    def sync(self) -> None:
+        """fsync des écritures en attente"""
+        with self._lock:
+            if self._file is not None and self._dirty:
+                os.fsync(self._file.fileno())
+                self._dirty = False
+
+    def rewrite(self, snapshot_seq: int, undo: List[Dict], redo: List[Dict]) -> None:
+        """
+        Tronque le journal après écriture d'un snapshot couvrant snapshot_seq
+
+        Args:
+            snapshot_seq: Dernière séquence incluse dans le snapshot
+            undo: Pile undo au moment du snapshot
+            redo: Pile redo au moment du snapshot
+        """
+        with self._lock:
+            kept = [e for e in self.tail if e["seq"] > snapshot_seq]
+            header = {"type": "header", "snapshot_seq": snapshot_seq, "undo": undo, "redo": redo}
+            tmp_path = self.journal_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(header, ensure_ascii=False) + "\n")
+                for entry in kept:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            os.replace(tmp_path, self.journal_path)
+            self.snapshot_seq = snapshot_seq
+            self.tail = kept
+            self._dirty = False
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None and self.compact_fn is not None:
+            self._thread = threading.Thread(target=self._run, name="genome-journal", daemon=True)
+            self._thread.start()
+
+    def _needs_compaction(self) -> bool:
+        if not self.tail:
+            return False
+        idle = time.monotonic() - self._last_append
+        return len(self.tail) >= self.compact_every or idle >= self.compaction_delay
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            # Dort tant que rien n'est en attente
+            pending = self._dirty or bool(self.tail)
+            self._wake.wait(self.fsync_interval if pending else None)
+            self._wake.clear()
+            try:
+                self.sync()
+                if self._needs_compaction():
+                    self.compact_fn()
+            except Exception as e:
+                print(f"⚠️ Erreur persistance journal : {e}")
+
+    def close(self) -> None:
+        """Arrête le thread de fond et synchronise le fichier"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.sync()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -3,25 +3,40 @@ GenomeStateManager — Pilier 1 du Système Cognitif
 
 Responsabilités :
 - Gère l'état actuel du Genome en mémoire
-- Applique les modifications de manière immutable
-- Fournit des snapshots pour rollback
+- Applique les modifications de manière immutable (arbre persistant : seuls
+  les nœuds du chemin n0[i].n1[j]... sont copiés, le reste est partagé)
+- Fournit des snapshots pour rollback (partagent les sous-arbres inchangés)
 - Reconstruit l'état à partir de l'event log
+- Persiste chaque modification dans un journal append-only (GenomeJournal),
+  compacté en arrière-plan dans genome_v2_modified.json
 
 Conformité : CONSTITUTION_AETHERFLOW v1.0.0
 """
 
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Mapping, Optional, Tuple
+from types import MappingProxyType
 from datetime import datetime
 from dataclasses import dataclass
+from collections import deque
 import copy
 import json
+import os
+import threading
+
+from .genome_journal import GenomeJournal
 
 
 @dataclass
 class ModificationResult:
-    """Résultat d'une tentative de modification"""
+    """
+    Résultat d'une tentative de modification
+
+    modified_genome est une vue en lecture seule de l'état courant : ses sous-arbres
+    sont partagés avec les snapshots et l'historique, ils ne doivent pas être mutés
+    (get_modified_genome() pour une copie modifiable).
+    """
     success: bool
-    modified_genome: Optional[Dict] = None
+    modified_genome: Optional[Mapping] = None
     error: Optional[str] = None
     validation_errors: Optional[List[str]] = None
     snapshot_id: Optional[str] = None
@@ -48,6 +63,38 @@ class GenomeState:
     last_modified: datetime
 
 
+def _assoc_in(node: Dict, steps: List[Tuple[str, int]], property: str, value: Any) -> Dict:
+    """
+    Retourne une copie de node où node[steps...][property] = value
+
+    Seuls les dicts et listes le long du chemin sont copiés (copie superficielle) ;
+    tous les autres sous-arbres sont partagés avec l'original. Les clés qui
+    référencent la même liste (ex. 'n0' et 'n0_phases') restent alias.
+
+    Args:
+        node: Nœud racine (non modifié)
+        steps: Chemin parsé [(level, index), ...]
+        property: Propriété à écrire sur le nœud final
+        value: Nouvelle valeur
+
+    Returns:
+        Nouveau nœud racine
+    """
+    new_node = dict(node)
+    if not steps:
+        new_node[property] = value
+        return new_node
+
+    level, index = steps[0]
+    children = node[level]
+    new_children = list(children)
+    new_children[index] = _assoc_in(children[index], steps[1:], property, value)
+    for key, child in node.items():
+        if child is children:
+            new_node[key] = new_children
+    return new_node
+
+
 class GenomeStateManager:
     """
     Gestionnaire d'état du Genome avec event sourcing
@@ -57,30 +104,62 @@ class GenomeStateManager:
     - genome_current : État actuel après toutes les modifications
     - snapshots : Dict de snapshots pour rollback rapide
     - modification_log : Liste des modifications (géré par ModificationLog)
+
+    Les états (genome_current, snapshots) ne sont jamais mutés sur place :
+    une modification produit un nouvel arbre par copie de chemin. Les nœuds
+    retournés par get_node_by_path et ModificationResult.modified_genome sont
+    donc en lecture seule ; get_modified_genome() et reconstruct_state()
+    retournent des copies.
     """
 
-    def __init__(self, genome_path: str, modified_genome_path: Optional[str] = None):
+    MAX_HISTORY = 50
+
+    def __init__(
+        self,
+        genome_path: str,
+        modified_genome_path: Optional[str] = None,
+        autosave: bool = True,
+        journal_path: Optional[str] = None,
+        compaction_delay: float = 2.0
+    ):
         """
         Initialise le manager avec le Genome de référence
 
         Args:
             genome_path: Chemin vers genome_reference.json
             modified_genome_path: Chemin vers genome_v2_modified.json (optionnel)
+            autosave: Journaliser chaque modification sur disque
+            journal_path: Chemin du journal (défaut : <modified>.journal.jsonl)
+            compaction_delay: Inactivité (s) avant compaction du journal dans le snapshot
         """
         self.genome_path = genome_path
+        self.autosave = autosave
         self.modified_genome_path = modified_genome_path or genome_path.replace('.json', '_modified.json')
 
-        # Tenter de charger le genome modifié, sinon charger le base
+        # Piles undo/redo (entrées 'set' du journal)
+        self._undo_stack: deque = deque(maxlen=self.MAX_HISTORY)
+        self._redo_stack: deque = deque(maxlen=self.MAX_HISTORY)
+        self._state_lock = threading.RLock()
+
+        self.journal: Optional[GenomeJournal] = None
+        if autosave:
+            self.journal = GenomeJournal(
+                journal_path or self.modified_genome_path.replace('.json', '.journal.jsonl'),
+                compact_fn=self.save_to_file,
+                compaction_delay=compaction_delay
+            )
+
+        # Tenter de charger le genome modifié, sinon charger le base, puis rejouer le journal
         self.genome_base = self._load_genome(genome_path)
-        self.genome_current = self._load_modified_genome()
+        self.genome_current = self._replay_journal(self._load_modified_genome())
 
         # Snapshots pour rollback
         self.snapshots: Dict[str, Dict] = {}
         self.modification_count = 0
 
-        # Snapshot initial
+        # Snapshot initial (partage l'arbre : aucun état n'est muté sur place)
         self.last_snapshot_id = self._create_snapshot_id()
-        self.snapshots[self.last_snapshot_id] = copy.deepcopy(self.genome_current)
+        self.snapshots[self.last_snapshot_id] = self.genome_current
 
         print(f"✅ GenomeStateManager initialisé : {len(self.genome_base.get('n0', []))} Corps chargés")
 
@@ -135,26 +214,85 @@ class GenomeStateManager:
 
         except FileNotFoundError:
             print(f"ℹ️ Aucun genome modifié trouvé, utilisation du genome de base")
-            return copy.deepcopy(self.genome_base)
+            return self.genome_base
         except json.JSONDecodeError as e:
             print(f"⚠️ Erreur lecture genome modifié, utilisation du genome de base : {e}")
-            return copy.deepcopy(self.genome_base)
+            return self.genome_base
+
+
+    def _replay_journal(self, genome: Dict) -> Dict:
+        """
+        Rejoue les entrées du journal postérieures au snapshot et reconstruit undo/redo
+
+        Args:
+            genome: Genome chargé depuis le snapshot
+
+        Returns:
+            Genome à jour
+        """
+        if self.journal is None:
+            return genome
+
+        header, entries = self.journal.load()
+        self._undo_stack.extend(header.get("undo", []))
+        self._redo_stack.extend(header.get("redo", []))
+
+        replayed = 0
+        for entry in entries:
+            if entry["seq"] > header.get("snapshot_seq", 0):
+                try:
+                    genome = _assoc_in(genome, self._parse_path(entry["path"]), entry["property"], entry["new_value"])
+                    replayed += 1
+                except (KeyError, IndexError, TypeError, ValueError) as e:
+                    print(f"⚠️ Entrée de journal {entry['seq']} non rejouable : {e}")
+            self._track_history(entry)
+
+        if replayed:
+            print(f"✅ Journal rejoué : {replayed} modification(s) depuis {self.journal.journal_path}")
+        return genome
+
+
+    def _track_history(self, entry: Dict) -> None:
+        """Met à jour les piles undo/redo à partir d'une entrée du journal"""
+        op = entry.get("op", "set")
+        if op == "set":
+            self._undo_stack.append(entry)
+            self._redo_stack.clear()
+        elif op == "undo" and self._undo_stack:
+            self._redo_stack.append(self._undo_stack.pop())
+        elif op == "redo" and self._redo_stack:
+            self._undo_stack.append(self._redo_stack.pop())
 
 
     def save_to_file(self) -> bool:
         """
-        Sauvegarde le Genome actuel dans genome_v2_modified.json
+        Sauvegarde le Genome actuel dans genome_v2_modified.json (compaction)
+
+        Le snapshot est écrit de façon atomique (fichier temporaire + rename),
+        puis le journal est tronqué aux entrées postérieures au snapshot.
+        Appelé en arrière-plan par le journal ; peut aussi être appelé explicitement.
 
         Returns:
             True si succès, False sinon
         """
         try:
-            # Créer une copie propre du genome actuel
-            genome_to_save = copy.deepcopy(self.genome_current)
-
-            # Sauvegarder avec indentation pour lisibilité
-            with open(self.modified_genome_path, 'w', encoding='utf-8') as f:
-                json.dump(genome_to_save, f, indent=2, ensure_ascii=False)
+            # Capture cohérente état / séquence ; genome_current est immuable :
+            # la sérialisation se fait hors verrou, sans copie
+            with self._state_lock:
+                genome = self.genome_current
+                seq = self.journal.last_seq if self.journal else 0
+                undo = list(self._undo_stack)
+                redo = list(self._redo_stack)
+
+            tmp_path = self.modified_genome_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(genome, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.modified_genome_path)
+
+            if self.journal is not None:
+                self.journal.rewrite(seq, undo, redo)
 
             print(f"✅ Genome sauvegardé dans : {self.modified_genome_path}")
             return True
@@ -309,22 +447,15 @@ class GenomeStateManager:
                 validation_errors=validation_errors
             )
 
-        # 2. Navigation vers le nœud
-        node, error = self._navigate_to_node(path)
+        # 2-4. Navigation, application par copie de chemin et journalisation
+        mod_id = modification_id or f"mod_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        _, error = self._commit(path, property, value, op="set", modification_id=mod_id)
         if error:
             return ModificationResult(
                 success=False,
                 error=f"Navigation échouée : {error}"
             )
 
-        # 3. Sauvegarde de l'ancienne valeur (pour rollback)
-        old_value = node.get(property, None)
-
-        # 4. Application de la modification (immutable via deepcopy)
-        self.genome_current = copy.deepcopy(self.genome_current)
-        node_updated, _ = self._navigate_to_node(path)
-        node_updated[property] = value
-
         # 5. Création snapshot si seuil atteint (50 modifs OU 5 min)
         self.modification_count += 1
         snapshot_id = None
@@ -332,19 +463,55 @@ class GenomeStateManager:
         if self.modification_count % 50 == 0:
             snapshot_id = self.save_checkpoint()
 
-        # 6. Log modification (sera géré par ModificationLog)
-        mod_id = modification_id or f"mod_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
-
-        # 7. Sauvegarde automatique sur disque
-        self.save_to_file()
-
         return ModificationResult(
             success=True,
-            modified_genome=self.genome_current,
+            modified_genome=MappingProxyType(self.genome_current),
             snapshot_id=snapshot_id
         )
 
 
+    def _commit(
+        self,
+        path: str,
+        property: str,
+        value: Any,
+        op: str,
+        modification_id: str
+    ) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Applique value sur le nœud et ajoute l'entrée au journal
+
+        Returns:
+            (entrée du journal, error)
+        """
+        with self._state_lock:
+            node, error = self._navigate_to_node(path)
+            if error:
+                return None, error
+
+            # Ancienne valeur conservée pour undo
+            old_value = node.get(property, None)
+
+            # Copie de chemin : O(profondeur), indépendant de la taille du Genome
+            self.genome_current = _assoc_in(self.genome_current, self._parse_path(path), property, value)
+
+            entry = {
+                "ts": datetime.now().isoformat(),
+                "id": modification_id,
+                "op": op,
+                "path": path,
+                "property": property,
+                "old_value": old_value,
+                "new_value": value
+            }
+            # Journalisation : une ligne ajoutée, fsync et compaction différés
+            if self.journal is not None:
+                entry["seq"] = self.journal.append(entry)
+            if op == "set":
+                self._track_history(entry)
+            return entry, None
+
+
     def get_modified_genome(self) -> Dict:
         """
         Retourne le Genome actuel avec toutes les modifications
@@ -369,8 +536,16 @@ class GenomeStateManager:
             print(f"❌ Snapshot {snapshot_id} introuvable")
             return False
 
-        self.genome_current = copy.deepcopy(self.snapshots[snapshot_id])
-        self.last_snapshot_id = snapshot_id
+        with self._state_lock:
+            self.genome_current = self.snapshots[snapshot_id]
+            self.last_snapshot_id = snapshot_id
+            # L'historique décrit des modifications postérieures au snapshot : il ne s'applique plus
+            self._undo_stack.clear()
+            self._redo_stack.clear()
+
+        # Le rollback n'est pas exprimé dans le journal : snapshot complet
+        if self.autosave:
+            self.save_to_file()
 
         print(f"✅ Rollback vers {snapshot_id} réussi")
         return True
@@ -384,72 +559,88 @@ class GenomeStateManager:
             ID du snapshot créé
         """
         snapshot_id = self._create_snapshot_id()
-        self.snapshots[snapshot_id] = copy.deepcopy(self.genome_current)
+        self.snapshots[snapshot_id] = self.genome_current
         self.last_snapshot_id = snapshot_id
 
         print(f"✅ Checkpoint sauvegardé : {snapshot_id}")
         return snapshot_id
 
 
-    def undo(self, modification_log: Any) -> Tuple[bool, Optional[str]]:
+    def undo(self, modification_log: Any = None) -> Tuple[bool, Optional[str]]:
         """
         Annule la dernière modification (ÉTAPE 7)
 
+        L'historique provient du journal (survit aux redémarrages).
+
         Args:
-            modification_log: Instance de ModificationLog
+            modification_log: Conservé pour compatibilité (non utilisé)
 
         Returns:
             (success, error_message)
         """
-        # Récupérer la dernière modification depuis modification_log
-        modification = modification_log.undo()
-
-        if not modification:
-            return False, "Aucune modification à annuler"
-
-        # Appliquer l'inverse de la modification (old_value devient la nouvelle valeur)
-        result = self.apply_modification(
-            path=modification.path,
-            property=modification.property,
-            value=modification.old_value,
-            modification_id=f"undo_{modification.id}"
-        )
+        with self._state_lock:
+            if not self._undo_stack:
+                return False, "Aucune modification à annuler"
+
+            modification = self._undo_stack[-1]
+            # Appliquer l'inverse de la modification (old_value devient la nouvelle valeur)
+            _, error = self._commit(
+                modification["path"],
+                modification["property"],
+                modification["old_value"],
+                op="undo",
+                modification_id=f"undo_{modification['id']}"
+            )
+            if error:
+                return False, error
+            self._redo_stack.append(self._undo_stack.pop())
 
-        if result.success:
-            print(f"✅ Undo appliqué : {modification.property} = {modification.old_value}")
-            return True, None
-        else:
-            return False, result.error
+        print(f"✅ Undo appliqué : {modification['property']} = {modification['old_value']}")
+        return True, None
 
-    def redo(self, modification_log: Any) -> Tuple[bool, Optional[str]]:
+    def redo(self, modification_log: Any = None) -> Tuple[bool, Optional[str]]:
         """
         Refait la dernière modification annulée (ÉTAPE 7)
 
         Args:
-            modification_log: Instance de ModificationLog
+            modification_log: Conservé pour compatibilité (non utilisé)
 
         Returns:
             (success, error_message)
         """
-        # Récupérer la modification à refaire depuis modification_log
-        modification = modification_log.redo()
+        with self._state_lock:
+            if not self._redo_stack:
+                return False, "Aucune modification à refaire"
+
+            modification = self._redo_stack[-1]
+            _, error = self._commit(
+                modification["path"],
+                modification["property"],
+                modification["new_value"],
+                op="redo",
+                modification_id=f"redo_{modification['id']}"
+            )
+            if error:
+                return False, error
+            self._undo_stack.append(self._redo_stack.pop())
 
-        if not modification:
-            return False, "Aucune modification à refaire"
+        print(f"✅ Redo appliqué : {modification['property']} = {modification['new_value']}")
+        return True, None
 
-        # Appliquer la modification (new_value)
-        result = self.apply_modification(
-            path=modification.path,
-            property=modification.property,
-            value=modification.new_value,
-            modification_id=f"redo_{modification.id}"
-        )
+    def can_undo(self) -> bool:
+        """Vérifie si undo est possible"""
+        return len(self._undo_stack) > 0
+
+    def can_redo(self) -> bool:
+        """Vérifie si redo est possible"""
+        return len(self._redo_stack) > 0
 
-        if result.success:
-            print(f"✅ Redo appliqué : {modification.property} = {modification.new_value}")
-            return True, None
-        else:
-            return False, result.error
+    def close(self) -> None:
+        """Compacte le journal et arrête le thread de persistance"""
+        if self.journal is not None:
+            if self.journal.tail:
+                self.save_to_file()
+            self.journal.close()
 
     def get_history(self, since: Optional[datetime] = None) -> List[Modification]:
         """
@@ -473,7 +664,7 @@ class GenomeStateManager:
         Reconstruit l'état complet du Genome
 
         Returns:
-            GenomeState avec toutes les métadonnées
+            GenomeState avec toutes les métadonnées (genome : copie modifiable)
         """
         return GenomeState(
             genome=copy.deepcopy(self.genome_current),
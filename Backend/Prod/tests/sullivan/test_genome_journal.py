@@ -0,0 +1,107 @@
+"""
+Tests unitaires pour le journal append-only de GenomeStateManager
+"""
+
+import json
+import time
+
+import pytest
+
+from Backend.Prod.sullivan.stenciler.genome_state_manager import GenomeStateManager
+
+
+def build_genome(n_phases=3):
+    return {
+        "version": "2.0.0",
+        "n0_phases": [{"id": f"phase_{i}", "name": f"Phase {i}"} for i in range(n_phases)],
+    }
+
+
+@pytest.fixture
+def genome_path(tmp_path):
+    path = tmp_path / "genome.json"
+    path.write_text(json.dumps(build_genome()))
+    return path
+
+
+def open_manager(genome_path, **kwargs):
+    # Compaction manuelle uniquement : le thread de fond ne doit pas interférer
+    kwargs.setdefault("compaction_delay", 3600)
+    return GenomeStateManager(str(genome_path), **kwargs)
+
+
+def journal_lines(genome_path):
+    journal = genome_path.parent / "genome_modified.journal.jsonl"
+    return [json.loads(line) for line in journal.read_text().splitlines()]
+
+
+class TestGenomeJournal:
+    """Tests journalisation, replay et compaction"""
+
+    def test_edit_appends_without_rewriting_snapshot(self, genome_path):
+        manager = open_manager(genome_path)
+        manager.apply_modification("n0[0]", "density", "compact")
+        manager.apply_modification("n0[1]", "density", "airy")
+
+        assert not (genome_path.parent / "genome_modified.json").exists()
+        lines = journal_lines(genome_path)
+        assert [line["seq"] for line in lines] == [1, 2]
+        assert lines[0]["old_value"] is None and lines[0]["new_value"] == "compact"
+        manager.journal.close()
+
+    def test_replay_after_crash(self, genome_path):
+        manager = open_manager(genome_path)
+        manager.apply_modification("n0[0]", "density", "compact")
+        manager.apply_modification("n0[0]", "density", "airy")
+        # Crash simulé : pas de close(), ligne partiellement écrite
+        with open(manager.journal.journal_path, "a") as f:
+            f.write('{"seq": 3, "op": "se')
+
+        reopened = open_manager(genome_path)
+        assert reopened.genome_current["n0"][0]["density"] == "airy"
+        assert reopened.can_undo()
+
+    def test_undo_redo_survive_restart(self, genome_path):
+        manager = open_manager(genome_path)
+        manager.apply_modification("n0[0]", "density", "compact")
+        manager.apply_modification("n0[0]", "density", "airy")
+        assert manager.undo() == (True, None)
+        manager.journal.close()
+
+        reopened = open_manager(genome_path)
+        assert reopened.genome_current["n0"][0]["density"] == "compact"
+        assert reopened.can_redo()
+        assert reopened.redo() == (True, None)
+        assert reopened.genome_current["n0"][0]["density"] == "airy"
+        assert not reopened.can_redo()
+
+    def test_compaction_truncates_journal_and_keeps_history(self, genome_path):
+        manager = open_manager(genome_path)
+        manager.apply_modification("n0[2]", "importance", "high")
+        assert manager.save_to_file()
+
+        snapshot = json.loads((genome_path.parent / "genome_modified.json").read_text())
+        assert snapshot["n0"][2]["importance"] == "high"
+        lines = journal_lines(genome_path)
+        assert len(lines) == 1 and lines[0]["type"] == "header"
+        assert lines[0]["snapshot_seq"] == 1
+
+        manager.apply_modification("n0[1]", "importance", "low")
+        manager.journal.close()
+        reopened = open_manager(genome_path)
+        assert reopened.genome_current["n0"][1]["importance"] == "low"
+        assert reopened.undo() == (True, None)
+        assert reopened.undo() == (True, None)
+        assert reopened.genome_current["n0"][2]["importance"] is None
+
+    def test_background_compaction(self, genome_path):
+        manager = open_manager(genome_path, compaction_delay=0)
+        manager.apply_modification("n0[0]", "density", "compact")
+        deadline = time.monotonic() + 5
+        while manager.journal.tail and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        snapshot = json.loads((genome_path.parent / "genome_modified.json").read_text())
+        assert snapshot["n0"][0]["density"] == "compact"
+        assert manager.journal.tail == []
+        manager.close()
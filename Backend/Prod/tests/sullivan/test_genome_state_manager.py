@@ -0,0 +1,108 @@
+"""
+Tests unitaires pour GenomeStateManager (état persistant, copie de chemin)
+"""
+
+import json
+
+import pytest
+
+from Backend.Prod.sullivan.stenciler.genome_state_manager import GenomeStateManager
+
+
+def build_genome(n_phases=3, n_sections=2):
+    return {
+        "version": "2.0.0",
+        "n0_phases": [
+            {
+                "id": f"phase_{i}",
+                "name": f"Phase {i}",
+                "n1_sections": [
+                    {"id": f"section_{i}_{j}", "name": f"Section {j}", "n2_features": []}
+                    for j in range(n_sections)
+                ],
+            }
+            for i in range(n_phases)
+        ],
+    }
+
+
+@pytest.fixture
+def manager(tmp_path):
+    genome_path = tmp_path / "genome.json"
+    genome_path.write_text(json.dumps(build_genome()))
+    return GenomeStateManager(str(genome_path), autosave=False)
+
+
+class TestPersistentState:
+    """Modifications par copie de chemin"""
+
+    def test_only_path_is_copied(self, manager):
+        before = manager.genome_current
+        result = manager.apply_modification("n0[1].n1_sections[0]", "density", "compact")
+        after = manager.genome_current
+
+        assert result.success
+        assert after is not before
+        assert after["n0"][1]["n1_sections"][0]["density"] == "compact"
+        # Sous-arbres hors du chemin partagés
+        assert after["n0"][0] is before["n0"][0]
+        assert after["n0"][2] is before["n0"][2]
+        assert after["n0"][1]["n1_sections"][1] is before["n0"][1]["n1_sections"][1]
+        # L'ancien état est intact
+        assert "density" not in before["n0"][1]["n1_sections"][0]
+
+    def test_n0_alias_preserved(self, manager):
+        manager.apply_modification("n0[0]", "importance", "high")
+        genome = manager.genome_current
+        assert genome["n0"] is genome["n0_phases"]
+        assert genome["n0_phases"][0]["importance"] == "high"
+
+    def test_snapshot_and_rollback_share_state(self, manager):
+        snapshot_id = manager.save_checkpoint()
+        snapshot = manager.snapshots[snapshot_id]
+        manager.apply_modification("n0[2]", "density", "airy")
+
+        assert manager.snapshots[snapshot_id] is snapshot
+        assert "density" not in snapshot["n0"][2]
+        assert manager.rollback_to(snapshot_id)
+        assert manager.genome_current is snapshot
+
+    def test_returned_states_cannot_corrupt_history(self, manager):
+        snapshot_id = manager.save_checkpoint()
+        result = manager.apply_modification("n0[0]", "density", "compact")
+        with pytest.raises(TypeError):
+            result.modified_genome["n0"] = []
+        assert result.modified_genome["n0"][0]["density"] == "compact"
+
+        state = manager.reconstruct_state()
+        state.genome["n0"][1]["density"] = "airy"
+        assert "density" not in manager.genome_current["n0"][1]
+        assert "density" not in manager.snapshots[snapshot_id]["n0"][1]
+
+    def test_rollback_resets_undo_redo(self, manager):
+        snapshot_id = manager.save_checkpoint()
+        manager.apply_modification("n0[0]", "density", "compact")
+        manager.apply_modification("n0[1]", "density", "airy")
+        assert manager.undo() == (True, None)
+        assert manager.can_undo() and manager.can_redo()
+
+        assert manager.rollback_to(snapshot_id)
+        assert not manager.can_undo()
+        assert not manager.can_redo()
+        assert "density" not in manager.genome_current["n0"][0]
+
+    def test_invalid_path_leaves_state_untouched(self, manager):
+        before = manager.genome_current
+        result = manager.apply_modification("n0[9]", "density", "compact")
+        assert not result.success
+        assert manager.genome_current is before
+
+    def test_autosave_writes_modified_file(self, tmp_path):
+        genome_path = tmp_path / "genome.json"
+        genome_path.write_text(json.dumps(build_genome()))
+        manager = GenomeStateManager(str(genome_path))
+        manager.apply_modification("n0[0]", "density", "compact")
+        manager.close()
+
+        saved = json.loads((tmp_path / "genome_modified.json").read_text())
+        assert saved["n0"][0]["density"] == "compact"
@@ -0,0 +1,99 @@
+"""
+Tests unitaires pour l'index d'embeddings des situations (IntentTranslator)
+"""
+
+import json
+import zlib
+
+import numpy as np
+import pytest
+
+from Backend.Prod.sullivan.intent_translator import IntentTranslator
+
+
+class FakeModel:
+    """Encodeur déterministe (sac de mots haché) comptant les appels"""
+
+    model_name = "fake-bow"
+
+    def __init__(self, dim=64):
+        self.dim = dim
+        self.calls = []
+
+    def encode(self, texts, convert_to_numpy=True):
+        self.calls.append(list(texts))
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().replace(":", " ").replace(",", " ").split():
+                vectors[row, zlib.crc32(word.encode()) % self.dim] += 1.0
+        return vectors
+
+
+def mapping(name, variants):
+    return {
+        "pattern_name": name,
+        "variants": variants,
+        "transformations": {"user_term": name, "tech_term": name},
+        "abstraction": {"name": name},
+        "realisation": {"template": "html"},
+    }
+
+
+@pytest.fixture
+def mappings_path(tmp_path):
+    path = tmp_path / "star_mappings.json"
+    path.write_text(json.dumps({"mappings": [
+        mapping("Toggle", ["switch on off", "checkbox"]),
+        mapping("Navigation", ["menu links", "breadcrumb"]),
+        mapping("Modal", ["dialog popup", "overlay"]),
+    ]}))
+    return path
+
+
+class TestSituationIndex:
+    """Tests index précalculé, persistance et recherche vectorisée"""
+
+    def test_situations_encoded_once(self, mappings_path):
+        model = FakeModel()
+        translator = IntentTranslator(mappings_path, embedding_model=model)
+        assert translator._situation_matrix.shape == (3, 64)
+        assert np.allclose(np.linalg.norm(translator._situation_matrix, axis=1), 1.0)
+
+        model.calls.clear()
+        results = translator.search_situation("menu links", limit=2)
+        assert results[0].pattern_name == "Navigation"
+        assert model.calls == [["menu links"]]
+
+    def test_index_persisted_and_invalidated(self, mappings_path):
+        IntentTranslator(mappings_path, embedding_model=FakeModel())
+        assert (mappings_path.parent / "star_mappings.embeddings.npz").exists()
+
+        model = FakeModel()
+        IntentTranslator(mappings_path, embedding_model=model)
+        assert model.calls == []  # rechargé depuis le cache
+
+        data = json.loads(mappings_path.read_text())
+        data["mappings"].append(mapping("Accordion", ["collapse sections"]))
+        mappings_path.write_text(json.dumps(data))
+        model = FakeModel()
+        translator = IntentTranslator(mappings_path, embedding_model=model)
+        assert len(model.calls) == 1
+        assert translator._situation_matrix.shape[0] == 4
+
+    def test_batch_search_matches_single(self, mappings_path):
+        translator = IntentTranslator(mappings_path, embedding_model=FakeModel())
+        queries = ["dialog popup", "switch checkbox", "breadcrumb menu"]
+        batched = translator.search_situations(queries, limit=1)
+        assert [r[0].pattern_name for r in batched] == ["Modal", "Toggle", "Navigation"]
+        assert batched == [translator.search_situation(q, limit=1) for q in queries]
+
+    def test_score_mapping_uses_index(self, mappings_path):
+        translator = IntentTranslator(mappings_path, embedding_model=FakeModel())
+        situation = translator.index_situations[2]
+        assert translator.score_mapping("dialog popup overlay", situation) > 0.9
+
+    def test_word_count_fallback(self, mappings_path, monkeypatch):
+        monkeypatch.setattr("Backend.Prod.sullivan.intent_translator.EMBEDDINGS_AVAILABLE", False)
+        translator = IntentTranslator(mappings_path)
+        assert translator._situation_matrix is None
+        assert translator.search_situation("overlay dialog", limit=1)[0].pattern_name == "Modal"
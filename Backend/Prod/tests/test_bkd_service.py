@@ -0,0 +1,144 @@
+"""Tests for the Stenciler BKD service: conversation storage and project caches."""
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Le Stenciler importe ses modules depuis son propre répertoire
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "Frontend" / "3. STENCILER"))
+
+import bkd_service
+from routers import bkd_router, projects_router
+
+
+@pytest.fixture
+def bkd(tmp_path, monkeypatch):
+    monkeypatch.setattr(bkd_service, "BKD_DB_PATH", tmp_path / "db" / "projects.db")
+    monkeypatch.setattr(bkd_service, "PROJECTS_DIR", tmp_path / "projects")
+    bkd_service.init_bkd_db()
+    bkd_service.invalidate_project_cache()
+    yield bkd_service
+    bkd_service.invalidate_project_cache()
+
+
+def insert_blob(bkd, conv_id, turns, updated_at="2026-01-01 00:00:00"):
+    with bkd.bkd_db() as con:
+        con.execute(
+            "INSERT INTO conversations (id, project_id, role, title, updated_at, content_json) "
+            "VALUES (?, 'p1', 'architect', NULL, ?, ?)",
+            (conv_id, updated_at, json.dumps(turns)),
+        )
+
+
+class TestConversations:
+    """Test the content_json migration, turn appends and paginated reads."""
+
+    def test_blob_migration_runs_once(self, bkd):
+        insert_blob(bkd, "text-shape", [{"role": "user", "text": "bonjour"},
+                                        {"role": "assistant", "text": "salut"}])
+        insert_blob(bkd, "content-shape", [{"role": "user", "content": "hello"},
+                                           {"role": "assistant", "content": {"html": "<p/>"}}])
+        bkd.init_bkd_db()
+        bkd.init_bkd_db()  # second start-up: blobs already emptied, nothing duplicated
+
+        text_conv = bkd.conv_get("text-shape")
+        assert [(t["seq"], t["role"], t["text"]) for t in text_conv["turns"]] == [
+            (1, "user", "bonjour"), (2, "assistant", "salut")]
+        content_conv = bkd.conv_get("content-shape")
+        assert [t["text"] for t in content_conv["turns"]] == ["hello", '{"html": "<p/>"}']
+        assert content_conv["turn_count"] == 2
+        with bkd.bkd_db() as con:
+            assert {r[0] for r in con.execute("SELECT content_json FROM conversations")} == {"[]"}
+
+    def test_append_to_unknown_conversation(self, bkd):
+        assert bkd.conv_append("missing", "user", "hello") is None
+        with bkd.bkd_db() as con:
+            assert con.execute("SELECT COUNT(*) FROM conversation_turns").fetchone()[0] == 0
+
+    def test_tail_paging_with_before_seq(self, bkd):
+        cid = bkd.conv_create("p1")
+        seqs = [bkd.conv_append(cid, "user", f"m{i}") for i in range(1, 8)]
+        assert seqs == list(range(1, 8))
+
+        tail = bkd.conv_get(cid, limit=3)
+        assert [t["text"] for t in tail["turns"]] == ["m5", "m6", "m7"]
+        assert tail["has_more"] and tail["turn_count"] == 7
+        older = bkd.conv_get(cid, limit=3, before_seq=tail["turns"][0]["seq"])
+        assert [t["text"] for t in older["turns"]] == ["m2", "m3", "m4"]
+        first = bkd.conv_get(cid, limit=3, before_seq=older["turns"][0]["seq"])
+        assert [t["text"] for t in first["turns"]] == ["m1"]
+        assert not first["has_more"]
+
+    def test_list_route_pages_with_turn_count(self, bkd):
+        for i in range(5):
+            insert_blob(bkd, f"c{i}", [{"role": "user", "text": "x"}] * i,
+                        updated_at=f"2026-01-0{i + 1} 00:00:00")
+        insert_blob(bkd, "worker", [], updated_at="2026-02-01 00:00:00")
+        with bkd.bkd_db() as con:
+            con.execute("UPDATE conversations SET role='worker' WHERE id='worker'")
+        bkd.init_bkd_db()
+
+        page = bkd_router.list_conversations("p1", role="architect", limit=2, before=None, before_id=None)
+        assert [(c.id, c.turn_count) for c in page] == [("c4", 4), ("c3", 3)]
+        last = page[-1]
+        page = bkd_router.list_conversations("p1", role="architect", limit=2,
+                                             before=last.updated_at, before_id=last.id)
+        assert [c.id for c in page] == ["c2", "c1"]
+        assert page[0].project_id == "p1" and page[0].title is None
+
+
+def add_teacher(bkd, token, active_project_id):
+    with bkd.bkd_db() as con:
+        con.execute(
+            "INSERT INTO users (id, name, role, token, active_project_id) VALUES (?, ?, 'teacher', ?, ?)",
+            (f"u-{token}", f"prof-{token}", token, active_project_id),
+        )
+
+
+class TestProjectCache:
+    """Test the token -> active project and project -> path caches."""
+
+    def test_set_active_project_visible_immediately(self, bkd):
+        add_teacher(bkd, "tok", "p1")
+        assert bkd.get_active_project_id("tok") == "p1"
+        bkd.set_active_project_id("p2", "tok")
+        assert bkd.get_active_project_id("tok") == "p2"
+
+    def test_resolution_racing_invalidation_is_not_cached(self, bkd, monkeypatch):
+        add_teacher(bkd, "tok", "p1")
+        resolve = bkd._resolve_active_project_id
+
+        def racing_resolve(token):
+            result = resolve(token)  # reads p1...
+            bkd.set_active_project_id("p2", token)  # ...while another request switches project
+            return result
+
+        monkeypatch.setattr(bkd, "_resolve_active_project_id", racing_resolve)
+        assert bkd.get_active_project_id("tok") == "p1"
+        monkeypatch.setattr(bkd, "_resolve_active_project_id", resolve)
+        assert bkd.get_active_project_id("tok") == "p2"
+
+    def test_db_error_not_cached(self, bkd, monkeypatch):
+        add_teacher(bkd, "tok", "p1")
+        read_db = bkd._read_db
+
+        def broken_db():
+            raise sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr(bkd, "_read_db", broken_db)
+        assert bkd.get_active_project_id("tok") == "homéos-default"
+        monkeypatch.setattr(bkd, "_read_db", read_db)
+        assert bkd.get_active_project_id("tok") == "p1"
+
+    def test_deleted_project_stops_resolving(self, bkd, tmp_path, monkeypatch):
+        project_dir = tmp_path / "projects" / "p1"
+        project_dir.mkdir(parents=True)
+        with bkd.bkd_db() as con:
+            con.execute("INSERT INTO projects (id, name, path) VALUES ('p1', 'P1', ?)", (str(project_dir),))
+        assert bkd.resolve_bkd_project_root("p1") == project_dir
+
+        monkeypatch.setattr(projects_router, "PROJECTS_DIR", tmp_path / "projects")
+        projects_router.delete_project_route("p1")
+        assert bkd.resolve_bkd_project_root("p1") is None
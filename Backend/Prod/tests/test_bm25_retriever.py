@@ -0,0 +1,101 @@
+"""Tests for the zero-dependency BM25 RAG engine."""
+import pytest
+
+from Backend.Prod.rag.bm25_retriever import (
+    BM25Index,
+    BM25Retriever,
+    chunk_markdown,
+    chunk_python,
+    tokenize,
+)
+
+
+MARKDOWN = """# Guide
+
+Intro text.
+
+## Caching
+
+The prompt cache stores responses in SQLite.
+
+```python
+# not a header
+```
+
+## Scheduling
+
+Critical path ordering of plan steps.
+"""
+
+PYTHON = '''"""Module docstring."""
+import os
+
+
+def load_config(path):
+    return open(path).read()
+
+
+class RateLimiter:
+    def acquire(self):
+        pass
+'''
+
+
+def write_docs(tmp_path):
+    (tmp_path / "guide.md").write_text(MARKDOWN)
+    (tmp_path / "limits.py").write_text(PYTHON)
+    return [str(tmp_path / "guide.md"), str(tmp_path / "limits.py")]
+
+
+class TestChunking:
+    """Test tokenizer and structure-aware chunking."""
+
+    def test_tokenize_splits_identifiers(self):
+        tokens = tokenize("PageIndexRetriever load_config the")
+        assert "pageindexretriever" in tokens
+        assert {"page", "index", "retriever", "load", "config"} <= set(tokens)
+        assert "the" not in tokens
+
+    def test_markdown_sections(self):
+        sections = [chunk.section for chunk in chunk_markdown(MARKDOWN)]
+        assert sections == ["Guide", "Guide > Caching", "Guide > Scheduling"]
+
+    def test_python_definitions(self):
+        sections = [chunk.section for chunk in chunk_python(PYTHON)]
+        assert sections == ["<module>", "load_config", "RateLimiter"]
+
+    def test_invalid_python_falls_back_to_lines(self):
+        chunks = chunk_python("def broken(:\n    pass\n")
+        assert len(chunks) == 1
+
+
+class TestBM25Retriever:
+    """Test indexing, persistence and retrieval."""
+
+    @pytest.mark.asyncio
+    async def test_retrieve_ranks_matching_section(self, tmp_path):
+        retriever = BM25Retriever(document_paths=write_docs(tmp_path), index_dir=str(tmp_path / "idx"))
+        results = await retriever.retrieve("prompt cache sqlite", top_k=2)
+        assert results[0]["reference"] == "guide.md:Guide > Caching"
+        assert results[0]["score"] > 0
+        assert set(results[0]) == {"content", "metadata", "reference", "score", "file_path", "file_name"}
+
+    def test_persisted_index_is_memory_mapped(self, tmp_path):
+        paths = write_docs(tmp_path)
+        first = BM25Retriever(document_paths=paths, index_dir=str(tmp_path / "idx"))
+        reloaded = BM25Retriever(document_paths=paths, index_dir=str(tmp_path / "idx"))
+        assert reloaded.index._mapped is not None
+        assert reloaded.search("rate limiter acquire") == first.search("rate limiter acquire")
+        reloaded.index.close()
+
+    def test_changed_document_triggers_rebuild(self, tmp_path):
+        paths = write_docs(tmp_path)
+        BM25Retriever(document_paths=paths, index_dir=str(tmp_path / "idx"))
+        (tmp_path / "guide.md").write_text("# Deployment\n\nKubernetes manifests.\n")
+        retriever = BM25Retriever(document_paths=paths, index_dir=str(tmp_path / "idx"))
+        assert retriever.search("kubernetes")[0]["reference"] == "guide.md:Deployment"
+        assert retriever.search("sqlite") == []
+
+    def test_unknown_terms_return_nothing(self, tmp_path):
+        index = BM25Index.build([tmp_path / "missing.md"])
+        assert index.search("anything") == []
@@ -0,0 +1,174 @@
+"""Tests for the persistent BrowserPool behind BrowserRenderer."""
+import asyncio
+import threading
+
+import pytest
+
+from Backend.Prod.retro_genome import browser_renderer
+from Backend.Prod.retro_genome.browser_renderer import BrowserPool, BrowserQueueFull, BrowserRenderer
+
+
+class FakePage:
+    def __init__(self, browser, viewport):
+        self.browser = browser
+        self.viewport_size = viewport
+        self.content = None
+        self.closed = False
+
+    async def set_content(self, html, wait_until="load"):
+        self.content = html
+
+    async def wait_for_load_state(self, state, timeout=None):
+        pass
+
+    async def set_viewport_size(self, viewport):
+        self.viewport_size = viewport
+
+    async def screenshot(self, full_page=True):
+        self.browser.active += 1
+        self.browser.peak = max(self.browser.peak, self.browser.active)
+        await asyncio.sleep(self.browser.delay)
+        self.browser.active -= 1
+        if "fail" in self.content:
+            raise RuntimeError("render failed")
+        self.browser.renders.append(self.content)
+        w, h = self.viewport_size["width"], self.viewport_size["height"]
+        return f"PNG:{self.content}:{w}x{h}".encode()
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.pages = []
+        self.renders = []
+        self.active = self.peak = 0
+        self.closed = False
+
+    async def new_page(self, viewport):
+        page = FakePage(self, viewport)
+        self.pages.append(page)
+        return page
+
+    def is_connected(self):
+        return not self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+def make_pool(browser, **kwargs):
+    pool = BrowserPool(**kwargs)
+    launches = []
+
+    async def launch():
+        launches.append(threading.current_thread().name)
+        return browser
+
+    pool._launch = launch
+    pool.launches = launches
+    return pool
+
+
+class TestBrowserPool:
+    """Test browser reuse, bounded concurrency and screenshot caching."""
+
+    def test_browser_survives_separate_event_loops(self):
+        browser = FakeBrowser()
+        pool = make_pool(browser)
+        try:
+            first = asyncio.run(pool.capture("<p>1</p>", 800, 600))
+            second = asyncio.run(pool.capture("<p>2</p>", 1024, 768))
+        finally:
+            pool.close()
+
+        assert first == b"PNG:<p>1</p>:800x600"
+        assert second == b"PNG:<p>2</p>:1024x768"
+        assert pool.launches == ["browser-pool"]
+        assert len(browser.pages) == 1  # page reused, viewport resized
+        assert browser.closed
+
+    def test_screenshot_cached_by_html_and_viewport(self):
+        browser = FakeBrowser()
+        pool = make_pool(browser)
+
+        async def run():
+            await pool.capture("<p>same</p>")
+            await pool.capture("<p>same</p>")
+            await pool.capture("<p>same</p>", 390, 844)
+
+        try:
+            asyncio.run(run())
+        finally:
+            pool.close()
+        assert len(browser.renders) == 2
+        assert pool.stats["cache_hits"] == 1
+
+    def test_concurrency_and_queue_are_bounded(self):
+        browser = FakeBrowser(delay=0.05)
+        pool = make_pool(browser, max_pages=2, max_queue=2)
+
+        async def run():
+            return await asyncio.gather(
+                *(pool.capture(f"<p>{i}</p>") for i in range(6)), return_exceptions=True
+            )
+
+        try:
+            results = asyncio.run(run())
+        finally:
+            pool.close()
+        assert browser.peak == 2
+        assert sum(isinstance(r, BrowserQueueFull) for r in results) == 2
+        assert sum(isinstance(r, bytes) for r in results) == 4
+
+    def test_failed_page_is_discarded(self):
+        browser = FakeBrowser()
+        pool = make_pool(browser)
+
+        async def run():
+            with pytest.raises(RuntimeError):
+                await pool.capture("<p>fail</p>")
+            return await pool.capture("<p>ok</p>")
+
+        try:
+            assert asyncio.run(run()) == b"PNG:<p>ok</p>:1440x900"
+        finally:
+            pool.close()
+        assert browser.pages[0].closed and len(browser.pages) == 2
+
+    def test_cancelled_leader_does_not_strand_followers(self):
+        browser = FakeBrowser(delay=0.2)
+        pool = make_pool(browser)
+
+        async def run():
+            leader = asyncio.ensure_future(pool.capture("<p>shared</p>"))
+            await asyncio.sleep(0.05)
+            follower = asyncio.ensure_future(pool.capture("<p>shared</p>"))
+            await asyncio.sleep(0.05)
+            leader.cancel()
+            return await asyncio.wait_for(follower, timeout=2.0)
+
+        try:
+            assert asyncio.run(run()) == b"PNG:<p>shared</p>:1440x900"
+        finally:
+            pool.close()
+        assert pool._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_capture_screenshot_returns_caller_owned_file(monkeypatch):
+    pool = make_pool(FakeBrowser())
+    monkeypatch.setattr(browser_renderer, "get_browser_pool", lambda: pool)
+    try:
+        first = await BrowserRenderer.capture_screenshot("<p>x</p>")
+        first.unlink()  # Visual QA loop deletes its snapshot
+        second = await BrowserRenderer.capture_screenshot("<p>x</p>")
+        assert second.read_bytes() == b"PNG:<p>x</p>:1440x900"
+        second.unlink()
+    finally:
+        pool.close()
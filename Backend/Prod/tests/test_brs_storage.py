@@ -0,0 +1,163 @@
+"""Tests for the pooled WAL / write-behind BRSStorage layer."""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from Backend.Prod.retro_genome.brs_storage import BRSStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    store = BRSStorage(str(tmp_path / "brs.db"))
+    yield store
+    store.close()
+
+
+class TestBRSStorage:
+    """Test WAL mode, batched writes and read-your-writes consistency."""
+
+    def test_wal_mode_and_reused_reader(self, storage):
+        conn = storage._get_connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert storage._get_connection() is conn
+
+    def test_reads_see_pending_writes(self, storage):
+        storage.save_session("s1", "prompt", {"target": "B2B"})
+        storage.save_message("s1", "gemini", "user", "hello")
+        storage.save_message("s1", "gemini", "assistant", "an idea about dashboards")
+        storage.save_nugget("s1", "gemini", "dashboards")
+
+        assert storage.get_session("s1")["buffer_answers"] == {"target": "B2B"}
+        assert [m["role"] for m in storage.get_messages("s1")] == ["user", "assistant"]
+        assert storage.get_basket("s1")[0]["text"] == "dashboards"
+        assert storage.search("dashboards")[0]["session_id"] == "s1"
+
+    def test_concurrent_writes_are_batched(self, storage, monkeypatch):
+        batch_sizes = []
+        original = storage._apply_batch
+
+        def slow_apply(batch):
+            batch_sizes.append(len(batch))
+            time.sleep(0.02)
+            original(batch)
+
+        monkeypatch.setattr(storage, "_apply_batch", slow_apply)
+
+        def writer(n):
+            for i in range(25):
+                storage.save_message("s1", f"p{n}", "assistant", f"message {n}-{i}")
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(storage.get_messages("s1")) == 100
+        assert sum(batch_sizes) == 100
+        assert len(batch_sizes) < 100
+        assert len(storage.search("message")) == 20
+
+    def test_failed_write_does_not_drop_batch(self, storage):
+        storage._enqueue([("INSERT INTO missing_table VALUES (?)", (1,))])
+        storage.save_message("s1", "gemini", "user", "kept")
+        assert [m["content"] for m in storage.get_messages("s1")] == ["kept"]
+
+    def test_close_flushes_queue(self, tmp_path):
+        path = str(tmp_path / "brs.db")
+        store = BRSStorage(path)
+        for i in range(10):
+            store.save_message("s1", "groq", "assistant", f"m{i}")
+        store.close()
+
+        reopened = BRSStorage(path)
+        try:
+            assert len(reopened.get_messages("s1")) == 10
+        finally:
+            reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_async_wrappers(self, storage):
+        storage.save_message("s1", "codestral", "user", "async")
+        assert (await storage.aget_messages("s1", provider="codestral"))[0]["content"] == "async"
+        assert await storage.aflush()
+        assert await storage.aget_session("missing") is None
+
+
+class TestBRSSearch:
+    """Test ranked, paginated FTS5 search with user filtering and prefix/trigram modes."""
+
+    def fill(self, storage):
+        storage.save_session("s_alice", "p", {}, user_id="alice")
+        storage.save_session("s_bob", "p", {}, user_id="bob")
+        for i in range(12):
+            storage.save_message("s_alice", "gemini", "assistant", f"dashboard draft {i}")
+        storage.save_message("s_alice", "gemini", "assistant", "dashboard dashboard dashboard metrics")
+        storage.save_message("s_bob", "groq", "assistant", "dashboard for bob")
+        storage.save_message("s_bob", "groq", "user", "dashboard question not indexed")
+
+    def test_bm25_ranking_and_user_filter(self, storage):
+        self.fill(storage)
+        results = storage.search("dashboard")
+        assert len(results) == 14
+        assert "metrics" in results[0]["excerpt"]
+        assert [r["score"] for r in results] == sorted(r["score"] for r in results)
+
+        bob = storage.search("dashboard", user_id="bob")
+        assert [r["session_id"] for r in bob] == ["s_bob"]
+        assert storage.search("dashboard", user_id="carol") == []
+
+    def test_cursor_pagination_has_no_overlap(self, storage):
+        self.fill(storage)
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = storage.search_page("dashboard", user_id="alice", limit=5, cursor=cursor)
+            seen.extend(r["excerpt"] for r in page["results"])
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert pages == 3
+        assert len(seen) == len(set(seen)) == 13
+
+        with pytest.raises(ValueError):
+            storage.search_page("dashboard", cursor="not-a-cursor")
+
+    def test_prefix_and_query_syntax_is_neutralized(self, storage):
+        self.fill(storage)
+        assert storage.search("dashb") == []
+        assert len(storage.search_page("metr", prefix=True)["results"]) == 1
+        # FTS5 operators and stray quotes are searched literally instead of raising
+        assert storage.search('NEAR( "dashboard') == []
+        assert storage.search("   ") == []
+
+    def test_trigram_tokenizer_matches_substrings(self, tmp_path):
+        store = BRSStorage(str(tmp_path / "brs.db"), tokenizer="trigram")
+        try:
+            self.fill(store)
+            assert store.tokenizer == "trigram"
+            assert len(store.search("shboa", user_id="alice")) == 13
+            assert store.search("da") == []  # shorter than a trigram
+        finally:
+            store.close()
+
+    def test_old_fts_schema_is_rebuilt_and_reindexed(self, tmp_path):
+        path = tmp_path / "brs.db"
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE sessions (id TEXT PRIMARY KEY, user_id TEXT, prompt TEXT, buffer_answers TEXT, created_at TEXT);
+            CREATE TABLE messages (id TEXT PRIMARY KEY, session_id TEXT, provider TEXT, role TEXT, content TEXT, created_at TEXT);
+            CREATE VIRTUAL TABLE messages_fts USING fts5(session_id UNINDEXED, provider UNINDEXED, content);
+            INSERT INTO sessions VALUES ('s1', 'alice', '', '{}', '');
+            INSERT INTO messages VALUES ('m1', 's1', 'gemini', 'assistant', 'legacy roadmap', '');
+            INSERT INTO messages VALUES ('m2', 's1', 'gemini', 'user', 'legacy question', '');
+        """)
+        conn.close()
+
+        store = BRSStorage(str(path))
+        try:
+            assert [r["session_id"] for r in store.search("legacy", user_id="alice")] == ["s1"]
+        finally:
+            store.close()
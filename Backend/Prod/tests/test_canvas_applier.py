@@ -0,0 +1,91 @@
+"""Tests for the compiled canvas templates of the Stenciler CanvasApplier."""
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+# Le Stenciler importe ses modules depuis son propre répertoire
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "Frontend" / "3. STENCILER"))
+
+from core import canvas_applier
+from core.canvas_applier import CanvasApplier, compile_template
+
+# Rendu de référence de chaque canevas, produit par l'implémentation précédente
+# (remplacements successifs) avec les props de canvas_props() et DEMO_DESIGN.
+EXPECTED_PATH = Path(__file__).parent / "data" / "canvas_applier_expected.json"
+
+DEMO_DESIGN = """| Token | Valeur | Usage |
+|---|---|---|
+| `--bg-primary` | `#101010` | fond |
+| `--text-primary` | `#fafafa` | texte |
+| `--homeos-green` | `#00aa55` | nudge |
+| `--separator` | `#333333` | bordure |
+| `--radius` | `8px` | rayon |
+| `--radius-lg` | `16px` | grand rayon |
+"""
+
+
+@pytest.fixture
+def applier(tmp_path, monkeypatch):
+    projects = tmp_path / "projects"
+    (projects / "demo").mkdir(parents=True)
+    (projects / "demo" / "DESIGN.md").write_text(DEMO_DESIGN, encoding="utf-8")
+    monkeypatch.setattr(canvas_applier, "PROJECTS_DIR", projects)
+    monkeypatch.setattr(canvas_applier, "DEFAULT_DESIGN_PATH", tmp_path / "missing" / "DESIGN.md")
+    return CanvasApplier()
+
+
+def canvas_props(template: str, flags: bool) -> dict:
+    props = {"id": "c1"}
+    for name in set(re.findall(r"\{\{(.*?)\}\}", template)):
+        if name not in ("id", "label_slug", "size_class", "variant_class"):
+            props[name] = f"{name} value"
+    for flag in set(re.findall(r"\[\[if\s+([^\]]+)\]\]", template)):
+        props[flag.strip()] = flags
+    return props
+
+
+class TestCanvasApplier:
+    """Test compiled rendering against the reference output and the design cache."""
+
+    def test_every_template_matches_reference(self, applier):
+        expected = json.loads(EXPECTED_PATH.read_text(encoding="utf-8"))
+        assert sorted(applier.templates) == sorted(expected)
+        for name, template in applier.templates.items():
+            assert applier.instanciate(name, canvas_props(template, True), "demo") == expected[name]["demo"], name
+            assert applier.instanciate(name, canvas_props(template, False), "nodesign") == expected[name]["fallback"], name
+
+    def test_if_blocks(self, applier):
+        segments = compile_template("<p>[[if shown]]<b>{{label}}</b>[[endif]]end</p>")
+        for flag, html in ((True, "<p><b>ok</b>end</p>"), (False, "<p>end</p>")):
+            out = []
+            applier._render(segments, {"shown": flag, "label": "ok"}, {}, out)
+            assert "".join(out) == html
+
+    def test_unknown_prop_left_verbatim(self, applier):
+        applier.compiled["probe"] = compile_template('<div class="af-radius" title="{{missing}}">{{label}}</div>')
+        html = applier.instanciate("probe", {"id": "p", "label": "x"}, "demo")
+        assert html == '<div class="rounded-[8px]" title="{{missing}}">x</div>'
+
+    def test_variant_class_af_classes_mapped(self, applier):
+        html = applier.instanciate("button", {"id": "b", "label": "Go", "variant": "secondary"}, "demo")
+        assert "bg-[#efefeb] border-[#333333]" in html
+        assert "af-border-primary" not in html
+
+    def test_design_cache_follows_mtime(self, applier, tmp_path):
+        design = tmp_path / "projects" / "demo" / "DESIGN.md"
+        props = {"id": "b", "label": "Go"}
+        assert "bg-[#00aa55]" in applier.instanciate("button", dict(props), "demo")
+        assert applier.instanciate("button", dict(props), "demo") == applier.instanciate("button", dict(props), "demo")
+
+        design.write_text(DEMO_DESIGN.replace("#00aa55", "#ff0000"), encoding="utf-8")
+        stat = design.stat()
+        os.utime(design, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        html = applier.instanciate("button", dict(props), "demo")
+        assert "bg-[#ff0000]" in html and "#00aa55" not in html
+
+        design.unlink()  # falls back to the (missing) constitutional DESIGN.md
+        assert "bg-[#8cc63f]" in applier.instanciate("button", dict(props), "demo")
@@ -0,0 +1,130 @@
+"""Tests for the shared, measured HTTP connection pool."""
+import asyncio
+
+import httpx
+import pytest
+
+from Backend.Prod.network.connection_pool import ConnectionPool, HostLimits
+from Backend.Prod.network.rate_limiter import RateLimiterRegistry
+
+
+async def start_server():
+    """Minimal HTTP/1.1 keep-alive server counting accepted connections."""
+    accepted = []
+
+    async def handle(reader, writer):
+        accepted.append(writer)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                body = b"" if head.startswith(b"HEAD") else b"ok"
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n" + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}", accepted
+
+
+class TestConnectionPool:
+    """Test connection sharing and measured statistics."""
+
+    @pytest.mark.asyncio
+    async def test_reuse_is_measured(self):
+        server, url, accepted = await start_server()
+        pool = ConnectionPool(http2=False)
+        async with httpx.AsyncClient(transport=pool.transport) as client:
+            for _ in range(3):
+                assert (await client.get(f"{url}/v1")).text == "ok"
+
+        stats = pool.get_stats()
+        assert len(accepted) == 1
+        assert (stats.total_requests, stats.connections_created, stats.connections_reused) == (3, 1, 2)
+        assert stats.dns_lookups_saved == 2 and stats.tls_handshakes_saved == 0
+        assert stats.handshake_time_ms > 0
+        assert stats.network_overhead_reduction_ms == pytest.approx(2 * stats.handshake_time_ms)
+        await pool.close_all()
+        server.close()
+
+    @pytest.mark.asyncio
+    async def test_clients_share_connections(self):
+        server, url, accepted = await start_server()
+        pool = ConnectionPool(http2=False)
+        first = httpx.AsyncClient(transport=pool.transport, headers={"Authorization": "a"})
+        second = httpx.AsyncClient(transport=pool.transport, headers={"Authorization": "b"})
+        await first.get(url)
+        await first.aclose()  # must not close the pooled connection
+        await second.get(url)
+
+        assert len(accepted) == 1
+        assert pool.get_summary()["hosts"]["127.0.0.1"]["connections_reused"] == 1
+        await second.aclose()
+        await pool.close_all()
+        server.close()
+
+    @pytest.mark.asyncio
+    async def test_prewarm_opens_connection_before_first_request(self):
+        server, url, accepted = await start_server()
+        pool = ConnectionPool(http2=False)
+        assert await pool.prewarm([f"{url}/v1/chat/completions", f"{url}/other"]) == 1
+        async with httpx.AsyncClient(transport=pool.transport) as client:
+            await client.post(f"{url}/v1/chat/completions", json={})
+
+        stats = pool.get_stats()
+        assert len(accepted) == 1
+        assert stats.connections_prewarmed == 1
+        assert (stats.total_requests, stats.connections_reused) == (1, 1)
+        await pool.close_all()
+        server.close()
+
+    @pytest.mark.asyncio
+    async def test_prewarm_unreachable_host_is_ignored(self):
+        pool = ConnectionPool(http2=False)
+        assert await pool.prewarm(["http://127.0.0.1:9/"], timeout=1.0) == 0
+        assert pool.get_stats().connections_prewarmed == 0
+
+    def test_host_limits(self):
+        pool = ConnectionPool(host_limits={"example.org": HostLimits(keepalive_expiry=5.0)})
+        assert pool.limits_for("example.org").keepalive_expiry == 5.0
+        assert pool.limits_for("localhost").http2 is False
+        assert pool.limits_for("unknown.test") == HostLimits()
+
+    @pytest.mark.asyncio
+    async def test_environment_proxies_apply(self, monkeypatch):
+        monkeypatch.setenv("HTTPS_PROXY", "http://proxy.test:3128")
+        monkeypatch.setenv("NO_PROXY", "localhost")
+        pool = ConnectionPool()
+        assert pool.proxy_for(httpx.URL("https://api.groq.com/v1")) == "http://proxy.test:3128"
+        assert pool.proxy_for(httpx.URL("https://localhost:11434/")) is None
+        assert pool.proxy_for(httpx.URL("http://api.groq.com/")) is None
+        transport = pool._transport_for(httpx.URL("https://api.groq.com/v1"))
+        assert transport._pool.__class__.__name__ == "AsyncHTTPProxy"
+        assert ConnectionPool(trust_env=False).proxy_for(httpx.URL("https://api.groq.com/")) is None
+
+    def test_all_proxy_and_no_proxy_patterns(self, monkeypatch):
+        for name in ("HTTP_PROXY", "HTTPS_PROXY", "http_proxy", "https_proxy"):
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.setenv("ALL_PROXY", "proxy.test:3128")
+        monkeypatch.setenv("NO_PROXY", ".internal.test,127.0.0.1")
+        pool = ConnectionPool()
+        assert pool.proxy_for(httpx.URL("https://api.mistral.ai/")) == "http://proxy.test:3128"
+        assert pool.proxy_for(httpx.URL("http://api.mistral.ai/")) == "http://proxy.test:3128"
+        assert pool.proxy_for(httpx.URL("https://llm.internal.test/")) is None
+        assert pool.proxy_for(httpx.URL("http://127.0.0.1:11434/")) is None
+        monkeypatch.setenv("NO_PROXY", "*")
+        assert ConnectionPool().proxy_for(httpx.URL("https://api.mistral.ai/")) is None
+
+    def test_open_connections_tolerates_transport_internals(self):
+        pool = ConnectionPool()
+        loop = asyncio.new_event_loop()
+        try:
+            pool._transports[loop] = {("https", "x", 443): object()}
+            assert pool._open_connections() == 0
+        finally:
+            loop.close()
+
+    def test_rate_limited_transport_defaults_to_global_pool(self):
+        transport = RateLimiterRegistry().transport("deepseek")
+        assert transport._transport.__class__.__name__ == "PooledTransport"
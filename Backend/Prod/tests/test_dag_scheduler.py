@@ -0,0 +1,152 @@
+"""Tests for the critical-path DAG scheduler."""
+import asyncio
+import time
+
+import pytest
+
+from Backend.Prod.models.plan_reader import Step, PlanValidationError
+from Backend.Prod.models.dag_scheduler import DagScheduler
+
+
+def make_step(step_id, deps=None, tokens=1000, files=None):
+    data = {
+        "id": step_id,
+        "description": f"Step {step_id}",
+        "type": "code_generation",
+        "complexity": 0.5,
+        "estimated_tokens": tokens,
+        "dependencies": deps or [],
+        "validation_criteria": [],
+    }
+    if files:
+        data["context"] = {"files": files}
+    return Step(data)
+
+
+class TestCriticalPath:
+    """Test critical path priorities."""
+
+    def test_chain_accumulates_cost(self):
+        steps = [make_step("a", tokens=1), make_step("b", ["a"], tokens=2), make_step("c", ["b"], tokens=3)]
+        scheduler = DagScheduler(steps, run_step=None)
+        assert scheduler.priorities == {"a": 6.0, "b": 5.0, "c": 3.0}
+
+    def test_cycle_detected(self):
+        steps = [make_step("a", ["b"]), make_step("b", ["a"])]
+        with pytest.raises(PlanValidationError):
+            DagScheduler(steps, run_step=None)
+
+    def test_unknown_dependency(self):
+        with pytest.raises(PlanValidationError):
+            DagScheduler([make_step("a", ["missing"])], run_step=None)
+
+
+class TestScheduling:
+    """Test ready-queue execution."""
+
+    @pytest.mark.asyncio
+    async def test_successor_starts_before_slow_sibling_finishes(self):
+        # a (slow) and b (fast) are independent; c depends only on b
+        durations = {"a": 0.3, "b": 0.05, "c": 0.05}
+        finished = {}
+
+        async def run(step):
+            await asyncio.sleep(durations[step.id])
+            finished[step.id] = time.monotonic()
+            return step.id
+
+        steps = [make_step("a"), make_step("b"), make_step("c", ["b"])]
+        outcomes = await DagScheduler(steps, run_step=run).run()
+
+        assert outcomes == {"a": "a", "b": "b", "c": "c"}
+        assert finished["c"] < finished["a"]
+
+    @pytest.mark.asyncio
+    async def test_longest_critical_path_first(self):
+        steps = [
+            make_step("short", tokens=10),
+            make_step("long_head", tokens=10),
+            make_step("long_tail", ["long_head"], tokens=5000),
+        ]
+        order = []
+
+        async def run(step):
+            order.append(step.id)
+
+        scheduler = DagScheduler(steps, run_step=run, max_concurrency=1)
+        await scheduler.run()
+        assert order[0] == "long_head"
+
+    @pytest.mark.asyncio
+    async def test_provider_limit(self):
+        running = {"n": 0, "max": 0}
+
+        async def run(step):
+            running["n"] += 1
+            running["max"] = max(running["max"], running["n"])
+            await asyncio.sleep(0.02)
+            running["n"] -= 1
+
+        steps = [make_step(f"s{i}") for i in range(6)]
+        scheduler = DagScheduler(
+            steps, run_step=run, provider_fn=lambda s: "deepseek", provider_limits={"deepseek": 2}
+        )
+        await scheduler.run()
+        assert running["max"] == 2
+        assert scheduler.stats.steps_completed == 6
+
+    @pytest.mark.asyncio
+    async def test_shared_resource_not_concurrent(self):
+        active = set()
+        overlaps = []
+
+        async def run(step):
+            if active:
+                overlaps.append((step.id, set(active)))
+            active.add(step.id)
+            await asyncio.sleep(0.02)
+            active.discard(step.id)
+
+        steps = [make_step("a", files=["x.py"]), make_step("b", files=["x.py"])]
+        await DagScheduler(
+            steps, run_step=run, resource_fn=lambda s: s.context["files"]
+        ).run()
+        assert overlaps == []
+
+    @pytest.mark.asyncio
+    async def test_exception_does_not_block_successors(self):
+        async def run(step):
+            if step.id == "a":
+                raise RuntimeError("boom")
+            return "ok"
+
+        done = []
+        steps = [make_step("a"), make_step("b", ["a"])]
+        outcomes = await DagScheduler(
+            steps, run_step=run, on_step_done=lambda s, o: done.append(s.id)
+        ).run()
+        assert isinstance(outcomes["a"], RuntimeError)
+        assert outcomes["b"] == "ok"
+        assert done == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_run_cancels_running_steps(self):
+        started = asyncio.Event()
+        cancelled = []
+
+        async def run(step):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(step.id)
+                raise
+
+        scheduler = DagScheduler([make_step("a"), make_step("b")], run_step=run)
+        runner = asyncio.ensure_future(scheduler.run())
+        await started.wait()
+        runner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await runner
+        assert sorted(cancelled) == ["a", "b"]
+        assert scheduler.running_step_ids == set()
@@ -0,0 +1,67 @@
+"""Tests for per-file async locks."""
+import asyncio
+
+import pytest
+
+from Backend.Prod.core.file_locks import FileLockManager
+
+
+class TestFileLockManager:
+    """Test FileLockManager."""
+
+    @pytest.mark.asyncio
+    async def test_same_file_serialized(self, tmp_path):
+        locks = FileLockManager(project_root=tmp_path)
+        active = []
+        overlaps = []
+
+        async def write(name):
+            async with locks.acquire(["a.py"]):
+                if active:
+                    overlaps.append(name)
+                active.append(name)
+                await asyncio.sleep(0.02)
+                active.remove(name)
+
+        await asyncio.gather(write("s1"), write("s2"), write("s3"))
+        assert overlaps == []
+        assert locks.stats.contended >= 1
+
+    @pytest.mark.asyncio
+    async def test_distinct_files_concurrent(self, tmp_path):
+        locks = FileLockManager(project_root=tmp_path)
+        active = set()
+        max_active = {"n": 0}
+
+        async def write(path):
+            async with locks.acquire([path]):
+                active.add(path)
+                max_active["n"] = max(max_active["n"], len(active))
+                await asyncio.sleep(0.02)
+                active.discard(path)
+
+        await asyncio.gather(write("a.py"), write("b.py"))
+        assert max_active["n"] == 2
+        assert locks.stats.contended == 0
+
+    @pytest.mark.asyncio
+    async def test_relative_and_absolute_paths_share_lock(self, tmp_path):
+        locks = FileLockManager(project_root=tmp_path)
+        async with locks.acquire(["pkg/../a.py"]):
+            assert locks.is_locked(str(tmp_path / "a.py"))
+        assert not locks.is_locked("a.py")
+
+    @pytest.mark.asyncio
+    async def test_overlapping_sets_no_deadlock(self, tmp_path):
+        locks = FileLockManager(project_root=tmp_path)
+
+        async def write(paths):
+            async with locks.acquire(paths):
+                await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(
+            asyncio.gather(write(["a.py", "b.py"]), write(["b.py", "a.py"])),
+            timeout=1.0
+        )
+        # Registry is emptied once no step holds a lock
+        assert locks._locks == {}
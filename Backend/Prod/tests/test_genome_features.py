@@ -0,0 +1,73 @@
+"""Tests for the batch (vectorized) path of core.genome_features.FeatureExtractor."""
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from Backend.Prod.core.genome_features import FeatureExtractor, IntentTranslator
+
+ENDPOINTS = [
+    {"path": "/api/v1/users/{userId}/products", "method": "GET", "summary": "List products for a user"},
+    {"path": "/", "method": "POST", "summary": "Create new resource"},
+    {"path": "/orgs/v2/departments/finance/reports", "method": "patch", "summary": ""},
+    {"path": "/some//path/with///empty///segments", "method": "INVALID", "summary": "Products report export"},
+    {"path": "/events/8c7e9b0a-3d2f-4c1e-8b7a-9d6c5b4a3e2d", "method": "DELETE", "summary": "Delete an event"},
+    {"path": "/items/42", "method": "", "summary": "Get one item"},
+    {"method": "GET"},
+]
+
+
+@pytest.fixture
+def extractor():
+    return FeatureExtractor(IntentTranslator(embedding_dim=8), embedding_dim=8)
+
+
+class TestExtractBatch:
+    """Test the batch feature matrix against the per-endpoint extractor."""
+
+    def test_matches_per_endpoint_features(self, extractor):
+        batch = extractor.extract_batch(ENDPOINTS)
+        assert sp.issparse(batch.matrix)
+        assert batch.shape[0] == len(ENDPOINTS)
+        assert len(batch.columns) == batch.shape[1] == len(set(batch.columns))
+
+        for row, endpoint in enumerate(ENDPOINTS):
+            single = extractor.extract(endpoint.get("path", ""), endpoint.get("method", ""), endpoint.get("summary", ""))
+            for name in ("has_id_in_path", "has_version_in_path", "has_plural_resource", "is_root_path",
+                         "method_get", "method_patch", "method_unknown", "has_summary"):
+                assert batch.column(name)[row] == single[name], (row, name)
+
+    def test_scalers_fitted_on_the_batch(self, extractor):
+        batch = extractor.extract_batch(ENDPOINTS)
+        depth = batch.column("path_depth_normalized")
+        assert depth.mean() == pytest.approx(0.0)
+        assert depth[2] > depth[1]  # 5 segments vs root
+
+    def test_tfidf_fitted_once_and_reused(self, extractor):
+        batch = extractor.extract_batch(ENDPOINTS, sparse=False)
+        assert isinstance(batch.matrix, np.ndarray)
+        assert "summary_tfidf_products" in batch.columns
+
+        again = extractor.extract_batch([{"path": "/x", "method": "GET", "summary": "products"}], fit=False)
+        assert again.columns == batch.columns
+        assert again.column("summary_tfidf_products")[0] == pytest.approx(1.0)
+
+    def test_transform_requires_fit(self, extractor):
+        with pytest.raises(ValueError):
+            extractor.extract_batch(ENDPOINTS, fit=False)
+
+    def test_empty_vocabulary_and_embeddings(self, extractor):
+        batch = extractor.extract_batch([{"path": "/a"}, {"path": "/b", "summary": "the"}], include_embeddings=True)
+        assert not any(c.startswith("summary_tfidf_") for c in batch.columns)
+        embedding = batch.to_dense()[:, batch.columns.index("summary_embedding_0"):][:, :8]
+        assert not embedding[0].any()
+        assert np.allclose(embedding[1], extractor.intent_translator.get_features_from_text("the"))
+
+    def test_empty_batch(self, extractor):
+        empty = extractor.extract_batch([], include_embeddings=True)
+        full = extractor.extract_batch(ENDPOINTS, include_embeddings=True)
+        assert empty.shape == (0, len(empty.columns))
+        assert empty.columns == [c for c in full.columns if not c.startswith("summary_tfidf_")]
+
+        again = extractor.extract_batch([], fit=False, include_embeddings=True, sparse=False)
+        assert again.columns == full.columns
+        assert again.matrix.shape == (0, len(full.columns))
@@ -0,0 +1,109 @@
+"""Tests for batched x_ui_hint inference in genome generation."""
+import json
+from types import SimpleNamespace
+
+from Backend.Prod.core import genome_generator
+from Backend.Prod.core.genome_generator import _infer_ui_hints, generate_genome
+
+
+class FakeTranslator:
+    """Maps queries to STAR patterns by keyword and records batched calls."""
+
+    mappings_digest = "fake-v1"
+
+    def __init__(self):
+        self.calls = []
+
+    def search_situations(self, queries, limit=5):
+        self.calls.append(list(queries))
+        results = []
+        for query in queries:
+            if "popup" in query:
+                results.append([SimpleNamespace(pattern_name="Modal")])
+            elif "menu" in query:
+                results.append([SimpleNamespace(pattern_name="Navigation")])
+            else:
+                results.append([])
+        return results
+
+    def propagate_star(self, situation):
+        return object()
+
+
+ENDPOINTS = [
+    ("/health", "get", "Health"),  # heuristic: status
+    ("/widgets/{widget_id}/popup", "post", "Open popup"),
+    ("/widgets/{id}/popup", "post", "Open  Popup"),  # same normalized query
+    ("/side", "post", "Main menu"),
+    ("/misc", "post", "Something else"),
+]
+
+
+class TestInferUiHints:
+    """Test heuristic + batched semantic inference and its persistent cache."""
+
+    def test_single_batched_semantic_pass(self, tmp_path):
+        translator = FakeTranslator()
+        hints = _infer_ui_hints(ENDPOINTS, tmp_path / "hints.json", intent_translator=translator)
+
+        assert hints == ["status", "form", "form", "dashboard", "generic"]
+        assert len(translator.calls) == 1
+        assert len(translator.calls[0]) == 3  # heuristic hit skipped, duplicate merged
+
+    def test_cache_only_reinfers_changed_endpoints(self, tmp_path):
+        cache_path = tmp_path / "hints.json"
+        _infer_ui_hints(ENDPOINTS, cache_path, intent_translator=FakeTranslator())
+
+        translator = FakeTranslator()
+        changed = ENDPOINTS[:-1] + [("/misc", "post", "Burger menu")]
+        hints = _infer_ui_hints(changed, cache_path, intent_translator=translator)
+
+        assert hints[-1] == "dashboard"
+        assert translator.calls == [["/misc post burger menu"]]
+        # Stale signature of the old /misc summary is dropped
+        assert len(json.loads(cache_path.read_text())["hints"]) == 3
+
+    def test_cache_invalidated_when_mappings_change(self, tmp_path):
+        cache_path = tmp_path / "hints.json"
+        _infer_ui_hints(ENDPOINTS, cache_path, intent_translator=FakeTranslator())
+
+        translator = FakeTranslator()
+        translator.mappings_digest = "fake-v2"
+        _infer_ui_hints(ENDPOINTS, cache_path, intent_translator=translator)
+        assert len(translator.calls[0]) == 3
+
+    def test_translator_error_keeps_heuristics(self, tmp_path):
+        translator = FakeTranslator()
+        translator.search_situations = None  # not callable
+        hints = _infer_ui_hints(ENDPOINTS, tmp_path / "hints.json", intent_translator=translator)
+        assert hints == ["status", "generic", "generic", "generic", "generic"]
+
+
+def test_generate_genome_uses_batched_hints(tmp_path, monkeypatch):
+    openapi = {
+        "paths": {
+            "/health": {"get": {"summary": "Health"}},
+            "/items/{id}": {"get": {}, "delete": {"summary": "Remove"}},
+            "/misc": {"post": {"description": "Open popup"}},
+        }
+    }
+    translator = FakeTranslator()
+    monkeypatch.setattr(genome_generator, "_get_openapi", lambda: openapi)
+    original = genome_generator._infer_ui_hints
+    monkeypatch.setattr(
+        genome_generator,
+        "_infer_ui_hints",
+        lambda operations, cache_path=None: original(operations, cache_path, intent_translator=translator),
+    )
+
+    out = generate_genome(output_path=tmp_path / "genome.json", hint_cache_path=tmp_path / "hints.json")
+    genome = json.loads(out.read_text())
+
+    assert [(e["method"], e["path"], e["x_ui_hint"]) for e in genome["endpoints"]] == [
+        ("GET", "/health", "status"),
+        ("GET", "/items/{id}", "detail"),
+        ("DELETE", "/items/{id}", "form"),
+        ("POST", "/misc", "form"),
+    ]
+    assert translator.calls == [["/misc post open popup"]]
+    assert (tmp_path / "hints.json").exists()
@@ -0,0 +1,82 @@
+"""Tests for the content-addressed fragment cache of genome_to_svg_v2.generate_svg."""
+import copy
+
+import pytest
+
+from Backend.Prod.exporters import genome_to_svg_v2 as g2s
+
+
+def make_organ(organ_id, hint="table"):
+    return {
+        "id": organ_id,
+        "name": organ_id.upper(),
+        "ui_role": "main-content",
+        "n2_features": [{"n3_components": [{"id": f"{organ_id}_c", "name": "Comp", "visual_hint": hint}]}],
+    }
+
+
+GENOME = {
+    "n0_phases": [
+        {"id": "n0_brainstorm", "name": "Brainstorm", "n1_sections": [make_organ("a"), make_organ("b")]},
+        {"id": "n0_backend", "name": "Backend", "n1_sections": [make_organ("c"), make_organ("d")]},
+    ],
+}
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Record organ ids passed to the underlying renderer."""
+    g2s.clear_render_cache()
+    calls = []
+    original = g2s.render_organ or g2s._render_organ_zones
+
+    def counting(organ, x, y, w):
+        calls.append(organ["id"])
+        return original(organ, x, y, w)
+
+    monkeypatch.setattr(g2s, "render_organ", counting)
+    yield calls
+    g2s.clear_render_cache()
+
+
+class TestRenderCache:
+    """Test per-phase and per-organ memoization."""
+
+    def test_unchanged_genome_is_served_from_cache(self, rendered):
+        first = g2s.generate_svg(GENOME)
+        assert sorted(rendered) == ["a", "b", "c", "d"]
+
+        rendered.clear()
+        assert g2s.generate_svg(copy.deepcopy(GENOME)) == first
+        assert rendered == []
+        assert g2s.render_cache_stats()["phases"]["hits"] == 2
+
+    def test_local_edit_rerenders_only_touched_organ(self, rendered):
+        g2s.generate_svg(GENOME)
+        edited = copy.deepcopy(GENOME)
+        edited["n0_phases"][1]["n1_sections"][1]["name"] = "Renamed"
+
+        rendered.clear()
+        svg = g2s.generate_svg(edited)
+
+        assert rendered == ["d"]
+        assert "Renamed" in svg
+
+        g2s.clear_render_cache()
+        assert g2s.generate_svg(edited) == svg  # spliced output matches a cold render
+
+    def test_style_id_is_part_of_the_key(self, rendered):
+        g2s.generate_svg(GENOME, style_id="minimal")
+        rendered.clear()
+        g2s.generate_svg(GENOME, style_id="swiss")
+        assert rendered == []  # organs unchanged, only phase assembly differs
+        assert g2s.render_cache_stats()["phases"]["misses"] == 4
+
+    def test_lru_bound(self):
+        cache = g2s._RenderCache(maxsize=2)
+        cache.put("a", ("<a/>", 1))
+        cache.put("b", ("<b/>", 1))
+        assert cache.get("a") is not None
+        cache.put("c", ("<c/>", 1))
+        assert cache.get("b") is None
+        assert len(cache) == 2
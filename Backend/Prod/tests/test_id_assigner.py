@@ -0,0 +1,46 @@
+"""Tests for the linear ID assignment pass of the Stenciler (core/id_assigner)."""
+import sys
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+# Le Stenciler importe ses modules depuis son propre répertoire
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "Frontend" / "3. STENCILER"))
+
+from core import id_assigner
+from core.id_assigner import ensure_ids, pick_parser
+
+
+def ids(html: str) -> list:
+    return [el.get("id") for el in BeautifulSoup(html, "html.parser").find_all(True)]
+
+
+class TestEnsureIds:
+    """Test slug IDs, suffixes and parser selection."""
+
+    def test_duplicate_labels_and_ids(self):
+        html = ensure_ids(
+            '<div id="keep"></div><p id="keep"></p>'
+            "<button>Acheter</button><button>Acheter</button><a>Acheter</a>"
+        )
+        assert ids(html) == ["keep", "keep", "btn-acheter", "btn-acheter-1", "lnk-acheter"]
+
+    def test_suffix_resumes_after_taken_ids(self):
+        html = ensure_ids('<span id="btn-go-1"></span><button>Go</button><button>Go</button><button>Go</button>')
+        assert ids(html) == ["btn-go-1", "btn-go", "btn-go-2", "btn-go-3"]
+
+    def test_generic_id_freed_by_rename(self):
+        html = ensure_ids('<button id="el-1">Go</button><h2></h2><section id="sec-12345"></section>')
+        assert ids(html) == ["btn-go", "el-1", "sec-12345"]
+
+    def test_fragment_vs_full_document_parser(self, monkeypatch):
+        monkeypatch.setattr(id_assigner, "HAS_LXML", True)
+        assert pick_parser("<button>Go</button>") == "html.parser"
+        assert pick_parser("  <!DOCTYPE html><html><body></body></html>") == "lxml"
+        assert pick_parser("<HTML><body></body></HTML>") == "lxml"
+        assert pick_parser("<html></html>", parser="html5lib") == "html5lib"
+        monkeypatch.setattr(id_assigner, "HAS_LXML", False)
+        assert pick_parser("<!doctype html><html></html>") == "html.parser"
+
+    def test_fragment_not_wrapped(self):
+        assert ensure_ids("<button>Go</button>") == '<button id="btn-go">Go</button>'
@@ -0,0 +1,45 @@
+"""Tests for lazy / background RAG initialization."""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from Backend.Prod.rag import LazyRetriever
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+
+class TestLazyRetriever:
+    """Test deferred PageIndexRetriever construction."""
+
+    def test_not_started_until_needed(self, tmp_path):
+        rag = LazyRetriever(document_paths=[str(tmp_path / "missing.md")], index_dir=str(tmp_path / "idx"))
+        assert not rag.ready
+        assert rag.enabled
+        assert rag.timings == {}
+
+    def test_warm_up_is_idempotent(self, tmp_path):
+        rag = LazyRetriever(document_paths=[str(tmp_path / "missing.md")], index_dir=str(tmp_path / "idx"))
+        future = rag.warm_up()
+        assert rag.warm_up() is future
+        future.result(timeout=30)
+        assert rag.ready
+        assert "total_ms" in rag.timings
+
+    @pytest.mark.asyncio
+    async def test_retrieve_without_documents_returns_empty(self, tmp_path):
+        rag = LazyRetriever(document_paths=[str(tmp_path / "missing.md")], index_dir=str(tmp_path / "idx"))
+        assert await rag.retrieve("anything") == []
+        assert not rag.enabled
+        assert rag.get_index_stats()["ready"] is True
+
+    def test_orchestrator_import_does_not_load_index_module(self):
+        code = (
+            "import sys, Backend.Prod.orchestrator; "
+            "print('Backend.Prod.rag.pageindex_store' in sys.modules)"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, timeout=60
+        )
+        assert out.stdout.strip().splitlines()[-1] == "False"
@@ -0,0 +1,112 @@
+"""Tests for bounded-concurrency organ SVG generation in the exporters."""
+import asyncio
+
+import pytest
+
+from Backend.Prod.exporters import genome_to_svg_v2
+from Backend.Prod.exporters.organ_batch import OrganSVGCache, iter_organs, render_organs
+
+
+def make_organ(organ_id, name=None):
+    return {
+        "id": organ_id,
+        "name": name or organ_id,
+        "ui_role": "main-content",
+        "n2_features": [{"n3_components": [{"id": f"{organ_id}_c", "name": "Table", "visual_hint": "table"}]}],
+    }
+
+
+GENOME = {
+    "n0_app_shell": {"n1_sections": [make_organ("shell")]},
+    "n0_phases": [
+        {"id": "n0_brainstorm", "name": "Brainstorm", "n1_sections": [make_organ("a"), make_organ("b")]},
+        {"id": "n0_backend", "name": "Backend", "n1_sections": [make_organ("c")]},
+    ],
+}
+
+
+class TestRenderOrgans:
+    """Test bounded parallelism, deduplication and the content-hash cache."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        active = peak = 0
+
+        async def render_one(organ):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            return f"<g>{organ['id']}</g>"
+
+        organs = [make_organ(f"o{i}") for i in range(10)]
+        results = await render_organs(organs, render_one, concurrency=3)
+
+        assert peak == 3
+        assert [r.value for r in results] == [f"<g>o{i}</g>" for i in range(10)]
+
+    @pytest.mark.asyncio
+    async def test_identical_organs_rendered_once(self):
+        calls = []
+
+        async def render_one(organ):
+            calls.append(organ["id"])
+            return "<g/>"
+
+        results = await render_organs([make_organ("x"), make_organ("x"), make_organ("y")], render_one)
+        assert sorted(calls) == ["x", "y"]
+        assert len(results) == 3
+
+    @pytest.mark.asyncio
+    async def test_cache_keyed_on_content_and_style(self, tmp_path):
+        cache = OrganSVGCache(tmp_path)
+        calls = []
+
+        async def render_one(organ):
+            calls.append(organ["id"])
+            return "<g/>" if organ["id"] != "empty" else None
+
+        organs = [make_organ("a"), make_organ("empty")]
+        await render_organs(organs, render_one, style_id="minimal", cache=cache)
+        results = await render_organs(organs, render_one, style_id="minimal", cache=cache)
+
+        assert calls == ["a", "empty", "empty"]  # empty results are not cached
+        assert results[0].cached and results[0].status == "ok"
+        assert results[1].status == "no_svg"
+
+        await render_organs([make_organ("a", name="Renamed")], render_one, style_id="minimal", cache=cache)
+        await render_organs([make_organ("a")], render_one, style_id="swiss", cache=cache)
+        assert calls[-2:] == ["a", "a"]
+
+    @pytest.mark.asyncio
+    async def test_errors_are_isolated(self):
+        async def render_one(organ):
+            if organ["id"] == "bad":
+                raise RuntimeError("boom")
+            return "<g/>"
+
+        results = await render_organs([make_organ("bad"), make_organ("good")], render_one)
+        assert [r.status for r in results] == ["error", "ok"]
+        assert results[0].error == "boom"
+
+
+def test_iter_organs_covers_all_phases():
+    assert [o["id"] for o in iter_organs(GENOME)] == ["a", "b", "c"]
+    assert [o["id"] for o in iter_organs(GENOME, include_app_shell=True)] == ["shell", "a", "b", "c"]
+
+
+def test_generate_svg_assembles_after_all_organs_resolve(monkeypatch):
+    requested = []
+
+    async def fake_payloads(organs, **kwargs):
+        requested.extend(o["id"] for o in organs)
+        return {o["id"]: (f'<g data-kimi="{o["id"]}"/>', 180) for o in organs if o["id"] != "b"}
+
+    monkeypatch.setattr(genome_to_svg_v2, "_kimi_organ_payloads", fake_payloads)
+    svg = genome_to_svg_v2.generate_svg(GENOME, use_kimi=True)
+
+    assert requested == ["shell", "a", "b", "c"]  # one batch for every phase
+    assert svg.count('data-kimi="shell"') == 2  # app shell repeated in each phase
+    assert 'data-kimi="a"' in svg and 'data-kimi="c"' in svg
+    assert 'data-kimi="b"' not in svg and 'data-genome-id="b"' in svg  # static fallback
@@ -0,0 +1,55 @@
+"""Tests for incremental PageIndexRetriever updates."""
+import json
+
+import pytest
+
+pytest.importorskip("llama_index.core")
+
+from Backend.Prod.rag.pageindex_store import PageIndexRetriever, MANIFEST_FILE
+
+
+def make_docs(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.md").write_text("# A\n\nalpha\n\n## B\n\nbeta\n")
+    (docs / "b.md").write_text("# C\n\ngamma\n")
+    return docs
+
+
+def load_manifest(index_dir):
+    return json.loads((index_dir / MANIFEST_FILE).read_text())["documents"]
+
+
+class TestIncrementalIndex:
+    """Test per-document manifest updates."""
+
+    def test_unchanged_docs_reuse_index(self, tmp_path):
+        docs = make_docs(tmp_path)
+        index_dir = tmp_path / "idx"
+        PageIndexRetriever(docs_path=str(docs), index_dir=str(index_dir))
+        before = load_manifest(index_dir)
+
+        retriever = PageIndexRetriever(docs_path=str(docs), index_dir=str(index_dir))
+        assert retriever.enabled
+        assert load_manifest(index_dir) == before
+
+    def test_only_changed_document_is_reparsed(self, tmp_path):
+        docs = make_docs(tmp_path)
+        index_dir = tmp_path / "idx"
+        PageIndexRetriever(docs_path=str(docs), index_dir=str(index_dir))
+        before = load_manifest(index_dir)
+
+        (docs / "a.md").write_text("# A\n\nalpha changed\n")
+        (docs / "b.md").unlink()
+        (docs / "c.md").write_text("# D\n\ndelta\n")
+        retriever = PageIndexRetriever(docs_path=str(docs), index_dir=str(index_dir))
+        after = load_manifest(index_dir)
+
+        key_a = str((docs / "a.md").resolve())
+        assert after[key_a]["hash"] != before[key_a]["hash"]
+        assert str((docs / "b.md").resolve()) not in after
+        assert str((docs / "c.md").resolve()) in after
+
+        docstore_ids = set(retriever.index.docstore.docs)
+        expected_ids = {node_id for entry in after.values() for node_id in entry["node_ids"]}
+        assert docstore_ids == expected_ids
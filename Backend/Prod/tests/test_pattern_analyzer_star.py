@@ -13,6 +13,15 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from Backend.Prod.sullivan.analyzer.pattern_analyzer import PatternAnalyzer
 from Backend.Prod.sullivan.library.elite_library import EliteLibrary
 from Backend.Prod.sullivan.models.component import Component
+from Backend.Prod.sullivan.intent_translator import reset_intent_translator
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_intent_translator():
+    """get_intent_translator() est partagé par processus : chaque test repart d'une instance neuve."""
+    reset_intent_translator()
+    yield
+    reset_intent_translator()
 
 
 @pytest.fixture
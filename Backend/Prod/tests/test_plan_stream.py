@@ -0,0 +1,107 @@
+"""Tests for incremental plan parsing in streaming mode."""
+import asyncio
+import json
+
+import pytest
+
+from Backend.Prod.models.plan_reader import PlanReader, PlanValidationError
+from Backend.Prod.models.plan_stream import IncrementalPlanParser, PlanStreamError
+
+
+def make_step(step_id, deps=()):
+    return {
+        "id": step_id,
+        "description": f"Step {step_id} {{with}} [brackets], \"quotes\" and é",
+        "type": "code_generation",
+        "complexity": 0.5,
+        "estimated_tokens": 100,
+        "dependencies": list(deps),
+        "context": {"files": ["a.py"], "nested": {"x": [1, 2]}},
+    }
+
+
+PLAN = {
+    "task_id": "task-1",
+    "description": "Streaming plan",
+    "metadata": {"author": "planner"},
+    "steps": [make_step("s1"), make_step("s2", ["s1"]), make_step("s3", ["s2"])],
+}
+
+
+class TestIncrementalPlanParser:
+    """Test the event-driven step parser."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 100000])
+    def test_any_chunking_yields_same_steps(self, chunk_size):
+        text = json.dumps(PLAN, ensure_ascii=False, indent=2)
+        parser = IncrementalPlanParser()
+        steps = []
+        for i in range(0, len(text), chunk_size):
+            steps.extend(parser.feed(text[i:i + chunk_size]))
+
+        assert steps == PLAN["steps"]
+        assert parser.done
+        assert parser.header == {k: v for k, v in PLAN.items() if k != "steps"}
+
+    def test_step_emitted_on_closing_brace(self):
+        text = json.dumps(PLAN)
+        first_end = text.index('"s2"')  # inside the second step
+        parser = IncrementalPlanParser()
+        assert [s["id"] for s in parser.feed(text[:first_end])] == ["s1"]
+        assert parser.header["task_id"] == "task-1"
+        assert not parser.done
+
+    def test_buffer_does_not_keep_consumed_steps(self):
+        parser = IncrementalPlanParser()
+        parser.feed('{"task_id": "t", "steps": [')
+        for i in range(200):
+            parser.feed(json.dumps(make_step(f"s{i}")) + ",")
+        assert len(parser._buf) < 10
+        assert parser.steps_seen == 200
+
+    def test_invalid_document(self):
+        with pytest.raises(PlanStreamError):
+            IncrementalPlanParser().feed('[{"id": 1}]')
+
+
+class TestReadStreaming:
+    """Test PlanReader.read_streaming against a growing file and a byte stream."""
+
+    @pytest.mark.asyncio
+    async def test_file_steps_arrive_before_plan_is_complete(self, tmp_path):
+        plan_path = tmp_path / "plan.json"
+        text = json.dumps(PLAN).encode()
+        cut = text.index(b'"s2"')
+        plan_path.write_bytes(text[:cut])
+
+        reader = PlanReader(schema_path=tmp_path / "missing_schema.json")
+        stream = reader.read_streaming(plan_path, max_wait_seconds=5, check_interval=0.01)
+        first = await asyncio.wait_for(stream.__anext__(), timeout=2)
+        assert first.id == "s1"
+        assert reader.stream_header["description"] == "Streaming plan"
+
+        with open(plan_path, "ab") as f:
+            f.write(text[cut:])
+        rest = [step.id async for step in stream]
+        assert rest == ["s2", "s3"]
+
+    @pytest.mark.asyncio
+    async def test_in_memory_stream(self, tmp_path):
+        text = json.dumps(PLAN, ensure_ascii=False).encode()
+
+        async def planner():
+            for i in range(0, len(text), 5):  # splits multi-byte characters too
+                yield text[i:i + 5]
+
+        reader = PlanReader(schema_path=tmp_path / "missing_schema.json")
+        ids = [step.id async for step in reader.read_streaming(stream=planner())]
+        assert ids == ["s1", "s2", "s3"]
+
+    @pytest.mark.asyncio
+    async def test_truncated_stream_raises(self, tmp_path):
+        async def planner():
+            yield json.dumps(PLAN)[:40]
+
+        reader = PlanReader(schema_path=tmp_path / "missing_schema.json")
+        with pytest.raises(PlanValidationError):
+            [step async for step in reader.read_streaming(stream=planner())]
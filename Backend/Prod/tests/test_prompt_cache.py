@@ -0,0 +1,168 @@
+"""Tests for the persistent prompt / semantic caches."""
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from Backend.Prod.cache import CacheStore, PromptCache, SemanticCache, normalize_prompt
+from Backend.Prod.models.agent_router import AgentRouter
+from Backend.Prod.models.deepseek_client import GenerationResult
+from Backend.Prod.models.plan_reader import Step
+
+
+class TestCacheStore:
+    """Test SQLite cache store bounds."""
+
+    def test_put_get_roundtrip(self, tmp_path):
+        store = CacheStore(tmp_path / "c.db")
+        store.put("k1", "hello", namespace="ns", metadata={"a": 1}, tokens_saved=10)
+        entry = store.get("k1")
+        assert entry.response == "hello"
+        assert entry.metadata == {"a": 1}
+        assert entry.tokens_saved == 10
+        assert entry.hits == 1
+
+    def test_lru_eviction_by_count(self, tmp_path):
+        store = CacheStore(tmp_path / "c.db", max_entries=2)
+        store.put("a", "1")
+        time.sleep(0.01)
+        store.put("b", "2")
+        time.sleep(0.01)
+        store.get("a")  # "b" becomes least recently used
+        time.sleep(0.01)
+        store.put("c", "3")
+        assert store.get("b") is None
+        assert store.get("a") is not None
+        assert store.get("c") is not None
+        assert store.get_stats()["evictions"] == 1
+
+    def test_eviction_by_bytes(self, tmp_path):
+        store = CacheStore(tmp_path / "c.db", max_bytes=200)
+        for i in range(5):
+            store.put(f"k{i}", "x" * 60)
+            time.sleep(0.01)
+        assert store.total_bytes() <= 200
+        assert store.get("k4") is not None
+        assert store.get("k0") is None
+
+    def test_ttl_expiry(self, tmp_path):
+        store = CacheStore(tmp_path / "c.db", ttl_seconds=0.05)
+        store.put("k", "v")
+        time.sleep(0.1)
+        assert store.get("k") is None
+
+
+class TestPromptCache:
+    """Test exact-match prompt cache."""
+
+    def test_normalize_prompt(self):
+        assert normalize_prompt("a  \r\nb\n\n\n\nc  ") == "a\nb\n\nc"
+
+    def test_hit_requires_same_provider_model_context(self, tmp_path):
+        cache = PromptCache(db_path=tmp_path / "p.db")
+        cache.put("Task: x", "out", context="ctx", provider="groq", model="m1", tokens_saved=100)
+
+        assert cache.get("Task: x  \n", context="ctx", provider="groq", model="m1") == "out"
+        assert cache.get("Task: x", context="other", provider="groq", model="m1") is None
+        assert cache.get("Task: x", context="ctx", provider="deepseek", model="m1") is None
+        assert cache.get("Task: x", context="ctx", provider="groq", model="m2") is None
+
+        summary = cache.get_cache_summary()
+        assert summary["cache_hits"] == 1
+        assert summary["cache_misses"] == 3
+        assert summary["tokens_saved"] == 100
+        assert summary["session"]["cache_hits"] == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        PromptCache(db_path=tmp_path / "p.db").put("p", "r", provider="groq")
+        assert PromptCache(db_path=tmp_path / "p.db").get("p", provider="groq") == "r"
+
+    def test_disabled(self, tmp_path):
+        cache = PromptCache(db_path=tmp_path / "p.db", enabled=False)
+        cache.put("p", "r")
+        assert cache.get("p") is None
+
+
+class TestSemanticCache:
+    """Test semantic cache with the hashing encoder (no sentence-transformers)."""
+
+    def test_near_duplicate_hit(self, tmp_path):
+        cache = SemanticCache(db_path=tmp_path / "s.db", use_embeddings=False)
+        prompt = "Task: Create a FastAPI endpoint returning the list of users with pagination support"
+        cache.put(prompt, "code", namespace="step_1")
+
+        hit = cache.get(prompt.replace("users", "users "), namespace="step_1")
+        assert hit is not None
+        assert hit[0] == "code"
+        assert hit[1] >= cache.similarity_threshold
+
+    def test_unrelated_prompt_misses(self, tmp_path):
+        cache = SemanticCache(db_path=tmp_path / "s.db", use_embeddings=False)
+        cache.put("Task: Create a FastAPI endpoint for users", "code", namespace="step_1")
+        assert cache.get("Task: Write a bash script to rotate logs", namespace="step_1") is None
+
+    def test_namespace_isolation(self, tmp_path):
+        cache = SemanticCache(db_path=tmp_path / "s.db", use_embeddings=False)
+        cache.put("Task: same prompt", "code", namespace="step_1")
+        assert cache.get("Task: same prompt", namespace="step_2") is None
+        assert cache.get("Task: same prompt", namespace="step_1") == ("code", 1.0)
+
+    def test_summary(self, tmp_path):
+        cache = SemanticCache(db_path=tmp_path / "s.db", use_embeddings=False)
+        cache.put("Task: a", "r", namespace="n", tokens_saved=50)
+        cache.get("Task: a", namespace="n")
+        summary = cache.get_cache_summary()
+        assert summary["total_entries"] == 1
+        assert summary["cache_hits"] == 1
+        assert summary["tokens_saved"] == 50
+        assert summary["entries_by_namespace"] == {"n": 1}
+
+
+def make_router(client, **caches):
+    """AgentRouter on a single mocked provider, without fallback cascade."""
+    with patch.object(AgentRouter, "_initialize_clients", lambda self: self._clients.update(deepseek=client)):
+        router = AgentRouter(**caches)
+    router.fallback_cascade = None
+    return router
+
+
+def make_client():
+    return AsyncMock(model="deepseek-chat", generate=AsyncMock(return_value=GenerationResult(
+        success=True, code="def f(): pass", tokens_used=50, input_tokens=30,
+        output_tokens=20, cost_usd=0.001, execution_time_ms=10, provider="deepseek"
+    )))
+
+
+def make_step():
+    return Step({
+        "id": "step_1", "description": "Create a FastAPI endpoint listing users",
+        "type": "code_generation", "complexity": 0.3, "estimated_tokens": 100,
+        "context": {"provider": "deepseek"}
+    })
+
+
+class TestAgentRouterCache:
+    """Test cache wiring in AgentRouter."""
+
+    @pytest.mark.asyncio
+    async def test_simple_path_stores_results(self, tmp_path):
+        client = make_client()
+        router = make_router(client, prompt_cache=PromptCache(db_path=tmp_path / "p.db"))
+        first = await router.execute_step(make_step(), context="plan A")
+        second = await router.execute_step(make_step(), context="plan A")
+        assert first.output == second.output == "def f(): pass"
+        assert client.generate.await_count == 1
+        assert second.cost_usd == 0.0
+
+    @pytest.mark.asyncio
+    async def test_semantic_namespace_isolates_plans(self, tmp_path):
+        client = make_client()
+        router = make_router(client, semantic_cache=SemanticCache(db_path=tmp_path / "s.db", use_embeddings=False))
+        await router.execute_step(make_step(), context="plan A")
+        await router.execute_step(make_step(), context="plan B")
+        assert client.generate.await_count == 2
+        await router.execute_step(make_step(), context="plan B")
+        assert client.generate.await_count == 2
+        namespaces = router.semantic_cache.get_cache_summary()["entries_by_namespace"]
+        assert len(namespaces) == 2
+        assert all(ns.startswith("step_step_1:deepseek:") for ns in namespaces)
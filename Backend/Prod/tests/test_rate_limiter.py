@@ -0,0 +1,127 @@
+"""Tests for the adaptive per-provider rate limiter."""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from Backend.Prod.network.rate_limiter import (
+    ProviderQuota,
+    ProviderRateLimiter,
+    RateLimiterRegistry,
+    TokenBucket,
+    estimate_request_tokens,
+    get_rate_limiter,
+    parse_reset,
+)
+from Backend.Prod.models.provider_fallback_cascade import FailureType, ProviderFallbackCascade
+
+
+def make_transport(registry, provider, handler):
+    return registry.transport(provider, httpx.MockTransport(handler))
+
+
+class TestParsing:
+    """Test header parsing helpers."""
+
+    def test_parse_reset_formats(self):
+        assert parse_reset("12") == 12.0
+        assert parse_reset("1m30.5s") == pytest.approx(90.5)
+        assert parse_reset("250ms") == pytest.approx(0.25)
+        assert parse_reset("2024-01-01T00:00:10Z", now=1704067200.0) == pytest.approx(10.0)
+        assert parse_reset("garbage") is None
+
+    def test_estimate_request_tokens(self):
+        request = httpx.Request("POST", "https://x", json={"messages": "a" * 400, "max_tokens": 100})
+        assert estimate_request_tokens(request) >= 200
+
+
+class TestTokenBucket:
+    """Test token bucket refill."""
+
+    def test_wait_time(self):
+        bucket = TokenBucket(per_minute=60)
+        now = time.monotonic()
+        bucket.consume(60)
+        assert bucket.wait_time(1, now) == pytest.approx(1.0, abs=0.05)
+        assert bucket.wait_time(1, now + 1.0) == 0.0
+
+
+class TestProviderRateLimiter:
+    """Test AIMD concurrency and cooldowns."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_capped(self):
+        registry = RateLimiterRegistry(quotas={"p": ProviderQuota(max_concurrency=2)})
+        running = {"n": 0, "max": 0}
+
+        async def handler(request):
+            running["n"] += 1
+            running["max"] = max(running["max"], running["n"])
+            await asyncio.sleep(0.02)
+            running["n"] -= 1
+            return httpx.Response(200)
+
+        async with httpx.AsyncClient(transport=make_transport(registry, "p", handler)) as client:
+            await asyncio.gather(*[client.get("https://x") for _ in range(6)])
+        assert running["max"] == 2
+        assert registry.get("p").in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_429_halves_concurrency_and_pauses(self):
+        registry = RateLimiterRegistry(quotas={"p": ProviderQuota(max_concurrency=8)})
+
+        def handler(request):
+            return httpx.Response(429, headers={"retry-after": "0.2"})
+
+        async with httpx.AsyncClient(transport=make_transport(registry, "p", handler)) as client:
+            await client.get("https://x")
+        limiter = registry.get("p")
+        assert limiter.concurrency_limit == 4
+        assert 0 < limiter.cooldown_remaining() <= 0.2
+
+        started = time.monotonic()
+        await limiter.acquire()
+        limiter.release()
+        assert time.monotonic() - started >= 0.1
+
+    def test_additive_increase(self):
+        limiter = ProviderRateLimiter("p", ProviderQuota(max_concurrency=4))
+        limiter.observe(429, httpx.Headers({"retry-after": "0"}))
+        assert limiter.concurrency_limit == 2
+        for _ in range(3):
+            limiter.observe(200, httpx.Headers())
+        assert limiter.concurrency_limit == 3
+
+    def test_headers_sync_buckets(self):
+        limiter = ProviderRateLimiter("p", ProviderQuota(tokens_per_minute=100_000))
+        limiter.observe(200, httpx.Headers({
+            "x-ratelimit-limit-tokens": "6000",
+            "x-ratelimit-remaining-tokens": "0",
+            "x-ratelimit-reset-tokens": "7.5s",
+        }))
+        assert limiter.tokens.capacity == 6000
+        assert limiter.tokens.available < 10
+        assert 7.0 < limiter.cooldown_remaining() <= 7.5
+
+
+    @pytest.mark.asyncio
+    async def test_completion_budget_refunded(self):
+        registry = RateLimiterRegistry(quotas={"p": ProviderQuota(tokens_per_minute=12_000)})
+        transport = make_transport(registry, "p", lambda request: httpx.Response(200))
+        limiter = registry.get("p")
+        async with httpx.AsyncClient(transport=transport) as client:
+            for _ in range(3):
+                await client.post("https://x", json={"messages": "a" * 400, "max_tokens": 8000})
+        assert limiter.stats.throttled == 0
+        assert limiter.tokens.available > 11_000
+
+
+class TestCascadeIntegration:
+    """Test the fallback cascade honours limiter cooldowns."""
+
+    def test_long_cooldown_switches_provider(self):
+        get_rate_limiter("cascade_test").observe(429, httpx.Headers({"retry-after": "120"}))
+        cascade = ProviderFallbackCascade(clients={})
+        should_retry, _ = cascade.should_retry(FailureType.RATE_LIMIT, 0, "cascade_test")
+        assert not should_retry
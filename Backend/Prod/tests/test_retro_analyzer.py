@@ -0,0 +1,105 @@
+"""Tests for concurrent multi-image analysis in RetroGenomeAnalyzer."""
+import asyncio
+import base64
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from Backend.Prod.retro_genome.analyzer import ImagePreprocessor, RetroGenomeAnalyzer
+
+
+class FakeClient:
+    """Vision client answering with a JSON echo after a delay, tracking concurrency."""
+
+    def __init__(self, delay=0.05, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.active = self.peak = 0
+        self.closed = False
+
+    async def generate_with_image(self, prompt, image_base64, mime_type, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        if self.fail:
+            return SimpleNamespace(success=False, error="quota", code="")
+        return SimpleNamespace(success=True, code=json.dumps({"elements": [{"id": f"e{len(image_base64)}"}]}))
+
+    async def close(self):
+        self.closed = True
+
+
+class DictCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+
+def make_pngs(tmp_path, count, size=(64, 48)):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"screen_{i}.png"
+        Image.new("RGB", size, (i * 40 % 256, 80, 120)).save(path)
+        paths.append(path)
+    return paths
+
+
+class TestAnalyzeMultiple:
+    """Test bounded concurrency, shared client and result caching."""
+
+    @pytest.mark.asyncio
+    async def test_images_analyzed_concurrently_in_order(self, tmp_path):
+        client = FakeClient()
+        analyzer = RetroGenomeAnalyzer(client=client, cache=DictCache(), max_concurrency=2)
+        paths = make_pngs(tmp_path, 5)
+
+        result = await analyzer.analyze_multiple(paths)
+
+        sources = [r["source"] for r in result["multi_template_analysis"]]
+        assert sources == [p.name for p in paths]
+        assert client.peak == 2
+        assert client.calls == 5
+        assert not client.closed  # shared client stays usable
+
+    @pytest.mark.asyncio
+    async def test_cache_keyed_on_preprocessed_image(self, tmp_path):
+        cache = DictCache()
+        paths = make_pngs(tmp_path, 2)
+        await RetroGenomeAnalyzer(client=FakeClient(), cache=cache).analyze_multiple(paths)
+
+        client = FakeClient()
+        again = await RetroGenomeAnalyzer(client=client, cache=cache).analyze_multiple(paths)
+        assert client.calls == 0
+        assert all(r["analysis"]["elements"] for r in again["multi_template_analysis"])
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self, tmp_path, monkeypatch):
+        real_sleep = asyncio.sleep
+        monkeypatch.setattr(asyncio, "sleep", lambda s: real_sleep(0))
+        cache = DictCache()
+        analyzer = RetroGenomeAnalyzer(client=FakeClient(delay=0, fail=True), cache=cache)
+        result = await analyzer.analyze_png(make_pngs(tmp_path, 1)[0])
+        assert result["error"] == "quota"
+        assert cache.data == {}
+
+
+@pytest.mark.asyncio
+async def test_async_preprocessing_matches_sync(tmp_path):
+    path = make_pngs(tmp_path, 1, size=(2000, 1000))[0]
+    preprocessor = ImagePreprocessor(max_dimension=500)
+    data = await preprocessor.process_bytes_async(path)
+
+    assert base64.b64encode(data).decode() == preprocessor.process(path)[0]
+    with Image.open(io.BytesIO(data)) as img:
+        assert img.size == (500, 250)
@@ -0,0 +1,176 @@
+"""Tests for the Stenciler background TaskManager."""
+import asyncio
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+# Le Stenciler importe ses modules depuis son propre répertoire
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "Frontend" / "3. STENCILER"))
+
+from core.task_manager import TaskManager, TaskQueueFull
+from routers import stitch_router
+
+
+@pytest.fixture
+def tm(monkeypatch):
+    monkeypatch.setattr(TaskManager, "MAX_WORKERS", 4)
+    monkeypatch.setattr(TaskManager, "MAX_PENDING", 100)
+    monkeypatch.setattr(TaskManager, "KIND_LIMITS", {"stitch_push": 2})
+    monkeypatch.setattr(TaskManager, "MAX_FINISHED", 500)
+    TaskManager._executor = None
+    TaskManager.configure(None)
+    yield TaskManager
+    wait_idle()
+    TaskManager.configure(None)
+    if TaskManager._executor is not None:
+        TaskManager._executor.shutdown(wait=True)
+        TaskManager._executor = None
+
+
+def wait_idle(timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while any(TaskManager._running.values()) or any(TaskManager._pending.values()):
+        assert time.monotonic() < deadline, "tasks still running"
+        time.sleep(0.01)
+
+
+class TestScheduling:
+    """Test the global / per-kind caps and the bounded queue."""
+
+    def test_peak_concurrency_per_kind(self, tm):
+        lock = threading.Lock()
+        active = {"stitch_push": 0, "default": 0}
+        peak = {"stitch_push": 0, "default": 0, "total": 0}
+
+        def job(task_id, kind):
+            with lock:
+                active[kind] += 1
+                peak[kind] = max(peak[kind], active[kind])
+                peak["total"] = max(peak["total"], sum(active.values()))
+            time.sleep(0.05)
+            with lock:
+                active[kind] -= 1
+
+        statuses = [tm.submit(job, "stitch_push", kind="stitch_push") for _ in range(5)]
+        statuses += [tm.submit(job, "default") for _ in range(5)]
+        wait_idle()
+
+        assert peak["stitch_push"] == 2
+        assert peak["total"] == 4
+        assert all(s.success for s in statuses)
+
+    def test_full_queue_returns_429(self, tm, monkeypatch):
+        tm.MAX_WORKERS, tm.MAX_PENDING = 1, 2
+        release = threading.Event()
+        monkeypatch.setattr(stitch_router, "_get_stitch_key", lambda: "key")
+        monkeypatch.setattr(stitch_router, "run_stitch_push_task", lambda task_id, *a: release.wait(5))
+        request = type("FakeRequest", (), {"headers": {}})()
+        req = stitch_router.PushRequest(project_id="p1", screen_intent="login")
+        try:
+            accepted = [stitch_router.stitch_push(req, request)["task_id"] for _ in range(3)]
+            with pytest.raises(HTTPException) as exc:
+                stitch_router.stitch_push(req, request)
+            with pytest.raises(TaskQueueFull):
+                tm.submit(lambda task_id: None)
+        finally:
+            release.set()
+        wait_idle()
+        assert exc.value.status_code == 429
+        assert all(tm.get_task(tid).success for tid in accepted)
+
+    def test_configure_refused_while_running(self, tm):
+        release = threading.Event()
+        tm.submit(lambda task_id: release.wait(5))
+        try:
+            with pytest.raises(RuntimeError):
+                tm.configure(None)
+        finally:
+            release.set()
+
+
+class TestEviction:
+    """Test eviction of finished tasks by age and by count."""
+
+    def test_evicts_oldest_finished_beyond_max(self, tm):
+        tm.MAX_FINISHED = 3
+        running = tm.create_task()
+        finished = []
+        for _ in range(5):
+            status = tm.create_task()
+            status.update("done", "ok", success=True)
+            finished.append(status.task_id)
+
+        assert tm.get_task(running.task_id) is running
+        assert [tid for tid in finished if tm.get_task(tid)] == finished[2:]
+
+    def test_cleanup_by_age(self, tm, tmp_path):
+        tm.configure(str(tmp_path / "tasks.db"))
+        old, recent = tm.create_task(), tm.create_task()
+        old.update("done", "ok", success=True)
+        recent.update("done", "ok", success=True)
+        old.updated_at = datetime.now() - timedelta(hours=2)
+        tm._persist(old)
+
+        assert tm.cleanup_old_tasks(3600) == 1
+        assert tm.get_task(old.task_id) is None
+        assert tm.get_task(recent.task_id) is recent
+        assert tm._db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 1
+
+
+class TestPersistence:
+    """Test the SQLite restore after a restart."""
+
+    def test_restart_restores_and_interrupts(self, tm, tmp_path):
+        db_path = str(tmp_path / "tasks.db")
+        tm.configure(db_path)
+        done = tm.submit(lambda task_id: tm.get_task(task_id).update("done", "ok", data={"screen": "login"}))
+        wait_idle()
+        orphan = tm.create_task("stitch_push")  # never picked up by a worker
+        orphan.update("running", "en cours")
+
+        tm.configure(db_path)  # simulated restart
+
+        restored = tm.get_task(done.task_id)
+        assert restored is not done
+        assert restored.success is True and restored.data == {"screen": "login"}
+        interrupted = tm.get_task(orphan.task_id)
+        assert interrupted.success is False and interrupted.error == "interrupted"
+        assert interrupted.version == orphan.version + 1
+        orphan.update("running", "mise à jour tardive")  # detached from the engine
+        assert tm.get_task(orphan.task_id).error == "interrupted"
+        row = tm._db.execute("SELECT error FROM tasks WHERE task_id=?", (orphan.task_id,)).fetchone()
+        assert row == ("interrupted",)
+
+
+class TestAwaitChange:
+    """Test the asyncio long-poll wait."""
+
+    @pytest.mark.asyncio
+    async def test_worker_update_wakes_waiter(self, tm):
+        release = threading.Event()
+        status = tm.submit(lambda task_id: release.wait(5))
+        while status.step != "running":
+            await asyncio.sleep(0.01)
+        version = status.version
+
+        waiter = asyncio.ensure_future(tm.await_change(status.task_id, version, timeout=5.0))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        started = time.monotonic()
+        release.set()
+        result = await asyncio.wait_for(waiter, timeout=2.0)
+
+        assert result is status and result.version > version
+        assert time.monotonic() - started < 1.0
+        assert tm._async_waiters == {}
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_unknown_task(self, tm):
+        status = tm.create_task()
+        assert await tm.await_change(status.task_id, status.version, timeout=0.05) is status
+        assert await tm.await_change("missing", timeout=0.05) is None
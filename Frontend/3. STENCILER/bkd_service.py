@@ -8,6 +8,8 @@ import os
 import sys
 import json
 import sqlite3, asyncio, logging, subprocess, shutil, contextlib, fcntl, urllib.request
+import threading, time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 
@@ -213,6 +215,21 @@ def init_bkd_db():
                 FOREIGN KEY (project_id) REFERENCES projects(id)
             )
         """)
+        # Turns normalisés : un INSERT par turn (content_json n'est plus qu'un héritage)
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS conversation_turns (
+                conv_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                text TEXT NOT NULL DEFAULT '',
+                created_at TEXT DEFAULT (datetime('now')),
+                PRIMARY KEY (conv_id, seq),
+                FOREIGN KEY (conv_id) REFERENCES conversations(id)
+            ) WITHOUT ROWID
+        """)
+        con.execute(
+            "CREATE INDEX IF NOT EXISTS idx_conversations_project ON conversations(project_id, updated_at)"
+        )
         # --- M307: Centralized auth & infra tables ---
         con.execute("""
             CREATE TABLE IF NOT EXISTS users (
@@ -331,6 +348,11 @@ def init_bkd_db():
             """, (admin_name,))
             logger.info(f"BKD Migration M326: 'owner_id' added to classes and backfilled to {admin_name}")
         
+        # Migration : blobs content_json -> conversation_turns
+        migrated = _migrate_conversation_blobs(con)
+        if migrated:
+            logger.info(f"BKD Migration: {migrated} conversations moved to conversation_turns.")
+
         # 4. Migration des données existantes (élèves -> subject)
         con.execute("""
             UPDATE projects SET type = 'subject'
@@ -346,6 +368,37 @@ def init_bkd_db():
     # Scaffold default project if empty
     scaffold_project(Path(default_path))
 
+def _migrate_conversation_blobs(con) -> int:
+    """Déplace les turns des blobs content_json vers conversation_turns (idempotent)."""
+    rows = con.execute(
+        "SELECT id, content_json FROM conversations WHERE content_json IS NOT NULL AND content_json NOT IN ('', '[]')"
+    ).fetchall()
+    for conv_id, content_json in rows:
+        try:
+            turns = json.loads(content_json)
+        except (TypeError, ValueError):
+            logger.warning(f"BKD Migration: unreadable content_json for conversation {conv_id}, kept as is")
+            continue
+        if not isinstance(turns, list):
+            continue
+        last = con.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM conversation_turns WHERE conv_id=?", (conv_id,)
+        ).fetchone()[0]
+        con.executemany(
+            "INSERT INTO conversation_turns (conv_id, seq, role, text) VALUES (?, ?, ?, ?)",
+            [(conv_id, last + i, *_turn_fields(t)) for i, t in enumerate(turns, start=1)],
+        )
+        con.execute("UPDATE conversations SET content_json='[]' WHERE id=?", (conv_id,))
+    return len(rows)
+
+
+def _turn_fields(turn) -> tuple:
+    """(role, text) d'un turn historique : {"role", "text"} ou {"role", "content"}."""
+    if not isinstance(turn, dict):
+        return "user", str(turn)
+    text = turn.get("text", turn.get("content", ""))
+    return turn.get("role", "user"), text if isinstance(text, str) else json.dumps(text, ensure_ascii=False)
+
 def get_user_role(user_id: str) -> str | None:
     """Lit le rôle d'un utilisateur par son ID (utilisé pour les permissions)."""
     with bkd_db() as con:
@@ -446,57 +499,128 @@ def _write_json_locked(file_path: Path, data: dict):
 
 # Global State for Active Project — M309: Pure DB persistence
 
+# Cache token -> projet actif et projet -> chemin (TTL + LRU).
+# Invalidé par set_active_project_id et le CRUD projets/élèves (invalidate_project_cache) ;
+# le TTL borne l'obsolescence pour les écritures faites hors de ces chemins.
+PROJECT_CACHE_TTL = float(os.getenv("BKD_PROJECT_CACHE_TTL", "30"))
+PROJECT_CACHE_SIZE = 1024
+
+_project_cache_lock = threading.Lock()
+_active_project_cache: "OrderedDict[str, tuple]" = OrderedDict()  # token -> (expires_at, pid)
+_project_path_cache: "OrderedDict[str, tuple]" = OrderedDict()    # pid -> (expires_at, path)
+_project_cache_generation = 0
+_read_local = threading.local()
+
+
+def _read_db() -> sqlite3.Connection:
+    """Connexion de lecture réutilisée par thread (autocommit : voit chaque commit)."""
+    con = getattr(_read_local, "con", None)
+    if con is None or _read_local.path != BKD_DB_PATH:
+        if con is not None:
+            con.close()
+        con = sqlite3.connect(str(BKD_DB_PATH), check_same_thread=False)
+        _read_local.con, _read_local.path = con, BKD_DB_PATH
+    return con
+
+
+def _cache_get(cache: OrderedDict, key: str):
+    with _project_cache_lock:
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return entry[1]
+
+
+def _cache_put(cache: OrderedDict, key: str, value, generation: int):
+    with _project_cache_lock:
+        # Une invalidation survenue pendant la résolution rend la valeur suspecte
+        if generation != _project_cache_generation or PROJECT_CACHE_TTL <= 0:
+            return
+        cache[key] = (time.monotonic() + PROJECT_CACHE_TTL, value)
+        cache.move_to_end(key)
+        while len(cache) > PROJECT_CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+def invalidate_project_cache():
+    """À appeler après toute écriture sur projects, students.project_id ou users.active_project_id."""
+    global _project_cache_generation
+    with _project_cache_lock:
+        _project_cache_generation += 1
+        _active_project_cache.clear()
+        _project_path_cache.clear()
+
+
 def get_active_project_id(token: str = None):
-    """M309/M337: Resolve active project with Role Isolation and JWT support."""
-    if token:
+    """M309/M337: Resolve active project with Role Isolation and JWT support (cached per token)."""
+    if not token:
+        return "homéos-default"
+    pid = _cache_get(_active_project_cache, token)
+    if pid is not None:
+        return pid
+    generation = _project_cache_generation
+    pid, cacheable = _resolve_active_project_id(token)
+    if cacheable:
+        _cache_put(_active_project_cache, token, pid, generation)
+    return pid
+
+
+def _resolve_active_project_id(token: str) -> tuple:
+    """Résolution DB/JWT sans cache. Retourne (project_id, cacheable) : une erreur n'est pas cachée."""
+    cacheable = True
+    try:
+        # 1. Tentative lookup DB (tokens UUID legacy)
+        row = _read_db().execute(
+            "SELECT s.project_id, u.role, u.active_project_id FROM users u "
+            "LEFT JOIN students s ON s.display = u.name "
+            "WHERE u.token = ?",
+            (token,)
+        ).fetchone()
+
+        if row:
+            stud_pid, role, user_pid = row
+            if role == 'student' and stud_pid:
+                return stud_pid, cacheable
+            if role in ('teacher', 'admin', 'prof') and user_pid:
+                return user_pid, cacheable
+    except Exception as e:
+        logger.error(f"get_active_project_id: DB error: {e}")
+        cacheable = False
+
+    # 2. Fallback JWT — token non stocké en DB (impersonation)
+    if token.startswith('eyJ'):
         try:
-            with bkd_db() as con:
-                # 1. Tentative lookup DB (tokens UUID legacy)
+            from core.auth_utils import decode_access_token
+            payload = decode_access_token(token)
+            if payload:
+                user_id = payload.get('user_id', '')
+                role = payload.get('role', '')
+                con = _read_db()
+                if role == 'student':
+                    # user_id peut être "student_<slug>" ou un vrai UUID
+                    row = con.execute(
+                        "SELECT project_id FROM students WHERE user_id = ?",
+                        (user_id,)
+                    ).fetchone()
+                    if row and row[0]:
+                        return row[0], cacheable
+
+                # Si prof JWT — chercher active_project_id dans users
                 row = con.execute(
-                    "SELECT s.project_id, u.role, u.active_project_id FROM users u "
-                    "LEFT JOIN students s ON s.display = u.name "
-                    "WHERE u.token = ?",
-                    (token,)
+                    "SELECT active_project_id FROM users WHERE id = ?",
+                    (user_id,)
                 ).fetchone()
-                
-                if row:
-                    stud_pid, role, user_pid = row
-                    if role == 'student' and stud_pid:
-                        return stud_pid
-                    if role in ('teacher', 'admin', 'prof') and user_pid:
-                        return user_pid
+                if row and row[0]:
+                    return row[0], cacheable
         except Exception as e:
-            logger.error(f"get_active_project_id: DB error: {e}")
+            logger.error(f"get_active_project_id: JWT decode error: {e}")
+            cacheable = False
 
-        # 2. Fallback JWT — token non stocké en DB (impersonation)
-        if token.startswith('eyJ'):
-            try:
-                from core.auth_utils import decode_access_token
-                payload = decode_access_token(token)
-                if payload:
-                    user_id = payload.get('user_id', '')
-                    role = payload.get('role', '')
-                    with bkd_db() as con:
-                        if role == 'student':
-                            # user_id peut être "student_<slug>" ou un vrai UUID
-                            row = con.execute(
-                                "SELECT project_id FROM students WHERE user_id = ?",
-                                (user_id,)
-                            ).fetchone()
-                            if row and row[0]:
-                                return row[0]
-                        
-                        # Si prof JWT — chercher active_project_id dans users
-                        row = con.execute(
-                            "SELECT active_project_id FROM users WHERE id = ?",
-                            (user_id,)
-                        ).fetchone()
-                        if row and row[0]:
-                            return row[0]
-            except Exception as e:
-                logger.error(f"get_active_project_id: JWT decode error: {e}")
-
-    return "homéos-default"
+    return "homéos-default", cacheable
 
 def set_active_project_id(pid: str, token: str = None):
     """M309: Persist active project with Role Isolation.
@@ -520,12 +644,26 @@ def set_active_project_id(pid: str, token: str = None):
                     logger.info(f"set_active_project_id: User {name} ({role}) active project updated to {pid}")
         except Exception as e:
             logger.error(f"set_active_project_id: DB error: {e}")
+        finally:
+            invalidate_project_cache()
+
+def _project_path(project_id: str) -> Path | None:
+    """Chemin d'un projet enregistré (caché) ; None si absent de la table projects."""
+    path = _cache_get(_project_path_cache, project_id)
+    if path is not None:
+        return path
+    generation = _project_cache_generation
+    row = _read_db().execute("SELECT path FROM projects WHERE id=?", (project_id,)).fetchone()
+    if not row:
+        return None
+    path = Path(row[0])
+    _cache_put(_project_path_cache, project_id, path, generation)
+    return path
 
 def get_active_project_path(token: str = None) -> Path:
     id = get_active_project_id(token)
-    with bkd_db() as con:
-        row = con.execute("SELECT path FROM projects WHERE id=?", (id,)).fetchone()
-    if row: return Path(row[0])
+    path = _project_path(id)
+    if path: return path
     # Fallback/Auto-init default
     p = PROJECTS_DIR / id
     p.mkdir(parents=True, exist_ok=True)
@@ -536,9 +674,7 @@ def resolve_bkd_project_root(project_id: str, token: str = None):
     if project_id == "active":
         project_id = get_active_project_id(token)
     
-    with bkd_db() as con:
-        row = con.execute("SELECT path FROM projects WHERE id=?", (project_id,)).fetchone()
-    return Path(row[0]) if row else None
+    return _project_path(project_id)
 
 
 def bkd_safe_path(project_root: Path, rel_path: str):
@@ -624,30 +760,62 @@ def conv_create(project_id: str, role: str = "architect", title: str = None) ->
     return cid
 
 
-def conv_append(conv_id: str, role: str, text: str):
-    """Ajoute un turn à la conversation. role = 'user' | 'assistant'."""
+def conv_append(conv_id: str, role: str, text: str) -> int | None:
+    """Ajoute un turn à la conversation. role = 'user' | 'assistant'. Retourne son seq."""
     with bkd_db() as con:
-        row = con.execute("SELECT content_json FROM conversations WHERE id=?", (conv_id,)).fetchone()
-        if not row:
-            return
-        turns = json.loads(row[0])
-        turns.append({"role": role, "text": text})
-        con.execute(
-            "UPDATE conversations SET content_json=?, updated_at=datetime('now') WHERE id=?",
-            (json.dumps(turns, ensure_ascii=False), conv_id)
-        )
+        # MAX(seq) est lu sur la clé primaire : coût constant quelle que soit la longueur
+        cur = con.execute("""
+            INSERT INTO conversation_turns (conv_id, seq, role, text)
+            SELECT ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM conversation_turns WHERE conv_id=?), ?, ?
+            WHERE EXISTS (SELECT 1 FROM conversations WHERE id=?)
+        """, (conv_id, conv_id, role, text or "", conv_id))
+        if not cur.rowcount:
+            return None
+        con.execute("UPDATE conversations SET updated_at=datetime('now') WHERE id=?", (conv_id,))
+        return con.execute(
+            "SELECT MAX(seq) FROM conversation_turns WHERE conv_id=?", (conv_id,)
+        ).fetchone()[0]
+
+
+def conv_turns(conv_id: str, limit: int = None, before_seq: int = None) -> list:
+    """
+    Turns d'une conversation en ordre chronologique.
+    limit : ne garde que les `limit` derniers (avant before_seq si fourni).
+    """
+    sql = "SELECT seq, role, text, created_at FROM conversation_turns WHERE conv_id=?"
+    params = [conv_id]
+    if before_seq is not None:
+        sql += " AND seq < ?"
+        params.append(before_seq)
+    if limit is not None:
+        sql += " ORDER BY seq DESC LIMIT ?"
+        params.append(limit)
+    else:
+        sql += " ORDER BY seq"
+    with bkd_db() as con:
+        rows = con.execute(sql, params).fetchall()
+    if limit is not None:
+        rows.reverse()
+    return [{"seq": r[0], "role": r[1], "text": r[2], "created_at": r[3]} for r in rows]
 
 
-def conv_get(conv_id: str) -> dict | None:
+def conv_get(conv_id: str, limit: int = None, before_seq: int = None) -> dict | None:
+    """
+    Conversation + turns. Sans limit : tous les turns ; avec limit : la fin de la
+    conversation (pagination vers le passé via before_seq = turns[0]["seq"]).
+    """
     with bkd_db() as con:
-        row = con.execute(
-            "SELECT id, project_id, role, title, created_at, updated_at, content_json FROM conversations WHERE id=?",
-            (conv_id,)
-        ).fetchone()
+        row = con.execute("""
+            SELECT id, project_id, role, title, created_at, updated_at,
+                   (SELECT COALESCE(MAX(seq), 0) FROM conversation_turns WHERE conv_id = conversations.id)
+            FROM conversations WHERE id=?
+        """, (conv_id,)).fetchone()
     if not row:
         return None
+    turns = conv_turns(conv_id, limit, before_seq)
     return {"id": row[0], "project_id": row[1], "role": row[2], "title": row[3],
-            "created_at": row[4], "updated_at": row[5], "turns": json.loads(row[6])}
+            "created_at": row[4], "updated_at": row[5], "turn_count": row[6], "turns": turns,
+            "has_more": bool(turns) and turns[0]["seq"] > 1}
 
 
 def get_fee_logic(project_id: str, screen_name: str) -> str:
@@ -676,21 +844,38 @@ def save_fee_logic(project_id: str, screen_name: str, content: str):
     file_path.write_text(content, encoding="utf-8")
 
 
-def conv_list(project_id: str, limit: int = 5) -> list:
+def conv_list(project_id: str, limit: int = 5, before: str = None, before_id: str = None, role: str = None) -> list:
+    """
+    Conversations d'un projet, les plus récentes d'abord.
+    before / before_id : updated_at et id du dernier élément de la page précédente (pagination).
+    """
+    sql = """
+        SELECT id, role, title, updated_at,
+               (SELECT COALESCE(MAX(seq), 0) FROM conversation_turns WHERE conv_id = conversations.id)
+        FROM conversations WHERE project_id=?
+    """
+    params = [project_id]
+    if role:
+        sql += " AND role=?"
+        params.append(role)
+    if before:
+        sql += " AND (updated_at < ? OR (updated_at = ? AND id < ?))"
+        params.extend([before, before, before_id or ""])
+    sql += " ORDER BY updated_at DESC, id DESC LIMIT ?"
+    params.append(limit)
     with bkd_db() as con:
-        rows = con.execute(
-            "SELECT id, role, title, updated_at FROM conversations WHERE project_id=? ORDER BY updated_at DESC LIMIT ?",
-            (project_id, limit)
-        ).fetchall()
-    return [{"id": r[0], "role": r[1], "title": r[2], "updated_at": r[3]} for r in rows]
+        rows = con.execute(sql, params).fetchall()
+    return [{"id": r[0], "role": r[1], "title": r[2], "updated_at": r[3], "turn_count": r[4]} for r in rows]
 
 
 def conv_auto_title(conv_id: str):
     """Tente de déduire un titre depuis les premiers turns ou la roadmap (regex M\\d+)."""
     import re
-    conv = conv_get(conv_id)
-    if not conv or conv.get("title"):
+    with bkd_db() as con:
+        row = con.execute("SELECT title FROM conversations WHERE id=?", (conv_id,)).fetchone()
+    if not row or row[0]:
         return
+    conv = conv_get(conv_id)
     # 1. Cherche référence mission dans les turns
     all_text = " ".join(t.get("text", "") for t in conv.get("turns", []))
     match = re.search(r'M(\d{3,})', all_text)
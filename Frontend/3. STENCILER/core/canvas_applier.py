@@ -1,8 +1,9 @@
 import os
 import re
 import json
+import random
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 # --- CONFIG ---
 CWD = Path(__file__).parent.parent.resolve()
@@ -10,9 +11,92 @@ TEMPLATES_DIR = CWD / "core" / "canvas_templates"
 DEFAULT_DESIGN_PATH = CWD.parent.parent / "Frontend/1. CONSTITUTION/DESIGN.md"
 PROJECTS_DIR = CWD.parent.parent / "projects"
 
+# --- Mapping des classes af-* vers les tokens DESIGN.md ---
+AF_CLASS_TOKENS = {
+    "af-bg-primary": "--bg-primary",
+    "af-bg-secondary": "--bg-secondary",
+    "af-text-primary": "--text-primary",
+    "af-text-muted": "--text-muted",
+    "af-border-primary": "--separator",
+    "af-nudge-bg": "--homeos-green",
+    "af-nudge-text": "--homeos-green",
+    "af-radius-sm": "--radius-sm",
+    "af-radius": "--radius",
+    "af-radius-md": "--radius-md",
+    "af-radius-lg": "--radius-lg",
+    "af-radius-max": "--radius-max"
+}
+
+# Fallbacks neutres si token non défini
+AF_CLASS_FALLBACKS = {
+    "af-bg-primary": "bg-[#f7f6f2]",
+    "af-bg-secondary": "bg-[#efefeb]",
+    "af-text-primary": "text-[#3d3d3c]",
+    "af-text-muted": "text-[#9a9a98]",
+    "af-border-primary": "border-[#e5e5e5]",
+    "af-nudge-bg": "bg-[#8cc63f]",
+    "af-nudge-text": "text-[#8cc63f]",
+    "af-radius": "rounded-[4px]",
+    "af-radius-sm": "rounded-[2px]",
+    "af-radius-md": "rounded-[6px]",
+    "af-radius-lg": "rounded-[12px]",
+    "af-radius-max": "rounded-[20px]"
+}
+
+# Alternance triée par longueur décroissante : af-radius ne doit pas matcher dans af-radius-md
+AF_CLASS_RE = re.compile("|".join(re.escape(c) for c in sorted(AF_CLASS_TOKENS, key=len, reverse=True)))
+IF_BLOCK_RE = re.compile(r"\[\[if\s+([^\]]+)\]\](.*?)\[\[endif\]\]", re.DOTALL)
+PLACEHOLDER_RE = re.compile(r"\{\{(.*?)\}\}", re.DOTALL)
+
+# Segments compilés : (TEXT, str) | (VAR, nom) | (AF, classe) | (IF, prop, segments)
+TEXT, VAR, AF, IF = range(4)
+
+
+def compile_template(template: str) -> List[tuple]:
+    """
+    Compile un canevas une fois pour toutes en liste de segments :
+    blocs [[if prop]]...[[endif]], placeholders {{prop}} et classes af-*.
+    """
+    segments: List[tuple] = []
+    pos = 0
+    for m in IF_BLOCK_RE.finditer(template):
+        segments.extend(_compile_flat(template[pos:m.start()]))
+        segments.append((IF, m.group(1).strip(), _compile_flat(m.group(2))))
+        pos = m.end()
+    segments.extend(_compile_flat(template[pos:]))
+    return segments
+
+
+def _compile_flat(text: str) -> List[tuple]:
+    segments: List[tuple] = []
+    pos = 0
+    for m in PLACEHOLDER_RE.finditer(text):
+        segments.extend(_compile_text(text[pos:m.start()]))
+        segments.append((VAR, m.group(1)))
+        pos = m.end()
+    segments.extend(_compile_text(text[pos:]))
+    return segments
+
+
+def _compile_text(text: str) -> List[tuple]:
+    segments: List[tuple] = []
+    pos = 0
+    for m in AF_CLASS_RE.finditer(text):
+        if m.start() > pos:
+            segments.append((TEXT, text[pos:m.start()]))
+        segments.append((AF, m.group(0)))
+        pos = m.end()
+    if pos < len(text):
+        segments.append((TEXT, text[pos:]))
+    return segments
+
+
 class CanvasApplier:
     def __init__(self):
         self.templates = {}
+        self.compiled: Dict[str, List[tuple]] = {}
+        # project_id -> (chemin DESIGN.md, mtime, tokens, classes af-* résolues)
+        self._design_cache: Dict[str, Tuple[Optional[Path], Optional[float], Dict[str, str], Dict[str, str]]] = {}
         self._load_templates()
 
     def _load_templates(self):
@@ -20,6 +104,7 @@ class CanvasApplier:
             return
         for f in TEMPLATES_DIR.glob("*.html"):
             self.templates[f.stem] = f.read_text(encoding='utf-8')
+            self.compiled[f.stem] = compile_template(self.templates[f.stem])
 
     def _parse_design_md(self, design_content: str) -> Dict[str, str]:
         """
@@ -40,81 +125,90 @@ class CanvasApplier:
         """
         Charge le DESIGN.md du projet ou le fallback constitutionnel.
         """
-        tokens = {}
+        return self._get_project_design(project_id)[0]
+
+    def _get_project_design(self, project_id: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        (tokens, classes af-* résolues) du projet, mis en cache et invalidés
+        quand le chemin ou le mtime du DESIGN.md change.
+        """
         design_path = PROJECTS_DIR / project_id / "DESIGN.md"
         if not design_path.exists():
             design_path = DEFAULT_DESIGN_PATH
-            
-        if design_path.exists():
+        try:
+            mtime = design_path.stat().st_mtime
+        except OSError:
+            design_path, mtime = None, None
+
+        cached = self._design_cache.get(project_id)
+        if cached and cached[0] == design_path and cached[1] == mtime:
+            return cached[2], cached[3]
+
+        tokens = {}
+        if design_path is not None:
             try:
                 content = design_path.read_text(encoding='utf-8')
                 tokens = self._parse_design_md(content)
             except Exception as e:
                 print(f"Error parsing DESIGN.md: {e}")
-        
-        return tokens
 
-    def _apply_design_system(self, html: str, tokens: Dict[str, str]) -> str:
+        class_map = self._resolve_af_classes(tokens)
+        self._design_cache[project_id] = (design_path, mtime, tokens, class_map)
+        return tokens, class_map
+
+    def _resolve_af_classes(self, tokens: Dict[str, str]) -> Dict[str, str]:
         """
-        Remplace les classes sémantiques af-* par leurs valeurs concrètes.
+        Classe sémantique af-* -> classe concrète pour ces tokens
+        (absente du résultat = classe laissée telle quelle).
         """
-        # --- Mapping des classes af-* vers les tokens DESIGN.md ---
-        mapping = {
-            "af-bg-primary": "--bg-primary",
-            "af-bg-secondary": "--bg-secondary",
-            "af-text-primary": "--text-primary",
-            "af-text-muted": "--text-muted",
-            "af-border-primary": "--separator",
-            "af-nudge-bg": "--homeos-green",
-            "af-nudge-text": "--homeos-green",
-            "af-radius-sm": "--radius-sm",
-            "af-radius": "--radius",
-            "af-radius-md": "--radius-md",
-            "af-radius-lg": "--radius-lg",
-            "af-radius-max": "--radius-max"
-        }
-
-        # Sort by length descending to avoid partial matches (e.g. af-radius matching inside af-radius-md)
-        sorted_classes = sorted(mapping.keys(), key=len, reverse=True)
-
-        for af_class in sorted_classes:
-            token = mapping[af_class]
+        class_map = {}
+        for af_class, token in AF_CLASS_TOKENS.items():
             value = tokens.get(token)
             if value:
                 # Si c'est une couleur (hex)
                 if value.startswith("#"):
                     # On convertit af-bg-* en bg-[#...]
                     if "-bg" in af_class:
-                        html = html.replace(af_class, f"bg-[{value}]")
+                        class_map[af_class] = f"bg-[{value}]"
                     # On convertit af-text-* en text-[#...]
                     elif "-text" in af_class:
-                        html = html.replace(af_class, f"text-[{value}]")
+                        class_map[af_class] = f"text-[{value}]"
                     # On convertit af-border-* en border-[{value}]
                     elif "-border" in af_class:
-                        html = html.replace(af_class, f"border-[{value}]")
+                        class_map[af_class] = f"border-[{value}]"
                 # Si c'est un radius (px)
                 elif "radius" in token:
-                    html = html.replace(af_class, f"rounded-[{value}]")
-            else:
-                # Fallbacks neutres si token non défini
-                fallbacks = {
-                    "af-bg-primary": "bg-[#f7f6f2]",
-                    "af-bg-secondary": "bg-[#efefeb]",
-                    "af-text-primary": "text-[#3d3d3c]",
-                    "af-text-muted": "text-[#9a9a98]",
-                    "af-border-primary": "border-[#e5e5e5]",
-                    "af-nudge-bg": "bg-[#8cc63f]",
-                    "af-nudge-text": "text-[#8cc63f]",
-                    "af-radius": "rounded-[4px]",
-                    "af-radius-sm": "rounded-[2px]",
-                    "af-radius-md": "rounded-[6px]",
-                    "af-radius-lg": "rounded-[12px]",
-                    "af-radius-max": "rounded-[20px]"
-                }
-                if af_class in fallbacks:
-                    html = html.replace(af_class, fallbacks[af_class])
-
-        return html
+                    class_map[af_class] = f"rounded-[{value}]"
+            elif af_class in AF_CLASS_FALLBACKS:
+                class_map[af_class] = AF_CLASS_FALLBACKS[af_class]
+        return class_map
+
+    def _apply_design_system(self, html: str, tokens: Dict[str, str]) -> str:
+        """
+        Remplace les classes sémantiques af-* par leurs valeurs concrètes.
+        """
+        class_map = self._resolve_af_classes(tokens)
+        return AF_CLASS_RE.sub(lambda m: class_map.get(m.group(0), m.group(0)), html)
+
+    def _render(self, segments: List[tuple], props: Dict[str, Any], class_map: Dict[str, str], out: List[str]):
+        """Rendu en une passe : substitution des props et mapping des classes af-*."""
+        for seg in segments:
+            kind = seg[0]
+            if kind == TEXT:
+                out.append(seg[1])
+            elif kind == AF:
+                out.append(class_map.get(seg[1], seg[1]))
+            elif kind == VAR:
+                if seg[1] in props:
+                    value = str(props[seg[1]])
+                    # Les valeurs (ex. variant_class) peuvent elles-mêmes contenir des classes af-*
+                    if "af-" in value:
+                        value = AF_CLASS_RE.sub(lambda m: class_map.get(m.group(0), m.group(0)), value)
+                    out.append(value)
+                else:
+                    out.append("{{" + seg[1] + "}}")
+            elif props.get(seg[1], False):
+                self._render(seg[2], props, class_map, out)
 
     def instanciate(self, canvas_name: str, props: Dict[str, Any], project_id: str = "active") -> str:
         """
@@ -125,29 +219,16 @@ class CanvasApplier:
             p_path = get_active_project_path()
             project_id = p_path.name if p_path else "default"
 
-        template = self.templates.get(canvas_name)
-        if not template:
+        segments = self.compiled.get(canvas_name)
+        if not segments:
             return f"<!-- Error: Canvas '{canvas_name}' not found -->"
 
-        # 1. Gestion des blocs conditionnels [[if prop]] ... [[endif]]
-        # (Supporte uniquement les booleens simples pour l'instant)
-        def _handle_ifs(match):
-            prop_name = match.group(1).strip()
-            content = match.group(2)
-            if props.get(prop_name, False):
-                return content
-            return ""
-        
-        template = re.sub(r"\[\[if\s+([^\]]+)\]\](.*?)\[\[endif\]\]", _handle_ifs, template, flags=re.DOTALL)
-
-        # 2. Remplacements de base {{prop}}
         # Ajout automatique de slug pour les labels si besoin
         if "label" in props:
             props["label_slug"] = re.sub(r'[^\w\s-]', '', str(props["label"]).lower()).replace(" ", "-")
         
         # Ajout d'un ID unique si absent
         if "id" not in props:
-            import random
             props["id"] = f"{int(random.random()*1000)}"
 
         # Derived class mapping (props → Tailwind classes)
@@ -161,15 +242,11 @@ class CanvasApplier:
             props["size_class"] = size_map.get(props.get("size", "md"), size_map["md"])
             props["variant_class"] = variant_map.get(props.get("variant", "primary"), variant_map["primary"])
 
-        # Remplacements
-        for key, value in props.items():
-            template = template.replace(f"{{{{{key}}}}}", str(value))
-
-        # 3. Application du Design System
-        tokens = self._get_project_design_tokens(project_id)
-        final_html = self._apply_design_system(template, tokens)
-
-        return final_html
+        # Application du Design System (tokens cachés par projet)
+        _, class_map = self._get_project_design(project_id)
+        out: List[str] = []
+        self._render(segments, props, class_map, out)
+        return "".join(out)
 
 # Singleton
 applier = CanvasApplier()
@@ -0,0 +1,112 @@
+"""
+ID Assigner — Mission 187
+Injecte ou renomme les IDs des éléments interactifs d'un HTML importé (Stitch, Figma, wire).
+
+Passe linéaire : tous les IDs existants sont collectés une seule fois (Counter),
+puis chaque élément générique reçoit un slug unique (compteur de suffixe par base,
+sans re-parcourir l'arbre). Partagé par import_router et wire_router.
+"""
+
+import logging
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Optional
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger("IdAssigner")
+
+TAG_PREFIXES = {
+    "button": "btn", "a": "lnk", "input": "inp", "form": "frm",
+    "select": "sel", "summary": "tog", "textarea": "inp",
+    "header": "hdr", "footer": "ftr", "nav": "nav", "section": "sec"
+}
+TARGET_TAGS = list(TAG_PREFIXES) + ["h1", "h2", "h3"]
+
+GENERIC_ID_RE = re.compile(r"^(el|div|section|block|id|tmp|gen)-\d+$")
+TEXT_MAX_LEN = 40
+
+_FULL_DOCUMENT_RE = re.compile(r"^\s*(<!doctype|<html)", re.IGNORECASE)
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+
+def slugify(text: str, max_len: int = 30) -> str:
+    text = unicodedata.normalize("NFD", text).encode("ascii", "ignore").decode()
+    text = re.sub(r"[^\w\s-]", "", text).strip().lower()
+    text = re.sub(r"[\s_]+", "-", text)
+    return text[:max_len].rstrip("-")
+
+
+def pick_parser(html: str, parser: Optional[str] = None) -> str:
+    """
+    lxml (parseur C) pour les documents complets ; html.parser pour les fragments,
+    que lxml envelopperait dans <html><body>.
+    """
+    if parser:
+        return parser
+    if HAS_LXML and _FULL_DOCUMENT_RE.match(html):
+        return "lxml"
+    return "html.parser"
+
+
+def _leading_text(el, max_len: int = TEXT_MAX_LEN) -> str:
+    """Équivalent de el.get_text(strip=True)[:max_len] sans extraire tout le sous-arbre."""
+    parts, size = [], 0
+    for s in el.stripped_strings:
+        parts.append(s)
+        size += len(s)
+        if size >= max_len:
+            break
+    return "".join(parts)[:max_len]
+
+
+def ensure_ids(html: str, parser: Optional[str] = None) -> str:
+    """Mission 187: Injecte ou renomme les IDs pour qu'ils soient exploitables."""
+    soup = BeautifulSoup(html, pick_parser(html, parser))
+
+    # Une seule passe pour connaître tous les IDs du document (compteur : doublons possibles)
+    taken = Counter(el["id"] for el in soup.find_all(id=True) if isinstance(el["id"], str))
+    next_suffix: Dict[str, int] = {}
+    counters: Dict[str, int] = {}
+    renamed = 0
+
+    for el in soup.find_all(TARGET_TAGS):
+        current_id = el.get("id", "")
+        is_generic = not current_id or GENERIC_ID_RE.match(current_id) or len(current_id) < 3
+        if not is_generic:
+            continue
+
+        prefix = TAG_PREFIXES.get(el.name, "el")
+        raw_text = _leading_text(el) or el.get("placeholder", "") or el.get("aria-label", "") or el.get("name", "")
+
+        if raw_text:
+            slug = slugify(raw_text)
+            new_id = f"{prefix}-{slug}" if slug else f"{prefix}-{counters.get(prefix, 0)+1}"
+        else:
+            counters[prefix] = counters.get(prefix, 0) + 1
+            new_id = f"{prefix}-{counters[prefix]}"
+
+        # Suffixe -1, -2... en reprenant là où la base s'était arrêtée
+        base_id = new_id
+        c = next_suffix.get(base_id, 1)
+        while taken[new_id]:
+            new_id = f"{base_id}-{c}"
+            c += 1
+        next_suffix[base_id] = c
+
+        if current_id:
+            taken[current_id] -= 1  # l'ancien ID redevient disponible
+        taken[new_id] += 1
+        el["id"] = new_id
+        renamed += 1
+        logger.debug(f"Ensured ID: {current_id} -> {new_id}")
+
+    if renamed:
+        logger.info(f"Ensured {renamed} IDs")
+    return str(soup)
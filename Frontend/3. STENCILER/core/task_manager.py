@@ -1,10 +1,40 @@
+"""
+Task Manager — moteur de tâches de fond du Stenciler.
+
+- Pool de workers borné (MAX_WORKERS) avec plafond de concurrence par type de tâche
+  (KIND_LIMITS) et file d'attente bornée (MAX_PENDING → TaskQueueFull).
+- Éviction automatique des tâches terminées (âge FINISHED_TTL, nombre MAX_FINISHED).
+- Persistance SQLite optionnelle (STENCILER_TASKS_DB) : l'état survit aux redémarrages,
+  les tâches interrompues sont marquées en erreur au rechargement.
+- await_change() : attente asyncio d'un changement d'état (long-poll / SSE), sans
+  bloquer de thread ; wait_for_change() reste disponible pour les appelants synchrones.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
 import uuid
-from typing import Dict, Any, Optional
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Set, Tuple
 from datetime import datetime
 
+logger = logging.getLogger("TaskManager")
+
+
+class TaskQueueFull(RuntimeError):
+    """Trop de tâches déjà en attente : le client doit réessayer plus tard."""
+    pass
+
+
 class TaskStatus:
-    def __init__(self, task_id: str):
+    def __init__(self, task_id: str, kind: str = "default"):
         self.task_id = task_id
+        self.kind = kind
         self.step = "pending"
         self.comment = "Initialisation..."
         self.success = None
@@ -12,6 +42,12 @@ class TaskStatus:
         self.error = None
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
+        self.version = 0
+        self._on_change: Optional[Callable[["TaskStatus"], None]] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.success is not None
 
     def update(self, step: str, comment: str, success: Optional[bool] = None, data: Any = None, error: str = None):
         self.step = step
@@ -23,35 +59,277 @@ class TaskStatus:
         if error is not None:
             self.error = error
         self.updated_at = datetime.now()
+        self.version += 1
+        if self._on_change is not None:
+            self._on_change(self)
 
     def to_dict(self):
         return {
             "task_id": self.task_id,
+            "kind": self.kind,
             "step": self.step,
             "comment": self.comment,
             "success": self.success,
             "data": self.data,
             "error": self.error,
+            "version": self.version,
             "updated_at": self.updated_at.isoformat()
         }
 
+
 class TaskManager:
-    _tasks: Dict[str, TaskStatus] = {}
+    MAX_WORKERS = int(os.getenv("STENCILER_TASK_WORKERS", "4"))
+    MAX_PENDING = 100
+    KIND_LIMITS: Dict[str, int] = {"stitch_push": 2}
+    FINISHED_TTL = 3600
+    MAX_FINISHED = 500
+
+    _tasks: "OrderedDict[str, TaskStatus]" = OrderedDict()
+    _lock = threading.RLock()
+    _changed = threading.Condition(_lock)
+    _pending: Dict[str, Deque[tuple]] = {}
+    _running: Dict[str, int] = {}
+    _async_waiters: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+    _executor: Optional[ThreadPoolExecutor] = None
+    _db_path: Optional[str] = os.getenv("STENCILER_TASKS_DB") or None
+    _db: Optional[sqlite3.Connection] = None
+    _loaded = False
+
+    # --- Cycle de vie ---
 
     @classmethod
-    def create_task(cls) -> TaskStatus:
+    def create_task(cls, kind: str = "default") -> TaskStatus:
         task_id = str(uuid.uuid4())
-        status = TaskStatus(task_id)
-        cls._tasks[task_id] = status
+        status = TaskStatus(task_id, kind)
+        status._on_change = cls._on_update
+        with cls._lock:
+            cls._ensure_loaded()
+            cls._tasks[task_id] = status
+            cls._persist(status)
+            cls._evict()
         return status
 
     @classmethod
     def get_task(cls, task_id: str) -> Optional[TaskStatus]:
-        return cls._tasks.get(task_id)
+        with cls._lock:
+            cls._ensure_loaded()
+            return cls._tasks.get(task_id)
+
+    @classmethod
+    def submit(cls, fn: Callable[..., Any], *args, kind: str = "default", **kwargs) -> TaskStatus:
+        """
+        Planifie fn(task_id, *args, **kwargs) sur le pool. La tâche attend en file
+        tant que MAX_WORKERS ou le plafond de son type est atteint.
+        """
+        with cls._lock:
+            if sum(len(q) for q in cls._pending.values()) >= cls.MAX_PENDING:
+                raise TaskQueueFull(f"TaskManager: {cls.MAX_PENDING} tasks already queued")
+            status = cls.create_task(kind)
+            status.update("queued", "En attente d'un worker...")
+            cls._pending.setdefault(kind, deque()).append((status, fn, args, kwargs))
+            cls._dispatch()
+        return status
+
+    @classmethod
+    def _dispatch(cls):
+        """Démarre les tâches en file tant que les plafonds global et par type le permettent."""
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(max_workers=cls.MAX_WORKERS, thread_name_prefix="stencil-task")
+        for kind, queue in cls._pending.items():
+            cap = cls.KIND_LIMITS.get(kind, cls.MAX_WORKERS)
+            while queue and cls._running.get(kind, 0) < cap and sum(cls._running.values()) < cls.MAX_WORKERS:
+                job = queue.popleft()
+                cls._running[kind] = cls._running.get(kind, 0) + 1
+                cls._executor.submit(cls._run, *job)
+
+    @classmethod
+    def _run(cls, status: TaskStatus, fn: Callable[..., Any], args: tuple, kwargs: dict):
+        try:
+            status.update("running", "Tâche démarrée...")
+            fn(status.task_id, *args, **kwargs)
+            if not status.finished:
+                status.update(status.step, status.comment, success=True)
+        except Exception as e:
+            logger.error(f"Task {status.task_id} ({status.kind}) failed: {e}")
+            status.update("error", f"Erreur : {e}", success=False, error=str(e))
+        finally:
+            with cls._lock:
+                cls._running[status.kind] -= 1
+                cls._dispatch()
+
+    @classmethod
+    def _on_update(cls, status: TaskStatus):
+        with cls._lock:
+            cls._persist(status)
+            if status.finished:
+                cls._evict()
+            cls._changed.notify_all()
+            for loop, event in cls._async_waiters.get(status.task_id, ()):
+                try:
+                    loop.call_soon_threadsafe(event.set)
+                except RuntimeError:
+                    pass  # boucle fermée : le client est déjà parti
+
+    @classmethod
+    def wait_for_change(cls, task_id: str, since_version: int = -1, timeout: float = 25.0) -> Optional[TaskStatus]:
+        """
+        Bloque jusqu'à ce que la tâche dépasse since_version, soit terminée, ou timeout.
+        Retourne la tâche (inchangée en cas de timeout) ou None si elle n'existe pas.
+        """
+        deadline = time.monotonic() + timeout
+        with cls._lock:
+            while True:
+                status = cls.get_task(task_id)
+                if status is None or status.version > since_version or status.finished:
+                    return status
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return status
+                cls._changed.wait(remaining)
+
+    @classmethod
+    async def await_change(cls, task_id: str, since_version: int = -1, timeout: float = 25.0) -> Optional[TaskStatus]:
+        """
+        Équivalent asyncio de wait_for_change : l'attente se fait sur un asyncio.Event
+        signalé par _on_update, aucun thread n'est bloqué pendant le long-poll.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            event = asyncio.Event()
+            waiter = (loop, event)
+            with cls._lock:
+                status = cls.get_task(task_id)
+                if status is None or status.version > since_version or status.finished:
+                    return status
+                # Enregistré sous le verrou de _on_update : aucune notification perdue
+                cls._async_waiters.setdefault(task_id, set()).add(waiter)
+            try:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return status
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return cls.get_task(task_id)
+            finally:
+                with cls._lock:
+                    waiters = cls._async_waiters.get(task_id)
+                    if waiters is not None:
+                        waiters.discard(waiter)
+                        if not waiters:
+                            del cls._async_waiters[task_id]
+
+    # --- Éviction ---
 
     @classmethod
     def cleanup_old_tasks(cls, max_age_seconds: int = 3600):
-        # Optional: cleanup logic
-        pass
+        """Supprime les tâches terminées depuis plus de max_age_seconds (mémoire et SQLite)."""
+        cutoff = datetime.now().timestamp() - max_age_seconds
+        with cls._lock:
+            expired = [tid for tid, s in cls._tasks.items() if s.finished and s.updated_at.timestamp() < cutoff]
+            for tid in expired:
+                del cls._tasks[tid]
+            if cls._db is not None:
+                with cls._db:
+                    cls._db.execute(
+                        "DELETE FROM tasks WHERE success IS NOT NULL AND updated_at < ?",
+                        (datetime.fromtimestamp(cutoff).isoformat(),)
+                    )
+        return len(expired)
+
+    @classmethod
+    def _evict(cls):
+        cls.cleanup_old_tasks(cls.FINISHED_TTL)
+        finished = [tid for tid, s in cls._tasks.items() if s.finished]
+        for tid in finished[:max(0, len(finished) - cls.MAX_FINISHED)]:
+            del cls._tasks[tid]
+
+    # --- Persistance SQLite (optionnelle) ---
+
+    @classmethod
+    def configure(cls, db_path: Optional[str] = None, max_workers: Optional[int] = None):
+        """
+        (Ré)initialise le moteur : chemin SQLite (None = mémoire seule) et taille du pool.
+        Refusé tant que des tâches tournent ou attendent : leurs mises à jour tardives
+        écraseraient l'état rechargé (ex. la ligne marquée « interrompue »).
+        """
+        with cls._lock:
+            if any(cls._running.values()) or any(cls._pending.values()):
+                raise RuntimeError("TaskManager.configure: tasks still running or queued")
+            for status in cls._tasks.values():
+                status._on_change = None
+            if cls._db is not None:
+                cls._db.close()
+            cls._db, cls._db_path, cls._loaded = None, db_path, False
+            cls._tasks.clear()
+            if max_workers is not None and max_workers != cls.MAX_WORKERS:
+                cls.MAX_WORKERS = max_workers
+                if cls._executor is not None:
+                    cls._executor.shutdown(wait=False)
+                    cls._executor = None
+            cls._ensure_loaded()
+
+    @classmethod
+    def _ensure_loaded(cls):
+        if cls._loaded:
+            return
+        cls._loaded = True
+        if not cls._db_path:
+            return
+        cls._db = sqlite3.connect(cls._db_path, check_same_thread=False)
+        with cls._db:
+            cls._db.execute("PRAGMA journal_mode=WAL")
+            cls._db.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_id TEXT PRIMARY KEY,
+                    kind TEXT,
+                    step TEXT,
+                    comment TEXT,
+                    success INTEGER,
+                    data_json TEXT,
+                    error TEXT,
+                    version INTEGER,
+                    created_at TEXT,
+                    updated_at TEXT
+                )
+            """)
+            # Les workers ne survivent pas au redémarrage : tâches en cours -> erreur
+            cls._db.execute("""
+                UPDATE tasks SET step='error', comment='Interrompue par un redémarrage du serveur',
+                    success=0, error='interrupted', version=version+1
+                WHERE success IS NULL
+            """)
+        rows = cls._db.execute(
+            "SELECT task_id, kind, step, comment, success, data_json, error, version, created_at, updated_at "
+            "FROM tasks ORDER BY created_at DESC LIMIT ?", (cls.MAX_FINISHED,)
+        ).fetchall()
+        for row in reversed(rows):
+            status = TaskStatus(row[0], row[1] or "default")
+            status.step, status.comment = row[2], row[3]
+            status.success = None if row[4] is None else bool(row[4])
+            status.data = json.loads(row[5]) if row[5] else None
+            status.error, status.version = row[6], row[7] or 0
+            status.created_at = datetime.fromisoformat(row[8])
+            status.updated_at = datetime.fromisoformat(row[9])
+            status._on_change = cls._on_update
+            cls._tasks[status.task_id] = status
+        logger.info(f"TaskManager: {len(rows)} tasks restored from {cls._db_path}")
+
+    @classmethod
+    def _persist(cls, status: TaskStatus):
+        if cls._db is None:
+            return
+        try:
+            with cls._db:
+                cls._db.execute(
+                    "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (status.task_id, status.kind, status.step, status.comment,
+                     None if status.success is None else int(status.success),
+                     json.dumps(status.data, ensure_ascii=False, default=str) if status.data is not None else None,
+                     status.error, status.version,
+                     status.created_at.isoformat(), status.updated_at.isoformat())
+                )
+        except sqlite3.Error as e:
+            logger.error(f"TaskManager: persist failed for {status.task_id}: {e}")
 
 task_manager = TaskManager()
@@ -17,7 +17,7 @@ from pydantic import BaseModel
 
 from Backend.Prod.models.gemini_client import GeminiClient
 from Backend.Prod.config.settings import settings
-from bkd_service import bkd_db
+from bkd_service import bkd_db, invalidate_project_cache
 from core.auth_utils import (
     hash_password_bcrypt, verify_password, create_access_token, 
     decode_access_token, send_magic_link_email
@@ -170,6 +170,7 @@ def _sqlite_set_student_user_id(student_id, class_id, user_id):
     with bkd_db() as conn:
         cursor = conn.cursor()
         cursor.execute("UPDATE students SET user_id = ? WHERE id = ? AND class_id = ?", (user_id, student_id, class_id))
+    invalidate_project_cache()
 
 def _create_workspace(workspace_id: str, name: str, owner_id: str):
     """M283a: Crée un workspace personnel pour un user."""
@@ -47,7 +47,7 @@ from bkd_service import (
     exec_query_knowledge_base, route_request_bkd,
     resolve_bkd_project_root, bkd_safe_path, bkd_build_tree,
     BKD_DB_PATH, bkd_db, PROJECTS_DIR as BKD_PROJECTS_DIR,
-    get_active_project_id, set_active_project_id, get_active_project_path,
+    get_active_project_id, set_active_project_id, get_active_project_path, invalidate_project_cache,
     BKD_ALLOWED_EXTENSIONS, BKD_EXCLUDE_DIRS,
     conv_create, conv_append, conv_get, conv_list, conv_auto_title,
     SULLIVAN_FEE_SYSTEM, get_fee_logic, save_fee_logic,
@@ -95,8 +95,9 @@ class ConversationInfo(BaseModel):
     id: str
     project_id: str
     role: str
-    title: str
+    title: Optional[str] = None
     updated_at: str
+    turn_count: int = 0
 
 class ConversationDetail(ConversationInfo):
     content_json: str
@@ -167,6 +168,7 @@ def list_bkd_files(request: Request, project_id: str = Query(...)):
 def delete_project(project_id: str):
     with get_db_conn() as conn:
         conn.execute('DELETE FROM projects WHERE id=?', (project_id,))
+    invalidate_project_cache()
     return {"ok": True, "deleted": project_id}
 
 # --- BKD FILES ---
@@ -235,38 +237,28 @@ def write_file(req: FileWriteRequest, request: Request):
 # --- CONVERSATIONS ---
 
 @router.get("/conversations", response_model=List[ConversationInfo])
-def list_conversations(project_id: str = Query(...), role: Optional[str] = None):
-    with get_db_conn() as conn:
-        q = "SELECT id, project_id, role, title, updated_at FROM conversations WHERE project_id = ?"
-        params = [project_id]
-        if role:
-            q += " AND role = ?"
-            params.append(role)
-        q += " ORDER BY updated_at DESC"
-        rows = conn.execute(q, params).fetchall()
-        return [ConversationInfo(id=r[0], project_id=r[1], role=r[2], title=r[3], updated_at=r[4]) for r in rows]
+def list_conversations(project_id: str = Query(...), role: Optional[str] = None,
+                       limit: int = Query(50, ge=1, le=500),
+                       before: Optional[str] = Query(None), before_id: Optional[str] = Query(None)):
+    """Page suivante : before / before_id = updated_at / id du dernier élément reçu."""
+    rows = conv_list(project_id, limit=limit, before=before, before_id=before_id, role=role)
+    return [ConversationInfo(project_id=project_id, **r) for r in rows]
 
 @router.get("/conversations/{conv_id}", response_model=ConversationDetail)
-def get_conversation(conv_id: str):
-    with get_db_conn() as conn:
-        row = conn.execute("SELECT id, project_id, role, title, updated_at, content_json FROM conversations WHERE id = ?", (conv_id,)).fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="Conversation not found")
-        return ConversationDetail(id=row[0], project_id=row[1], role=row[2], title=row[3], updated_at=row[4], content_json=row[5])
+def get_conversation(conv_id: str, limit: Optional[int] = Query(None), before_seq: Optional[int] = Query(None)):
+    conv = conv_get(conv_id, limit=limit, before_seq=before_seq)
+    if not conv:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    # "content" : clé historique lue par WsBackend.loadConversation ; "text" : forme de conversation_turns
+    turns = [{"role": t["role"], "content": t["text"], "text": t["text"]} for t in conv["turns"]]
+    return ConversationDetail(id=conv["id"], project_id=conv["project_id"], role=conv["role"], title=conv["title"],
+                              updated_at=conv["updated_at"], turn_count=conv["turn_count"], content_json=json.dumps(turns, ensure_ascii=False))
 
 @router.post("/conversations/{conv_id}/append")
 def append_to_conversation(conv_id: str, turn: Dict[str, Any] = Body(...)):
     """Ajoute un tour (role: user|assistant, content: str) à une conversation existante."""
-    with get_db_conn() as conn:
-        row = conn.execute("SELECT content_json FROM conversations WHERE id = ?", (conv_id,)).fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="Conversation not found")
-        
-        history = json.loads(row[0])
-        history.append(turn)
-        
-        conn.execute("UPDATE conversations SET content_json = ?, updated_at = datetime('now') WHERE id = ?", 
-                     (json.dumps(history), conv_id))
+    if conv_append(conv_id, turn.get("role", "user"), turn.get("text", turn.get("content", ""))) is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
     return {"ok": True}
 
 # --- BKD CHAT ---
@@ -351,16 +343,8 @@ def bkd_chat_endpoint(req: ChatRequest):
                 break
 
         # Persister le tour dans la DB
-        with get_db_conn() as conn:
-            row = conn.execute("SELECT content_json FROM conversations WHERE id = ?", (conv_id,)).fetchone()
-            if row:
-                hist = json.loads(row[0])
-                hist.append({"role": "user", "content": req.message})
-                hist.append({"role": "assistant", "content": final_text})
-                conn.execute(
-                    "UPDATE conversations SET content_json = ?, updated_at = datetime('now') WHERE id = ?", 
-                    (json.dumps(hist), conv_id)
-                )
+        conv_append(conv_id, "user", req.message)
+        conv_append(conv_id, "assistant", final_text)
 
         return ChatResponse(
             explanation=final_text,
@@ -381,35 +365,15 @@ class ConvCreateRequest(BaseModel):
     role: str = "architect"
     title: Optional[str] = None
 
-class ConvAppendRequest(BaseModel):
-    role: str  # 'user' | 'assistant'
-    text: str
-
 @router.post("/conversations")
 def create_conversation(req: ConvCreateRequest):
     cid = conv_create(req.project_id, req.role, req.title)
     return {"id": cid}
 
-@router.get("/conversations")
-def list_conversations(project_id: str = Query(...), limit: int = Query(5)):
-    return {"conversations": conv_list(project_id, limit)}
-
-@router.get("/conversations/{conv_id}")
-def get_conversation(conv_id: str):
-    conv = conv_get(conv_id)
-    if not conv:
-        raise HTTPException(status_code=404, detail="Conversation not found")
-    return conv
-
-@router.post("/conversations/{conv_id}/append")
-def append_to_conversation(conv_id: str, req: ConvAppendRequest):
-    conv_append(conv_id, req.role, req.text)
-    conv_auto_title(conv_id)
-    return {"ok": True}
-
 @router.delete("/conversations/{conv_id}")
 def delete_conversation(conv_id: str):
     with bkd_db() as con:
+        con.execute("DELETE FROM conversation_turns WHERE conv_id=?", (conv_id,))
         con.execute("DELETE FROM conversations WHERE id=?", (conv_id,))
     return {"ok": True}
 
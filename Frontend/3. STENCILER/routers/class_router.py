@@ -28,7 +28,7 @@ CLASSES_DIR = ROOT_DIR / "classes"
 CLASSES_DIR.mkdir(parents=True, exist_ok=True)
 
 # --- DB ---
-from bkd_service import bkd_db, get_user_role
+from bkd_service import bkd_db, get_user_role, invalidate_project_cache
 
 # --- MODELS ---
 class ClassCreateRequest(BaseModel):
@@ -289,6 +289,7 @@ def delete_class(class_id: str):
     with bkd_db() as con:
         con.execute("DELETE FROM students WHERE class_id=?", (class_id,))
         con.execute("DELETE FROM classes WHERE id=?", (class_id,))
+    invalidate_project_cache()
     return {"ok": True, "id": class_id}
 
 
@@ -404,6 +405,7 @@ def start_student_project(class_id: str, student_id: str):
             "UPDATE students SET project_id=? WHERE id=?",
             (project_id, student_id)
         )
+    invalidate_project_cache()
 
     return StudentStartResponse(
         project_id=project_id,
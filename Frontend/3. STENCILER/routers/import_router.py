@@ -8,6 +8,8 @@ from datetime import datetime
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Body, Request
 from bs4 import BeautifulSoup
 
+from core.id_assigner import ensure_ids
+
 logger = logging.getLogger("ImportRouter")
 
 CWD = Path(__file__).parent.parent.resolve()
@@ -33,55 +35,6 @@ def get_active_project_path(token: str = None):
     return get_active_project_path(token)
 
 
-def ensure_ids(html: str) -> str:
-    """Mission 187: Injecte ou renomme les IDs pour qu'ils soient exploitables."""
-    import re
-    import unicodedata
-
-    def slugify(text: str, max_len: int = 30) -> str:
-        text = unicodedata.normalize("NFD", text).encode("ascii", "ignore").decode()
-        text = re.sub(r"[^\w\s-]", "", text).strip().lower()
-        text = re.sub(r"[\s_]+", "-", text)
-        return text[:max_len].rstrip("-")
-
-    TAG_PREFIXES = {
-        "button": "btn", "a": "lnk", "input": "inp", "form": "frm",
-        "select": "sel", "summary": "tog", "textarea": "inp",
-        "header": "hdr", "footer": "ftr", "nav": "nav", "section": "sec"
-    }
-
-    soup = BeautifulSoup(html, "html.parser")
-    counters = {}
-
-    targets = soup.find_all(["button", "a", "input", "form", "select", "summary", "textarea", "header", "footer", "nav", "section", "h1", "h2", "h3"])
-
-    for el in targets:
-        current_id = el.get("id", "")
-        is_generic = not current_id or re.match(r"^(el|div|section|block|id|tmp|gen)-\d+$", current_id) or len(current_id) < 3
-
-        if is_generic:
-            prefix = TAG_PREFIXES.get(el.name, "el")
-            raw_text = el.get_text(strip=True)[:40] or el.get("placeholder", "") or el.get("aria-label", "") or el.get("name", "")
-
-            if raw_text:
-                slug = slugify(raw_text)
-                new_id = f"{prefix}-{slug}" if slug else f"{prefix}-{counters.get(prefix, 0)+1}"
-            else:
-                counters[prefix] = counters.get(prefix, 0) + 1
-                new_id = f"{prefix}-{counters[prefix]}"
-
-            base_id = new_id
-            c = 1
-            while soup.find(id=new_id):
-                new_id = f"{base_id}-{c}"
-                c += 1
-
-            el["id"] = new_id
-            logger.info(f"Ensured ID: {current_id} -> {new_id}")
-
-    return str(soup)
-
-
 @router.post("/api/import/figma")
 def import_figma_svg(request: Request, body: dict = Body(...)):
     """M265: Reçoit un SVG du plugin Figma → sauve dans imports/ du projet actif."""
@@ -15,7 +15,7 @@ from pathlib import Path
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 
-from bkd_service import bkd_db
+from bkd_service import bkd_db, invalidate_project_cache
 
 from fastapi import APIRouter, HTTPException, Body, UploadFile, File, Request
 from fastapi.responses import FileResponse
@@ -181,6 +181,7 @@ def activate_project(req: ProjectActivateRequest, request: Request = None):
                     "UPDATE students SET project_id=? WHERE ? LIKE class_id || '-' || id || '%'",
                     (req.id, req.id)
                 )
+            invalidate_project_cache()
             logger.info(f"[M304] students.project_id mis à jour pour pattern: {req.id}")
         except Exception as e:
             logger.warning(f"[M304] Student update failed: {e}")
@@ -296,6 +297,7 @@ def delete_project_route(project_id: str):
     # Supprimer de la DB
     with bkd_db() as conn:
         conn.execute('DELETE FROM projects WHERE id=?', (project_id,))
+    invalidate_project_cache()
 
 
     logger.info(f"Project deleted: {project_id}")
@@ -12,7 +12,8 @@ from datetime import datetime
 from typing import Optional
 
 import asyncio
-from fastapi import APIRouter, HTTPException, Request, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 logger = logging.getLogger("AetherFlowV3")
@@ -499,31 +500,65 @@ def run_stitch_push_task(task_id: str, project_id: str, screen_intent: str, toke
 
 
 @router.post("/push")
-def stitch_push(req: PushRequest, background_tasks: BackgroundTasks, request: Request):
+def stitch_push(req: PushRequest, request: Request):
     """Lance une génération d'écran Stitch en arrière-plan depuis le genome du projet."""
     if not _get_stitch_key():
         raise HTTPException(status_code=501, detail="Stitch non configuré")
 
-    from core.task_manager import TaskManager
-    status = TaskManager.create_task()
+    from core.task_manager import TaskManager, TaskQueueFull
 
     token = request.headers.get("X-User-Token")
-    background_tasks.add_task(run_stitch_push_task, status.task_id, req.project_id, req.screen_intent, token)
+    try:
+        status = TaskManager.submit(run_stitch_push_task, req.project_id, req.screen_intent, token, kind="stitch_push")
+    except TaskQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
 
     return {"task_id": status.task_id}
 
 
 @router.get("/task/{task_id}")
-def stitch_task_status(task_id: str):
-    """Retourne l'état d'avancement d'une tâche Stitch."""
+async def stitch_task_status(task_id: str, since: Optional[int] = Query(None), timeout: float = Query(25.0, le=60.0)):
+    """
+    Retourne l'état d'avancement d'une tâche Stitch.
+    Long-poll : avec ?since=<version>, attend (jusqu'à timeout s) un état plus récent.
+    """
     from core.task_manager import TaskManager
-    status = TaskManager.get_task(task_id)
+    if since is None:
+        status = TaskManager.get_task(task_id)
+    else:
+        status = await TaskManager.await_change(task_id, since, timeout)
     if not status:
         raise HTTPException(status_code=404, detail="Task not found")
     
     return status.to_dict()
 
 
+@router.get("/task/{task_id}/events")
+async def stitch_task_events(task_id: str):
+    """SSE : un événement par changement d'état de la tâche, jusqu'à sa fin."""
+    from core.task_manager import TaskManager
+    if not TaskManager.get_task(task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    async def generate():
+        version = -1
+        while True:
+            status = await TaskManager.await_change(task_id, version, 15.0)
+            if status is None:
+                yield f"event: error\ndata: {json.dumps({'error': 'Task not found'})}\n\n"
+                return
+            if status.version == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = status.version
+            yield f"data: {json.dumps(status.to_dict(), ensure_ascii=False)}\n\n"
+            if status.finished:
+                return
+
+    return StreamingResponse(generate(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 # --- M277/M280: CREATE PROJECT (instant via MCP) ---
 
 @router.post("/create-project")
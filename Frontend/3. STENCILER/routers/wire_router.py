@@ -4,7 +4,6 @@ Contains all wire-related routes for the Stenciler module.
 """
 
 import os
-import re
 import json
 import ast
 import uuid
@@ -21,6 +20,7 @@ from pydantic import BaseModel, Field
 from bs4 import BeautifulSoup
 
 from wire_analyzer import WireAnalyzer
+from core.id_assigner import ensure_ids
 
 logger = logging.getLogger("WireRouter")
 
@@ -107,46 +107,6 @@ WIRES (CÂBLAGE) : {len(manifest.get('wires', []))} actifs
         return "ALERTE : Échec du chargement du manifeste."
 
 
-def ensure_ids(html: str) -> str:
-    """Mission 187: Injecte ou renomme les IDs pour qu'ils soient exploitables."""
-    soup = BeautifulSoup(html, 'html.parser')
-    counters = {}
-
-    TAG_PREFIXES = {
-        'button': 'btn', 'a': 'lnk', 'input': 'inp', 'form': 'frm',
-        'select': 'sel', 'summary': 'tog', 'textarea': 'inp',
-        'header': 'hdr', 'footer': 'ftr', 'nav': 'nav', 'section': 'sec'
-    }
-
-    targets = soup.find_all(['button', 'a', 'input', 'form', 'select', 'summary', 'textarea', 'header', 'footer', 'nav', 'section', 'h1', 'h2', 'h3'])
-
-    for el in targets:
-        current_id = el.get('id', '')
-        is_generic = not current_id or re.match(r'^(el|div|section|block|id|tmp|gen)-\d+$', current_id) or len(current_id) < 3
-
-        if is_generic:
-            prefix = TAG_PREFIXES.get(el.name, 'el')
-            raw_text = el.get_text(strip=True)[:40] or el.get('placeholder', '') or el.get('aria-label', '') or el.get('name', '')
-
-            if raw_text:
-                slug = re.sub(r'[^\w\s-]', '', raw_text).strip().lower()
-                slug = re.sub(r'[\s_]+', '-', slug)
-                new_id = f"{prefix}-{slug}" if slug else f"{prefix}-{counters.get(prefix, 0)+1}"
-            else:
-                counters[prefix] = counters.get(prefix, 0) + 1
-                new_id = f"{prefix}-{counters[prefix]}"
-
-            base_id = new_id
-            c = 1
-            while soup.find(id=new_id):
-                new_id = f"{base_id}-{c}"
-                c += 1
-
-            el['id'] = new_id
-
-    return str(soup)
-
-
 # --- Router ---
 
 router = APIRouter()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Benchmark BRSStorage.search_page : latence des requêtes FTS5 sur un corpus synthétique.
+
+Charge N messages assistant (vocabulaire à distribution de Zipf, répartis sur
+plusieurs utilisateurs) puis mesure p50 / p95 pour : recherche simple, filtrée
+par utilisateur, par préfixe (saisie incrémentale) et page suivante via curseur.
+
+Usage :
+    python scripts/benchmark_brs_search.py --messages 1000000 --users 200 --queries 500
+    python scripts/benchmark_brs_search.py --messages 100000 --tokenizer trigram
+"""
+import argparse
+import itertools
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Backend.Prod.retro_genome.brs_storage import BRSStorage
+
+VOCABULARY_SIZE = 20000
+WORDS_PER_MESSAGE = 40
+
+
+def build_vocabulary(rng: random.Random) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    return sorted(words)
+
+
+def load_corpus(storage: BRSStorage, n_messages: int, n_users: int, vocabulary: list, rng: random.Random) -> None:
+    """Insertion en masse (hors file d'écriture) : sessions, messages et index FTS."""
+    n_sessions = max(n_users, n_messages // 50)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    conn = storage._connect()
+    with conn:
+        conn.executemany(
+            "INSERT INTO sessions (id, user_id, prompt, buffer_answers, created_at) VALUES (?, ?, '', '{}', '')",
+            ((f"s{i}", f"u{i % n_users}") for i in range(n_sessions)),
+        )
+    batch = 50000
+    for start in range(0, n_messages, batch):
+        rows = []
+        for i in range(start, min(start + batch, n_messages)):
+            session = i % n_sessions
+            content = " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=WORDS_PER_MESSAGE))
+            rows.append((f"m{i}", f"s{session}", "gemini", content, f"u{session % n_users}"))
+        with conn:
+            conn.executemany(
+                "INSERT INTO messages (id, session_id, provider, role, content, created_at) "
+                "VALUES (?, ?, ?, 'assistant', ?, '')",
+                (row[:4] for row in rows),
+            )
+            conn.executemany(
+                "INSERT INTO messages_fts (session_id, provider, content, user_id) VALUES (?, ?, ?, ?)",
+                (row[1:] for row in rows),
+            )
+        print(f"  {min(start + batch, n_messages):>9} messages chargés", end="\r", flush=True)
+    with conn:
+        conn.execute("INSERT INTO messages_fts(messages_fts) VALUES ('optimize')")
+    conn.close()
+    print()
+
+
+def measure(fn, queries: list) -> list:
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recherche FTS5 BRS")
+    parser.add_argument("--messages", type=int, default=1_000_000, help="Taille du corpus")
+    parser.add_argument("--users", type=int, default=200, help="Nombre d'utilisateurs")
+    parser.add_argument("--queries", type=int, default=500, help="Requêtes par scénario")
+    parser.add_argument("--tokenizer", choices=["unicode61", "trigram"], default="unicode61")
+    parser.add_argument("--db", type=Path, help="Réutilise/crée la base à ce chemin (sinon répertoire temporaire)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = build_vocabulary(rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or Path(tmp) / "brs_bench.db"
+        storage = BRSStorage(str(db_path), tokenizer=args.tokenizer)
+        try:
+            if not storage._read("SELECT 1 FROM messages LIMIT 1"):
+                started = time.perf_counter()
+                load_corpus(storage, args.messages, args.users, vocabulary, rng)
+                print(f"Chargement : {time.perf_counter() - started:.1f}s ({args.tokenizer})")
+
+            # Requêtes : deux termes de fréquence moyenne à rare (rangs 200+ de la loi de Zipf)
+            terms = [" ".join(rng.sample(vocabulary[200:], 2)) for _ in range(args.queries)]
+            single = [rng.choice(vocabulary[200:]) for _ in range(args.queries)]
+            users = [f"u{rng.randrange(args.users)}" for _ in range(args.queries)]
+            first_pages = {q: storage.search_page(q, limit=20) for q in single}
+
+            scenarios = {
+                "simple (2 termes)": measure(lambda q: storage.search_page(q), terms),
+                "filtre user_id": measure(lambda qu: storage.search_page(qu[0], user_id=qu[1]), list(zip(single, users))),
+                "préfixe (saisie)": measure(lambda q: storage.search_page(q[:4], prefix=True), single),
+                "page 2 (curseur)": measure(
+                    lambda q: storage.search_page(q, cursor=first_pages[q]["next_cursor"])
+                    if first_pages[q]["next_cursor"] else None,
+                    single,
+                ),
+            }
+        finally:
+            storage.close()
+
+    print(f"{'scénario':<20} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, timings in scenarios.items():
+        print(f"{name:<20} {statistics.median(timings):>8.2f} {percentile(timings, 0.95):>8.2f} {max(timings):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
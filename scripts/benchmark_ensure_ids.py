@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Benchmark ensure_ids (Stenciler) : attribution d'IDs sur des pages de 5k à 50k éléments.
+
+Compare la passe linéaire de core/id_assigner.py à l'ancienne boucle
+``while soup.find(id=new_id)`` (un parcours complet de l'arbre par candidat),
+et vérifie que les deux produisent le même HTML.
+
+Usage :
+    python scripts/benchmark_ensure_ids.py --sizes 5000 20000 50000 --legacy-max 1000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+# Le Stenciler importe ses modules depuis son propre répertoire
+sys.path.insert(0, str(Path(__file__).parent.parent / "Frontend" / "3. STENCILER"))
+
+from core.id_assigner import HAS_LXML, TAG_PREFIXES, TARGET_TAGS, ensure_ids, slugify
+
+LABELS = ["Voir plus", "Acheter", "Détails", "Suivant", "Profil", "Paramètres", "Aide", "Contact"]
+
+
+def build_page(n_elements: int, seed: int = 42) -> str:
+    """Page type export Stitch/Figma : cartes répétées, libellés dupliqués, IDs génériques."""
+    rng = random.Random(seed)
+    cards = []
+    for i in range(n_elements // 5):
+        label = rng.choice(LABELS)
+        generic = f' id="el-{i}"' if rng.random() < 0.3 else ""
+        cards.append(
+            f'<section{generic}><h3>{label} {i % 50}</h3>'
+            f'<a href="#">{label}</a><button>{label}</button>'
+            f'<input placeholder="{label}"><button></button></section>'
+        )
+    return "<!DOCTYPE html><html><body><nav><a>Accueil</a></nav>" + "".join(cards) + "</body></html>"
+
+
+def legacy_ensure_ids(html: str) -> str:
+    """Référence : ancien algorithme (soup.find par candidat, quadratique)."""
+    soup = BeautifulSoup(html, "html.parser")
+    counters = {}
+    for el in soup.find_all(TARGET_TAGS):
+        current_id = el.get("id", "")
+        if not current_id or re.match(r"^(el|div|section|block|id|tmp|gen)-\d+$", current_id) or len(current_id) < 3:
+            prefix = TAG_PREFIXES.get(el.name, "el")
+            raw_text = el.get_text(strip=True)[:40] or el.get("placeholder", "") or el.get("aria-label", "") or el.get("name", "")
+            if raw_text:
+                slug = slugify(raw_text)
+                new_id = f"{prefix}-{slug}" if slug else f"{prefix}-{counters.get(prefix, 0)+1}"
+            else:
+                counters[prefix] = counters.get(prefix, 0) + 1
+                new_id = f"{prefix}-{counters[prefix]}"
+            base_id, c = new_id, 1
+            while soup.find(id=new_id):
+                new_id = f"{base_id}-{c}"
+                c += 1
+            el["id"] = new_id
+    return str(soup)
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ensure_ids")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 20000, 50000], help="Éléments par page")
+    parser.add_argument("--legacy-max", type=int, default=1000, help="Taille max pour l'ancien algorithme (quadratique)")
+    args = parser.parse_args()
+
+    print(f"{'éléments':>9} {'html.parser s':>14} {'lxml s':>8} {'ancien s':>9} {'identique':>10}")
+    for size in args.sizes:
+        html = build_page(size)
+        linear, t_linear = timed(ensure_ids, html, parser="html.parser")
+        t_lxml = timed(ensure_ids, html)[1] if HAS_LXML else float("nan")
+        if size <= args.legacy_max:
+            legacy, t_legacy = timed(legacy_ensure_ids, html)
+            same = "oui" if legacy == linear else "NON"
+        else:
+            t_legacy, same = float("nan"), "-"
+        print(f"{size:>9} {t_linear:>14.2f} {t_lxml:>8.2f} {t_legacy:>9.2f} {same:>10}")
+
+
+if __name__ == "__main__":
+    main()
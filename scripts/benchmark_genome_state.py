@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmark GenomeStateManager : coût d'une modification selon la taille du Genome.
+
+Compare la copie de chemin (arbre persistant) à l'ancien deepcopy complet.
+Le coût par modification doit rester constant quand le Genome grossit.
+
+Usage :
+    python scripts/benchmark_genome_state.py --sizes 10 100 1000 --edits 500
+"""
+import argparse
+import copy
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Backend.Prod.sullivan.stenciler.genome_state_manager import GenomeStateManager
+
+
+def build_genome(n_phases: int, n_sections: int = 5, n_features: int = 5) -> dict:
+    """Genome synthétique : n_phases × n_sections × n_features nœuds."""
+    return {
+        "version": "2.0.0",
+        "n0_phases": [
+            {
+                "id": f"phase_{i}",
+                "name": f"Phase {i}",
+                "n1_sections": [
+                    {
+                        "id": f"section_{i}_{j}",
+                        "name": f"Section {j}",
+                        "n2_features": [
+                            {"id": f"feature_{i}_{j}_{k}", "name": f"Feature {k}", "density": "normal"}
+                            for k in range(n_features)
+                        ],
+                    }
+                    for j in range(n_sections)
+                ],
+            }
+            for i in range(n_phases)
+        ],
+    }
+
+
+def random_paths(n_phases: int, count: int, n_sections: int = 5, n_features: int = 5) -> list:
+    rng = random.Random(42)
+    return [
+        f"n0[{rng.randrange(n_phases)}].n1_sections[{rng.randrange(n_sections)}]"
+        f".n2_features[{rng.randrange(n_features)}]"
+        for _ in range(count)
+    ]
+
+
+def bench_path_copy(genome_file: Path, paths: list) -> list:
+    manager = GenomeStateManager(str(genome_file), autosave=False)
+    timings = []
+    for i, path in enumerate(paths):
+        started = time.perf_counter()
+        manager.apply_modification(path, "density", "compact" if i % 2 else "airy")
+        timings.append((time.perf_counter() - started) * 1e6)
+    return timings
+
+
+def bench_deepcopy(genome: dict, paths: list) -> list:
+    """Référence : ancien comportement (deepcopy complet à chaque modification)."""
+    timings = []
+    current = dict(genome, n0=genome["n0_phases"])  # même normalisation que le manager
+    for i, path in enumerate(paths):
+        started = time.perf_counter()
+        current = copy.deepcopy(current)
+        node = current
+        for part in path.split("."):
+            level, index = part[:-1].split("[")
+            node = node[level][int(index)]
+        node["density"] = "compact" if i % 2 else "airy"
+        timings.append((time.perf_counter() - started) * 1e6)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GenomeStateManager")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Nombre de phases n0")
+    parser.add_argument("--edits", type=int, default=500, help="Modifications par taille")
+    args = parser.parse_args()
+
+    print(f"{'phases':>8} {'nœuds':>8} {'copie chemin µs':>16} {'deepcopy µs':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_phases in args.sizes:
+            genome = build_genome(n_phases)
+            genome_file = Path(tmp) / f"genome_{n_phases}.json"
+            genome_file.write_text(json.dumps(genome))
+            paths = random_paths(n_phases, args.edits)
+
+            path_copy = statistics.median(bench_path_copy(genome_file, paths))
+            # Le deepcopy est coûteux : on limite le nombre d'itérations
+            deep = statistics.median(bench_deepcopy(genome, paths[:min(len(paths), 50)]))
+            n_nodes = n_phases * (1 + 5 + 25)
+            print(f"{n_phases:>8} {n_nodes:>8} {path_copy:>16.1f} {deep:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()